@@ -4,6 +4,8 @@ RideHub Professional Frontend - Complete Implementation Summary
 ==============================================================
 
 This document summarizes all professional UI improvements made to the RideHub app.
+Importing it has no side effects; run it to print the summary banner.  Tools
+read single fields through ``python -m ridehub.manifest get <key>``.
 """
 
 IMPLEMENTATION_COMPLETE = {
@@ -93,15 +95,122 @@ IMPLEMENTATION_COMPLETE = {
 
     "color_palette": {
         "primary": {
-            "blacks": ["#000000", "#111827"],
-            "blues": ["#0EA5E9", "#0284C7", "#0369A1", "#082F49"],
-            "grays": ["#F9FAFB", "#F3F4F6", "#E5E7EB", "#D1D5DB", "#9CA3AF", "#6B7280", "#4B5563", "#374151", "#1F2937"]
+            "50": "#F0F9FF",
+            "100": "#E0F2FE",
+            "200": "#BAE6FD",
+            "300": "#7DD3FC",
+            "400": "#38BDF8",
+            "500": "#0EA5E9",
+            "600": "#0284C7",
+            "700": "#0369A1",
+            "800": "#075985",
+            "900": "#082F49"
+        },
+        "neutral": {
+            "0": "#FFFFFF",
+            "50": "#F9FAFB",
+            "100": "#F3F4F6",
+            "200": "#E5E7EB",
+            "300": "#D1D5DB",
+            "400": "#9CA3AF",
+            "500": "#6B7280",
+            "600": "#4B5563",
+            "700": "#374151",
+            "800": "#1F2937",
+            "900": "#111827"
         },
         "status": {
             "success": "#10B981",
             "warning": "#F59E0B",
             "danger": "#EF4444",
-            "info": "#3B82F6"
+            "info": "#3B82F6",
+            "error": "#DC2626"
+        },
+        "semantic": {
+            "background": "#FFFFFF",
+            "surface": "#F9FAFB",
+            "border": "#E5E7EB"
+        },
+        "text": {
+            "primary": "#111827",
+            "secondary": "#6B7280",
+            "tertiary": "#9CA3AF",
+            "inverse": "#FFFFFF"
+        },
+        "brand": {
+            "black": "#000000",
+            "coral": "#F37254",
+            "coralLight": "#FCF3F1"
+        },
+        "scales": {
+            "secondary": {
+                "100": "#F8F8F8",
+                "200": "#F1F1F1",
+                "300": "#D9D9D9",
+                "400": "#C2C2C2",
+                "500": "#AAAAAA",
+                "600": "#999999",
+                "700": "#666666",
+                "800": "#4D4D4D",
+                "900": "#333333"
+            },
+            "success": {
+                "100": "#F0FFF4",
+                "200": "#C6F6D5",
+                "300": "#9AE6B4",
+                "400": "#68D391",
+                "500": "#38A169",
+                "600": "#2F855A",
+                "700": "#276749",
+                "800": "#22543D",
+                "900": "#1C4532"
+            },
+            "danger": {
+                "100": "#FFF5F5",
+                "200": "#FED7D7",
+                "300": "#FEB2B2",
+                "400": "#FC8181",
+                "500": "#F56565",
+                "600": "#E53E3E",
+                "700": "#C53030",
+                "800": "#9B2C2C",
+                "900": "#742A2A"
+            },
+            "warning": {
+                "100": "#FFFBEB",
+                "200": "#FEF3C7",
+                "300": "#FDE68A",
+                "400": "#FACC15",
+                "500": "#EAB308",
+                "600": "#CA8A04",
+                "700": "#A16207",
+                "800": "#854D0E",
+                "900": "#713F12"
+            },
+            "general": {
+                "100": "#CED1DD",
+                "200": "#858585",
+                "300": "#EEEEEE",
+                "400": "#0CC25F",
+                "500": "#F6F8FA",
+                "600": "#E6F3FF",
+                "700": "#EBEBEB",
+                "800": "#ADADAD"
+            }
+        },
+        "aliases": {
+            "primary": "brand.black",
+            "secondary": "brand.coral",
+            "tertiary": "brand.coralLight",
+            "success": "status.success",
+            "warning": "status.warning",
+            "danger": "status.danger",
+            "info": "status.info",
+            "lightGray": "neutral.100",
+            "mediumGray": "neutral.300",
+            "darkGray": "neutral.500",
+            "white": "neutral.0",
+            "black": "brand.black"
         }
     },
 
@@ -135,13 +244,65 @@ IMPLEMENTATION_COMPLETE = {
         }
     },
 
+    "radius_system": {
+        "presets": {
+            "none": "0px",
+            "xs": "4px",
+            "sm": "8px",
+            "md": "12px",
+            "lg": "16px",
+            "xl": "20px",
+            "2xl": "24px",
+            "3xl": "32px",
+            "full": "9999px"
+        }
+    },
+
     "shadow_system": {
+        "color": "#000",
         "levels": {
-            "sm": "Subtle (elevation: 1)",
-            "md": "Noticeable (elevation: 2)",
-            "lg": "Prominent (elevation: 4)",
-            "xl": "Strong (elevation: 5)",
-            "2xl": "Very Strong (elevation: 6)"
+            "none": {
+                "label": "None",
+                "offset": "0px",
+                "blur": "0px",
+                "opacity": 0,
+                "elevation": 0
+            },
+            "sm": {
+                "label": "Subtle",
+                "offset": "1px",
+                "blur": "2px",
+                "opacity": 0.05,
+                "elevation": 1
+            },
+            "md": {
+                "label": "Noticeable",
+                "offset": "2px",
+                "blur": "4px",
+                "opacity": 0.1,
+                "elevation": 2
+            },
+            "lg": {
+                "label": "Prominent",
+                "offset": "4px",
+                "blur": "8px",
+                "opacity": 0.15,
+                "elevation": 4
+            },
+            "xl": {
+                "label": "Strong",
+                "offset": "8px",
+                "blur": "16px",
+                "opacity": 0.2,
+                "elevation": 5
+            },
+            "2xl": {
+                "label": "Very Strong",
+                "offset": "12px",
+                "blur": "24px",
+                "opacity": 0.25,
+                "elevation": 6
+            }
         }
     },
 
@@ -255,12 +416,410 @@ IMPLEMENTATION_COMPLETE = {
         ]
     },
 
+    "backend_services": {
+        "EtaEngine": {
+            "file": "ridehub/eta.py",
+            "replaces": "lib/map.ts calculateDriverTimes",
+            "features": [
+                "shared rider -> destination leg resolved once per rider",
+                "N-driver x M-rider pickup legs as one NumPy matrix",
+                "same {...marker, time, price} output shape",
+                "pluggable leg_duration for the shared leg"
+            ],
+            "benchmark": "benchmarks/bench_eta.py",
+            "usage": "Driver ETAs and fares for confirm-ride"
+        },
+        "GeoIndex": {
+            "file": "ridehub/geoindex.py",
+            "replaces": "lib/map.ts generateMarkersFromData full scan",
+            "features": [
+                "uniform lat/lng geocell grid",
+                "k-nearest queries with ring expansion",
+                "radius queries over overlapping cells only",
+                "O(1) insert, move and remove"
+            ],
+            "benchmark": "benchmarks/bench_geoindex.py",
+            "usage": "Nearest-driver lookup for the map and dispatch"
+        },
+        "PositionIngestor": {
+            "file": "ridehub/ingest.py",
+            "replaces": "store/index.ts one-shot setDrivers",
+            "features": [
+                "asyncio tick loop over batched GPS fixes",
+                "latest fix per driver kept within each tick",
+                "one vectorized apply per tick, stale fixes ignored",
+                "copy-on-write snapshots for lock-free readers",
+                "bounded queue for producer backpressure"
+            ],
+            "benchmark": "benchmarks/bench_ingest.py",
+            "usage": "Live driver positions for markers and ETAs"
+        },
+        "RouteCache": {
+            "file": "ridehub/route_cache.py",
+            "replaces": "lib/map.ts per-call Directions fetch",
+            "features": [
+                "origin/destination snapped to a configurable grid",
+                "TTL expiry and LRU eviction",
+                "hit/miss/eviction/expiration counters",
+                "wraps any leg fetcher for EtaEngine"
+            ],
+            "standin": "ridehub/standins.py DirectionsStandIn",
+            "benchmark": "benchmarks/bench_route_cache.py",
+            "usage": "Reuse Directions durations across nearby riders"
+        },
+        "AsyncDirectionsClient": {
+            "file": "ridehub/directions.py",
+            "replaces": "lib/map.ts fetch loop",
+            "features": [
+                "keep-alive HTTP/1.1 connection pool",
+                "pool size doubles as concurrency semaphore",
+                "identical in-flight legs coalesced into one future",
+                "retry with full-jitter exponential backoff"
+            ],
+            "benchmark": "benchmarks/bench_directions_client.py",
+            "usage": "Directions lookups from the backend"
+        },
+        "Dispatcher": {
+            "file": "ridehub/assignment.py",
+            "replaces": "per-rider setSelectedDriver matching",
+            "features": [
+                "open requests batched per dispatch tick",
+                "Hungarian solver vectorized over columns",
+                "Jacobi auction with epsilon scaling",
+                "greedy completion when the time budget runs out"
+            ],
+            "benchmark": "benchmarks/bench_assignment.py",
+            "usage": "Many-to-many rider-driver matching at peak"
+        },
+        "ClusterIndex": {
+            "file": "ridehub/clustering.py",
+            "replaces": "components/Map.tsx one Marker per driver",
+            "features": [
+                "nested geocell grid, one level per zoom",
+                "cluster centroids with counts per viewport",
+                "individual drivers only where visible",
+                "incremental moves via DriverTable.subscribe"
+            ],
+            "benchmark": "benchmarks/bench_clustering.py",
+            "usage": "Zoom-aware map marker payloads"
+        },
+        "WireFormat": {
+            "file": "ridehub/wire.py",
+            "schemas": "ridehub/models.py (mirrors types/type.d.ts)",
+            "features": [
+                "schema-versioned columnar encoding for markers and rides",
+                "fixed-width numeric columns via array/struct",
+                "interned string side table",
+                "zero-copy memoryview reader"
+            ],
+            "benchmark": "benchmarks/bench_wire.py",
+            "usage": "Compact marker and ride list responses"
+        },
+        "RideStore": {
+            "file": "ridehub/ride_store.py",
+            "replaces": "lib/utils.ts sortRides and the rides.tsx payment_status filter",
+            "features": [
+                "array-backed Ride columns with interned strings",
+                "created_at parsed once into an integer sort key",
+                "posting lists on user_id, driver_id and payment_status",
+                "opaque cursor pagination, newest first"
+            ],
+            "benchmark": "benchmarks/bench_ride_store.py",
+            "usage": "Ride history pages and status tabs"
+        },
+        "RideImportExport": {
+            "file": "ridehub/ride_io.py",
+            "replaces": "MOCK_RIDES array in app/(root)/(tabs)/rides.tsx",
+            "features": [
+                "chunked NDJSON and gzip NDJSON generators",
+                "validation against the Ride interface with line numbers",
+                "flat memory regardless of file size",
+                "import into and export out of RideStore"
+            ],
+            "benchmark": "benchmarks/bench_ride_io.py",
+            "usage": "Ride history backfills and analytics dumps"
+        },
+        "FareEngine": {
+            "file": "ridehub/fares.py",
+            "replaces": "(totalTime * 0.5).toFixed(2) in calculateDriverTimes",
+            "features": [
+                "base, per-minute, per-km and minimum fare in one NumPy expression",
+                "dense geocell surge grid with dirty-cell refresh",
+                "DriverTable listener keeps supply counts current",
+                "toFixed(2)-exact price rendering"
+            ],
+            "benchmark": "benchmarks/bench_fares.py",
+            "usage": "Quoting every candidate driver for many riders at once"
+        },
+        "PromoEngine": {
+            "file": "ridehub/promos.py",
+            "replaces": "myCodes list walk in app/(root)/promo-codes.tsx",
+            "features": [
+                "normalized fixed-width codes in NumPy columns",
+                "Bloom filter in front of an open-addressing hash index",
+                "percentage/fixed rules compiled to arrays for batch discounts",
+                "striped-lock usesLeft decrement on redeem"
+            ],
+            "benchmark": "benchmarks/bench_promos.py",
+            "usage": "Validating and applying campaign codes at 10M issued"
+        },
+        "WalletLedger": {
+            "file": "ridehub/ledger.py",
+            "replaces": "useState(45.5) balance and literal transactions in app/(root)/wallet.tsx",
+            "features": [
+                "append-only 128-byte CRC-checked records read through mmap",
+                "integer-cent balances kept per account, checkpointed atomically",
+                "per-type and per-status back-pointer chains for filtered history",
+                "cursor pages independent of history length"
+            ],
+            "benchmark": "benchmarks/bench_ledger.py",
+            "usage": "Wallet balance, top-ups and transaction history"
+        },
+        "ChatBroker": {
+            "file": "ridehub/chat.py",
+            "replaces": "static conversations and messages arrays in app/(root)/(tabs)/chat.tsx",
+            "features": [
+                "bounded ring-buffer history per conversation",
+                "unreadCount from two counters per side, no scans",
+                "bounded subscriber outboxes; slow readers stall then are dropped",
+                "newline-delimited JSON over TCP, many conversations per socket"
+            ],
+            "benchmark": "benchmarks/bench_chat.py",
+            "usage": "Rider <-> driver messaging with live delivery and unread badges"
+        },
+        "AutocompleteCache": {
+            "file": "ridehub/places.py",
+            "replaces": "per-keystroke Places requests from components/GoogleTextInput.tsx",
+            "features": [
+                "prefix trie with per-node TTL and LRU-bounded size",
+                "concurrent identical prefixes share one upstream call",
+                "longer prefixes filtered from complete shorter results",
+                "pooled keep-alive upstream client"
+            ],
+            "standin": "ridehub/standins.py PlacesStandIn",
+            "benchmark": "benchmarks/bench_places.py",
+            "usage": "Share pickup/destination suggestions across riders"
+        },
+        "DispatchRuntime": {
+            "file": "ridehub/shards.py",
+            "replaces": "single-threaded driver matching over store/index.ts drivers",
+            "features": [
+                "city split into geocell-block shards owned by worker processes",
+                "driver positions in shared memory, one dense slot range per shard",
+                "per-shard sequence counters; workers re-run shards written mid-match",
+                "border requests read neighbour shards; coordinator resolves claims"
+            ],
+            "benchmark": "benchmarks/bench_shards.py",
+            "usage": "Parallel dispatch ticks across worker processes"
+        },
+        "RouteGeometryCache": {
+            "file": "ridehub/polyline.py",
+            "replaces": "full-resolution route geometry drawn by components/Map.tsx",
+            "features": [
+                "Douglas-Peucker vertex ranking, one vectorized pass per tree level",
+                "zoom-dependent tolerance as a threshold on the ranking",
+                "vectorized Google encoded-polyline encode and decode",
+                "LRU cache of encoded strings per route and zoom"
+            ],
+            "benchmark": "benchmarks/bench_polyline.py",
+            "usage": "Ship pixel-accurate route polylines sized to the map zoom"
+        },
+        "BookingLoad": {
+            "file": "ridehub/loadtest.py",
+            "replaces": "unmeasured app/(root) find-ride -> confirm-ride -> book-ride -> payment flow",
+            "features": [
+                "concurrent riders walking every booking stage against the ridehub services",
+                "whole-fleet GPS streaming through the ingestor while riders book",
+                "seeded columnar and block-streamed generators scaling to millions of records",
+                "per-stage throughput and p50/p95/p99 written to JSON, compared against a baseline"
+            ],
+            "standin": "ridehub/standins.py PlacesStandIn, DirectionsStandIn",
+            "benchmark": "benchmarks/bench_booking.py",
+            "usage": "Catch end-to-end booking regressions by diffing load reports across runs"
+        },
+        "Metrics": {
+            "file": "ridehub/metrics.py",
+            "replaces": "console.log in lib/fetch.ts, lib/map.ts and lib/auth.ts",
+            "features": [
+                "counters and HDR-style log-linear latency histograms in integer nanoseconds",
+                "timed() decorator and Histogram.time() context manager under 1 us per call",
+                "Prometheus text exposition on /metrics",
+                "on-demand sampling profiler dump in folded-stack form on /debug/profile"
+            ],
+            "benchmark": "benchmarks/bench_metrics.py",
+            "usage": "Scrape /metrics; fetch /debug/profile?seconds=N for a flame graph"
+        },
+        "TokenCompiler": {
+            "file": "ridehub/tokens.py",
+            "replaces": "palettes hand-copied into theme.ts, constants and tailwind.config.js",
+            "features": [
+                "color_palette, spacing_system, radius_system, shadow_system as the single source",
+                "manifest read with ast, never imported or executed",
+                "per-section digests in block markers; unchanged files are never rewritten",
+                "stat-gated no-op builds and a polling --watch mode; --check for CI"
+            ],
+            "benchmark": "benchmarks/bench_tokens.py",
+            "usage": "python -m ridehub.tokens after editing tokens, or --watch while iterating"
+        },
+        "AssetPipeline": {
+            "file": "ridehub/assets.py",
+            "replaces": "raw PNGs from uber_assets.zip imported by constants/index.ts",
+            "features": [
+                "zip read through mmap, members inflated in place; __MACOSX and .DS_Store skipped",
+                "@1x/@2x/@3x area-averaged renditions encoded in a process pool (ridehub/png.py)",
+                "smallest of indexed and truecolour PNG encodings, per-row filters, no metadata",
+                "content-addressed cache: unchanged masters are never decoded again"
+            ],
+            "benchmark": "benchmarks/bench_assets.py",
+            "usage": "python -m ridehub.assets uber_assets.zip build/ before bundling"
+        },
+        "FontStage": {
+            "file": "ridehub/fonts.py",
+            "replaces": "all 14 PlusJakartaSans faces shipped in full, 7 loaded at startup",
+            "features": [
+                "faces found from font-* classes and fontFamily styles in app/ and components/",
+                "referenced but not loaded by useFonts is an error; unused loads are reported",
+                "glyph-id-preserving subset to locale code points (ridehub/ttf.py)",
+                "subsets cached by font and code-point hash; warm runs place nothing"
+            ],
+            "benchmark": "benchmarks/bench_fonts.py",
+            "usage": "python -m ridehub.fonts build/ before bundling"
+        },
+        "Manifest": {
+            "file": "ridehub/manifest.py",
+            "replaces": "importing IMPLEMENTATION_COMPLETE.py, which printed a 343-line banner",
+            "features": [
+                "literal parsed once into a marshal snapshot in __pycache__, one blob per section",
+                "snapshot checked by mtime and size, then CRC-32; a touch only refreshes the index",
+                "sections unmarshalled on first access; dotted keys reach into dicts and lists",
+                "CLI without argparse or json imports; importing the manifest prints nothing"
+            ],
+            "benchmark": "benchmarks/bench_manifest.py",
+            "usage": "python -m ridehub.manifest get color_palette.status"
+        },
+        "VisualDiff": {
+            "file": "ridehub/visual.py",
+            "replaces": "no screenshot coverage of the component variants",
+            "features": [
+                "case matrix (component x variant x size/state) enumerated from this manifest",
+                "byte-identical screenshots skipped on SHA-256 before any decode",
+                "pixelmatch YIQ threshold and anti-aliasing test, vectorised with NumPy",
+                "pairs diffed in a process pool; diff images and report.json for failures"
+            ],
+            "benchmark": "benchmarks/bench_visual.py",
+            "usage": "python -m ridehub.visual baseline/ current/ --out visual-diff"
+        },
+        "ImportGraph": {
+            "file": "ridehub/imports.py",
+            "replaces": "no check that shipped assets, components or manifest entries are used",
+            "features": [
+                "import/export graph walked from every expo-router route and app.json",
+                "per-key reachability through exported object literals such as icons",
+                "used, unused (bundled but unreached) and orphan bytes per asset and module",
+                "per-file parses cached by content hash; manifest claims checked against the tree"
+            ],
+            "benchmark": "benchmarks/bench_imports.py",
+            "usage": "python -m ridehub.imports --report graph.json"
+        }
+    },
+
+    "metrics": {
+        "ridehub_chat_post_seconds": {
+            "type": "histogram",
+            "file": "ridehub/chat.py",
+            "measures": "ChatBroker.post, backpressure waits included"
+        },
+        "ridehub_directions_fetch_seconds": {
+            "type": "histogram",
+            "file": "ridehub/directions.py",
+            "measures": "AsyncDirectionsClient.fetch, retries included"
+        },
+        "ridehub_directions_retries_total": {
+            "type": "counter",
+            "file": "ridehub/directions.py",
+            "measures": "Directions requests retried after failing"
+        },
+        "ridehub_eta_batch_seconds": {
+            "type": "histogram",
+            "file": "ridehub/eta.py",
+            "measures": "EtaEngine.batch, drivers x riders"
+        },
+        "ridehub_driver_table_apply_seconds": {
+            "type": "histogram",
+            "file": "ridehub/ingest.py",
+            "measures": "DriverTable.apply of one coalesced batch"
+        },
+        "ridehub_position_fixes_applied_total": {
+            "type": "counter",
+            "file": "ridehub/ingest.py",
+            "measures": "GPS fixes written to the table"
+        },
+        "ridehub_fare_quote_seconds": {
+            "type": "histogram",
+            "file": "ridehub/fares.py",
+            "measures": "FareEngine.quote of one array of trips"
+        },
+        "ridehub_surge_refresh_seconds": {
+            "type": "histogram",
+            "file": "ridehub/fares.py",
+            "measures": "SurgeGrid.refresh of the dirty cells"
+        },
+        "ridehub_ledger_append_seconds": {
+            "type": "histogram",
+            "file": "ridehub/ledger.py",
+            "measures": "WalletLedger.append_many of one batch"
+        },
+        "ridehub_ledger_records_total": {
+            "type": "counter",
+            "file": "ridehub/ledger.py",
+            "measures": "Transactions appended to the log"
+        },
+        "ridehub_places_autocomplete_seconds": {
+            "type": "histogram",
+            "file": "ridehub/places.py",
+            "measures": "AutocompleteCache.autocomplete, upstream waits included"
+        },
+        "ridehub_places_upstream_total": {
+            "type": "counter",
+            "file": "ridehub/places.py",
+            "measures": "Autocomplete requests sent upstream"
+        },
+        "ridehub_promo_redeem_seconds": {
+            "type": "histogram",
+            "file": "ridehub/promos.py",
+            "measures": "PromoEngine.redeem of one code"
+        },
+        "ridehub_promo_rejected_total": {
+            "type": "counter",
+            "file": "ridehub/promos.py",
+            "measures": "Redemptions refused for any reason"
+        },
+        "ridehub_ride_store_query_seconds": {
+            "type": "histogram",
+            "file": "ridehub/ride_store.py",
+            "measures": "RideStore.query of one page"
+        },
+        "ridehub_assignment_solve_seconds": {
+            "type": "histogram",
+            "file": "ridehub/assignment.py",
+            "measures": "solve() of one cost matrix"
+        },
+        "ridehub_dispatch_tick_seconds": {
+            "type": "histogram",
+            "file": "ridehub/shards.py",
+            "measures": "DispatchRuntime.tick across shards"
+        }
+    },
+
     "files_modified": [
         "components/CustomButton.tsx - Enhanced with new variants and sizes",
         "components/InputField.tsx - Added focus, error, success states",
         "app/(root)/(tabs)/home.tsx - Integrated professional components",
         "app/(root)/(tabs)/profile.tsx - Added navigation links",
-        "app/(root)/(tabs)/chat.tsx - Enhanced with professional design"
+        "app/(root)/(tabs)/chat.tsx - Enhanced with professional design",
+        "lib/theme.ts - Colors, Spacing, BorderRadius, Shadows generated by ridehub/tokens.py",
+        "constants/index.ts - colors, shadows, borderRadius, spacing generated from tokens",
+        "tailwind.config.js - colors generated by ridehub/tokens.py"
     ],
 
     "files_created": [
@@ -295,7 +854,7 @@ IMPLEMENTATION_COMPLETE = {
     ]
 }
 
-print("""
+BANNER = """
 ╔══════════════════════════════════════════════════════════════════════════════╗
 ║                                                                              ║
 ║                       🎨 RIDEHUB PROFESSIONAL UI                            ║
@@ -637,4 +1196,7 @@ Last Updated: 2025-02-12
 ║                    Ready for Professional Deployment! 🚀                     ║
 ║                                                                              ║
 ╚══════════════════════════════════════════════════════════════════════════════╝
-""")
+"""
+
+if __name__ == "__main__":
+    print(BANNER)
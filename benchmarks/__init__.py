@@ -0,0 +1 @@
+"""Benchmarks for the ``ridehub`` services.  Run one with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,121 @@
+"""
+Asset pipeline: bytes saved and cold / warm / one-edit wall time.
+
+Runs :class:`ridehub.assets.AssetPipeline` over ``uber_assets.zip`` three
+times with one scratch cache: cold (empty cache), warm (nothing changed) and
+after one image in a copy of the archive was edited.  That last run must
+re-render exactly one asset.  Every rendition is decoded again and checked
+against an independent resample of its master.  The table lists the
+largest assets and the bytes a device at each density loads, before and
+after.
+
+    python -m benchmarks.bench_assets [--archive uber_assets.zip] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from benchmarks.common import format_seconds, print_table
+from ridehub import png
+from ridehub.assets import SCALES, AssetArchive, AssetPipeline
+
+EDITED = "assets/images/onboarding2.png"
+
+
+def edited_copy(archive: str, target: str) -> None:
+    """``archive`` with one pixel of ``EDITED`` changed, everything else byte-identical."""
+    with zipfile.ZipFile(archive) as source, zipfile.ZipFile(target, "w") as out:
+        for info in source.infolist():
+            data = source.read(info)
+            if info.filename == EDITED:
+                pixels = png.decode(data)
+                pixels[0, 0] = 255 - pixels[0, 0]
+                data = png.encode(pixels)
+            out.writestr(info, data)
+
+
+def verify(report, archive_path: str, out_dir: str) -> int:
+    """Decode every rendition and compare it with the master resampled here; pixels checked."""
+    checked = 0
+    with AssetArchive(archive_path) as archive:
+        for asset in report.assets:
+            master = png.decode(archive.read(asset.master))
+            for rendition in asset.renditions:
+                with open(os.path.join(out_dir, rendition.path), "rb") as handle:
+                    pixels = png.decode(handle.read())
+                expected = png.resize(master, rendition.width, rendition.height)
+                assert pixels.shape == expected.shape, rendition.path
+                assert np.array_equal(pixels, expected), rendition.path
+                checked += pixels.shape[0] * pixels.shape[1]
+    return checked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--archive", default="uber_assets.zip")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        cache, out = os.path.join(scratch, "cache"), os.path.join(scratch, "out")
+
+        def run(archive: str):
+            return AssetPipeline(archive, out, cache_dir=cache, workers=args.workers).run()
+
+        cold = run(args.archive)
+        assert cold.rendered == len({a.master for a in cold.assets}) - 1  # icon == adaptive-icon
+        pixels = verify(cold, args.archive, out)
+        warm = run(args.archive)
+        assert warm.rendered == 0 and warm.linked == 0
+        edited_archive = os.path.join(scratch, "edited.zip")
+        edited_copy(args.archive, edited_archive)
+        edited = run(edited_archive)
+        assert edited.rendered == 1, edited.rendered
+        assert [a.asset for a in edited.assets if not a.cached] == [EDITED]
+
+    rows = []
+    for asset in sorted(cold.assets, key=lambda a: -a.source_bytes)[:10]:
+        by_scale = {r.scale: r for r in asset.renditions}
+        rows.append(
+            (
+                asset.asset.split("/")[-1],
+                f"{asset.source_bytes:,}",
+                *(f"{by_scale[s].bytes:,}" if s in by_scale else "-" for s in SCALES),
+                f"{by_scale[max(by_scale)].width}x{by_scale[max(by_scale)].height}",
+            )
+        )
+    print(
+        f"{len(cold.assets)} assets from {args.archive}, {cold.junk_skipped} junk and "
+        f"{cold.other_skipped} non-PNG entries skipped; {pixels:,} output pixels verified"
+    )
+    print_table(("asset", "shipped", *(f"@{s}x" for s in SCALES), "master"), rows)
+
+    rows = []
+    for scale in SCALES:
+        before, after = cold.bytes_at(scale)
+        rows.append((f"@{scale}x", f"{before:,}", f"{after:,}", f"{1 - after / before:.1%}"))
+    rows.append(
+        (
+            "all densities",
+            f"{cold.source_bytes:,}",
+            f"{cold.output_bytes:,}",
+            f"{1 - cold.output_bytes / cold.source_bytes:.1%}",
+        )
+    )
+    print("\nBytes loaded per device density (React Native picks the nearest scale >= device)")
+    print_table(("device", "before", "after", "saved"), rows)
+    print(
+        f"\ncold {format_seconds(cold.seconds)} ({cold.rendered} rendered), "
+        f"warm {format_seconds(warm.seconds)} (0 rendered, 0 files placed), "
+        f"one image edited {format_seconds(edited.seconds)} ({edited.rendered} rendered)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Batch assignment solve time and total pickup time vs. today's greedy choice.
+
+Riders and drivers are scattered over the same city box and the cost matrix is
+``EtaEngine.pickup_matrix``.  ``greedy`` reproduces the current behaviour:
+riders in arrival order each take the nearest free driver.  ``auto`` picks
+the auction solver for square matrices and Hungarian otherwise.  A budgeted
+solve, greedy completion included, must finish within ``SLACK`` of its budget
+(median of ``RUNS``).
+
+    python -m benchmarks.bench_assignment
+"""
+
+from __future__ import annotations
+
+import statistics
+
+import numpy as np
+
+from benchmarks.common import format_seconds, print_table
+from ridehub.assignment import solve
+from ridehub.eta import EtaEngine
+
+SOUTH_WEST = np.array([40.70, -74.02])
+SPAN = np.array([0.08, 0.06])
+RUNS = 3
+SLACK = 1.1  # timer and scheduling noise on a busy machine
+
+
+def scatter(n: int, rng: np.random.Generator) -> np.ndarray:
+    return SOUTH_WEST + rng.uniform(0, 1, (n, 2)) * SPAN
+
+
+def main() -> None:
+    rng = np.random.default_rng(21)
+    engine = EtaEngine()
+    rows = []
+    for riders, drivers in ((100, 100), (250, 400), (500, 500), (1_000, 1_000), (1_000, 2_000), (2_000, 2_000)):
+        cost = engine.pickup_matrix(scatter(drivers, rng), scatter(riders, rng))
+        baseline = solve(cost, "greedy")
+        row = [f"{riders}x{drivers}", f"{baseline.total_cost / 60 / riders:.2f}"]
+        for method in ("hungarian", "auto"):
+            result = solve(cost, method)
+            row += [
+                format_seconds(result.solve_seconds),
+                f"{result.total_cost / 60 / riders:.2f}",
+            ]
+        hungarian_total = float(row[3])
+        row.append(f"{1 - hungarian_total / float(row[1]):.0%}")
+        rows.append(row)
+
+    print("Mean pickup minutes per rider and solve time")
+    print_table(
+        (
+            "riders x drivers",
+            "greedy min",
+            "hungarian",
+            "min",
+            "auto",
+            "min",
+            "saved vs greedy",
+        ),
+        rows,
+    )
+
+    cost = engine.pickup_matrix(scatter(2_000, rng), scatter(2_000, rng))
+    rows = []
+    over = []
+    for budget in (0.05, 0.1, 0.5, None):
+        results = [solve(cost, "auction", time_budget=budget) for _ in range(RUNS)]
+        seconds = statistics.median(r.solve_seconds for r in results)
+        result = results[0]
+        rows.append(
+            (
+                "none" if budget is None else format_seconds(budget),
+                format_seconds(seconds),
+                "yes" if result.fell_back else "no",
+                f"{result.total_cost / 60 / 2_000:.2f}",
+            )
+        )
+        if budget is not None and seconds > budget * SLACK:
+            over.append(f"{format_seconds(budget)} budget took {format_seconds(seconds)}")
+    print("\n2000x2000 auction under a time budget (greedy completion included)")
+    print_table(("budget", "solve", "fell back", "min/rider"), rows)
+    assert not over, "; ".join(over)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+End-to-end booking load: per-stage throughput and latency percentiles.
+
+Riders walk find-ride -> confirm-ride -> book-ride -> payment against the
+``ridehub`` services and the Places / Directions stand-ins, ``--concurrency``
+at a time, while the whole fleet streams GPS fixes.  All data is synthetic
+and seeded, so two runs with the same arguments do the same work.  The
+report is written as JSON to ``--output``, by default in the system temp
+directory so a run leaves nothing in the checkout.  With ``--baseline`` the
+run is compared against an earlier report, every stage that got more than
+``--tolerance`` worse is listed, and the exit status is 1.
+
+    python -m benchmarks.bench_booking [--riders 5000] [--drivers 20000]
+        [--history 100000] [--output PATH] [--baseline old.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from dataclasses import fields
+
+from benchmarks.common import format_seconds, print_table
+from ridehub.loadtest import STAGES, LoadProfile, compare_reports, run_load
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    for f in fields(LoadProfile):
+        flag = "--" + f.name.replace("_", "-")
+        parser.add_argument(flag, type=type(f.default), default=f.default)
+    parser.add_argument(
+        "--output", default=os.path.join(tempfile.gettempdir(), "booking-load.json")
+    )
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    profile = LoadProfile(**{f.name: getattr(args, f.name) for f in fields(LoadProfile)})
+
+    with tempfile.TemporaryDirectory() as directory:
+        report = run_load(profile, os.path.join(directory, "wallet.log"))
+    report.write(args.output)
+
+    counters = report.counters
+    assert counters["booked"] == counters["rides_stored"] - profile.history
+    assert counters["booked"] == counters["ledger_records"]
+    assert report.stages["booking"]["count"] + report.stages["booking"]["errors"] == profile.riders
+
+    rows = []
+    for name in STAGES:
+        stage = report.stages[name]
+        rows.append(
+            (
+                name,
+                f"{stage['count']:,}",
+                stage["errors"],
+                f"{stage['throughput_per_s']:,.0f}/s",
+                *(
+                    format_seconds(stage[key] / 1e3) if key in stage else "-"
+                    for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+                ),
+            )
+        )
+    print(
+        f"{profile.riders:,} bookings by {profile.concurrency} concurrent riders, "
+        f"{profile.drivers:,} drivers, {profile.places:,} places, "
+        f"{profile.history:,} rides of history; {format_seconds(report.wall_seconds)} wall"
+    )
+    print_table(("stage", "count", "errors", "throughput", "p50", "p95", "p99", "max"), rows)
+    print(
+        f"places: {counters['places_upstream']:,} upstream of {counters['places_requests']:,}; "
+        f"directions: {counters['directions_requests']:,} requests, "
+        f"route cache hit rate {counters['route_cache_hit_rate']:.1%}; "
+        f"promos: {counters['promo_redeemed']:,} redeemed, {counters['promo_rejected']:,} rejected"
+    )
+    print(f"report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        current = report.to_dict()
+        if baseline.get("profile") != current["profile"]:
+            print(f"\nwarning: {args.baseline} was run with a different profile")
+        regressions = compare_reports(baseline, current, tolerance=args.tolerance)
+        if not regressions:
+            print(f"no stage regressed by more than {args.tolerance:.0%} against {args.baseline}")
+            return
+        print(f"\nregressions against {args.baseline}:")
+        print_table(
+            ("stage", "metric", "baseline", "now", "change"),
+            [
+                (stage, metric, f"{before:,.3f}", f"{after:,.3f}", f"{after / before - 1:+.1%}")
+                for stage, metric, before, after in regressions
+            ],
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
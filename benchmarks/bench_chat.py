@@ -0,0 +1,226 @@
+"""
+Chat broker load test at 50k concurrent conversations.
+
+1. Memory: 50k conversations, each with a user and a driver subscription,
+   measured with ``tracemalloc`` empty and again with every ring buffer full.
+2. In-process fan-out: posts at a fixed rate across all 50k conversations,
+   with a consumer task per subscription; reports delivery latency.
+3. TCP: the same through :class:`ChatServer`, with the conversations
+   multiplexed over a few gateway connections (one socket per conversation
+   side would exceed the file-descriptor limit here).
+4. Backpressure: a subscriber that stops reading makes ``post`` wait, then
+   is closed as lagging; its outbox never grows past the limit.
+
+    python -m benchmarks.bench_chat [--conversations 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import format_seconds, percentile, print_table
+from ridehub.chat import ChatBroker, ChatServer, SubscriptionClosed
+
+TEXTS = ["I'm 2 minutes away", "Thanks! Where are you now?", "At the corner of 5th and Main", "OK"]
+
+
+def measure_memory(conversations: int) -> tuple[float, float]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    broker = ChatBroker()
+    subscriptions = []
+    for i in range(conversations):
+        broker.open(f"c{i}", f"user{i}", f"driver{i % 5_000}")
+        subscriptions.append(broker.subscribe(f"c{i}", "user"))
+        subscriptions.append(broker.subscribe(f"c{i}", "driver"))
+    empty = tracemalloc.get_traced_memory()[0] - before
+
+    async def fill() -> None:
+        for i in range(conversations):
+            for j in range(broker.history):
+                await broker.post(f"c{i}", "user" if j % 2 else "driver", TEXTS[j % len(TEXTS)])
+        # Drain the outboxes so only the ring buffers hold messages.
+        for subscription in subscriptions:
+            while len(subscription):
+                await subscription.get()
+
+    asyncio.run(fill())
+    full = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # Sides alternate and the user speaks last: the driver has exactly one unread.
+    for i in range(0, conversations, 997):
+        assert broker.unread_count(f"c{i}", "user") == 0
+        assert broker.unread_count(f"c{i}", "driver") == 1
+        assert len(broker.messages(f"c{i}")) == broker.history
+    return empty / conversations, full / conversations
+
+
+async def fan_out(conversations: int, rate: int, seconds: float) -> tuple[list[float], ChatBroker]:
+    broker = ChatBroker(clock=time.perf_counter)
+    latencies: list[float] = []
+
+    async def consume(subscription) -> None:
+        try:
+            while True:
+                message = await subscription.get()
+                latencies.append(time.perf_counter() - message["timestamp"])
+        except SubscriptionClosed:
+            pass
+
+    consumers = []
+    for i in range(conversations):
+        broker.open(f"c{i}")
+        for side in ("user", "driver"):
+            consumers.append(asyncio.create_task(consume(broker.subscribe(f"c{i}", side))))
+    await asyncio.sleep(0)
+    # 100k long-lived tasks and subscriptions: keep full collections from walking them.
+    gc.freeze()
+
+    rng = random.Random(14)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    sent = 0
+    while (now := time.perf_counter()) - start < seconds:
+        due = int((now - start) / interval) - sent
+        for _ in range(due):
+            side = rng.choice(("user", "driver"))
+            await broker.post(f"c{rng.randrange(conversations)}", side, "ping")
+        sent += max(due, 0)
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.2)
+    for conversation in range(conversations):
+        broker.close(f"c{conversation}")
+    await asyncio.gather(*consumers)
+    gc.unfreeze()
+    assert len(latencies) == 2 * broker.stats.posted == broker.stats.delivered
+    return latencies, broker
+
+
+async def over_tcp(conversations: int, gateways: int, rate: int, seconds: float) -> list[float]:
+    broker = ChatBroker()
+    server = await ChatServer(broker).start()
+    latencies: list[float] = []
+
+    async def gateway(index: int) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(server.host, server.port, limit=2**20)
+        for i in range(index, conversations, gateways):
+            for side in ("user", "driver"):
+                writer.write(
+                    json.dumps({"op": "subscribe", "conversation": f"c{i}", "side": side}).encode()
+                    + b"\n"
+                )
+        await writer.drain()
+        return reader, writer
+
+    connections = [await gateway(g) for g in range(gateways)]
+    # Subscriptions are processed in order; a history round trip on each gateway
+    # proves they are all registered before load starts.
+    for g, (reader, writer) in enumerate(connections):
+        request = {"op": "history", "conversation": f"c{g}", "side": "user"}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        assert json.loads(await reader.readline())["event"] == "history"
+
+    async def receive(reader: asyncio.StreamReader) -> None:
+        while line := await reader.readline():
+            event = json.loads(line)
+            if event["event"] == "message":
+                sent_at = float(event["message"]["text"])
+                latencies.append(time.perf_counter() - sent_at)
+
+    receivers = [asyncio.create_task(receive(reader)) for reader, _ in connections]
+    gc.freeze()
+    _, sender = await asyncio.open_connection(server.host, server.port)
+    rng = random.Random(15)
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    sent = 0
+    while (now := time.perf_counter()) - start < seconds:
+        due = int((now - start) / interval) - sent
+        for _ in range(due):
+            request = {
+                "op": "send",
+                "conversation": f"c{rng.randrange(conversations)}",
+                "side": rng.choice(("user", "driver")),
+                "text": repr(time.perf_counter()),
+            }
+            sender.write(json.dumps(request).encode() + b"\n")
+        sent += max(due, 0)
+        await sender.drain()
+        await asyncio.sleep(0.001)
+    expected = 2 * sent
+    deadline = time.perf_counter() + 10
+    while len(latencies) < expected and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    assert len(latencies) == expected, (len(latencies), expected)
+    sender.close()
+    for _, writer in connections:
+        writer.close()
+    for task in receivers:
+        task.cancel()
+    await asyncio.gather(*receivers, return_exceptions=True)
+    await server.close()
+    gc.unfreeze()
+    return latencies
+
+
+async def backpressure() -> tuple[float, ChatBroker, int]:
+    broker = ChatBroker(subscriber_buffer=64, send_timeout=0.2)
+    broker.open("slow")
+    stalled = broker.subscribe("slow", "driver")
+    start = time.perf_counter()
+    for i in range(200):
+        await broker.post("slow", "user", f"message {i}")
+    elapsed = time.perf_counter() - start
+    return elapsed, broker, len(stalled)
+
+
+def latency_row(name: str, samples: list[float], rate: int) -> tuple:
+    return (
+        name,
+        f"{rate:,}/s",
+        f"{len(samples):,}",
+        format_seconds(percentile(samples, 50)),
+        format_seconds(percentile(samples, 99)),
+        format_seconds(max(samples)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=50_000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    n = args.conversations
+
+    empty, full = measure_memory(n)
+    print(
+        f"Memory per conversation ({n:,} conversations, 2 subscriptions each): "
+        f"{empty:,.0f} B empty, {full:,.0f} B with a full {ChatBroker().history}-message ring\n"
+    )
+
+    rows = []
+    for rate in (5_000, 20_000):
+        latencies, broker = asyncio.run(fan_out(n, rate, args.seconds))
+        rows.append(latency_row(f"in-process, {n:,} conversations", latencies, rate))
+    for rate in (2_000, 5_000):
+        latencies = asyncio.run(over_tcp(n, 16, rate, args.seconds))
+        rows.append(latency_row(f"TCP, {n:,} conversations / 16 sockets", latencies, rate))
+    print_table(("path", "post rate", "deliveries", "p50", "p99", "max"), rows)
+
+    elapsed, broker, queued = asyncio.run(backpressure())
+    print(
+        f"\nStalled subscriber: 200 posts took {format_seconds(elapsed)}; "
+        f"{broker.stats.waited} post waited, {broker.stats.lagging} subscriber closed as lagging, "
+        f"outbox held {queued} messages (limit {broker.subscriber_buffer})"
+    )
+
+
+if __name__ == "__main__":
+    main()
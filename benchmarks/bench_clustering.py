@@ -0,0 +1,123 @@
+"""
+Clustered map payload vs. one marker per driver.
+
+The baseline serializes a full ``MarkerData`` record for every driver, which
+is what ``Map.tsx`` receives and renders today.  The clustered response holds
+cluster centroids with counts plus full records only for drivers that are
+individually visible in the viewport.
+
+    python -m benchmarks.bench_clustering
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub.clustering import ClusterIndex, region_to_viewport
+from ridehub.ingest import DriverTable, PositionBatch
+
+DRIVERS = 100_000
+CENTER = (40.7306, -73.9866)
+VIEWS = {
+    "city z11": (11, 0.35, 0.45),
+    "district z14": (14, 0.04, 0.05),
+    "street z17": (17, 0.005, 0.006),
+}
+
+
+def marker(driver_id: int, lat: float, lng: float) -> dict:
+    return {
+        "latitude": lat,
+        "longitude": lng,
+        "id": driver_id,
+        "title": f"Driver {driver_id}",
+        "profile_image_url": f"https://i.pravatar.cc/150?img={driver_id % 70}",
+        "car_image_url": "https://via.placeholder.com/150?text=Car",
+        "car_seats": 4,
+        "rating": 4.8,
+        "first_name": "Driver",
+        "last_name": str(driver_id),
+    }
+
+
+def main() -> None:
+    rng = np.random.default_rng(17)
+    lats = CENTER[0] + rng.normal(0, 0.06, DRIVERS)
+    lngs = CENTER[1] + rng.normal(0, 0.08, DRIVERS)
+    records = {i: marker(i, lat, lng) for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist()))}
+
+    index = ClusterIndex()
+    start = time.perf_counter()
+    for driver_id, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist())):
+        index.insert(driver_id, lat, lng)
+    build = time.perf_counter() - start
+
+    def baseline() -> bytes:
+        return json.dumps(list(records.values())).encode()
+
+    baseline_bytes = len(baseline())
+    baseline_time = best_of(baseline, repeat=3)
+
+    rows = []
+    for name, (zoom, lat_delta, lng_delta) in VIEWS.items():
+        viewport = region_to_viewport(*CENTER, lat_delta, lng_delta)
+
+        def clustered() -> bytes:
+            clusters, drivers = index.query(viewport, zoom)
+            return json.dumps(
+                {"clusters": clusters, "drivers": [records[d["id"]] for d in drivers]}
+            ).encode()
+
+        clusters, drivers = index.query(viewport, zoom)
+        payload = clustered()
+        elapsed = best_of(clustered, repeat=5)
+        rows.append(
+            (
+                name,
+                f"{DRIVERS:,}",
+                f"{baseline_bytes / 1024:,.0f} KiB",
+                format_seconds(baseline_time),
+                len(clusters),
+                len(drivers),
+                f"{len(payload) / 1024:,.1f} KiB",
+                format_seconds(elapsed),
+            )
+        )
+
+    print(f"{DRIVERS:,} drivers, index built in {build:.2f} s")
+    print_table(
+        (
+            "view",
+            "markers today",
+            "bytes today",
+            "time today",
+            "clusters",
+            "drivers",
+            "clustered bytes",
+            "clustered time",
+        ),
+        rows,
+    )
+
+    table = DriverTable()
+    table.subscribe(index.on_positions)
+    table.apply(PositionBatch(np.arange(DRIVERS, dtype=np.int64), lats, lngs, np.zeros(DRIVERS)))
+    moved = 10_000
+    batch = PositionBatch(
+        np.arange(moved, dtype=np.int64),
+        lats[:moved] + rng.normal(0, 0.0005, moved),
+        lngs[:moved] + rng.normal(0, 0.0005, moved),
+        np.ones(moved),
+    )
+    start = time.perf_counter()
+    table.apply(batch)
+    elapsed = time.perf_counter() - start
+    print(f"\nIncremental update: {moved:,} moved drivers applied in {format_seconds(elapsed)}")
+
+
+if __name__ == "__main__":
+    main()
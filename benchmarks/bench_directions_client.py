@@ -0,0 +1,128 @@
+"""
+Pooled Directions client vs. one-socket-per-leg fetching, 1k concurrent legs.
+
+The naive client mirrors the ``lib/map.ts`` loop: every leg opens its own
+connection, nothing caps concurrency, and identical legs are fetched again.
+A fifth of the legs are duplicates requested at the same moment (riders at
+the same pickup heading to the same place), and the stand-in fails 2% of
+requests with a 503 to exercise the retry path.
+
+    python -m benchmarks.bench_directions_client
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.common import format_seconds, percentile, print_table
+from ridehub.directions import AsyncDirectionsClient, directions_query, parse_duration
+from ridehub.standins import DirectionsStandIn
+
+CONCURRENCY = 1_000
+DUPLICATE_SHARE = 0.2
+LATENCY = 0.01
+
+
+def make_legs(rng: np.random.Generator) -> list[tuple[float, float, float, float]]:
+    unique = int(CONCURRENCY * (1 - DUPLICATE_SHARE))
+    legs = [
+        (*(40.75 + rng.normal(0, 0.02, 2)).tolist(), 40.7580, -73.9855) for _ in range(unique)
+    ]
+    legs += [legs[i] for i in rng.integers(0, unique, CONCURRENCY - unique)]
+    rng.shuffle(legs)
+    return legs
+
+
+async def naive_duration(url: str, leg) -> float:
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        writer.write(
+            f"GET {parts.path}?{directions_query(*leg, key='')} HTTP/1.1\r\n"
+            f"Host: {parts.hostname}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        response = await reader.read()
+        body = response.split(b"\r\n\r\n", 1)[1]
+        return parse_duration(json.loads(body))
+    finally:
+        writer.close()
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    try:
+        await coro
+    except Exception:
+        return float("nan")
+    return time.perf_counter() - start
+
+
+async def run_naive(server: DirectionsStandIn, legs) -> list[float]:
+    return await asyncio.gather(*(timed(naive_duration(server.url, leg)) for leg in legs))
+
+
+async def run_pooled(server: DirectionsStandIn, legs, max_connections: int):
+    async with AsyncDirectionsClient(server.url, max_connections=max_connections, key="") as client:
+        latencies = await asyncio.gather(*(timed(client.duration(*leg)) for leg in legs))
+    return latencies, client.stats
+
+
+def main() -> None:
+    legs = make_legs(np.random.default_rng(9))
+    rows = []
+    with DirectionsStandIn(latency=LATENCY, failure_rate=0.02).running() as server:
+        before = (server.connections, server.requests)
+        start = time.perf_counter()
+        latencies = asyncio.run(run_naive(server, legs))
+        wall = time.perf_counter() - start
+        ok = [x for x in latencies if x == x]
+        rows.append(
+            (
+                "naive",
+                format_seconds(percentile(ok, 50)),
+                format_seconds(percentile(ok, 99)),
+                format_seconds(wall),
+                server.connections - before[0],
+                server.requests - before[1],
+                len(latencies) - len(ok),
+                0,
+                0,
+            )
+        )
+
+        for max_connections in (16, 64, 256):
+            before = (server.connections, server.requests)
+            start = time.perf_counter()
+            latencies, stats = asyncio.run(run_pooled(server, legs, max_connections))
+            wall = time.perf_counter() - start
+            ok = [x for x in latencies if x == x]
+            assert stats.sockets_opened == server.connections - before[0]
+            rows.append(
+                (
+                    f"pooled/{max_connections}",
+                    format_seconds(percentile(ok, 50)),
+                    format_seconds(percentile(ok, 99)),
+                    format_seconds(wall),
+                    stats.sockets_opened,
+                    server.requests - before[1],
+                    len(latencies) - len(ok),
+                    stats.coalesced,
+                    stats.retries,
+                )
+            )
+
+    print(f"{CONCURRENCY:,} concurrent legs, {LATENCY * 1000:.0f} ms stand-in latency")
+    print_table(
+        ("client", "p50", "p99", "wall", "sockets", "HTTP requests", "failed", "coalesced", "retries"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
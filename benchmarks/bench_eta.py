@@ -0,0 +1,130 @@
+"""
+ETA engine vs. the per-marker ``calculateDriverTimes`` loop.
+
+The legacy path is reproduced faithfully: two leg lookups per marker, one of
+which is the shared rider -> destination leg.  Both paths use the same
+straight-line leg estimate, so the difference is purely structural (2N lookups
+vs. one shared lookup plus a vectorized matrix).  Prices are checked against
+a scalar ``toFixed(2)`` (exact decimal value, halves away from zero) of the
+legacy times, not against the legacy loop's Python formatting, which rounds
+halves to even.  A 75 s trip, priced at exactly 0.625, checks that tie.
+
+    python -m benchmarks.bench_eta
+"""
+
+from __future__ import annotations
+
+import math
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub.eta import DETOUR_FACTOR, DEFAULT_SPEED_KMH, EtaEngine
+from ridehub.geo import EARTH_RADIUS_KM
+
+USER = (40.7128, -74.0060)
+DESTINATION = (40.7580, -73.9855)
+SECONDS_PER_KM = 3600.0 * DETOUR_FACTOR / DEFAULT_SPEED_KMH
+
+
+class CountingLeg:
+    """Scalar leg estimate that counts how often it is asked (one 'Directions call' each)."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+        self.calls += 1
+        p1, p2 = math.radians(lat1), math.radians(lat2)
+        a = (
+            math.sin((p2 - p1) / 2) ** 2
+            + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))) * SECONDS_PER_KM
+
+
+def to_fixed(value: float) -> str:
+    """JavaScript's ``value.toFixed(2)``."""
+    return str(Decimal(value).quantize(Decimal("0.01"), ROUND_HALF_UP))
+
+
+def legacy_driver_times(markers, leg, user, destination):
+    out = []
+    for marker in markers:
+        time_to_user = leg(marker["latitude"], marker["longitude"], *user)
+        time_to_destination = leg(*user, *destination)
+        total = (time_to_user + time_to_destination) / 60
+        out.append({**marker, "time": total, "price": f"{total * 0.5:.2f}"})
+    return out
+
+
+def make_markers(n: int, rng: np.random.Generator) -> list[dict]:
+    coords = np.asarray(USER) + rng.uniform(-0.05, 0.05, size=(n, 2))
+    return [
+        {
+            "id": i,
+            "title": f"Driver {i}",
+            "first_name": "Driver",
+            "last_name": str(i),
+            "profile_image_url": "",
+            "car_image_url": "",
+            "car_seats": 4,
+            "rating": 4.8,
+            "latitude": lat,
+            "longitude": lng,
+        }
+        for i, (lat, lng) in enumerate(coords.tolist())
+    ]
+
+
+def main() -> None:
+    rng = np.random.default_rng(7)
+    tied = {**make_markers(1, rng)[0], "latitude": USER[0], "longitude": USER[1]}
+    priced = EtaEngine(leg_duration=lambda *_: 75.0).driver_times([tied], *USER, *DESTINATION)
+    assert priced[0]["price"] == to_fixed(0.625) == "0.63", priced[0]["price"]
+    rows = []
+    for n in (10, 100, 1_000, 10_000):
+        markers = make_markers(n, rng)
+
+        legacy_leg = CountingLeg()
+        expected = legacy_driver_times(markers, legacy_leg, USER, DESTINATION)
+        engine_leg = CountingLeg()
+        engine = EtaEngine(leg_duration=engine_leg)
+        actual = engine.driver_times(markers, *USER, *DESTINATION)
+        assert [m["price"] for m in actual] == [to_fixed(m["time"] * 0.5) for m in expected]
+        assert np.allclose([m["time"] for m in actual], [m["time"] for m in expected])
+
+        legacy = best_of(lambda: legacy_driver_times(markers, legacy_leg, USER, DESTINATION))
+        vectorized = best_of(lambda: engine.driver_times(markers, *USER, *DESTINATION))
+        rows.append(
+            (
+                n,
+                2 * n,
+                1,
+                format_seconds(legacy),
+                format_seconds(vectorized),
+                format_seconds(vectorized / n),
+                f"{legacy / vectorized:.1f}x",
+            )
+        )
+
+    print("Single rider (calculateDriverTimes shape)")
+    print_table(
+        ("N", "legacy legs", "engine legs", "legacy", "engine", "engine/driver", "speedup"), rows
+    )
+
+    print("\nBatch of M riders x N drivers")
+    engine = EtaEngine()
+    rows = []
+    for m, n in ((100, 1_000), (1_000, 1_000), (1_000, 5_000)):
+        drivers = np.asarray(USER) + rng.uniform(-0.05, 0.05, size=(n, 2))
+        pickups = np.asarray(USER) + rng.uniform(-0.05, 0.05, size=(m, 2))
+        destinations = np.asarray(DESTINATION) + rng.uniform(-0.05, 0.05, size=(m, 2))
+        elapsed = best_of(lambda: engine.batch(drivers, pickups, destinations).prices, repeat=3)
+        rows.append((m, n, format_seconds(elapsed), format_seconds(elapsed / m)))
+    print_table(("M", "N", "batch", "per rider"), rows)
+
+
+if __name__ == "__main__":
+    main()
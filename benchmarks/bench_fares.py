@@ -0,0 +1,164 @@
+"""
+Vectorized fare quotes vs. pricing one marker at a time.
+
+Golden checks come first (the fixed cases live in ``tests/test_fares.py``;
+these are random): with :data:`LEGACY_SCHEDULE` and surge off, every
+quote must render to the same string as ``(totalTime * 0.5).toFixed(2)``,
+whose exact semantics (round the exact binary value half away from zero) are
+reproduced with ``Decimal``.  Exact binary halves such as 0.125 are included
+on purpose.  Then quote throughput is compared with the per-marker loop, and
+an incremental surge refresh with a full recompute.
+
+    python -m benchmarks.bench_fares
+"""
+
+from __future__ import annotations
+
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub.eta import EtaEngine
+from ridehub.fares import LEGACY_SCHEDULE, FareEngine, FareSchedule, SurgeGrid, format_prices
+from ridehub.geo import haversine_km
+from ridehub.ingest import DriverTable, PositionBatch
+
+CENTER = (40.7306, -73.9866)
+BOUNDS = (40.45, -74.30, 41.00, -73.65)
+CENT = Decimal("0.01")
+
+
+def to_fixed(value: float) -> str:
+    """JavaScript ``Number.prototype.toFixed(2)`` for ordinary magnitudes."""
+    return str(Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP))
+
+
+def legacy_prices(total_minutes: list[float]) -> list[str]:
+    return [to_fixed(total * 0.5) for total in total_minutes]
+
+
+def speedup(ratio: float) -> str:
+    return f"{ratio:.1f}x" if ratio < 10 else f"{ratio:,.0f}x"
+
+
+def golden(rng: np.random.Generator) -> int:
+    minutes = rng.uniform(0, 120, 200_000)
+    ties = np.array([0.25, 0.75, 1.25, 1.75, 20.25, 33.75, 0.0, 59.999])  # fares x.125, x.375, ...
+    minutes = np.concatenate([ties, minutes, np.round(minutes, 1), np.round(minutes)])
+    expected = legacy_prices(minutes.tolist())
+    assert format_prices(FareEngine().quote(minutes)) == expected
+
+    # Surge on but idle (no demand) must not change a single price.
+    grid = SurgeGrid(*BOUNDS)
+    pickups = np.asarray(CENTER) + rng.normal(0, 0.05, (len(minutes), 2))
+    grid.add_supply(pickups[:, 0], pickups[:, 1])
+    grid.refresh()
+    surged = FareEngine(LEGACY_SCHEDULE, grid).quote(minutes, pickups=pickups)
+    assert format_prices(surged) == expected
+
+    # Same through the ETA engine's batch, as calculateDriverTimes would price it.
+    drivers = np.asarray(CENTER) + rng.normal(0, 0.03, (500, 2))
+    riders = np.asarray(CENTER) + rng.normal(0, 0.03, (40, 2))
+    destinations = np.asarray(CENTER) + rng.normal(0, 0.05, (40, 2))
+    batch = EtaEngine().batch(drivers, riders, destinations)
+    batch_prices = format_prices(FareEngine().quote_batch(batch))
+    assert batch_prices == legacy_prices(batch.total_minutes.ravel().tolist())
+    return len(minutes) * 2 + batch.total_minutes.size
+
+
+def main() -> None:
+    rng = np.random.default_rng(11)
+    checked = golden(rng)
+    print(f"Golden: {checked:,} quotes match (totalTime * 0.5).toFixed(2)\n")
+
+    grid = SurgeGrid(*BOUNDS)
+    demand = np.asarray(CENTER) + rng.normal(0, 0.02, (20_000, 2))
+    supply = np.asarray(CENTER) + rng.normal(0, 0.06, (20_000, 2))
+    grid.add_demand(demand[:, 0], demand[:, 1])
+    grid.add_supply(supply[:, 0], supply[:, 1])
+    grid.refresh()
+    engine = FareEngine(FareSchedule(base=2.5, per_minute=0.35, per_km=1.1, minimum=7.0), grid)
+    eta = EtaEngine()
+
+    rows = []
+    for m, n in ((1, 50), (1_000, 20), (1_000, 100), (5_000, 200)):
+        drivers = np.asarray(CENTER) + rng.normal(0, 0.03, (n, 2))
+        riders = np.asarray(CENTER) + rng.normal(0, 0.03, (m, 2))
+        destinations = np.asarray(CENTER) + rng.normal(0, 0.05, (m, 2))
+        batch = eta.batch(drivers, riders, destinations)
+        trip_km = haversine_km(riders[:, 0], riders[:, 1], destinations[:, 0], destinations[:, 1])
+        minutes = batch.total_minutes.tolist()
+
+        def per_marker():
+            return [[f"{total * 0.5:.2f}" for total in row] for row in minutes]
+
+        def vectorized():
+            return engine.quote_batch(batch, trip_km, riders)
+
+        before = best_of(per_marker, repeat=3)
+        after = best_of(vectorized, repeat=5)
+        quotes = m * n
+        rows.append(
+            (
+                f"{m:,} x {n:,}",
+                f"{quotes / before:,.0f}",
+                f"{quotes / after:,.0f}",
+                format_seconds(after),
+                speedup(before / after),
+            )
+        )
+    print_table(
+        ("riders x drivers", "per-marker quotes/s", "engine quotes/s", "engine batch", "speedup"),
+        rows,
+    )
+
+    # Incremental surge: drivers stream positions, only touched cells are recomputed.
+    drivers = 100_000
+    table = DriverTable()
+    surge = SurgeGrid(*BOUNDS, cell_deg=0.002)
+    lats = CENTER[0] + rng.normal(0, 0.06, drivers)
+    lngs = CENTER[1] + rng.normal(0, 0.08, drivers)
+    initial = PositionBatch(np.arange(drivers, dtype=np.int64), lats, lngs, np.zeros(drivers))
+    surge.on_positions(table.apply(initial), initial)
+    surge.add_demand(demand[:, 0], demand[:, 1])
+    surge.refresh()
+    assert surge.supply.sum() == np.count_nonzero(surge.cells(lats, lngs) >= 0)
+
+    moved = 5_000
+    moves = PositionBatch(
+        np.arange(moved, dtype=np.int64),
+        lats[:moved] + rng.normal(0, 0.003, moved),
+        lngs[:moved] + rng.normal(0, 0.003, moved),
+        np.ones(moved),
+    )
+    snapshot = table.apply(moves)
+    start = time.perf_counter()
+    surge.on_positions(snapshot, moves)
+    listener = time.perf_counter() - start
+    start = time.perf_counter()
+    recomputed = surge.refresh()
+    incremental = time.perf_counter() - start
+
+    def full_recompute():
+        surge._dirty[:] = True
+        return surge.refresh()
+
+    reference = surge.multipliers.copy()
+    cells = full_recompute()
+    assert np.array_equal(reference, surge.multipliers)
+    full = best_of(full_recompute, repeat=5)
+    print(f"\nSurge grid {surge.shape[0]}x{surge.shape[1]} cells, {drivers:,} drivers, {moved:,} moved:")
+    print_table(
+        ("step", "cells", "time"),
+        [
+            ("supply listener", "", format_seconds(listener)),
+            ("incremental refresh", f"{recomputed:,}", format_seconds(incremental)),
+            ("full recompute", f"{cells:,}", format_seconds(full)),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
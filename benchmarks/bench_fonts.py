@@ -0,0 +1,167 @@
+"""
+Font stage: bytes shipped, font-load work at cold start, and stage wall time.
+
+Runs :class:`ridehub.fonts.FontStage` on a scratch copy of the sources and
+fonts three times with one scratch cache: cold (empty cache), warm (nothing
+changed) and after one face's file was edited, which must re-subset that
+face alone.  Every subset is checked against its original.  Checksums must
+hold, ``cmap`` must be the original's restricted to the kept code points,
+and every kept glyph's outline must be byte-identical.
+
+"Before" is every face ``tailwind.config.js`` can name, loaded in full, as
+``app/_layout.tsx`` did until the stage existed.  "After" is the faces the
+sources reference, subset.  Font-load work is timed on this machine as what
+a loader does per face before the first frame: read the file, check every
+table checksum, and read ``cmap`` and ``loca``.  That shows the ratio, not a
+device's milliseconds.
+
+    python -m benchmarks.bench_fonts [--locale en] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub import ttf
+from ridehub.fonts import (
+    DEFAULT_LOCALES,
+    FONT_DIR,
+    SOURCES,
+    TAILWIND,
+    FontStage,
+    tailwind_families,
+)
+
+EDITED = "PlusJakartaSans-Medium.ttf"
+
+
+def scratch_tree(root: str) -> None:
+    for name in (*SOURCES, FONT_DIR):
+        shutil.copytree(name, os.path.join(root, name))
+    shutil.copyfile(TAILWIND, os.path.join(root, TAILWIND))
+
+
+def full_face(root: str, family: str) -> str:
+    """The shipped file of a family: ``Jakarta-Bold`` is ``PlusJakartaSans-Bold.ttf``."""
+    style = family.partition("-")[2] or "Regular"
+    return os.path.join(root, FONT_DIR, f"PlusJakartaSans-{style}.ttf")
+
+
+def edit_font(path: str) -> None:
+    """Change one byte of the ``name`` table, as a re-export of the face would.
+
+    The table checksum is left stale; the stage recomputes it anyway.
+    """
+    with open(path, "rb") as handle:
+        data = bytearray(handle.read())
+    font = ttf.Font(data)
+    at = bytes(data).index(font.tables[b"name"]) + len(font.tables[b"name"]) - 1
+    data[at] ^= 0x01
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def verify(report, root: str, out_dir: str) -> int:
+    """Check every subset against its source; the number of outlines compared."""
+    compared = 0
+    for face in report.faces:
+        with open(os.path.join(root, face.source), "rb") as handle:
+            original = ttf.Font(handle.read())
+        with open(os.path.join(out_dir, face.source), "rb") as handle:
+            data = handle.read()
+        ttf.verify(data)
+        subset = ttf.Font(data)
+        assert subset.num_glyphs == original.num_glyphs, face.source
+        mapping, kept = original.cmap(), subset.cmap()
+        assert kept and all(mapping[cp] == gid for cp, gid in kept.items()), face.source
+        before, after = original.offsets(), subset.offsets()
+        for gid in ttf.closure(original, kept)[1]:
+            old = original.tables[b"glyf"][before[gid] : before[gid + 1]]
+            new = subset.tables[b"glyf"][after[gid] : after[gid + 1]]
+            assert new.rstrip(b"\0") == old.rstrip(b"\0"), (face.source, gid)
+            compared += 1
+        for tag in (b"hmtx", b"GPOS", b"GSUB", b"GDEF", b"name"):
+            assert subset.tables.get(tag) == original.tables.get(tag), (face.source, tag)
+    return compared
+
+
+def load(paths: list[str]) -> None:
+    for path in paths:
+        with open(path, "rb") as handle:
+            data = handle.read()
+        ttf.verify(data)
+        font = ttf.Font(data)
+        font.cmap()
+        font.offsets()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locale", action="append")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    locales = args.locale or DEFAULT_LOCALES
+
+    with tempfile.TemporaryDirectory() as scratch:
+        root = os.path.join(scratch, "tree")
+        cache, out = os.path.join(scratch, "cache"), os.path.join(scratch, "out")
+        scratch_tree(root)
+
+        def run():
+            return FontStage(out, root=root, cache_dir=cache, locales=locales).run()
+
+        cold = run()
+        assert cold.subset == len(cold.faces) and not cold.unused and not cold.unresolved
+        outlines = verify(cold, root, out)
+        full = sorted({full_face(root, family) for family in tailwind_families(root).values()})
+        subset = [os.path.join(out, face.source) for face in cold.faces]
+        load_before = best_of(lambda: load(full), repeat=args.repeat)
+        load_after = best_of(lambda: load(subset), repeat=args.repeat)
+        declared = sum(os.path.getsize(path) for path in full)
+        warm = run()
+        assert warm.subset == 0 and warm.linked == 0
+        edit_font(os.path.join(root, FONT_DIR, EDITED))
+        edited = run()
+        assert edited.subset == 1, edited.subset
+        assert [f.source for f in edited.faces if not f.cached] == [f"{FONT_DIR}/{EDITED}"]
+
+
+    rows = [
+        (
+            face.family,
+            face.source.split("/")[-1],
+            face.references,
+            f"{face.source_bytes:,}",
+            f"{face.bytes:,}",
+            f"{1 - face.bytes / face.source_bytes:.1%}",
+            face.codepoints,
+        )
+        for face in cold.faces
+    ]
+    print(
+        f"{len(cold.faces)} faces referenced, {len(cold.dropped)} font files dropped; "
+        f"locales {', '.join(locales)}; {outlines:,} glyph outlines verified"
+    )
+    print_table(("family", "file", "refs", "shipped", "subset", "saved", "code points"), rows)
+
+    rows = [
+        ("bundled font bytes", f"{cold.bundled_bytes:,}", f"{cold.output_bytes:,}"),
+        ("loaded at cold start", f"{declared:,}", f"{cold.output_bytes:,}"),
+        ("faces loaded", len(full), len(cold.faces)),
+        ("font-load work", format_seconds(load_before), format_seconds(load_after)),
+    ]
+    print("\nBefore: every face Tailwind can name, in full.  After: referenced faces, subset.")
+    print_table(("", "before", "after"), rows)
+    print(
+        f"\nstage cold {format_seconds(cold.seconds)} ({cold.subset} subset), "
+        f"warm {format_seconds(warm.seconds)} (0 subset, 0 files placed), "
+        f"one face edited {format_seconds(edited.seconds)} ({edited.subset} subset)"
+    )
+
+
+if __name__ == "__main__":
+    main()
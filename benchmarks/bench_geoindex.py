@@ -0,0 +1,114 @@
+"""
+Geocell index vs. a linear scan over every driver.
+
+The linear baseline is the vectorized equivalent of ``generateMarkersFromData``
+visiting the whole driver array: one NumPy haversine over all N positions
+followed by a partial sort.  Results of both paths are compared before timing.
+
+    python -m benchmarks.bench_geoindex
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub.geo import haversine_km
+from ridehub.geoindex import GeoIndex
+
+CITY_SOUTH_WEST = (40.55, -74.15)
+CITY_SPAN = (0.35, 0.45)  # roughly the five boroughs
+K = 10
+RADIUS_KM = 1.0
+QUERIES = 200
+
+
+def linear_nearest(lats, lngs, lat, lng, k):
+    km = haversine_km(lat, lng, lats, lngs)
+    idx = np.argpartition(km, k - 1)[:k]
+    idx = idx[np.argsort(km[idx], kind="stable")]
+    return idx.tolist()
+
+
+def linear_within(lats, lngs, lat, lng, radius_km):
+    km = haversine_km(lat, lng, lats, lngs)
+    idx = np.flatnonzero(km <= radius_km)
+    return idx[np.argsort(km[idx], kind="stable")].tolist()
+
+
+def main() -> None:
+    rng = np.random.default_rng(11)
+    rows = []
+    for n in (10_000, 100_000, 1_000_000):
+        lats = CITY_SOUTH_WEST[0] + rng.uniform(0, CITY_SPAN[0], n)
+        lngs = CITY_SOUTH_WEST[1] + rng.uniform(0, CITY_SPAN[1], n)
+        queries = np.column_stack(
+            (
+                CITY_SOUTH_WEST[0] + rng.uniform(0, CITY_SPAN[0], QUERIES),
+                CITY_SOUTH_WEST[1] + rng.uniform(0, CITY_SPAN[1], QUERIES),
+            )
+        ).tolist()
+
+        index = GeoIndex()
+        start = time.perf_counter()
+        for driver_id, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist())):
+            index.insert(driver_id, lat, lng)
+        insert = (time.perf_counter() - start) / n
+
+        for lat, lng in queries[:20]:
+            assert [d for d, _ in index.nearest(lat, lng, K)] == linear_nearest(lats, lngs, lat, lng, K)
+            assert [d for d, _ in index.within(lat, lng, RADIUS_KM)] == linear_within(
+                lats, lngs, lat, lng, RADIUS_KM
+            )
+
+        def run(fn):
+            return best_of(lambda: [fn(lat, lng) for lat, lng in queries], repeat=3) / QUERIES
+
+        scan_knn = run(lambda lat, lng: linear_nearest(lats, lngs, lat, lng, K))
+        grid_knn = run(lambda lat, lng: index.nearest(lat, lng, K))
+        scan_radius = run(lambda lat, lng: linear_within(lats, lngs, lat, lng, RADIUS_KM))
+        grid_radius = run(lambda lat, lng: index.within(lat, lng, RADIUS_KM))
+
+        churn = list(range(0, n, max(1, n // 10_000)))
+        start = time.perf_counter()
+        for driver_id in churn:
+            index.remove(driver_id)
+        for driver_id in churn:
+            index.insert(driver_id, lats[driver_id], lngs[driver_id])
+        churn_cost = (time.perf_counter() - start) / (2 * len(churn))
+
+        rows.append(
+            (
+                f"{n:,}",
+                format_seconds(scan_knn),
+                format_seconds(grid_knn),
+                f"{scan_knn / grid_knn:.0f}x",
+                format_seconds(scan_radius),
+                format_seconds(grid_radius),
+                f"{scan_radius / grid_radius:.0f}x",
+                format_seconds(insert),
+                format_seconds(churn_cost),
+            )
+        )
+
+    print(f"Per query: k={K} nearest, {RADIUS_KM} km radius")
+    print_table(
+        (
+            "drivers",
+            "scan kNN",
+            "grid kNN",
+            "speedup",
+            "scan radius",
+            "grid radius",
+            "speedup",
+            "insert",
+            "on/off duty",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Import graph: cold scan, warm re-scan and one edited file, with the findings checked.
+
+Runs :class:`ridehub.imports.ImportGraph` on a scratch copy of the tree with
+one scratch cache, and reports the best ``analyze()`` time of each scenario.
+
+* cold: an empty cache, parsed inline, in a process pool and with the
+  default ``workers`` (which must pick inline for a tree this size);
+* warm: nothing changed;
+* comment edited: one component gains a comment, so one file is re-parsed
+  and the graph is unchanged;
+* icon used: ``DriverCard`` starts rendering ``icons.to``, so ``to.png`` moves
+  from unused to used.
+
+Each incremental result must equal a cold scan of the same tree.  The
+findings are checked against a plain ``grep`` of the sources.  The icons
+marked used must be exactly the ``icons.<name>`` the reached modules
+mention.  ``react-logo`` and ``partial-react-logo`` are imported by nothing,
+and ``components/index.ts`` and the components only it imports are
+reached from no route.
+
+    python -m benchmarks.bench_imports [--repeat 10] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import tempfile
+
+from benchmarks.common import format_seconds, print_table
+from ridehub.imports import APP_CONFIG, ASSET_DIR, POOL_THRESHOLD, SOURCE_DIRS, ImportGraph
+from ridehub.manifest import MANIFEST
+
+EXTRA_DIRS = ("store", "types")  # imported through @/ but outside SOURCE_DIRS
+COMMENTED = "components/DriverCard.tsx"
+
+
+def scratch_tree(root: str) -> None:
+    for name in (*SOURCE_DIRS, *EXTRA_DIRS, ASSET_DIR):
+        shutil.copytree(name, os.path.join(root, name))
+    for name in (APP_CONFIG, MANIFEST):
+        shutil.copyfile(name, os.path.join(root, name))
+
+
+def edit(root: str, path: str, old: str, new: str) -> None:
+    with open(os.path.join(root, path), encoding="utf-8") as handle:
+        text = handle.read()
+    assert old in text, (path, old)
+    with open(os.path.join(root, path), "w", encoding="utf-8") as handle:
+        handle.write(text.replace(old, new, 1))
+
+
+def grep_icons(root: str, paths) -> set[str]:
+    """``icons.<name>`` mentioned by the given modules, mapped to their asset files."""
+    with open(os.path.join(root, "constants/index.ts"), encoding="utf-8") as handle:
+        imports = dict(re.findall(r'import (\w+) from "@/(assets/icons/[^"]+)"', handle.read()))
+    names = set()
+    for path in paths:
+        with open(os.path.join(root, path), encoding="utf-8") as handle:
+            names.update(re.findall(r"\bicons\.(\w+)", handle.read()))
+    return {imports[name] for name in names}
+
+
+def statuses(report) -> dict[str, str]:
+    return {usage.path: usage.status for usage in report.files}
+
+
+def best(graph: ImportGraph, repeat: int, before=None):
+    """The best ``analyze()`` seconds over ``repeat`` runs, and the last report."""
+    seconds = float("inf")
+    for _ in range(repeat):
+        if before:
+            before()
+        report = graph.analyze()
+        seconds = min(seconds, report.seconds)
+    return seconds, report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        root, cache = os.path.join(scratch, "tree"), os.path.join(scratch, "cache")
+        scratch_tree(root)
+
+        def clear():
+            shutil.rmtree(cache, ignore_errors=True)
+
+        def fresh():
+            clear()
+            return ImportGraph(root, cache_dir=cache, workers=1).analyze()
+
+        inline, pool = (
+            ImportGraph(root, cache_dir=cache, workers=workers) for workers in (1, args.workers)
+        )
+        rows = []
+        seconds, cold = best(inline, args.repeat, clear)
+        rows.append(("cold, inline", cold, seconds))
+        seconds, pooled = best(pool, args.repeat, clear)
+        rows.append((f"cold, pool of {args.workers}", pooled, seconds))
+        assert pooled.to_dict() | {"seconds": 0} == cold.to_dict() | {"seconds": 0}
+        seconds, default = best(ImportGraph(root, cache_dir=cache), args.repeat, clear)
+        rows.append(("cold, default workers", default, seconds))
+        assert default.parsed < POOL_THRESHOLD
+
+        seconds, warm = best(inline, args.repeat)
+        rows.append(("warm, nothing changed", warm, seconds))
+        assert warm.parsed == 0 and statuses(warm) == statuses(cold)
+
+        counter = iter(range(10**6))
+
+        def comment():
+            edit(root, COMMENTED, "import", f"// revision {next(counter)}\nimport")
+
+        seconds, commented = best(inline, args.repeat, comment)
+        rows.append(("warm, comment edited", commented, seconds))
+        assert commented.parsed == 1 and statuses(commented) == statuses(cold)
+
+        assert statuses(cold)["assets/icons/to.png"] == "unused"
+        edit(root, COMMENTED, "icons.", "icons.to && icons.")
+        seconds, used = best(inline, 1)
+        rows.append(("warm, icon used", used, seconds))
+        assert used.parsed == 1 and statuses(used)["assets/icons/to.png"] == "used"
+        assert used.to_dict() | {"seconds": 0, "parsed": 0, "cached": 0} == fresh().to_dict() | {
+            "seconds": 0,
+            "parsed": 0,
+            "cached": 0,
+        }
+
+        final = statuses(used)
+        reached = [u.path for u in used.files if u.kind != "asset" and u.status == "used"]
+        marked = {p for p, s in final.items() if p.startswith("assets/icons/") and s == "used"}
+        assert marked == grep_icons(root, reached), marked
+        for path in ("assets/images/react-logo.png", "assets/images/partial-react-logo.png"):
+            assert final[path] == "orphan", path
+        for path in ("components/index.ts", "components/EmptyState.tsx"):
+            assert final[path] == "orphan", path
+        # The scratch tree holds only the sources, so the claims are checked in place.
+        issues = ImportGraph(".", cache_dir=cache, workers=1).analyze().manifest
+
+    print(
+        f"{cold.modules} modules, {cold.bundled} bundled, {cold.used} used, "
+        f"{len(cold.files) - cold.modules} assets; best of {args.repeat}"
+    )
+    print_table(
+        ("scenario", "parsed", "cached", "analyze"),
+        [(name, r.parsed, r.cached, format_seconds(seconds)) for name, r, seconds in rows],
+    )
+    print()
+    print_table(
+        ("status", "assets", "asset bytes", "modules", "module bytes"),
+        [
+            (
+                status,
+                len(cold.select(status, ("asset",))),
+                f"{cold.bytes(status, ('asset',)):,}",
+                len(cold.select(status, ("component", "module"))),
+                f"{cold.bytes(status, ('component', 'module')):,}",
+            )
+            for status in ("used", "unused", "orphan")
+        ],
+    )
+    print(f"\n{len(issues)} manifest claims contradicted by the tree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+GPS ingestion throughput on a single core.
+
+Producers push batches of raw fixes (several per driver per tick, shuffled and
+partly out of order) while a reader task keeps taking snapshots and checks
+that each one is internally consistent.  Throughput is raw updates accepted
+per second, end to end, including coalescing and the final apply.
+
+    python -m benchmarks.bench_ingest
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import numpy as np
+
+from benchmarks.common import print_table
+from ridehub.ingest import DriverTable, PositionBatch, PositionIngestor
+
+BATCH_SIZE = 2_000
+TOTAL_UPDATES = 2_000_000
+TICK_INTERVAL = 0.05
+
+
+def make_batches(fleet: int, rng: np.random.Generator) -> list[PositionBatch]:
+    batches = []
+    clock = 1_700_000_000.0
+    for _ in range(TOTAL_UPDATES // BATCH_SIZE):
+        ids = rng.integers(0, fleet, BATCH_SIZE)
+        fixed_at = clock + rng.uniform(-1.0, 1.0, BATCH_SIZE)  # jitter reorders fixes
+        batches.append(
+            PositionBatch(
+                ids.astype(np.int64),
+                40.55 + rng.uniform(0, 0.35, BATCH_SIZE),
+                -74.15 + rng.uniform(0, 0.45, BATCH_SIZE),
+                fixed_at,
+            )
+        )
+        clock += 0.01
+    return batches
+
+
+async def run(fleet: int, batches: list[PositionBatch]) -> tuple[float, PositionIngestor, int]:
+    table = DriverTable()
+    ingestor = PositionIngestor(table, tick_interval=TICK_INTERVAL, max_pending=256)
+    reads = 0
+    done = False
+
+    async def reader() -> None:
+        nonlocal reads
+        last_version = -1
+        while not done:
+            snapshot = table.snapshot
+            assert snapshot.version >= last_version
+            assert len(snapshot.latitudes) == len(snapshot.longitudes) == len(snapshot.driver_ids)
+            last_version = snapshot.version
+            reads += 1
+            await asyncio.sleep(0.001)
+
+    async def producer(chunk: list[PositionBatch]) -> None:
+        for batch in chunk:
+            await ingestor.submit(batch)
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    ticker = asyncio.create_task(ingestor.run())
+    reading = asyncio.create_task(reader())
+    await asyncio.gather(*(producer(batches[i::4]) for i in range(4)))
+    ingestor.stop()
+    await ticker
+    elapsed = time.perf_counter() - start
+    done = True
+    await reading
+    return elapsed, ingestor, reads
+
+
+def main() -> None:
+    rng = np.random.default_rng(3)
+    rows = []
+    for fleet in (10_000, 100_000):
+        batches = make_batches(fleet, rng)
+        elapsed, ingestor, reads = asyncio.run(run(fleet, batches))
+
+        expected = PositionBatch.concat(batches).latest_per_driver()
+        snapshot = ingestor.table.snapshot
+        assert len(snapshot) == len(expected)
+        for driver_id, lat in zip(expected.driver_ids[:1000].tolist(), expected.latitudes[:1000].tolist()):
+            assert snapshot.position(driver_id)[0] == lat
+
+        rows.append(
+            (
+                f"{fleet:,}",
+                f"{ingestor.updates_received:,}",
+                f"{ingestor.updates_applied:,}",
+                ingestor.ticks,
+                f"{elapsed:.2f} s",
+                f"{ingestor.updates_received / elapsed:,.0f}",
+                reads,
+            )
+        )
+    print_table(
+        ("drivers", "received", "applied", "ticks", "wall", "updates/s", "snapshot reads"), rows
+    )
+
+
+if __name__ == "__main__":
+    main()
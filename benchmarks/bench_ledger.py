@@ -0,0 +1,181 @@
+"""
+Wallet ledger at 1M transactions per account.
+
+Appends go to a fresh log: one hot account with 1M transactions interleaved
+with 200k more spread over other accounts.  Balance reads and history pages
+are compared with recomputing from the log: a vectorized NumPy scan of the
+whole file through ``mmap``, which is the best a "sum the history" design can
+do.  Reopen times show the checkpoint skipping log replay.
+
+    python -m benchmarks.bench_ledger [--dir /tmp]
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, percentile, print_table
+from ridehub.ledger import RECORD_SIZE, STATUSES, TYPES, WalletLedger
+
+HOT = 42
+HOT_TRANSACTIONS = 1_000_000
+OTHER_TRANSACTIONS = 200_000
+BATCH = 1_000
+TITLES = {"ride": "Ride to Airport", "refund": "Refund", "topup": "Wallet Top-up", "subscription": "Plus"}
+
+LOG_DTYPE = np.dtype(
+    [
+        ("account", "<u8"),
+        ("at", "<i8"),
+        ("amount", "<i8"),
+        ("balance", "<i8"),
+        ("links", "<i8", 3),
+        ("type", "u1"),
+        ("status", "u1"),
+        ("title_len", "<u2"),
+        ("crc", "<u4"),
+        ("title", "S64"),
+    ]
+)
+assert LOG_DTYPE.itemsize == RECORD_SIZE
+
+
+def transactions(rng: np.random.Generator):
+    total = HOT_TRANSACTIONS + OTHER_TRANSACTIONS
+    hot = rng.random(total) < HOT_TRANSACTIONS / total
+    accounts = np.where(hot, HOT, rng.integers(1_000, 50_000, total)).tolist()
+    types = rng.choice(len(TYPES), total, p=[0.7, 0.05, 0.15, 0.1]).tolist()
+    statuses = rng.choice(len(STATUSES), total, p=[0.9, 0.07, 0.03]).tolist()
+    amounts = np.round(rng.uniform(3, 60, total), 2).tolist()
+    start = 1_735_689_600.0
+    for i in range(total):
+        kind = TYPES[types[i]]
+        sign = -1 if kind in ("ride", "subscription") else 1
+        yield (accounts[i], kind, sign * amounts[i], STATUSES[statuses[i]], TITLES[kind], start + i)
+
+
+def scan(path: str) -> np.ndarray:
+    with open(path, "rb") as handle:
+        view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return np.frombuffer(view, dtype=LOG_DTYPE)
+
+
+def recompute_balance(log: np.ndarray, account: int) -> int:
+    mine = (log["account"] == account) & (log["status"] == 0)
+    return int(log["amount"][mine].sum())
+
+
+def recompute_page(log: np.ndarray, account: int, type_=None, status=None, limit=20) -> list[str]:
+    mask = log["account"] == account
+    if type_ is not None:
+        mask &= log["type"] == TYPES.index(type_)
+    if status is not None:
+        mask &= log["status"] == STATUSES.index(status)
+    return [str(i) for i in np.flatnonzero(mask)[::-1][:limit]]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default=tempfile.gettempdir())
+    args = parser.parse_args()
+    path = os.path.join(args.dir, "bench_wallet.log")
+    for stale in (path, path + ".ckpt"):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    rng = np.random.default_rng(13)
+    pending = list(transactions(rng))
+    ledger = WalletLedger(path)
+    start = time.perf_counter()
+    for i in range(0, len(pending), BATCH):
+        ledger.append_many(pending[i : i + BATCH])
+    batched = time.perf_counter() - start
+    single = pending[:20_000]
+    start = time.perf_counter()
+    for account, kind, amount, status, title, at in single:
+        ledger.append(account, kind, amount, status=status, title=title, at=at)
+    one_by_one = time.perf_counter() - start
+    del pending
+    print(
+        f"Appended {len(ledger):,} records ({os.path.getsize(path) / 2**20:,.0f} MiB): "
+        f"{(len(ledger) - len(single)) / batched:,.0f}/s in batches of {BATCH:,}, "
+        f"{len(single) / one_by_one:,.0f}/s one at a time\n"
+    )
+
+    log = scan(path)
+    hot_count = int((log["account"] == HOT).sum())
+    assert round(ledger.balance(HOT) * 100) == recompute_balance(log, HOT)
+
+    reads = []
+    for _ in range(20_000):
+        start = time.perf_counter()
+        ledger.balance(HOT)
+        reads.append(time.perf_counter() - start)
+    recompute = best_of(lambda: recompute_balance(log, HOT), repeat=3)
+    rows = [
+        (
+            "balance",
+            format_seconds(percentile(reads, 50)),
+            format_seconds(percentile(reads, 99)),
+            format_seconds(recompute),
+        )
+    ]
+
+    middle = ledger.history(HOT, limit=hot_count // 2).next_cursor
+    cases = {
+        "history, first page": ({}, None),
+        "history, page at 500k": ({}, middle),
+        "type=refund": ({"type": "refund"}, None),
+        "status=failed": ({"status": "failed"}, None),
+        "type=topup, status=pending": ({"type": "topup", "status": "pending"}, None),
+    }
+    for name, (filters, cursor) in cases.items():
+        page = ledger.history(HOT, cursor=cursor, **filters)
+        ids = [t["id"] for t in page.transactions]
+        if cursor is None:
+            assert ids == recompute_page(log, HOT, filters.get("type"), filters.get("status")), name
+        samples = []
+        for _ in range(500):
+            start = time.perf_counter()
+            ledger.history(HOT, cursor=cursor, **filters)
+            samples.append(time.perf_counter() - start)
+        baseline = best_of(
+            lambda: recompute_page(log, HOT, filters.get("type"), filters.get("status")), repeat=3
+        )
+        rows.append(
+            (
+                name,
+                format_seconds(percentile(samples, 50)),
+                format_seconds(percentile(samples, 99)),
+                format_seconds(baseline),
+            )
+        )
+    print(f"Account {HOT}: {hot_count:,} transactions")
+    print_table(("read", "ledger p50", "ledger p99", "recompute from log"), rows)
+
+    del log
+    ledger.close()
+    start = time.perf_counter()
+    reopened = WalletLedger(path)
+    warm = time.perf_counter() - start
+    assert reopened.balance(HOT) == ledger.balance(HOT)
+    reopened.close()
+    os.remove(path + ".ckpt")
+    start = time.perf_counter()
+    replayed = WalletLedger(path)
+    cold = time.perf_counter() - start
+    assert replayed.balance(HOT) == ledger.balance(HOT)
+    replayed.close()
+    print(f"\nReopen: {format_seconds(warm)} from checkpoint, {format_seconds(cold)} replaying the log")
+    os.remove(path)
+    os.remove(path + ".ckpt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Manifest reads: startup cost of one field, module import against ridehub.manifest.
+
+Every scenario reads ``color_palette.status`` in a fresh interpreter, from a
+scratch copy of ``IMPLEMENTATION_COMPLETE.py``, and reports the median
+process wall time.  The import column is ``python -X importtime``'s
+cumulative time for the module that does the work, from separate runs.
+"legacy" is the file as it was before the banner moved under ``__main__``,
+so importing it prints the banner again.  With nothing changed, the
+``.pyc`` and the snapshot are current.  "touched" gives the manifest a new
+mtime, and "edited" changes its bytes before every run, which is what
+happens to the bytecode whenever anyone edits the file.  "-B" is an
+interpreter that never writes bytecode (``PYTHONDONTWRITEBYTECODE``, as in
+many CI images), so it compiles the file on every import.  ``python -c pass``
+is the floor every process pays.
+
+    python -m benchmarks.bench_manifest [--runs 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub.manifest import MANIFEST, Manifest, snapshot_path
+
+KEY = "color_palette.status"
+IMPORT = (
+    "from IMPLEMENTATION_COMPLETE import IMPLEMENTATION_COMPLETE as m; "
+    "print(m['color_palette']['status'])"
+)
+API = f"from ridehub.manifest import Manifest; print(Manifest().get({KEY!r}))"
+# A different length: bytecode is checked by whole-second mtime and size only.
+DATE, OTHER_DATE = '"date": "2025-02-12"', '"date": "2025-02-12T09:00"'
+
+
+def flip(path: str) -> None:
+    with open(path, encoding="utf-8") as handle:
+        text = handle.read()
+    old, new = (DATE, OTHER_DATE) if DATE in text else (OTHER_DATE, DATE)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text.replace(old, new, 1))
+
+
+def measure(args: list[str], cwd: str, runs: int, module: str = "", before=None):
+    """Median wall seconds, median ``-X importtime`` cumulative seconds of ``module``, stdout.
+
+    Bytecode is written whatever the caller's environment says, as on a developer's machine.
+    """
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    walls, imports = [], []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        done = subprocess.run(
+            [sys.executable, *args], cwd=cwd, env=env, capture_output=True, check=True
+        )
+        walls.append(time.perf_counter() - start)
+    for _ in range(runs if module else 0):
+        if before:
+            before()
+        command = [sys.executable, "-X", "importtime", *args]
+        traced = subprocess.run(command, cwd=cwd, env=env, capture_output=True, check=True)
+        for line in traced.stderr.decode().splitlines():
+            fields = [f.strip() for f in line.rpartition("import time:")[2].split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                imports.append(int(fields[1]) / 1e6)
+    imported = statistics.median(imports) if imports else None
+    return statistics.median(walls), imported, done.stdout
+
+
+def rebuild(path: str) -> None:
+    """A read with no snapshot: parse the source and write one."""
+    try:
+        os.remove(snapshot_path(path))
+    except FileNotFoundError:
+        pass
+    Manifest(path).get(KEY)
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    runs = args.runs
+
+    with tempfile.TemporaryDirectory() as scratch:
+        legacy, current = os.path.join(scratch, "legacy"), os.path.join(scratch, "current")
+        unwritable = os.path.join(scratch, "no-bytecode")
+        for directory in (legacy, current, unwritable):
+            os.makedirs(directory)
+        with open(MANIFEST, encoding="utf-8") as handle:
+            source = handle.read()
+        with open(os.path.join(legacy, MANIFEST), "w", encoding="utf-8") as handle:
+            handle.write(source.replace('if __name__ == "__main__":', "if True:", 1))
+        shutil.copyfile(MANIFEST, os.path.join(current, MANIFEST))
+        shutil.copyfile(MANIFEST, os.path.join(unwritable, MANIFEST))
+        path = os.path.join(current, MANIFEST)
+
+        def edit_legacy():
+            flip(os.path.join(legacy, MANIFEST))
+
+        def edit_current():
+            flip(path)
+
+        cli = ["-m", "ridehub.manifest", "get", KEY]
+        module = "IMPLEMENTATION_COMPLETE"
+        floor, _, _ = measure(["-c", "pass"], current, runs)
+        api = ["-c", API]
+        get = "ridehub.manifest"
+        scenarios = [
+            ("legacy import, unchanged", legacy, ["-c", IMPORT], module, None),
+            ("legacy import, manifest edited", legacy, ["-c", IMPORT], module, edit_legacy),
+            ("import, unchanged", current, ["-c", IMPORT], module, None),
+            ("import, manifest edited", current, ["-c", IMPORT], module, edit_current),
+            ("import, bytecode off (-B)", unwritable, ["-B", "-c", IMPORT], module, None),
+            ("Manifest().get, unchanged", current, api, get, None),
+            ("Manifest().get, manifest touched", current, api, get, lambda: os.utime(path)),
+            ("Manifest().get, manifest edited", current, api, get, edit_current),
+            ("manifest get CLI, unchanged", current, cli, "", None),
+        ]
+        rows = []
+        for name, directory, command, target, before in scenarios:
+            if before is None:
+                measure(command, directory, 1)  # leave the .pyc / snapshot in place
+            wall, imported, stdout = measure(command, directory, runs, target, before)
+            rows.append((name, wall, imported, len(stdout)))
+        assert stdout.decode().strip() == json.dumps(
+            Manifest(path).get(KEY), indent=2, ensure_ascii=False
+        )
+
+        manifest = Manifest(path)
+        manifest.get(KEY)
+        assert manifest.loaded_from == "snapshot", manifest.loaded_from
+        warm = best_of(lambda: Manifest(path).get(KEY), repeat=runs, number=20)
+        lookup = best_of(lambda: manifest.get(KEY), repeat=runs, number=1000)
+        cold = best_of(lambda: rebuild(path), repeat=runs)
+
+    print(
+        f"Reading {KEY} in a fresh interpreter, median of {runs} "
+        f"(python -c pass: {format_seconds(floor)})"
+    )
+    print_table(
+        ("scenario", "process", "over floor", "import", "stdout bytes"),
+        [
+            (
+                name,
+                format_seconds(wall),
+                format_seconds(wall - floor),
+                "-" if imp is None else format_seconds(imp),
+                out,
+            )
+            for name, wall, imp, out in rows
+        ],
+    )
+    print(
+        f"\nin process: Manifest(...).get from the snapshot {format_seconds(warm)}, "
+        f"rebuilt from source {format_seconds(cold)}, repeat lookup {format_seconds(lookup)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
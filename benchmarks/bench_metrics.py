@@ -0,0 +1,188 @@
+"""
+Instrumentation overhead, histogram accuracy and endpoint cost.
+
+Overhead is the extra time a call takes once it is timed, against the same
+empty function called bare, best of several million calls.  It is measured
+for the ``timed`` decorator on a function and on a coroutine, for the
+``Histogram.time()`` context manager and for ``Counter.inc``, and each must
+stay under the 1 µs budget or the run fails.  Accuracy
+compares histogram percentiles of a million log-normal latencies with the
+exact ones.  The endpoint section scrapes every metric the services register
+over HTTP and takes a short profiler dump of a busy thread.
+
+    python -m benchmarks.bench_metrics [--calls 2000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+import ridehub.chat  # noqa: F401  (imported for the metrics they register)
+import ridehub.loadtest  # noqa: F401
+import ridehub.shards  # noqa: F401
+from benchmarks.common import format_seconds, print_table
+from ridehub.metrics import REGISTRY, MetricsServer, Registry, SamplingProfiler, timed
+
+BUDGET = 1e-6
+REPEAT = 5
+
+
+def per_call(loop, calls: int) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        loop(calls)
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def overheads(calls: int) -> list[tuple[str, float]]:
+    registry = Registry()
+    histogram = registry.histogram("bench_seconds")
+    counter = registry.counter("bench_total")
+
+    def bare():
+        pass
+
+    @timed(histogram)
+    def decorated():
+        pass
+
+    async def bare_coroutine():
+        pass
+
+    @timed(histogram)
+    async def decorated_coroutine():
+        pass
+
+    def call_loop(fn):
+        def loop(n):
+            for _ in range(n):
+                fn()
+
+        return loop
+
+    def with_loop(n):
+        for _ in range(n):
+            with histogram.time():
+                pass
+
+    def inc_loop(n):
+        inc = counter.inc
+        for _ in range(n):
+            inc()
+
+    def await_loop(fn):
+        def loop(n):
+            async def main():
+                for _ in range(n):
+                    await fn()
+
+            asyncio.run(main())
+
+        return loop
+
+    baseline = per_call(call_loop(bare), calls)
+    awaits = calls // 4
+    await_baseline = per_call(await_loop(bare_coroutine), awaits)
+    rows = [
+        ("@timed function", per_call(call_loop(decorated), calls) - baseline),
+        ("@timed coroutine", per_call(await_loop(decorated_coroutine), awaits) - await_baseline),
+        ("with histogram.time()", per_call(with_loop, calls) - baseline),
+        ("counter.inc()", per_call(inc_loop, calls) - baseline),
+    ]
+    assert histogram.count == REPEAT * (2 * calls + awaits)
+    assert counter.value == REPEAT * calls
+    return rows
+
+
+def accuracy(rng: np.random.Generator) -> tuple[list[tuple], float]:
+    samples = rng.lognormal(np.log(2e-3), 1.2, 1_000_000)
+    histogram = Registry().histogram("accuracy_seconds")
+    observe = histogram.observe_ns
+    start = time.perf_counter()
+    for ns in np.round(samples * 1e9).astype(np.int64).tolist():
+        observe(ns)
+    record = (time.perf_counter() - start) / len(samples)
+    rows = []
+    for pct in (50, 90, 99, 99.9, 99.99):
+        exact = float(np.percentile(samples, pct, method="inverted_cdf"))
+        estimate = histogram.percentile(pct)
+        error = estimate / exact - 1
+        assert 0 <= error <= 1 / 32 + 1e-9, (pct, exact, estimate)
+        rows.append((f"p{pct:g}", format_seconds(exact), format_seconds(estimate), f"{error:+.2%}"))
+    assert abs(histogram.sum - samples.sum()) < 1e-6 * len(samples)
+    return rows, record
+
+
+def endpoint() -> tuple[int, float, str]:
+    rng = np.random.default_rng(19)
+    for metric in REGISTRY:
+        if metric.kind == "histogram":
+            for ns in rng.lognormal(np.log(5e5), 1.5, 10_000).astype(np.int64).tolist():
+                metric.observe_ns(ns)
+    stop = threading.Event()
+
+    def busy():
+        values = np.arange(100_000)
+        while not stop.is_set():
+            np.sort(values[::-1])
+
+    worker = threading.Thread(target=busy, name="busy")
+    worker.start()
+    server = MetricsServer(port=0, profiler=SamplingProfiler(0.002))
+    try:
+        with server.running():
+            start = time.perf_counter()
+            body = urllib.request.urlopen(server.url + "/metrics").read().decode()
+            scrape = time.perf_counter() - start
+            dump = urllib.request.urlopen(server.url + "/debug/profile?seconds=0.5").read().decode()
+    finally:
+        stop.set()
+        worker.join()
+    assert all(f"# TYPE {metric.name} " in body for metric in REGISTRY)
+    hottest = next(line for line in dump.splitlines() if line.startswith("busy;"))
+    return len(body.splitlines()), scrape, hottest
+
+
+def shorten(stack: str, width: int = 120) -> str:
+    """A folded stack cut to ``width``: the thread name and the innermost frames that fit."""
+    thread, *frames = stack.split(";")
+    kept: list[str] = []
+    while frames and len(thread) + sum(len(f) + 1 for f in kept) + len(frames[-1]) + 5 <= width:
+        kept.insert(0, frames.pop())
+    return ";".join([thread, *(["..."] if frames else []), *kept])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    costs = overheads(args.calls)
+    rows = [(name, format_seconds(cost), "yes" if cost < BUDGET else "NO") for name, cost in costs]
+    print(f"Overhead per call, best of {REPEAT} x {args.calls:,} calls")
+    print_table(("instrument", "overhead", "< 1 µs"), rows)
+    over = [name for name, cost in costs if cost >= BUDGET]
+    assert not over, f"over the {format_seconds(BUDGET)} budget: {', '.join(over)}"
+
+    rows, record = accuracy(np.random.default_rng(19))
+    print(f"\nHistogram of 1,000,000 log-normal latencies, {format_seconds(record)} per observe_ns")
+    print_table(("percentile", "exact", "histogram", "error"), rows)
+
+    lines, scrape, hottest = endpoint()
+    print(
+        f"\n/metrics: {len(list(REGISTRY))} metrics, {lines:,} lines, "
+        f"scraped in {format_seconds(scrape)}"
+    )
+    print(f"/debug/profile hottest stack: {shorten(hottest)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Autocomplete cache hit rates on replayed keystroke traces.
+
+Riders arrive over half an hour and type a destination one character at a
+time.  As with ``GoogleTextInput`` (``debounce={200}``), a request fires only
+after a 200 ms pause or when the rider stops.  Riders stop as soon as their
+destination appears in the suggestions.  Half head for one of a few dozen
+hotspots (airports, stations), the rest for one of 30k street addresses.
+Every uncached request is a real HTTP round-trip to ``PlacesStandIn``, and
+each cached answer is checked against what the stand-in would have returned.
+
+    python -m benchmarks.bench_places [--users 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import heapq
+import time
+
+import numpy as np
+
+from benchmarks.common import format_seconds, print_table
+from ridehub.places import AutocompleteCache, PlacesClient
+from ridehub.standins import PlacesStandIn
+
+DEBOUNCE = 0.2
+WINDOW = 0.1  # requests firing within one window are issued concurrently
+ARRIVAL_SECONDS = 1_800
+HOTSPOTS = [
+    "JFK International Airport, Queens, NY",
+    "LaGuardia Airport, Queens, NY",
+    "Newark Liberty International Airport, Newark, NJ",
+    "Penn Station, New York, NY",
+    "Grand Central Terminal, New York, NY",
+    "Port Authority Bus Terminal, New York, NY",
+    "Times Square, New York, NY",
+    "Barclays Center, Brooklyn, NY",
+    "Madison Square Garden, New York, NY",
+    "Yankee Stadium, Bronx, NY",
+    "Citi Field, Queens, NY",
+    "Central Park Zoo, New York, NY",
+    "Brooklyn Bridge Park, Brooklyn, NY",
+    "World Trade Center, New York, NY",
+    "Jamaica Station, Queens, NY",
+    "Atlantic Terminal, Brooklyn, NY",
+    "Hudson Yards, New York, NY",
+    "Columbia University, New York, NY",
+    "NYU Langone Hospital, New York, NY",
+    "Mount Sinai Hospital, New York, NY",
+    "Lincoln Center, New York, NY",
+    "Museum of Modern Art, New York, NY",
+    "Metropolitan Museum of Art, New York, NY",
+    "Rockefeller Center, New York, NY",
+    "Empire State Building, New York, NY",
+    "Coney Island, Brooklyn, NY",
+    "Staten Island Ferry Terminal, New York, NY",
+    "Flushing Main Street Station, Queens, NY",
+    "Kings Plaza Shopping Center, Brooklyn, NY",
+    "Queens Center Mall, Queens, NY",
+]
+STREETS = (
+    "Main Oak Maple Park Pine Cedar Elm Washington Lake Hill Church Spring Ridge Jackson Lincoln "
+    "Madison Franklin Jefferson Highland Sunset River Forest Meadow Prospect Union Grand Fulton "
+    "Atlantic Flatbush Bedford Myrtle Nostrand Broadway Lexington Amsterdam Columbus Ocean Bay "
+    "Harbor Linden Willow Chestnut Walnut Hickory Cherry Mulberry Orchard Clinton Henry Court "
+    "Smith Hoyt Bond Nevins Dean Bergen Pacific Warren Baltic Degraw Sackett Union Carroll"
+).split()
+SUFFIXES = ("St", "Ave", "Pl", "Blvd", "Rd")
+BOROUGHS = ("New York", "Brooklyn", "Queens", "Bronx", "Staten Island")
+
+
+def make_places(rng: np.random.Generator, addresses: int = 30_000) -> list[str]:
+    seen, streets = set(HOTSPOTS), []
+    while len(streets) < addresses:
+        place = (
+            f"{rng.integers(1, 1_000)} {STREETS[rng.integers(len(STREETS))]} "
+            f"{SUFFIXES[rng.integers(len(SUFFIXES))]}, {BOROUGHS[rng.integers(len(BOROUGHS))]}, NY"
+        )
+        if place not in seen:
+            seen.add(place)
+            streets.append(place)
+    return HOTSPOTS + streets  # prominence order: hotspots first
+
+
+def make_riders(rng: np.random.Generator, places: list[str], users: int):
+    """(arrival time, destination, keystroke gaps) per rider."""
+    hot = rng.random(users) < 0.5
+    zipf = np.minimum(rng.zipf(1.3, users) - 1, len(HOTSPOTS) - 1)
+    tail = rng.integers(len(HOTSPOTS), len(places), users)
+    targets = np.where(hot, zipf, tail)
+    arrivals = np.sort(rng.uniform(0, ARRIVAL_SECONDS, users))
+    riders = []
+    for arrival, target in zip(arrivals.tolist(), targets.tolist()):
+        text = places[target]
+        gaps = rng.lognormal(np.log(0.16), 0.5, len(text)).tolist()
+        riders.append((arrival, text, gaps))
+    return riders
+
+
+def first_request(rider) -> tuple[float, int]:
+    return next_request(rider, 0, rider[0])
+
+
+def next_request(rider, typed: int, now: float) -> tuple[float, int]:
+    """When the next debounced request fires and how much has been typed by then."""
+    _, text, gaps = rider
+    while True:
+        now += gaps[typed]
+        typed += 1
+        if typed == len(text) or gaps[typed] > DEBOUNCE:
+            return now + DEBOUNCE, typed
+
+
+async def replay(riders, cache: AutocompleteCache | None, fetch, server: PlacesStandIn, sim):
+    """Returns (requests, upstream calls, mismatches)."""
+    queue = [(*first_request(rider), i) for i, rider in enumerate(riders)]
+    heapq.heapify(queue)
+    requests = upstream = mismatches = 0
+
+    async def ask(text: str) -> list[dict]:
+        nonlocal upstream
+        if cache is not None:
+            return await cache.autocomplete(text, language="en")
+        upstream += 1
+        return (await fetch({"input": text, "language": "en"}))["predictions"]
+
+    while queue:
+        window_end = queue[0][0] + WINDOW
+        batch = []
+        while queue and queue[0][0] < window_end:
+            batch.append(heapq.heappop(queue))
+        sim[0] = batch[-1][0]
+        answers = await asyncio.gather(*(ask(riders[i][1][:typed]) for _, typed, i in batch))
+        requests += len(batch)
+        for (at, typed, i), predictions in zip(batch, answers):
+            text = riders[i][1]
+            if cache is not None and (i + typed) % 7 == 0:
+                expected = server.respond({"input": text[:typed]})[1]["predictions"]
+                mismatches += predictions != expected
+            if typed < len(text) and all(p["description"] != text for p in predictions):
+                heapq.heappush(queue, (*next_request(riders[i], typed, at - DEBOUNCE), i))
+    if cache is not None:
+        upstream = cache.stats.upstream
+    return requests, upstream, mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(15)
+    places = make_places(rng)
+    riders = make_riders(rng, places, args.users)
+
+    configs = {
+        "no cache": None,
+        "exact prefixes only": {"page_size": 0},  # nothing is ever complete
+        "trie + filtering": {},
+        "trie + filtering, 2k entries": {"max_entries": 2_000},
+        "trie + filtering, 60 s TTL": {"ttl": 60.0},
+    }
+    rows = []
+    with PlacesStandIn(places).running() as server:
+
+        async def run(options):
+            client = PlacesClient(server.url, key="")
+            sim = [0.0]
+            cache = None
+            if options is not None:
+                cache = AutocompleteCache(client, clock=lambda: sim[0], **options)
+            try:
+                result = await replay(riders, cache, client, server, sim)
+            finally:
+                await client.close()
+            return result, cache
+
+        for name, options in configs.items():
+            start = time.perf_counter()
+            (requests, upstream, mismatches), cache = asyncio.run(run(options))
+            wall = time.perf_counter() - start
+            assert mismatches == 0, (name, mismatches)
+            stats = cache.stats if cache is not None else None
+            rows.append(
+                (
+                    name,
+                    f"{requests:,}",
+                    f"{upstream:,}",
+                    f"{1 - upstream / requests:.1%}",
+                    f"{stats.hits:,}" if stats else "-",
+                    f"{stats.filtered:,}" if stats else "-",
+                    f"{stats.coalesced:,}" if stats else "-",
+                    f"{stats.evictions:,}" if stats else "-",
+                    format_seconds(wall),
+                )
+            )
+
+    minutes = ARRIVAL_SECONDS // 60
+    print(f"{args.users:,} riders, {len(places):,} places, {minutes} simulated minutes")
+    print_table(
+        (
+            "cache",
+            "requests",
+            "upstream",
+            "saved",
+            "exact hits",
+            "filtered",
+            "coalesced",
+            "evictions",
+            "wall",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
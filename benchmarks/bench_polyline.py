@@ -0,0 +1,209 @@
+"""
+Route simplification and encoding on a synthetic route corpus.
+
+Routes are 2-40 km of road-like geometry with a vertex every 5-15 m: straight
+blocks, right-angle turns and long gentle curves, as full-resolution
+Directions step polylines look.  For each zoom the table shows the points and
+bytes shipped, compared with the full route as an encoded polyline and as the
+JSON coordinate list ``Map.tsx`` would otherwise parse.  It also shows the
+time to rank a route once, to simplify and encode it at a zoom, and to serve
+a cache hit.  The same work is timed with a pure-Python recursive
+Douglas-Peucker and a per-point encoder, which must produce identical strings.
+
+    python -m benchmarks.bench_polyline [--routes 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from benchmarks.common import format_seconds, percentile, print_table
+from ridehub.polyline import (
+    RouteGeometry,
+    RouteGeometryCache,
+    _project,
+    _segment_distance,
+    decode,
+    encode,
+    tolerance_m,
+)
+
+ZOOMS = (10, 12, 14, 16, 18)
+METRES_PER_DEGREE = 111_195.0
+
+
+def make_route(rng: np.random.Generator) -> np.ndarray:
+    length = rng.uniform(2_000, 40_000)
+    heading = rng.uniform(0, 2 * math.pi)
+    steps, headings = [], []
+    travelled = 0.0
+    while travelled < length:
+        block = rng.uniform(100, 800)
+        spacing = rng.uniform(5, 15)
+        count = max(2, int(block / spacing))
+        if rng.random() < 0.3:  # a long curve
+            turn = rng.normal(0, 0.8)
+            headings.append(heading + np.linspace(0, turn, count))
+            heading += turn
+        else:
+            headings.append(np.full(count, heading))
+            heading += rng.choice((-math.pi / 2, math.pi / 2, 0.0), p=(0.3, 0.3, 0.4))
+        steps.append(np.full(count, spacing))
+        travelled += block
+    heading_all = np.concatenate(headings)
+    step_all = np.concatenate(steps)
+    north = np.cumsum(step_all * np.cos(heading_all)) + rng.normal(0, 0.3, len(step_all))
+    east = np.cumsum(step_all * np.sin(heading_all)) + rng.normal(0, 0.3, len(step_all))
+    lat0, lng0 = 40.75 + rng.normal(0, 0.05), -73.98 + rng.normal(0, 0.05)
+    lat = lat0 + north / METRES_PER_DEGREE
+    lng = lng0 + east / (METRES_PER_DEGREE * math.cos(math.radians(lat0)))
+    return np.column_stack((lat, lng))
+
+
+def reference_encode(points) -> str:
+    out, prev_lat, prev_lng = [], 0, 0
+    for lat, lng in points:
+        ilat = int(math.floor(abs(lat) * 1e5 + 0.5)) * (1 if lat >= 0 else -1)
+        ilng = int(math.floor(abs(lng) * 1e5 + 0.5)) * (1 if lng >= 0 else -1)
+        for delta in (ilat - prev_lat, ilng - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        prev_lat, prev_lng = ilat, ilng
+    return "".join(out)
+
+
+def reference_simplify(xy: list[tuple[float, float]], tolerance: float) -> list[int]:
+    """Recursive Douglas-Peucker over plain tuples, segment distance like the module."""
+
+    def distance(p, a, b):
+        abx, aby = b[0] - a[0], b[1] - a[1]
+        length2 = abx * abx + aby * aby
+        t = 0.0 if length2 == 0 else ((p[0] - a[0]) * abx + (p[1] - a[1]) * aby) / length2
+        t = min(1.0, max(0.0, t))
+        return math.hypot(p[0] - a[0] - abx * t, p[1] - a[1] - aby * t)
+
+    keep = [0]
+
+    def split(first: int, last: int) -> None:
+        best, index = -1.0, -1
+        for i in range(first + 1, last):
+            d = distance(xy[i], xy[first], xy[last])
+            if d > best:
+                best, index = d, i
+        if best > tolerance:
+            split(first, index)
+            keep.append(index)
+            split(index, last)
+
+    split(0, len(xy) - 1)
+    keep.append(len(xy) - 1)
+    return keep
+
+
+def max_deviation(geometry: RouteGeometry, keep: np.ndarray) -> float:
+    """Largest distance from a dropped vertex to the simplified segment spanning it."""
+    xy = _project(geometry.points, geometry.latitude)
+    kept = np.flatnonzero(keep)
+    segment = np.searchsorted(kept, np.arange(len(xy)), side="right") - 1
+    segment = np.minimum(segment, len(kept) - 2)
+    a, b = xy[kept[segment]], xy[kept[segment + 1]]
+    return float(_segment_distance(xy, a, b).max())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--routes", type=int, default=500)
+    args = parser.parse_args()
+    rng = np.random.default_rng(17)
+    routes = [make_route(rng) for _ in range(args.routes)]
+    full_points = sum(len(r) for r in routes)
+    full_encoded = sum(len(encode(r)) for r in routes)
+    full_json = sum(
+        len(json.dumps([{"latitude": lat, "longitude": lng} for lat, lng in r.tolist()]))
+        for r in routes
+    )
+
+    rank_times, geometries = [], []
+    for route in routes:
+        start = time.perf_counter()
+        geometries.append(RouteGeometry(route))
+        rank_times.append(time.perf_counter() - start)
+
+    rows = [("full", f"{full_points:,}", "-", f"{full_encoded:,}", "-", f"{full_json:,}", "-", "-")]
+    for zoom in ZOOMS:
+        points = size = 0
+        samples = []
+        for geometry in geometries:
+            start = time.perf_counter()
+            text = geometry.encoded(zoom)
+            samples.append(time.perf_counter() - start)
+            points += int(geometry.keep(tolerance_m(zoom, geometry.latitude)).sum())
+            size += len(text)
+        rows.append(
+            (
+                f"zoom {zoom}",
+                f"{points:,}",
+                f"{points / full_points:.1%}",
+                f"{size:,}",
+                f"{size / full_encoded:.1%}",
+                f"{size / full_json:.2%}",
+                format_seconds(percentile(samples, 50)),
+                format_seconds(percentile(samples, 99)),
+            )
+        )
+
+    # Exactness: vectorized ranking and encoding against the plain-Python reference.
+    check = geometries[: max(1, len(geometries) // 10)]
+    python_samples = []
+    for geometry in check:
+        xy = [tuple(p) for p in _project(geometry.points, geometry.latitude).tolist()]
+        for zoom in (12, 16):
+            tolerance = tolerance_m(zoom, geometry.latitude)
+            start = time.perf_counter()
+            keep = sorted(reference_simplify(xy, tolerance))
+            text = reference_encode(geometry.points[keep].tolist())
+            python_samples.append(time.perf_counter() - start)
+            assert keep == np.flatnonzero(geometry.keep(tolerance)).tolist()
+            assert text == geometry.encoded(zoom)
+            assert max_deviation(geometry, geometry.keep(tolerance)) <= tolerance
+            assert np.abs(decode(text) - geometry.points[keep]).max() <= 0.5e-5 + 1e-12
+
+    cache = RouteGeometryCache()
+    for i, route in enumerate(routes):
+        for zoom in ZOOMS:
+            cache.encoded(f"route-{i}", zoom, route)
+    hit_samples = []
+    for i in rng.integers(0, len(routes), 20_000).tolist():
+        start = time.perf_counter()
+        cache.encoded(f"route-{i}", ZOOMS[i % len(ZOOMS)])
+        hit_samples.append(time.perf_counter() - start)
+
+    print(
+        f"{len(routes):,} routes, {full_points:,} vertices; "
+        f"rank once: p50 {format_seconds(percentile(rank_times, 50))}, "
+        f"p99 {format_seconds(percentile(rank_times, 99))}"
+    )
+    headers = ("geometry", "points", "of full", "bytes", "of full", "of JSON")
+    print_table((*headers, "encode p50", "encode p99"), rows)
+    print(
+        f"\nPure-Python Douglas-Peucker + encoder (zoom 12 and 16, {len(check)} routes): "
+        f"p50 {format_seconds(percentile(python_samples, 50))}, "
+        f"p99 {format_seconds(percentile(python_samples, 99))}; identical output"
+    )
+    print(
+        f"Cache hit: p50 {format_seconds(percentile(hit_samples, 50))}, "
+        f"p99 {format_seconds(percentile(hit_samples, 99))} "
+        f"({cache.stats.hits:,} hits, {cache.stats.misses:,} misses)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Promo engine at 10M issued codes vs. walking the code list.
+
+The baseline is what ``promo-codes.tsx`` does: scan the list for a matching,
+active code.  It is measured on 1M codes, since a 10M-entry list of dicts does
+not fit next to the engine here, and it scales linearly.  The engine is
+measured at 10M codes for single lookups (valid and unknown codes), batch
+lookups, batch fare discounts, and concurrent redemption of a limited code.
+
+    python -m benchmarks.bench_promos [--codes 10000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, percentile, print_table
+from ridehub.promos import CODE_BYTES, PromoEngine, PromoRule, hash_codes
+
+ALPHABET = np.frombuffer(b"ABCDEFGHJKLMNPQRSTUVWXYZ23456789", dtype=np.uint8)
+RULES = [
+    PromoRule("percentage", 50, min_ride_amount=10),
+    PromoRule("fixed", 20, min_ride_amount=50),
+    PromoRule("percentage", 30),
+    PromoRule("percentage", 15, max_discount=8),
+]
+
+
+def make_codes(count: int, prefix: bytes = b"P", salt: int = 0x5DEECE66D) -> np.ndarray:
+    """``count`` distinct 11-character codes (a bijection of the index, so no repeats)."""
+    x = (np.arange(count, dtype=np.uint64) * np.uint64(salt | 1)) & np.uint64((1 << 50) - 1)
+    chars = np.empty((count, CODE_BYTES), dtype=np.uint8)
+    chars[:, 0] = prefix[0]
+    for j in range(10):
+        chars[:, j + 1] = ALPHABET[((x >> np.uint64(5 * j)) & np.uint64(31)).astype(np.intp)]
+    chars[:, 11:] = 0
+    return chars.view(f"S{CODE_BYTES}").ravel()
+
+
+def latencies(fn, inputs) -> list[float]:
+    out = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        out.append(time.perf_counter() - start)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--codes", type=int, default=10_000_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(12)
+
+    # Baseline: the client's list walk, on 1M codes.
+    sample = [c.decode() for c in make_codes(1_000_000).tolist()]
+    records = [{"code": c, "isActive": True, "usesLeft": 1} for c in sample]
+    probes = [sample[i] for i in rng.integers(0, len(sample), 5)]
+
+    def walk(code: str) -> bool:
+        return any(r["code"] == code and r["isActive"] for r in records)
+
+    scan = percentile(latencies(walk, probes), 50)
+    del records, sample
+
+    codes = make_codes(args.codes)
+    engine = PromoEngine(RULES, capacity=args.codes)
+    rules = rng.integers(0, len(RULES), args.codes).astype(np.int32)
+    uses = np.where(rng.random(args.codes) < 0.5, 1, -1)
+    start = time.perf_counter()
+    engine.issue_many(codes, rules, uses=uses, normalized=True)
+    build = time.perf_counter() - start
+    print(f"{len(engine):,} codes issued in {build:.1f} s ({len(engine) / build:,.0f} codes/s)")
+
+    valid = [c.decode().lower() for c in codes[rng.integers(0, args.codes, 20_000)].tolist()]
+    unknown = [c.decode() for c in make_codes(20_000, prefix=b"X", salt=0x2545F491).tolist()]
+    assert all(engine.lookup(c) is not None for c in valid)
+    assert all(engine.lookup(c) is None for c in unknown)
+    unknown_raw = np.array([c.encode() for c in unknown], dtype=f"S{CODE_BYTES}")
+    false_positive = engine.bloom.contains_many(hash_codes(unknown_raw)).mean()
+
+    hit = latencies(engine.lookup, valid)
+    miss = latencies(engine.lookup, unknown)
+    batch_codes = valid[:10_000]
+    rows = engine.lookup_many(batch_codes)
+    assert (rows >= 0).all() and rows[0] == engine.lookup(valid[0])
+    batch = best_of(lambda: engine.lookup_many(batch_codes), repeat=3)
+
+    fares = rng.uniform(5, 80, (10_000, 20))
+    discounted = engine.apply(fares, batch_codes)
+    for i in range(0, 10_000, 997):
+        for j in (0, 7, 19):
+            assert abs(engine.check(batch_codes[i], fares[i, j]).final_fare - discounted[i, j]) < 1e-9
+    apply_batch = best_of(lambda: engine.apply(fares, batch_codes), repeat=3)
+    one_rider = fares[0]
+    apply_one = best_of(lambda: engine.apply(one_rider, valid[0]), repeat=200)
+
+    print_table(
+        ("operation", "p50", "p99", "note"),
+        [
+            ("list walk (1M codes)", format_seconds(scan), "", "client approach, linear in codes"),
+            (
+                "lookup, issued code",
+                format_seconds(percentile(hit, 50)),
+                format_seconds(percentile(hit, 99)),
+                "",
+            ),
+            (
+                "lookup, unknown code",
+                format_seconds(percentile(miss, 50)),
+                format_seconds(percentile(miss, 99)),
+                f"Bloom false positives {false_positive:.2%}",
+            ),
+            (
+                "lookup_many, 10k codes",
+                format_seconds(batch),
+                "",
+                f"{format_seconds(batch / 10_000)}/code",
+            ),
+            ("apply, 1 code x 20 fares", format_seconds(apply_one), "", ""),
+            (
+                "apply, 10k codes x 20 fares",
+                format_seconds(apply_batch),
+                "",
+                f"{200_000 / apply_batch:,.0f} fares/s",
+            ),
+        ],
+    )
+
+    # Concurrent redemption never oversells.
+    engine.issue("LIMITED-1000", 2, uses=1_000)
+    redeemed = []
+
+    def redeem_many() -> None:
+        count = 0
+        for _ in range(400):
+            count += engine.redeem("limited 1000", 40.0).valid
+        redeemed.append(count)
+
+    threads = [threading.Thread(target=redeem_many) for _ in range(8)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert sum(redeemed) == 1_000 and engine.get("LIMITED1000")["usesLeft"] == 0
+    print(
+        f"\n8 threads x 400 redemptions of a 1,000-use code: {sum(redeemed):,} succeeded, "
+        f"{3_200 / elapsed:,.0f} redemptions/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
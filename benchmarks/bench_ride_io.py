@@ -0,0 +1,151 @@
+"""
+Streaming NDJSON ride import/export: throughput and peak RSS.
+
+Each phase runs in a fresh worker process so its peak resident set size is
+measured on its own.  Rides are generated lazily, written, then read back and
+validated; the same phases at 500k and 5M rows show that memory stays flat
+as the file grows.  A small round trip through ``RideStore`` checks that
+import and export preserve every record.
+
+    python -m benchmarks.bench_ride_io [--rows 5000000] [--dir /tmp]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import numpy as np
+
+from benchmarks.common import print_table
+from ridehub.ride_io import export_rides, import_rides, read_rides, write_rides
+from ridehub.ride_store import RideStore
+
+STATUSES = ["paid", "paid", "paid", "pending", "failed", "refunded"]
+STREETS = ["Broadway", "5th Ave", "Madison Ave", "Park Ave", "Lexington Ave", "Canal St"]
+NAMES = ["James", "Sarah", "Mike", "Zoë", "Łukasz", "Ana", "Kenji", "Priya"]
+BLOCK = 10_000
+
+
+def generate_rides(count: int, seed: int = 10) -> Iterator[dict]:
+    """Yield ``count`` synthetic rides without ever holding more than a block."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    elapsed = 0
+    for base in range(0, count, BLOCK):
+        n = min(BLOCK, count - base)
+        steps = np.cumsum(rng.integers(1, 30_000_000, n)).tolist()
+        coords = (40.7 + rng.random((n, 4)) * 0.1).round(6).tolist()
+        minutes = rng.integers(5, 60, n).tolist()
+        drivers = rng.integers(1, 5_001, n).tolist()
+        users = rng.integers(0, 200_000, n).tolist()
+        statuses = rng.integers(0, len(STATUSES), n).tolist()
+        for j in range(n):
+            i = base + j
+            ride = {
+                "id": str(i),
+                "origin_address": f"{i % 900 + 1} {STREETS[i % 6]}, New York, NY",
+                "destination_address": f"{i % 700 + 1} {STREETS[(i + 3) % 6]}, New York, NY",
+                "origin_latitude": coords[j][0],
+                "origin_longitude": -coords[j][1],
+                "destination_latitude": coords[j][2],
+                "destination_longitude": -coords[j][3],
+                "ride_time": minutes[j],
+                "fare_price": minutes[j] * 0.5,
+                "payment_status": STATUSES[statuses[j]],
+                "driver_id": drivers[j],
+                "user_id": f"user{users[j]}",
+                "created_at": (start + timedelta(microseconds=elapsed + steps[j])).isoformat(),
+            }
+            if i % 10:
+                ride["driver"] = {
+                    "first_name": NAMES[drivers[j] % 8],
+                    "last_name": str(drivers[j]),
+                    "car_seats": 4,
+                }
+            yield ride
+        elapsed += steps[-1]
+
+
+def _peak_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _phase(name: str, path: str, rows: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    if name == "idle":
+        pass
+    elif name == "write":
+        assert write_rides(path, generate_rides(rows)) == rows
+    elif name == "read":
+        assert sum(len(chunk) for chunk in read_rides(path)) == rows
+    else:
+        raise ValueError(name)
+    return time.perf_counter() - start, _peak_mib()
+
+
+def run_phase(name: str, path: str = "", rows: int = 0) -> tuple[float, float]:
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(_phase, name, path, rows).result()
+
+
+def round_trip(directory: str) -> None:
+    rows = 20_000
+    source = os.path.join(directory, "source.ndjson.gz")
+    target = os.path.join(directory, "export.ndjson")
+    write_rides(source, generate_rides(rows, seed=3))
+    store = RideStore()
+    stats = import_rides(store, source, chunk_size=3_000)
+    assert stats.rows == rows and stats.skipped == 0 and len(store) == rows
+    assert export_rides(store, target) == rows
+    for original, chunk in zip(generate_rides(rows, seed=3), (r for c in read_rides(target) for r in c)):
+        assert original == chunk, original["id"]
+    os.remove(source)
+    os.remove(target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--dir", default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    round_trip(args.dir)
+    print("RideStore import/export round trip: ok\n")
+
+    _, idle = run_phase("idle")
+    table = []
+    for rows in sorted({min(500_000, args.rows), args.rows}):
+        for suffix in (".ndjson", ".ndjson.gz"):
+            path = os.path.join(args.dir, f"bench_rides_{rows}{suffix}")
+            try:
+                for phase in ("write", "read"):
+                    elapsed, peak = run_phase(phase, path, rows)
+                    table.append(
+                        (
+                            f"{rows:,}",
+                            suffix,
+                            phase,
+                            f"{os.path.getsize(path) / 2**20:,.0f} MiB",
+                            f"{elapsed:.1f} s",
+                            f"{rows / elapsed:,.0f}",
+                            f"{peak:,.0f} MiB",
+                        )
+                    )
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+    print(f"worker baseline RSS (imports only): {idle:,.0f} MiB")
+    print_table(("rows", "format", "phase", "file", "time", "rows/s", "peak RSS"), table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Indexed ride history vs. sort-and-filter per request at 1M rides.
+
+The baseline mirrors ``sortRides`` plus the ``rides.tsx`` tab filter: parse
+``created_at`` for every ride, sort the whole list newest first, then filter
+and take the first page.  :class:`RideStore` parses each timestamp once at
+insert and answers from its posting lists.  Every query is checked against
+the baseline, and one user's full history is walked page by page through
+cursors to make sure pagination neither skips nor repeats rides.
+
+    python -m benchmarks.bench_ride_store
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from functools import cmp_to_key
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub.ride_store import RideStore, timestamp_key
+
+RIDES = 1_000_000
+USERS = 50_000
+DRIVERS = 5_000
+PAGE = 20
+STATUSES = ["paid", "paid", "paid", "paid", "pending", "failed", "refunded"]
+STREETS = ["Broadway", "5th Ave", "Madison Ave", "Park Ave", "Lexington Ave", "Canal St"]
+
+
+def make_rides(rng: np.random.Generator) -> list[dict]:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Strictly increasing timestamps, with 1% of rides arriving up to 30 min late.
+    offsets = np.cumsum(rng.integers(1, 60_000_000, RIDES))
+    delay = np.where(rng.random(RIDES) < 0.01, rng.integers(0, 1_800_000_000, RIDES), 0)
+    order = np.argsort(offsets + delay, kind="stable")
+    users = rng.integers(0, USERS, RIDES)
+    drivers = rng.integers(1, DRIVERS + 1, RIDES)
+    statuses = rng.integers(0, len(STATUSES), RIDES)
+    coords = (40.7 + rng.random((RIDES, 4)) * 0.1).tolist()
+    minutes = rng.integers(5, 60, RIDES)
+    driver_records = {
+        d: {"first_name": "Driver", "last_name": str(d), "car_seats": 4} for d in range(1, DRIVERS + 1)
+    }
+    rides = []
+    for i in order.tolist():
+        moment = start + timedelta(microseconds=int(offsets[i]))
+        rides.append(
+            {
+                "id": str(i),
+                "origin_address": f"{i % 900 + 1} {STREETS[i % len(STREETS)]}, New York, NY",
+                "destination_address": f"{i % 700 + 1} {STREETS[(i + 3) % len(STREETS)]}, New York, NY",
+                "origin_latitude": coords[i][0],
+                "origin_longitude": -coords[i][1],
+                "destination_latitude": coords[i][2],
+                "destination_longitude": -coords[i][3],
+                "ride_time": float(minutes[i]),
+                "fare_price": round(float(minutes[i]) * 0.5, 2),
+                "payment_status": STATUSES[statuses[i]],
+                "driver_id": int(drivers[i]),
+                "user_id": f"user{users[i]}",
+                "created_at": moment.isoformat().replace("+00:00", "Z"),
+                "driver": driver_records[int(drivers[i])],
+            }
+        )
+    return rides
+
+
+def baseline(rides: list[dict], predicate, limit: int = PAGE) -> list[dict]:
+    ordered = sorted(rides, key=lambda r: datetime.fromisoformat(r["created_at"]), reverse=True)
+    return [r for r in ordered if predicate(r)][:limit]
+
+
+def main() -> None:
+    rng = np.random.default_rng(9)
+    rides = make_rides(rng)
+
+    store = RideStore()
+    start = time.perf_counter()
+    store.extend(rides)
+    build = time.perf_counter() - start
+    print(f"{RIDES:,} rides loaded in {build:.2f} s ({RIDES / build:,.0f} rides/s)\n")
+
+    user = rides[len(rides) // 2]["user_id"]
+    driver = rides[len(rides) // 3]["driver_id"]
+    unpaid = set(STATUSES) - {"paid"}
+    queries = {
+        "recent (all)": ({}, lambda r: True),
+        "user, all": ({"user_id": user}, lambda r: r["user_id"] == user),
+        "user, completed": (
+            {"user_id": user, "payment_status": "paid"},
+            lambda r: r["user_id"] == user and r["payment_status"] == "paid",
+        ),
+        "user, cancelled": (
+            {"user_id": user, "payment_status": unpaid},
+            lambda r: r["user_id"] == user and r["payment_status"] != "paid",
+        ),
+        "driver, all": ({"driver_id": driver}, lambda r: r["driver_id"] == driver),
+        "status refunded": (
+            {"payment_status": "refunded"},
+            lambda r: r["payment_status"] == "refunded",
+        ),
+    }
+
+    rows = []
+    for name, (filters, predicate) in queries.items():
+        expected = [r["id"] for r in baseline(rides, predicate)]
+        got = [r["id"] for r in store.query(**filters, limit=PAGE).rides]
+        assert got == expected, name
+        before = best_of(lambda: baseline(rides, predicate), repeat=1)
+        after = best_of(lambda: store.query(**filters, limit=PAGE), repeat=50)
+        rows.append((name, format_seconds(before), format_seconds(after), f"{before / after:,.0f}x"))
+    print_table(("query (first page)", "sort+filter", "RideStore", "speedup"), rows)
+
+    # Walk one user's entire history through cursors.
+    history = [r["id"] for r in baseline(rides, lambda r: r["user_id"] == user, limit=RIDES)]
+    walked, cursor = [], None
+    while True:
+        page = store.query(user_id=user, limit=7, cursor=cursor)
+        walked.extend(r["id"] for r in page.rides)
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert walked == history
+    print(f"\nCursor walk of {user}: {len(walked)} rides, matches full sort")
+
+    # What sortRides does today: two parses inside every comparison.
+    sample = rides[:10_000]
+
+    def compare(a: dict, b: dict) -> int:
+        return timestamp_key(b["created_at"]) - timestamp_key(a["created_at"])
+
+    per_comparison = best_of(lambda: sorted(sample, key=cmp_to_key(compare)), repeat=3)
+    parsed_once = best_of(
+        lambda: sorted(sample, key=lambda r: timestamp_key(r["created_at"]), reverse=True), repeat=3
+    )
+    print(
+        f"10k-ride sort: parse per comparison {format_seconds(per_comparison)}, "
+        f"parse once {format_seconds(parsed_once)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Route cache hit rate and latency against a local Directions stand-in.
+
+The workload replays confirm-ride opens: riders cluster around a handful of
+pickup hotspots (a few metres of GPS jitter each) heading to popular
+destinations, and many reopen the screen.  Every uncached lookup is a real
+HTTP round-trip to ``DirectionsStandIn``.
+
+    python -m benchmarks.bench_route_cache
+"""
+
+from __future__ import annotations
+
+import time
+from functools import partial
+
+import numpy as np
+
+from benchmarks.common import format_seconds, print_table
+from ridehub.directions import fetch_duration
+from ridehub.route_cache import RouteCache
+from ridehub.standins import DirectionsStandIn
+
+LATENCY = 0.005
+LOOKUPS = 1_500
+HOTSPOTS = np.array([(40.7506, -73.9935), (40.6413, -73.7781), (40.7527, -73.9772), (40.7061, -74.0087)])
+DESTINATIONS = np.array([(40.7580, -73.9855), (40.7128, -74.0060), (40.7484, -73.9857)])
+
+
+def workload(rng: np.random.Generator) -> list[tuple[float, float, float, float]]:
+    trips = []
+    for _ in range(LOOKUPS):
+        origin = HOTSPOTS[rng.integers(len(HOTSPOTS))] + rng.normal(0, 0.0001, 2)  # ~10 m jitter
+        destination = DESTINATIONS[rng.integers(len(DESTINATIONS))] + rng.normal(0, 0.0001, 2)
+        trips.append((*origin.tolist(), *destination.tolist()))
+    return trips
+
+
+def replay(trips, leg) -> tuple[float, list[float]]:
+    start = time.perf_counter()
+    durations = [leg(*trip) for trip in trips]
+    return time.perf_counter() - start, durations
+
+
+def main() -> None:
+    trips = workload(np.random.default_rng(5))
+    rows = []
+    with DirectionsStandIn(latency=LATENCY).running() as server:
+        fetch = partial(fetch_duration, base_url=server.url)
+
+        elapsed, exact = replay(trips, fetch)
+        rows.append(("none", "-", server.requests, "-", format_seconds(elapsed / LOOKUPS), "-"))
+
+        for grid_deg, max_entries in ((0.0005, 100_000), (0.001, 100_000), (0.0005, 8)):
+            cache = RouteCache(grid_deg=grid_deg, max_entries=max_entries)
+            before = server.requests
+            elapsed, cached = replay(trips, cache.wrap(fetch))
+            error = np.abs(np.array(cached) - np.array(exact)).max()
+            rows.append(
+                (
+                    f"{grid_deg} deg / {max_entries:,}",
+                    f"{cache.stats.hit_rate:.1%}",
+                    server.requests - before,
+                    cache.stats.evictions,
+                    format_seconds(elapsed / LOOKUPS),
+                    f"{error:.0f} s",
+                )
+            )
+
+    print(f"{LOOKUPS:,} leg lookups, {LATENCY * 1000:.0f} ms stand-in latency")
+    print_table(("cache", "hit rate", "HTTP calls", "evictions", "per lookup", "max error"), rows)
+
+    clock = [0.0]
+    cache = RouteCache(ttl=60.0, clock=lambda: clock[0])
+    cache.put(*trips[0], 120.0)
+    clock[0] = 59.0
+    assert cache.get(*trips[0]) == 120.0
+    clock[0] = 61.0
+    assert cache.get(*trips[0]) is None and cache.stats.expirations == 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Sharded dispatch: matching throughput against worker count.
+
+30k drivers are spread over New York, denser towards Midtown, and stored in a
+``SharedDriverTable`` of 4x4-geocell shards.  Each tick brings 2,000 ride
+requests.  Between ticks a tenth of the drivers move, some across shard
+borders, and drivers matched three ticks earlier become free again.  Worker
+count runs from 1 to the number of cores.  ``workers=0`` is the same matcher
+inline in the coordinator, and one worker must reproduce it exactly.
+
+    python -m benchmarks.bench_shards [--workers 1 2 4] [--ticks 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.common import format_seconds, percentile, print_table
+from ridehub.shards import DispatchRuntime, ShardGrid, TickResult
+
+BOUNDS = (40.49, -74.26, 40.92, -73.69)
+CENTER = (40.754, -73.984)
+DRIVERS = 30_000
+REQUESTS = 2_000
+
+
+def points(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray]:
+    south, west, north, east = BOUNDS
+    central = rng.random(n) < 0.6
+    lat = np.where(
+        central, rng.normal(CENTER[0], 0.05, n), rng.uniform(south + 0.05, north - 0.05, n)
+    )
+    lng = np.where(
+        central, rng.normal(CENTER[1], 0.05, n), rng.uniform(west + 0.05, east - 0.05, n)
+    )
+    return np.clip(lat, south, north), np.clip(lng, west, east)
+
+
+def run(workers: int, ticks: int) -> tuple[list[float], list[TickResult], int, ShardGrid]:
+    """Tick latencies, tick results and how many matches crossed a shard border."""
+    rng = np.random.default_rng(16)
+    grid = ShardGrid(*BOUNDS, shard_cells=4)
+    lat, lng = points(rng, DRIVERS)
+    samples, results = [], []
+    cross = 0
+    busy: list[np.ndarray] = []
+    with DispatchRuntime(grid, workers=workers, capacity=8_192) as runtime:
+        runtime.update(np.arange(DRIVERS), lat, lng)
+        for tick in range(ticks):
+            moving = rng.choice(DRIVERS, DRIVERS // 10, replace=False)
+            lat[moving] += rng.normal(0, 0.003, len(moving))
+            lng[moving] += rng.normal(0, 0.003, len(moving))
+            runtime.update(moving, lat[moving], lng[moving])
+            if len(busy) == 3:
+                runtime.release(busy.pop(0))
+
+            plat, plng = points(rng, REQUESTS)
+            riders = list(range(tick * REQUESTS, (tick + 1) * REQUESTS))
+            start = time.perf_counter()
+            result = runtime.tick(riders, np.column_stack((plat, plng)))
+            samples.append(time.perf_counter() - start)
+
+            drivers = np.fromiter(result.matches.values(), dtype=np.int64)
+            rows = np.fromiter(result.matches, dtype=np.int64) - tick * REQUESTS
+            assert len(np.unique(drivers)) == len(drivers)
+            assert not busy or not np.isin(drivers, np.concatenate(busy)).any()
+            assert max(result.pickup_seconds.values(), default=0) <= 600
+            home = grid.shard_of(plat[rows], plng[rows])
+            cross += int((grid.shard_of(lat[drivers], lng[drivers]) != home).sum())
+            busy.append(drivers)
+            results.append(result)
+    return samples, results, cross, grid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    cores = os.cpu_count() or 1
+    parser.add_argument("--workers", type=int, nargs="+", default=list(range(1, cores + 1)))
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    baseline_samples, baseline, baseline_cross, grid = run(0, args.ticks)
+    rows = []
+    for workers in [0, *args.workers]:
+        if workers == 0:
+            samples, results, cross = baseline_samples, baseline, baseline_cross
+        else:
+            samples, results, cross, _ = run(workers, args.ticks)
+        if workers == 1:
+            assert [r.matches for r in results] == [r.matches for r in baseline]
+        matched = sum(len(r.matches) for r in results)
+        rows.append(
+            (
+                "inline" if workers == 0 else workers,
+                f"{matched / sum(samples):,.0f}/s",
+                format_seconds(percentile(samples, 50)),
+                format_seconds(percentile(samples, 99)),
+                f"{matched / (len(results) * REQUESTS):.1%}",
+                f"{cross / matched:.1%}",
+                sum(r.conflicts for r in results),
+                sum(r.reruns for r in results),
+            )
+        )
+
+    print(
+        f"{DRIVERS:,} drivers in {len(grid)} shards, {REQUESTS:,} requests per tick, "
+        f"{args.ticks} ticks, {cores} core(s)"
+    )
+    headers = ("workers", "matched", "tick p50", "tick p99", "served", "cross-shard", "conflicts")
+    print_table((*headers, "re-runs"), rows)
+
+
+if __name__ == "__main__":
+    main()
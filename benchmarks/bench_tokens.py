@@ -0,0 +1,158 @@
+"""
+Design-token builds: cold, no-op, one-section edits and watch latency.
+
+The manifest and the three targets are copied into a scratch directory and
+compiled there.  Each scenario reports its median build time and which files
+were rewritten.  No-op builds must not touch any file, and an edit must
+rewrite only the files that render the edited section.  Watch latency runs
+from saving the manifest to the rewritten target landing on disk, with
+``TokenCompiler.watch`` polling every ``--interval`` seconds.
+
+    python -m benchmarks.bench_tokens [--rounds 200] [--interval 0.01]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.common import format_seconds, print_table
+from ridehub.tokens import MANIFEST, TokenCompiler
+
+SPACING = '"5xl": "48px"'
+PRIMARY = '"500": "#0EA5E9"'
+
+
+def mtimes(compiler: TokenCompiler) -> dict[str, int]:
+    return {t: os.stat(os.path.join(compiler.root, t)).st_mtime_ns for t in compiler.targets}
+
+
+def flip(path: str, a: str, b: str) -> None:
+    """Replace ``a`` with ``b`` in the file, or ``b`` with ``a`` if it was flipped already."""
+    with open(path, encoding="utf-8") as handle:
+        text = handle.read()
+    old, new = (a, b) if a in text else (b, a)
+    assert old in text, old
+    # Written aside and renamed, as editors save, so the watcher never sees half a file.
+    with open(path + ".new", "w", encoding="utf-8") as handle:
+        handle.write(text.replace(old, new, 1))
+    os.replace(path + ".new", path)
+
+
+def timed_builds(compiler: TokenCompiler, rounds: int, before=None, **kwargs):
+    samples, written = [], set()
+    for i in range(rounds):
+        if before:
+            before(i)
+        start = time.perf_counter()
+        result = compiler.build(**kwargs)
+        samples.append(time.perf_counter() - start)
+        written.update(result.written)
+    return statistics.median(samples), written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for name in (MANIFEST, *TokenCompiler().targets):
+            os.makedirs(os.path.join(root, os.path.dirname(name)), exist_ok=True)
+            shutil.copyfile(name, os.path.join(root, name))
+        manifest = os.path.join(root, MANIFEST)
+        rows = []
+
+        def stale(_):
+            # Forget every digest, as before the first build of a new checkout.
+            for target in TokenCompiler().targets:
+                path = os.path.join(root, target)
+                with open(path, encoding="utf-8") as handle:
+                    text = re.sub(r"(// @generated tokens:\S+) \S+", r"\1 -", handle.read())
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(text)
+
+        cold = []
+        for i in range(args.rounds // 10):
+            stale(i)
+            start = time.perf_counter()
+            written = set(TokenCompiler(root).build().written)
+            cold.append(time.perf_counter() - start)
+        rows.append(("cold, every block stale", statistics.median(cold), written))
+
+        first = []
+        for _ in range(args.rounds // 10):
+            start = time.perf_counter()
+            compiler = TokenCompiler(root)
+            result = compiler.build()
+            first.append(time.perf_counter() - start)
+            assert not result.written
+        before = mtimes(compiler)
+        rows.append(("cold, already up to date", statistics.median(first), set()))
+
+        noop, written = timed_builds(compiler, args.rounds)
+        rows.append(("no-op rebuild", noop, written))
+        assert not written and mtimes(compiler) == before
+
+        touched, written = timed_builds(
+            compiler, args.rounds // 10, before=lambda _: os.utime(manifest)
+        )
+        rows.append(("manifest saved, tokens unchanged", touched, written))
+        assert not written and mtimes(compiler) == before
+
+        def toggle_spacing(_):
+            flip(manifest, SPACING, '"5xl": "56px"')
+
+        spacing, written = timed_builds(compiler, args.rounds // 10, before=toggle_spacing)
+        rows.append(("spacing_system edited", spacing, written))
+        assert "tailwind.config.js" not in written
+        assert mtimes(compiler)["tailwind.config.js"] == before["tailwind.config.js"]
+
+        def toggle_primary(_):
+            flip(manifest, PRIMARY, '"500": "#0286FF"')
+
+        primary, written = timed_builds(compiler, args.rounds // 10, before=toggle_primary)
+        rows.append(("color_palette edited", primary, written))
+        assert written == set(compiler.targets)
+        assert compiler.check() == []
+
+        stop = threading.Event()
+        watcher = threading.Thread(
+            target=compiler.watch, kwargs={"interval": args.interval, "stop": stop}
+        )
+        watcher.start()
+        latencies = []
+        theme = os.path.join(root, "lib/theme.ts")
+        try:
+            for i in range(20):
+                previous = os.stat(theme).st_mtime_ns
+                start = time.perf_counter()
+                toggle_spacing(i)
+                while os.stat(theme).st_mtime_ns == previous:
+                    time.sleep(0.0005)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            stop.set()
+            watcher.join()
+
+    print(f"Token builds over {MANIFEST} and {len(compiler.targets)} targets (median)")
+    print_table(
+        ("scenario", "build", "rewritten"),
+        [(name, format_seconds(t), ", ".join(sorted(w)) or "-") for name, t, w in rows],
+    )
+    print(
+        f"\nwatch ({format_seconds(args.interval)} poll): save -> theme.ts rewritten "
+        f"median {format_seconds(statistics.median(latencies))}, "
+        f"max {format_seconds(max(latencies))}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Visual regression: the whole component matrix, hashed, decoded and diffed.
+
+There are no device screenshots in the tree, so the benchmark renders one
+per case of :func:`ridehub.visual.variant_matrix`.  Each is 390 points wide
+at 3x, with the variant's fill from the manifest's ``color_palette``, a
+label bar and an icon.  Edges are anti-aliased from a signed distance field,
+as a rasteriser would draw them.  The current set is the baseline with the
+changes a real run sees:
+
+* most files byte-identical;
+* a few re-encoded with the same pixels;
+* a few re-rendered a quarter pixel to the right, which changes only
+  edges.  These must pass within a 0.1% tolerance.  Most edge pixels are
+  discounted as anti-aliasing, but a crisp edge that turns soft is a
+  difference to pixelmatch too;
+* two real changes (the danger buttons' red, the card empty state's label
+  moved), one resized header, one screenshot missing and one with no
+  baseline yet.
+
+The verdicts are asserted.  A shifted badge and a recoloured button are
+also checked against a scalar port of pixelmatch over a crop, and every
+pixel's classification must match.  That port's rate, extrapolated to the
+matrix, is the "per-pixel loop" row.  Two unchanged sets show what the hash
+skip saves: one is a copy of the baseline, and in the other every file is
+re-encoded, so every pair is decoded.
+
+    python -m benchmarks.bench_visual [--repeat 3] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub import png
+from ridehub.manifest import Manifest
+from ridehub.visual import DEFAULT_THRESHOLD, MAX_YIQ_DELTA, VisualDiff, compare, variant_matrix
+
+WIDTH = 1170
+HEIGHTS = {"sm": 120, "md": 144, "lg": 168}
+BADGE_WIDTHS = {"sm": 210, "md": 270, "lg": 330}
+COMPONENT_HEIGHTS = {
+    "ProfessionalHeader": 330,
+    "ProfessionalFooter": 250,
+    "ProfessionalCard": 540,
+    "LoadingSpinner": 240,
+    "EmptyState": 900,
+    "InputField": 168,
+}
+FILLS = {
+    "primary": "primary.500",
+    "secondary": "neutral.600",
+    "danger": "status.danger",
+    "success": "status.success",
+    "warning": "status.warning",
+    "info": "status.info",
+    "error": "status.error",
+    "premium": "primary.900",
+    "dark": "neutral.900",
+    "light": "neutral.50",
+    "elevated": "neutral.0",
+    "focused": "primary.50",
+    "disabled": "neutral.200",
+}
+OUTLINED = (
+    "outline", "ghost", "default", "elevated", "minimal", "card", "focused", "error", "success"
+)
+REENCODED = ("ProfessionalCard/default", "CustomButton/primary-md", "InputField/disabled")
+SHIFTED = ("ProfessionalHeader/gradient", "CustomButton/outline-lg", "ProfessionalBadge/info-md")
+CHANGED = ("CustomButton/danger-sm", "CustomButton/danger-md", "CustomButton/danger-lg")
+MOVED = "EmptyState/card"
+RESIZED = "ProfessionalHeader/light"
+MISSING = "LoadingSpinner/default"
+UNBASELINED = "ProfessionalFooter/default"
+TOLERANCE = 0.001
+
+
+def colour(hex_code: str) -> np.ndarray:
+    return np.array([int(hex_code[i : i + 2], 16) for i in (1, 3, 5)], np.float64)
+
+
+def rounded_box(x, y, left, top, right, bottom, radius):
+    """Signed distance to a rounded rectangle (negative inside)."""
+    cx, cy = (left + right) / 2, (top + bottom) / 2
+    hx, hy = (right - left) / 2 - radius, (bottom - top) / 2 - radius
+    qx, qy = np.abs(x - cx) - hx, np.abs(y - cy) - hy
+    outside = np.hypot(np.maximum(qx, 0), np.maximum(qy, 0))
+    return outside + np.minimum(np.maximum(qx, qy), 0) - radius
+
+
+def paint(canvas, distance, rgb) -> None:
+    cover = np.clip(0.5 - distance, 0, 1)[..., None]
+    canvas[...] = canvas * (1 - cover) + rgb * cover
+
+
+def render(case, manifest: Manifest, shift: float = 0.0, overrides=None) -> np.ndarray:
+    """One screenshot: container, label bar and icon, anti-aliased edges."""
+    overrides = overrides or {}
+    values = dict(case.axes)
+    variant = values.get("variant") or values.get("state") or "default"
+    size = values.get("size", "md")
+    height = COMPONENT_HEIGHTS.get(case.component, HEIGHTS[size])
+    width = BADGE_WIDTHS[size] if case.component == "ProfessionalBadge" else WIDTH
+    seed = zlib.crc32(case.name.encode())
+    y, x = np.mgrid[0:height, 0:width].astype(np.float64)
+    x -= shift
+    canvas = np.empty((height, width, 3))
+
+    def palette(key: str) -> np.ndarray:
+        return colour(manifest.get("color_palette." + key))
+
+    canvas[...] = palette("semantic.background")
+    fill = palette(overrides.get("fill", FILLS.get(variant, "primary.600")))
+    box = rounded_box(x, y, 12, 12, width - 12, height - 12, min(36, height / 4))
+    if variant == "gradient":
+        ramp = (x / width)[..., None]
+        start, end = palette("primary.500"), palette("primary.800")
+        cover = np.clip(0.5 - box, 0, 1)[..., None]
+        canvas[...] = canvas * (1 - cover) + (start * (1 - ramp) + end * ramp) * cover
+    elif variant in OUTLINED:
+        paint(canvas, np.abs(box) - 3, palette("semantic.border"))
+    else:
+        paint(canvas, box, fill)
+    ink = palette("text.primary" if variant in OUTLINED else "neutral.0")
+    label_top = height / 2 - height / 8 + overrides.get("label_dy", 0)
+    label_left = 60 + seed % 40
+    label = rounded_box(x, y, label_left + 90, label_top, width * 0.6, label_top + height / 4, 8)
+    paint(canvas, label, ink)
+    icon = np.hypot(x - label_left - 30, y - height / 2) - height / 7
+    paint(canvas, icon, ink if variant in OUTLINED else fill * 0.6 + 255 * 0.4)
+    out = np.empty((height, width, 4), np.uint8)
+    out[..., :3] = np.clip(np.rint(canvas), 0, 255)
+    out[..., 3] = 255
+    return out
+
+
+def _delta(p, q, y_only=False) -> float:
+    r1, g1, b1, a1 = p
+    r2, g2, b2, a2 = q
+    if a1 < 255:
+        a1 /= 255
+        r1, g1, b1 = (255 + (c - 255) * a1 for c in (r1, g1, b1))
+    if a2 < 255:
+        a2 /= 255
+        r2, g2, b2 = (255 + (c - 255) * a2 for c in (r2, g2, b2))
+    y = (r1 * 0.29889531 + g1 * 0.58662247 + b1 * 0.11448223) - (
+        r2 * 0.29889531 + g2 * 0.58662247 + b2 * 0.11448223
+    )
+    if y_only:
+        return y
+    i = (r1 * 0.59597799 - g1 * 0.27417610 - b1 * 0.32180189) - (
+        r2 * 0.59597799 - g2 * 0.27417610 - b2 * 0.32180189
+    )
+    q = (r1 * 0.21147017 - g1 * 0.52261711 + b1 * 0.31114694) - (
+        r2 * 0.21147017 - g2 * 0.52261711 + b2 * 0.31114694
+    )
+    return 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+
+
+def _window(x1, y1, width, height):
+    x0, y0 = max(x1 - 1, 0), max(y1 - 1, 0)
+    x2, y2 = min(x1 + 1, width - 1), min(y1 + 1, height - 1)
+    edge = x1 in (x0, x2) or y1 in (y0, y2)
+    cells = [(x, y) for x in range(x0, x2 + 1) for y in range(y0, y2 + 1)]
+    return int(edge), [cell for cell in cells if cell != (x1, y1)]
+
+
+def _many_siblings(img, x1, y1, width, height) -> bool:
+    zeroes, cells = _window(x1, y1, width, height)
+    for x, y in cells:
+        if img[y][x] == img[y1][x1]:
+            zeroes += 1
+            if zeroes > 2:
+                return True
+    return False
+
+
+def _antialiased(img, x1, y1, width, height, other) -> bool:
+    zeroes, cells = _window(x1, y1, width, height)
+    low = high = 0
+    for x, y in cells:
+        delta = _delta(img[y1][x1], img[y][x], True)
+        if delta == 0:
+            zeroes += 1
+            if zeroes > 2:
+                return False
+        elif delta < low:
+            low, low_at = delta, (x, y)
+        elif delta > high:
+            high, high_at = delta, (x, y)
+    if low == 0 or high == 0:
+        return False
+    return any(
+        _many_siblings(img, *at, width, height) and _many_siblings(other, *at, width, height)
+        for at in (low_at, high_at)
+    )
+
+
+def reference(a: np.ndarray, b: np.ndarray, threshold: float = DEFAULT_THRESHOLD):
+    """pixelmatch's own loop: the (y, x) of differing and of anti-aliased pixels."""
+    height, width = a.shape[:2]
+    img, other = a.tolist(), b.tolist()
+    limit = MAX_YIQ_DELTA * threshold * threshold
+    diff, antialiased = set(), set()
+    for y in range(height):
+        for x in range(width):
+            if img[y][x] == other[y][x] or _delta(img[y][x], other[y][x]) <= limit:
+                continue
+            if _antialiased(img, x, y, width, height, other) or _antialiased(
+                other, x, y, width, height, img
+            ):
+                antialiased.add((y, x))
+            else:
+                diff.add((y, x))
+    return diff, antialiased
+
+
+def write(directory: str, case, data: bytes) -> None:
+    path = os.path.join(directory, case.path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def build(manifest, cases, baseline: str, current: str, recoded: str) -> dict:
+    """Write the three screenshot sets; the baseline pixels of the cases that change."""
+    kept = {}
+    for case in cases:
+        image = render(case, manifest)
+        data = png.encode(image)
+        if case.name != UNBASELINED:
+            write(baseline, case, data)
+        if case.name == MISSING:
+            continue
+        write(recoded, case, png.encode(image, level=1))
+        if case.name in REENCODED:
+            changed = png.encode(image, level=1)
+            assert changed != data, case.name
+        elif case.name in SHIFTED:
+            changed = png.encode(render(case, manifest, shift=0.25))
+        elif case.name in CHANGED:
+            changed = png.encode(render(case, manifest, overrides={"fill": "status.error"}))
+        elif case.name == MOVED:
+            changed = png.encode(render(case, manifest, overrides={"label_dy": 12}))
+        elif case.name == RESIZED:
+            changed = png.encode(np.concatenate((image, image[-6:])))
+        else:
+            changed = data
+        if changed != data:
+            kept[case.name] = image
+        write(current, case, changed)
+    return kept
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    manifest = Manifest()
+    cases = variant_matrix(manifest)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        baseline, current, recoded, copied, out = (
+            os.path.join(scratch, name)
+            for name in ("baseline", "current", "recoded", "copied", "out")
+        )
+        kept = build(manifest, cases, baseline, current, recoded)
+        shutil.copytree(baseline, copied)
+
+        def run(directory: str):
+            shutil.rmtree(out, ignore_errors=True)
+            return VisualDiff(
+                baseline,
+                directory,
+                out_dir=out,
+                cases=cases,
+                max_diff_ratio=TOLERANCE,
+                workers=args.workers,
+            ).run()
+
+        report = run(current)
+        results = {result.case: result for result in report.cases}
+        assert results[MISSING].status == "missing" and results[UNBASELINED].status == "new"
+        assert results[RESIZED].status == "resized"
+        for name in (*CHANGED, MOVED):
+            assert results[name].status == "failed", results[name]
+            assert os.path.exists(results[name].diff_image), name
+        for name in SHIFTED:
+            result = results[name]
+            assert result.status == "passed" and result.antialiased_pixels, result
+        changed = {*REENCODED, *SHIFTED, *CHANGED, MOVED, RESIZED, MISSING, UNBASELINED}
+        assert all(results[c.name].status == "identical" for c in cases if c.name not in changed)
+        assert report.hashed_identical == len(cases) - len(changed)
+        assert report.compared == len(changed) - 2 and not report.unlisted
+
+        checked, scalar = 0, 0.0
+        for name in (SHIFTED[2], CHANGED[0]):
+            case = next(c for c in cases if c.name == name)
+            with open(os.path.join(current, case.path), "rb") as handle:
+                image = png.decode(handle.read())
+            a, b = kept[name][:, :360], image[:, :360]
+            start = time.perf_counter()
+            diff, antialiased = reference(a, b)
+            scalar += time.perf_counter() - start
+            comparison = compare(a, b)
+            assert set(zip(*np.nonzero(comparison.diff))) == diff, name
+            assert set(zip(*np.nonzero(comparison.antialiased))) == antialiased, name
+            checked += a.shape[0] * a.shape[1]
+
+        same = run(copied)
+        assert same.compared == 0 and same.hashed_identical == len(cases) - 1
+        redecoded = run(recoded)
+        assert redecoded.compared == len(cases) - 2
+        unpaired = (MISSING, UNBASELINED)
+        assert all(r.status == "identical" for r in redecoded.cases if r.case not in unpaired)
+        timings = [best_of(lambda: run(d), repeat=args.repeat) for d in (copied, recoded, current)]
+        pixels = redecoded.pixels_compared
+
+    workers = args.workers or os.cpu_count() or 1
+    print(
+        f"{len(cases)} cases from the manifest, {pixels:,} pixels a set, {workers} worker(s), "
+        f"{TOLERANCE:.1%} tolerance; {checked:,} pixels match the scalar pixelmatch port"
+    )
+    diffed = [r for r in report.cases if r.status in ("passed", "failed")]
+    print_table(
+        ("case", "status", "differ", "anti-aliased", "max delta"),
+        [
+            (r.case, r.status, r.diff_pixels, r.antialiased_pixels, f"{r.max_delta:.3f}")
+            for r in diffed
+        ],
+    )
+    print(f"\nfailing: {', '.join(sorted(r.case for r in report.failed))}\n")
+    rows = [
+        ("unchanged, byte-identical", same),
+        ("unchanged, re-encoded", redecoded),
+        (f"{len(changed)} cases changed", report),
+    ]
+    table = [
+        (name, r.compared, f"{r.pixels_compared:,}", format_seconds(seconds))
+        for (name, r), seconds in zip(rows, timings)
+    ]
+    loop = format_seconds(scalar / checked * pixels)
+    table.append(("per-pixel loop (extrapolated)", len(cases) - 2, f"{pixels:,}", loop))
+    print_table(("current set", "pairs decoded", "pixels compared", "wall"), table)
+
+
+if __name__ == "__main__":
+    main()
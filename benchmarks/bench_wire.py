@@ -0,0 +1,133 @@
+"""
+Binary wire format vs. JSON for 10k markers (and rides).
+
+Round-trips are verified first, including missing optional fields, nested
+ride drivers and non-ASCII names; then encode/decode time and bytes per
+record are compared with ``json``.  ``open`` is the cost of wrapping a
+payload in ``WireReader`` (zero-copy) and reading two numeric columns.
+
+    python -m benchmarks.bench_wire
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from benchmarks.common import best_of, format_seconds, print_table
+from ridehub.wire import WireFormatError, WireReader, decode, encode
+
+RECORDS = 10_000
+FIRST_NAMES = ["James", "Sarah", "Mike", "Zoë", "Łukasz", "Ana", "Kenji", "Priya"]
+LAST_NAMES = ["Wilson", "Johnson", "Taylor", "García", "Nowak", "Sato", "Patel"]
+CAR_MODELS = ["Toyota Camry", "Honda Accord", "Tesla Model 3"]
+
+
+def make_markers(rng: np.random.Generator) -> list[dict]:
+    markers = []
+    for i in range(RECORDS):
+        first, last = FIRST_NAMES[i % len(FIRST_NAMES)], LAST_NAMES[i % len(LAST_NAMES)]
+        marker = {
+            "latitude": 40.7128 + float(rng.normal(0, 0.01)),
+            "longitude": -74.0060 + float(rng.normal(0, 0.01)),
+            "id": i,
+            "title": f"{first} {last}",
+            "profile_image_url": f"https://i.pravatar.cc/150?img={i % 70}",
+            "car_image_url": "https://via.placeholder.com/150?text=Camry",
+            "car_seats": 4 + i % 3,
+            "rating": round(4 + float(rng.uniform(0, 1)), 1),
+            "first_name": first,
+            "last_name": last,
+            # generateMarkersFromData spreads the whole Driver into the marker
+            "email": f"{first.lower()}{i}@example.com",
+            "car_model": CAR_MODELS[i % len(CAR_MODELS)],
+            "car_year": 2018 + i % 6,
+            "car_color": "Silver",
+        }
+        if i % 2:
+            marker["time"] = float(rng.uniform(3, 40))
+            marker["price"] = f"{marker['time'] * 0.5:.2f}"
+        markers.append(marker)
+    return markers
+
+
+def make_rides(rng: np.random.Generator) -> list[dict]:
+    rides = []
+    for i in range(RECORDS):
+        ride = {
+            "id": str(i),
+            "origin_address": f"{i % 500} Main St, New York, NY",
+            "destination_address": "Times Square, New York, NY",
+            "origin_latitude": 40.7 + float(rng.uniform(0, 0.1)),
+            "origin_longitude": -74.0 + float(rng.uniform(0, 0.1)),
+            "destination_latitude": 40.758,
+            "destination_longitude": -73.9855,
+            "ride_time": float(rng.integers(5, 60)),
+            "fare_price": round(float(rng.uniform(5, 60)), 2),
+            "payment_status": "paid" if i % 5 else "pending",
+            "driver_id": i % 300,
+            "user_id": f"user{i % 1000}",
+            "created_at": f"2025-02-{1 + i % 28:02d}T10:{i % 60:02d}:00.000Z",
+        }
+        if i % 3 == 0:
+            ride["driver"] = {"first_name": "James", "last_name": "Wilson", "car_seats": 4}
+        rides.append(ride)
+    return rides
+
+
+def main() -> None:
+    rng = np.random.default_rng(8)
+    rows = []
+    for kind, records in (("markers", make_markers(rng)), ("rides", make_rides(rng))):
+        payload = encode(records, kind)
+        assert decode(payload) == records
+        reader = WireReader(payload)
+        assert reader.row(RECORDS - 1) == records[-1]
+        text = json.dumps(records).encode()
+
+        column = "latitude" if kind == "markers" else "origin_latitude"
+
+        def open_payload():
+            reader = WireReader(payload)
+            return reader.column(column)[0], reader.column(column)[-1]
+
+        rows.append(
+            (
+                kind,
+                f"{len(text) / RECORDS:.0f}",
+                f"{len(payload) / RECORDS:.0f}",
+                format_seconds(best_of(lambda: json.dumps(records).encode())),
+                format_seconds(best_of(lambda: encode(records, kind))),
+                format_seconds(best_of(lambda: json.loads(text))),
+                format_seconds(best_of(lambda: decode(payload))),
+                format_seconds(best_of(open_payload, number=100)),
+            )
+        )
+
+    for broken in (b"", b"XXXX" + bytes(20), encode([], "markers")[:4] + bytes([9]) + bytes(19)):
+        try:
+            WireReader(broken)
+        except WireFormatError:
+            pass
+        else:
+            raise AssertionError("corrupt payload accepted")
+
+    print(f"{RECORDS:,} records")
+    print_table(
+        (
+            "kind",
+            "JSON B/rec",
+            "wire B/rec",
+            "JSON enc",
+            "wire enc",
+            "JSON dec",
+            "wire dec",
+            "wire open",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Small timing helpers shared by the benchmark scripts.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from fractions import Fraction
+from typing import Callable, Sequence
+
+
+def best_of(fn: Callable[[], object], *, repeat: int = 5, number: int = 1) -> float:
+    """Best wall time in seconds for one call of ``fn`` over ``repeat`` rounds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``pct`` in 0..100).
+
+    The smallest sample with at least ``pct`` percent of the samples at or
+    below it, as ``np.percentile(..., method="inverted_cdf")`` in
+    ``ridehub.loadtest`` computes it.  The rank is worked out exactly, so
+    ``pct / 100 * n`` landing a hair above an integer cannot skip a sample.
+    """
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    rank = math.ceil(Fraction(str(pct)) * len(ordered) / 100)
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 0:
+        # A difference of two noisy timings can dip below zero.
+        return "-" + format_seconds(-seconds)
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:.0f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1.0:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[object]]) -> None:
+    cells = [[str(h) for h in headers]] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
@@ -96,39 +96,49 @@ export const onboarding = [
 ];
 
 // Professional Design System
+// @generated tokens:colors 93e193985c51bfd8 from IMPLEMENTATION_COMPLETE.py; do not edit
 export const colors = {
-  primary: "#000000", // Black - Uber style
-  secondary: "#F37254", // Coral - Accent color
-  tertiary: "#FCF3F1", // Light coral background
-  success: "#10B981", // Green
-  warning: "#F59E0B", // Amber
-  danger: "#EF4444", // Red
-  info: "#3B82F6", // Blue
+  primary: "#000000",
+  secondary: "#F37254",
+  tertiary: "#FCF3F1",
+  success: "#10B981",
+  warning: "#F59E0B",
+  danger: "#EF4444",
+  info: "#3B82F6",
   lightGray: "#F3F4F6",
   mediumGray: "#D1D5DB",
   darkGray: "#6B7280",
   white: "#FFFFFF",
   black: "#000000",
 };
+// @end tokens:colors
 
+// @generated tokens:shadows c855fcd3a100729a from IMPLEMENTATION_COMPLETE.py; do not edit
 export const shadows = {
   none: "0 0 0 rgba(0,0,0,0)",
   sm: "0 1px 2px rgba(0,0,0,0.05)",
-  base: "0 1px 3px rgba(0,0,0,0.1), 0 1px 2px rgba(0,0,0,0.06)",
-  md: "0 4px 6px rgba(0,0,0,0.1), 0 2px 4px rgba(0,0,0,0.06)",
-  lg: "0 10px 15px rgba(0,0,0,0.1), 0 4px 6px rgba(0,0,0,0.05)",
-  xl: "0 20px 25px rgba(0,0,0,0.1), 0 10px 10px rgba(0,0,0,0.04)",
+  md: "0 2px 4px rgba(0,0,0,0.1)",
+  lg: "0 4px 8px rgba(0,0,0,0.15)",
+  xl: "0 8px 16px rgba(0,0,0,0.2)",
+  "2xl": "0 12px 24px rgba(0,0,0,0.25)",
 };
+// @end tokens:shadows
 
+// @generated tokens:radius de44b0619e03ff84 from IMPLEMENTATION_COMPLETE.py; do not edit
 export const borderRadius = {
+  none: 0,
   xs: 4,
   sm: 8,
   md: 12,
   lg: 16,
   xl: 20,
+  "2xl": 24,
+  "3xl": 32,
   full: 9999,
 };
+// @end tokens:radius
 
+// @generated tokens:spacing a93cebe0d358ba6f from IMPLEMENTATION_COMPLETE.py; do not edit
 export const spacing = {
   xs: 4,
   sm: 8,
@@ -137,7 +147,10 @@ export const spacing = {
   xl: 20,
   "2xl": 24,
   "3xl": 32,
+  "4xl": 40,
+  "5xl": 48,
 };
+// @end tokens:spacing
 
 export const data = {
   onboarding,
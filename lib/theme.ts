@@ -7,18 +7,20 @@
 // COLOR PALETTE
 // =============================================================================
 
+// @generated tokens:colors 37b68ee8ca175c6a from IMPLEMENTATION_COMPLETE.py; do not edit
 export const Colors = {
-  // Primary Colors
   primary: {
     50: "#F0F9FF",
     100: "#E0F2FE",
+    200: "#BAE6FD",
+    300: "#7DD3FC",
+    400: "#38BDF8",
     500: "#0EA5E9",
     600: "#0284C7",
     700: "#0369A1",
+    800: "#075985",
     900: "#082F49",
   },
-
-  // Neutral Colors
   neutral: {
     0: "#FFFFFF",
     50: "#F9FAFB",
@@ -32,15 +34,11 @@ export const Colors = {
     800: "#1F2937",
     900: "#111827",
   },
-
-  // Status Colors
   success: "#10B981",
   warning: "#F59E0B",
   danger: "#EF4444",
   info: "#3B82F6",
   error: "#DC2626",
-
-  // Semantic Colors
   background: "#FFFFFF",
   surface: "#F9FAFB",
   border: "#E5E7EB",
@@ -50,14 +48,13 @@ export const Colors = {
     tertiary: "#9CA3AF",
     inverse: "#FFFFFF",
   },
-
-  // Brand Colors
   brand: {
     black: "#000000",
     coral: "#F37254",
     coralLight: "#FCF3F1",
   },
 };
+// @end tokens:colors
 
 // =============================================================================
 // TYPOGRAPHY
@@ -106,6 +103,7 @@ export const Typography = {
 // SPACING SYSTEM
 // =============================================================================
 
+// @generated tokens:spacing fc667b1d528466ae from IMPLEMENTATION_COMPLETE.py; do not edit
 export const Spacing = {
   xs: 4,
   sm: 8,
@@ -117,11 +115,13 @@ export const Spacing = {
   "4xl": 40,
   "5xl": 48,
 };
+// @end tokens:spacing
 
 // =============================================================================
 // BORDER RADIUS
 // =============================================================================
 
+// @generated tokens:radius 8cf1d5c1edbbe803 from IMPLEMENTATION_COMPLETE.py; do not edit
 export const BorderRadius = {
   none: 0,
   xs: 4,
@@ -133,13 +133,21 @@ export const BorderRadius = {
   "3xl": 32,
   full: 9999,
 };
+// @end tokens:radius
 
 // =============================================================================
 // SHADOWS
 // =============================================================================
 
+// @generated tokens:shadows 2ab9e3bc6ec60bba from IMPLEMENTATION_COMPLETE.py; do not edit
 export const Shadows = {
-  none: "0 0 0 rgba(0,0,0,0)",
+  none: {
+    shadowColor: "#000",
+    shadowOffset: { width: 0, height: 0 },
+    shadowOpacity: 0,
+    shadowRadius: 0,
+    elevation: 0,
+  },
   sm: {
     shadowColor: "#000",
     shadowOffset: { width: 0, height: 1 },
@@ -176,6 +184,7 @@ export const Shadows = {
     elevation: 6,
   },
 };
+// @end tokens:shadows
 
 // =============================================================================
 // GRADIENTS (Common Combinations)
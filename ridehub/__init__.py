@@ -0,0 +1,8 @@
+"""
+RideHub backend services
+========================
+
+Python counterparts of the hot paths that currently live in the Expo client
+(``lib/map.ts``, ``store/index.ts``).  Each module is self-contained and is
+catalogued in the ``backend_services`` section of ``IMPLEMENTATION_COMPLETE.py``.
+"""
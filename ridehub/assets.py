@@ -0,0 +1,434 @@
+"""
+Image asset pipeline
+====================
+
+``constants/index.ts`` imports the PNGs from ``uber_assets.zip`` as they were
+exported.  Many are stored without any row filtering, carry ``eXIf`` and
+``tEXt`` chunks, or are far larger than the screen shows them.
+:class:`AssetPipeline` turns the archive into React Native density
+renditions (``name.png``, ``name@2x.png``, ``name@3x.png``) that Metro
+resolves from the same ``require``.
+
+The archive is mapped with :mod:`mmap` and never extracted.
+:class:`AssetArchive` reads the central directory once, and each member is
+inflated straight out of the mapping.  ``__MACOSX/``, AppleDouble ``._*``
+files and ``.DS_Store`` are skipped.  Only PNGs are handled here; fonts
+have their own pipeline.
+
+Files that differ only by an ``@Nx`` suffix are one asset.  It is rendered
+from its densest member, and a file without a suffix is taken to be
+``default_scale``, unless it has suffixed siblings, in which case it is
+@1x as React Native reads it.  An asset gets a rendition for every scale up to its
+master's; upscaling only adds bytes.  Renditions are area-averaged and
+re-encoded by :mod:`ridehub.png` in a process pool.  The master-scale
+rendition falls back to the original, with metadata chunks stripped, when
+that is smaller.
+
+Everything is content-addressed under ``cache_dir``.  A master's SHA-256,
+together with the scales and :data:`PIPELINE_VERSION`, names a small JSON
+record of its renditions.  Rendition files are stored by their own SHA-256,
+so identical outputs (``icon.png`` and ``adaptive-icon.png``) are stored
+once.  An asset whose record exists is never decoded again.  A warm run
+inflates and hashes the archive, and it hard-links (or copies) only
+outputs that are not already in place.
+
+    python -m ridehub.assets uber_assets.zip build/ [--cache .asset-cache] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import posixpath
+import re
+import shutil
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from ridehub import png
+
+# Bump when decoding, resampling or encoding changes so cached renditions are redone.
+PIPELINE_VERSION = 1
+SCALES = (1, 2, 3)
+DEFAULT_CACHE = ".asset-cache"
+
+_SCALE = re.compile(r"^(?P<stem>.+?)@(?P<scale>[1-9])x$")
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+
+
+class AssetError(ValueError):
+    """The archive or one of its members cannot be processed."""
+
+
+def is_junk(name: str) -> bool:
+    """macOS resource forks and Finder metadata that ride along in zips made on a Mac."""
+    base = posixpath.basename(name.rstrip("/"))
+    return name.startswith("__MACOSX/") or base.startswith("._") or base == ".DS_Store"
+
+
+@dataclass(frozen=True)
+class Member:
+    name: str
+    offset: int  # of the compressed data, past the local header
+    compressed_size: int
+    size: int
+    method: int
+    crc: int
+
+
+class AssetArchive:
+    """Read-only view of a zip through ``mmap``; members are inflated on demand."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            with zipfile.ZipFile(self._map) as archive:
+                infos = archive.infolist()
+            self.members = {}
+            for info in infos:
+                if info.is_dir():
+                    continue
+                header = _LOCAL_HEADER.unpack_from(self._map, info.header_offset)
+                if header[0] != b"PK\x03\x04":
+                    raise AssetError(f"{path}: bad local header for {info.filename}")
+                name_length, extra_length = header[9], header[10]
+                self.members[info.filename] = Member(
+                    info.filename,
+                    info.header_offset + _LOCAL_HEADER.size + name_length + extra_length,
+                    info.compress_size,
+                    info.file_size,
+                    info.compress_type,
+                    info.CRC,
+                )
+        except (OSError, ValueError, zipfile.BadZipFile) as exc:
+            self.close()
+            raise AssetError(f"{path}: {exc}") from exc
+
+    def read(self, name: str) -> bytes:
+        member = self.members[name]
+        raw = memoryview(self._map)[member.offset : member.offset + member.compressed_size]
+        try:
+            if member.method == zipfile.ZIP_STORED:
+                data = bytes(raw)
+            elif member.method == zipfile.ZIP_DEFLATED:
+                data = zlib.decompress(raw, -15)
+            else:
+                raise AssetError(f"{name}: unsupported compression method {member.method}")
+        finally:
+            raw.release()
+        if zlib.crc32(data) != member.crc:
+            raise AssetError(f"{name}: CRC mismatch")
+        return data
+
+    def close(self) -> None:
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "AssetArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def split_scale(name: str) -> tuple[str, Optional[int]]:
+    """``assets/a@3x.png`` -> ``("assets/a.png", 3)``; an unsuffixed name has no scale."""
+    stem, ext = posixpath.splitext(name)
+    match = _SCALE.match(stem)
+    if match:
+        return match["stem"] + ext, int(match["scale"])
+    return name, None
+
+
+def rendition_name(asset: str, scale: int) -> str:
+    stem, ext = posixpath.splitext(asset)
+    return asset if scale == 1 else f"{stem}@{scale}x{ext}"
+
+
+@dataclass
+class Rendition:
+    scale: int
+    path: str
+    digest: str
+    bytes: int
+    width: int
+    height: int
+
+
+def pick_scale(available, device_scale: int) -> int:
+    """The density React Native loads: the smallest at or above the device's, else the largest."""
+    above = [s for s in available if s >= device_scale]
+    return min(above) if above else max(available)
+
+
+@dataclass
+class AssetResult:
+    asset: str
+    master: str
+    source_sizes: dict[int, int]  # scale -> bytes of each member as shipped
+    renditions: list[Rendition]
+    cached: bool
+
+    @property
+    def source_bytes(self) -> int:
+        return sum(self.source_sizes.values())
+
+
+@dataclass
+class PipelineReport:
+    assets: list[AssetResult] = field(default_factory=list)
+    junk_skipped: int = 0
+    other_skipped: int = 0
+    rendered: int = 0
+    reused: int = 0
+    linked: int = 0
+    seconds: float = 0.0
+
+    @property
+    def source_bytes(self) -> int:
+        return sum(a.source_bytes for a in self.assets)
+
+    @property
+    def output_bytes(self) -> int:
+        return sum(r.bytes for a in self.assets for r in a.renditions)
+
+    def bytes_at(self, device_scale: int) -> tuple[int, int]:
+        """``(before, after)`` bytes of the images a ``device_scale`` device loads."""
+        before = after = 0
+        for asset in self.assets:
+            before += asset.source_sizes[pick_scale(asset.source_sizes, device_scale)]
+            by_scale = {r.scale: r.bytes for r in asset.renditions}
+            after += by_scale[pick_scale(by_scale, device_scale)]
+        return before, after
+
+    def to_dict(self) -> dict:
+        return {
+            "assets": [asdict(a) for a in self.assets],
+            "junk_skipped": self.junk_skipped,
+            "other_skipped": self.other_skipped,
+            "rendered": self.rendered,
+            "reused": self.reused,
+            "linked": self.linked,
+            "source_bytes": self.source_bytes,
+            "output_bytes": self.output_bytes,
+            "device_bytes": {scale: self.bytes_at(scale) for scale in SCALES},
+            "seconds": self.seconds,
+        }
+
+
+class AssetPipeline:
+    """``uber_assets.zip`` -> deduplicated, re-encoded @1x/@2x/@3x renditions in ``out_dir``."""
+
+    def __init__(
+        self,
+        archive_path: str,
+        out_dir: str,
+        *,
+        cache_dir: str = DEFAULT_CACHE,
+        workers: Optional[int] = None,
+        default_scale: int = 2,
+        scales: tuple[int, ...] = SCALES,
+        level: int = 9,
+    ) -> None:
+        if default_scale not in scales:
+            raise ValueError(f"default_scale must be one of {scales}")
+        self.archive_path = archive_path
+        self.out_dir = out_dir
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.default_scale = default_scale
+        self.scales = tuple(sorted(scales))
+        self.level = level
+
+    def run(self) -> PipelineReport:
+        start = time.perf_counter()
+        report = PipelineReport()
+        groups: dict[str, dict[int, str]] = {}
+        with AssetArchive(self.archive_path) as archive:
+            for name in archive.members:
+                if is_junk(name):
+                    report.junk_skipped += 1
+                elif not name.lower().endswith(".png"):
+                    report.other_skipped += 1
+                else:
+                    asset, scale = split_scale(name)
+                    groups.setdefault(asset, {})[scale] = name
+            for asset, members in groups.items():
+                # As in React Native, a plain name is @1x once it has suffixed siblings.
+                if None in members:
+                    plain = members.pop(None)
+                    members[1 if members else self.default_scale] = plain
+
+            jobs: dict[str, tuple[str, int]] = {}  # key -> (master member, master scale)
+            keyed = []
+            for asset, members in sorted(groups.items()):
+                scale = max(members)
+                master = members[scale]
+                sizes = {s: archive.members[m].size for s, m in sorted(members.items())}
+                key = self._key(hashlib.sha256(archive.read(master)).hexdigest(), scale)
+                keyed.append((asset, master, sizes, key))
+                if key not in jobs and self._load_record(key) is None:
+                    jobs[key] = (master, scale)
+
+            if jobs:
+                # Largest masters first, so one big image does not finish last.
+                order = sorted(jobs, key=lambda k: -archive.members[jobs[k][0]].size)
+                args = [(self.archive_path, *jobs[k], self.scales, self.level) for k in order]
+                with ProcessPoolExecutor(self.workers) as pool:
+                    for key, renditions in zip(order, pool.map(_render, args)):
+                        self._store(key, renditions)
+                report.rendered = len(jobs)
+
+        for asset, master, sizes, key in keyed:
+            record = self._load_record(key)
+            renditions = []
+            for item in record:
+                path = rendition_name(asset, item["scale"])
+                renditions.append(Rendition(path=path, **item))
+                report.linked += self._place(item["digest"], path)
+            cached = key not in jobs
+            report.reused += cached
+            report.assets.append(AssetResult(asset, master, sizes, renditions, cached))
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _key(self, source_digest: str, scale: int) -> str:
+        recipe = f"v{PIPELINE_VERSION}|{self.scales}|{scale}|{self.level}|{source_digest}"
+        return hashlib.sha256(recipe.encode()).hexdigest()
+
+    def _record_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "records", key[:2], key + ".json")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest + ".png")
+
+    def _load_record(self, key: str) -> Optional[list[dict]]:
+        try:
+            with open(self._record_path(key), encoding="utf-8") as handle:
+                record = json.load(handle)
+        except FileNotFoundError:
+            return None
+        if not all(os.path.exists(self._object_path(item["digest"])) for item in record):
+            return None
+        return record
+
+    def _store(self, key: str, renditions: list[tuple[int, int, int, bytes]]) -> None:
+        record = []
+        for scale, width, height, data in renditions:
+            digest = hashlib.sha256(data).hexdigest()
+            path = self._object_path(digest)
+            if not os.path.exists(path):
+                _write_atomic(path, data)
+            record.append(
+                {
+                    "scale": scale,
+                    "digest": digest,
+                    "bytes": len(data),
+                    "width": width,
+                    "height": height,
+                }
+            )
+        _write_atomic(self._record_path(key), json.dumps(record).encode())
+
+    def _place(self, digest: str, path: str) -> int:
+        """Put the object at ``out_dir/path`` unless it is already there; 1 if it was placed."""
+        source = self._object_path(digest)
+        target = os.path.join(self.out_dir, path)
+        try:
+            if os.path.samefile(source, target):
+                return 0
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = target + ".assets-tmp"
+        try:
+            os.link(source, temporary)
+        except OSError:  # another filesystem, or no hard links
+            shutil.copyfile(source, temporary)
+        os.replace(temporary, target)
+        return 1
+
+
+_archive: Optional[AssetArchive] = None
+
+
+def _render(job: tuple[str, str, int, tuple[int, ...], int]) -> list[tuple[int, int, int, bytes]]:
+    """Worker: decode a master once and encode every rendition up to its scale."""
+    global _archive
+    archive_path, master, master_scale, scales, level = job
+    if _archive is None or _archive.path != archive_path:
+        _archive = AssetArchive(archive_path)
+    try:
+        data = _archive.read(master)
+        pixels = png.decode(data)
+    except png.PngError as exc:
+        raise AssetError(f"{master}: {exc}") from None
+    height, width = pixels.shape[:2]
+    out = []
+    for scale in scales:
+        if scale > master_scale:
+            break
+        w = max(1, round(width * scale / master_scale))
+        h = max(1, round(height * scale / master_scale))
+        encoded = png.encode(png.resize(pixels, w, h), level=level)
+        if scale == master_scale:
+            # Some exports are already tighter than we can make them.
+            encoded = min(encoded, png.strip(data), key=len)
+        out.append((scale, w, h, encoded))
+    return out
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("archive")
+    parser.add_argument("out_dir")
+    parser.add_argument("--cache", default=DEFAULT_CACHE)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--default-scale", type=int, default=2)
+    parser.add_argument("--report", help="write the JSON report here")
+    args = parser.parse_args(argv)
+    pipeline = AssetPipeline(
+        args.archive,
+        args.out_dir,
+        cache_dir=args.cache,
+        workers=args.workers,
+        default_scale=args.default_scale,
+    )
+    report = pipeline.run()
+    print(
+        f"{len(report.assets)} assets ({report.rendered} rendered, {report.reused} cached), "
+        f"{report.junk_skipped} junk entries skipped, {report.seconds:.2f} s; "
+        f"all densities {report.source_bytes:,} -> {report.output_bytes:,} bytes"
+    )
+    for scale in pipeline.scales:
+        before, after = report.bytes_at(scale)
+        print(f"  @{scale}x device loads {before:,} -> {after:,} bytes")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump(report.to_dict(), handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
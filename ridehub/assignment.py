@@ -0,0 +1,301 @@
+"""
+Batch rider-driver assignment
+=============================
+
+Today each rider picks a driver on confirm-ride and ``setSelectedDriver``
+records the choice, one rider at a time.  At peak that greedy order leaves
+some riders with long pickups while closer drivers sit idle.
+
+:class:`Dispatcher` collects the open requests of one dispatch tick, builds
+the rider x driver pickup-time matrix with ``ridehub.eta``, and solves it as
+a single assignment problem:
+
+* ``hungarian`` - exact shortest-augmenting-path solver, inner loop
+  vectorized over columns.
+* ``auction``   - Bertsekas' auction with epsilon scaling, all unassigned
+  riders bidding at once; optimal to within ``n * eps`` seconds.  Fastest on
+  square matrices; rectangular ones are padded with indifferent dummy riders,
+  which makes prices climb slowly, so ``auto`` uses it only when square.
+* ``greedy``    - the current behaviour: riders in arrival order take the
+  nearest free driver.
+
+When a ``time_budget`` is given and the exact solver runs out of time, the
+riders it has not placed yet are completed greedily.  The budget covers that
+completion too: the exact solver's deadline leaves room for a worst-case
+greedy pass, and a budget too small for even that goes straight to greedy.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Hashable, Optional, Sequence
+
+import numpy as np
+
+from ridehub.eta import EtaEngine
+from ridehub.metrics import histogram, timed
+
+UNASSIGNED = -1
+# Upper estimate of greedy()'s cost per cell scanned (measured 5-10 ns, plus the
+# submatrix copy in _complete_greedily), reserved out of a solve's time budget.
+_GREEDY_SECONDS_PER_CELL = 15e-9
+_SOLVE_SECONDS = histogram("ridehub_assignment_solve_seconds", "solve() of one cost matrix")
+
+
+class _OutOfTime(Exception):
+    def __init__(self, partial: np.ndarray) -> None:
+        self.partial = partial
+
+
+@dataclass(frozen=True)
+class Assignment:
+    """``driver_for[i]`` is the driver column for rider row ``i`` (or -1)."""
+
+    driver_for: np.ndarray
+    total_cost: float
+    method: str
+    solve_seconds: float
+    fell_back: bool = False
+
+
+def greedy(cost: np.ndarray, order: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Riders in ``order`` (default: row order) each take the cheapest free driver."""
+    riders, drivers = cost.shape
+    driver_for = np.full(riders, UNASSIGNED, dtype=np.int64)
+    taken = np.zeros(drivers, dtype=bool)
+    masked = np.where(taken, np.inf, 0.0)
+    for row in range(riders) if order is None else order:
+        if taken.all():
+            break
+        col = int(np.argmin(cost[row] + masked))
+        driver_for[row] = col
+        taken[col] = True
+        masked[col] = np.inf
+    return driver_for
+
+
+def hungarian(cost: np.ndarray, deadline: Optional[float] = None) -> np.ndarray:
+    """Exact minimum-cost assignment of every row when rows <= columns."""
+    rows, cols = cost.shape
+    if rows > cols:
+        raise ValueError("hungarian() needs rows <= columns; transpose the matrix")
+    # 1-based potentials and matching, as in the classic formulation.
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    match = np.zeros(cols + 1, dtype=np.int64)  # match[j] = row on column j
+    way = np.zeros(cols + 1, dtype=np.int64)
+    for row in range(1, rows + 1):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise _OutOfTime(_hungarian_result(match, rows))
+        match[0] = row
+        col = 0
+        min_slack = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current = match[col]
+            free = ~used
+            free[0] = False
+            slack = cost[current - 1] - u[current] - v[1:]
+            better = free[1:] & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = col
+            candidates = np.where(free, min_slack, np.inf)
+            next_col = int(np.argmin(candidates))
+            delta = candidates[next_col]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_slack[free] -= delta
+            col = next_col
+            if match[col] == 0:
+                break
+        while col:
+            previous = way[col]
+            match[col] = match[previous]
+            col = previous
+    return _hungarian_result(match, rows)
+
+
+def _hungarian_result(match: np.ndarray, rows: int) -> np.ndarray:
+    driver_for = np.full(rows, UNASSIGNED, dtype=np.int64)
+    cols = np.flatnonzero(match[1:]) + 1
+    driver_for[match[cols] - 1] = cols - 1
+    return driver_for
+
+
+def auction(
+    cost: np.ndarray, deadline: Optional[float] = None, scale: float = 5.0
+) -> np.ndarray:
+    """Jacobi auction with epsilon scaling; rows <= columns."""
+    rows, cols = cost.shape
+    if rows > cols:
+        raise ValueError("auction() needs rows <= columns; transpose the matrix")
+    if rows < cols:
+        # Dummy riders that value every driver equally make the problem square.
+        cost = np.vstack((cost, np.zeros((cols - rows, cols))))
+    n = cols
+    benefit = -cost
+    prices = np.zeros(n)
+    spread = float(np.ptp(benefit)) if benefit.size else 0.0
+    eps = max(spread / 2.0, 1.0)
+    eps_min = 1.0 / (n + 1)
+    owner = np.full(n, UNASSIGNED, dtype=np.int64)
+    assigned = np.full(n, UNASSIGNED, dtype=np.int64)
+    # Every finished phase yields a complete, n*eps-optimal assignment; on
+    # timeout that beats the half-built one of the phase in progress.
+    last_complete: Optional[np.ndarray] = None
+
+    while True:
+        owner[:] = UNASSIGNED
+        assigned[:] = UNASSIGNED
+        unassigned = np.arange(n)
+        while unassigned.size:
+            if deadline is not None and time.perf_counter() > deadline:
+                partial = last_complete if last_complete is not None else assigned
+                raise _OutOfTime(_real_rows(partial, rows))
+            values = benefit[unassigned] - prices
+            if n > 1:
+                top2 = np.argpartition(-values, 1, axis=1)[:, :2]
+                v_top = np.take_along_axis(values, top2, axis=1)
+                first = np.argmax(v_top, axis=1)
+                best = top2[np.arange(len(unassigned)), first]
+                best_value = v_top[np.arange(len(unassigned)), first]
+                second_value = v_top[np.arange(len(unassigned)), 1 - first]
+            else:
+                best = np.zeros(len(unassigned), dtype=np.int64)
+                best_value = values[:, 0]
+                second_value = best_value
+            bids = prices[best] + (best_value - second_value) + eps
+
+            # Highest bid per driver wins; lexsort puts each driver's top bid last.
+            order = np.lexsort((bids, best))
+            sorted_cols = best[order]
+            last = np.empty(len(order), dtype=bool)
+            last[:-1] = sorted_cols[1:] != sorted_cols[:-1]
+            last[-1] = True
+            winners = order[last]
+            won_cols = best[winners]
+            won_rows = unassigned[winners]
+
+            evicted = owner[won_cols]
+            evicted = evicted[evicted != UNASSIGNED]
+            assigned[evicted] = UNASSIGNED
+            owner[won_cols] = won_rows
+            assigned[won_rows] = won_cols
+            prices[won_cols] = bids[winners]
+            unassigned = np.flatnonzero(assigned == UNASSIGNED)
+        if eps <= eps_min:
+            return _real_rows(assigned, rows)
+        last_complete = assigned.copy()
+        eps = max(eps / scale, eps_min)
+
+
+def _real_rows(assigned: np.ndarray, rows: int) -> np.ndarray:
+    return assigned[:rows].copy()
+
+
+_SOLVERS = {"hungarian": hungarian, "auction": auction}
+
+
+@timed(_SOLVE_SECONDS)
+def solve(
+    cost: np.ndarray, method: str = "auto", time_budget: Optional[float] = None
+) -> Assignment:
+    """Minimum total cost assignment of riders (rows) to drivers (columns).
+
+    With more riders than drivers the problem is solved transposed, so the
+    riders that end up unserved are the ones that are most expensive to serve.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    start = time.perf_counter()
+    fell_back = False
+    if method == "auto":
+        method = "auction" if cost.shape[0] == cost.shape[1] else "hungarian"
+    deadline = None
+    if time_budget is not None and method != "greedy":
+        # Each greedy rider scans every driver, until riders or drivers run out.
+        riders, drivers = cost.shape
+        reserve = _GREEDY_SECONDS_PER_CELL * min(riders, drivers) * drivers
+        deadline = start + time_budget - reserve
+        fell_back = time_budget <= reserve
+    if method == "greedy" or fell_back:
+        driver_for = greedy(cost)
+    else:
+        solver = _SOLVERS[method]
+        transposed = cost.shape[0] > cost.shape[1]
+        matrix = cost.T if transposed else cost
+        try:
+            result = solver(matrix, deadline)
+        except _OutOfTime as out:
+            result = out.partial
+            fell_back = True
+        if transposed:
+            driver_for = np.full(cost.shape[0], UNASSIGNED, dtype=np.int64)
+            placed = np.flatnonzero(result != UNASSIGNED)
+            driver_for[result[placed]] = placed
+        else:
+            driver_for = result
+        if fell_back:
+            driver_for = _complete_greedily(cost, driver_for)
+
+    placed = np.flatnonzero(driver_for != UNASSIGNED)
+    total = float(cost[placed, driver_for[placed]].sum())
+    return Assignment(driver_for, total, method, time.perf_counter() - start, fell_back)
+
+
+def _complete_greedily(cost: np.ndarray, driver_for: np.ndarray) -> np.ndarray:
+    driver_for = driver_for.copy()
+    free_drivers = np.setdiff1d(np.arange(cost.shape[1]), driver_for[driver_for != UNASSIGNED])
+    open_riders = np.flatnonzero(driver_for == UNASSIGNED)
+    if free_drivers.size and open_riders.size:
+        sub = greedy(cost[np.ix_(open_riders, free_drivers)])
+        hit = sub != UNASSIGNED
+        driver_for[open_riders[hit]] = free_drivers[sub[hit]]
+    return driver_for
+
+
+@dataclass
+class RideRequest:
+    rider_id: Hashable
+    pickup: tuple[float, float]
+    destination: tuple[float, float]
+
+
+@dataclass
+class Dispatcher:
+    """Collects ride requests and assigns them in one batch per tick."""
+
+    engine: EtaEngine = field(default_factory=EtaEngine)
+    method: str = "auto"
+    time_budget: Optional[float] = 0.2
+    max_pickup_seconds: Optional[float] = None
+    _open: list[RideRequest] = field(default_factory=list)
+
+    def submit(self, request: RideRequest) -> None:
+        self._open.append(request)
+
+    def tick(
+        self, driver_ids: Sequence[Hashable], driver_coordinates
+    ) -> tuple[dict[Hashable, Hashable], Assignment]:
+        """Assign the open requests to ``driver_ids``; unmatched riders stay open."""
+        requests, self._open = self._open, []
+        if not requests or not len(driver_ids):
+            self._open = requests
+            return {}, Assignment(np.full(len(requests), UNASSIGNED), 0.0, self.method, 0.0)
+
+        pickups = [r.pickup for r in requests]
+        cost = self.engine.pickup_matrix(driver_coordinates, pickups)
+        if self.max_pickup_seconds is not None:
+            # Too far is never worth it: price it out so the solver avoids it.
+            cost = np.where(cost > self.max_pickup_seconds, 1e9, cost)
+        result = solve(cost, self.method, self.time_budget)
+
+        matches = {}
+        for row, request in enumerate(requests):
+            col = int(result.driver_for[row])
+            if col == UNASSIGNED or cost[row, col] >= 1e9:
+                self._open.append(request)
+            else:
+                matches[request.rider_id] = driver_ids[col]
+        return matches, result
@@ -0,0 +1,375 @@
+"""
+Rider <-> driver chat broker
+============================
+
+``chat.tsx`` renders static ``Conversation`` and ``Message`` arrays: there is
+no delivery, no unread tracking and nothing to stop one slow phone from
+buffering a conversation's traffic without bound.
+
+:class:`ChatBroker` is an in-process asyncio fan-out:
+
+* each conversation keeps its most recent messages in a bounded ring buffer
+  (``deque(maxlen=history)``), which is also what clients resync from;
+* ``unreadCount`` is kept per side as two counters (messages the other side
+  sent, messages this side has seen), so it never needs a scan;
+* every subscriber has a bounded outbox.  When it is full, :meth:`post`
+  queues the message behind any earlier waiting ones and waits up to
+  ``send_timeout`` for the subscriber to make room, which pushes back on the
+  sender.  Waiting messages enter the outbox in post order as it drains, and
+  all of a post's subscribers are waited on together.  A subscriber still
+  behind after that is closed as lagging and must resync from history.
+  Memory per subscriber is therefore capped.
+
+:class:`ChatServer` exposes the broker over TCP as newline-delimited JSON, and
+one connection may carry many conversations::
+
+    -> {"op": "subscribe", "conversation": "c1", "side": "user"}
+    -> {"op": "send", "conversation": "c1", "side": "user", "text": "hi"}
+    <- {"event": "message", "conversation": "c1", "message": {...}}
+    -> {"op": "read", "conversation": "c1", "side": "driver"}
+    -> {"op": "history", "conversation": "c1", "side": "driver"}
+    <- {"event": "history", "conversation": "c1", "messages": [...], "unreadCount": 0}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from ridehub.metrics import histogram, timed
+
+Side = Literal["user", "driver"]
+SIDES = ("user", "driver")
+
+DEFAULT_HISTORY = 32
+DEFAULT_SUBSCRIBER_BUFFER = 64
+_POST_SECONDS = histogram(
+    "ridehub_chat_post_seconds", "ChatBroker.post, backpressure waits included"
+)
+
+
+class SubscriptionClosed(Exception):
+    """The subscription was closed; ``reason`` is "closed" or "lagging"."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass
+class BrokerStats:
+    posted: int = 0
+    delivered: int = 0
+    waited: int = 0  # deliveries that had to wait for a full subscriber outbox
+    lagging: int = 0  # subscribers closed for staying full past send_timeout
+
+
+class Subscription:
+    """Bounded outbox of one side's live view of a conversation."""
+
+    __slots__ = ("conversation", "side", "limit", "_buffer", "_reader", "_pending", "reason")
+
+    def __init__(self, conversation: "Conversation", side: Side, limit: int) -> None:
+        self.conversation = conversation
+        self.side = side
+        self.limit = limit
+        self._buffer: deque = deque()
+        self._reader: Optional[asyncio.Future] = None
+        # (message, future) waiting for room, oldest first; the future says if it got in
+        self._pending: deque[tuple[tuple, asyncio.Future]] = deque()
+        self.reason: Optional[str] = None
+
+    @property
+    def closed(self) -> bool:
+        return self.reason is not None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def get(self) -> dict:
+        """Next message, waiting if none is queued."""
+        while not self._buffer:
+            if self.reason is not None:
+                raise SubscriptionClosed(self.reason)
+            self._reader = asyncio.get_running_loop().create_future()
+            try:
+                await self._reader
+            finally:
+                self._reader = None
+        message = self._buffer.popleft()
+        while self._pending and len(self._buffer) < self.limit:
+            waiting, admitted = self._pending.popleft()
+            self._buffer.append(waiting)
+            _wake(admitted, True)
+        return self.conversation.render(message)
+
+    def close(self, reason: str = "closed") -> None:
+        if self.reason is None:
+            self.reason = reason
+            self.conversation.subscribers.discard(self)
+        _wake(self._reader)
+        while self._pending:
+            _wake(self._pending.popleft()[1], False)
+
+    def _offer(self, message: tuple) -> Optional[asyncio.Future]:
+        """Queue ``message`` behind any waiting ones.
+
+        None if it went straight into the outbox, else a future that becomes True once it
+        gets in, or False if the subscription closes first.
+        """
+        if not self._pending and len(self._buffer) < self.limit:
+            self._buffer.append(message)
+            _wake(self._reader)
+            return None
+        admitted = asyncio.get_running_loop().create_future()
+        self._pending.append((message, admitted))
+        return admitted
+
+
+class Conversation:
+    """Ring-buffered history, unread counters and live subscribers of one chat."""
+
+    __slots__ = ("id", "user_id", "driver_id", "messages", "next_id", "sent", "seen", "subscribers")
+
+    def __init__(self, conversation_id: str, user_id: str, driver_id: str, history: int) -> None:
+        self.id = conversation_id
+        self.user_id = user_id
+        self.driver_id = driver_id
+        # (id, sender index, text, timestamp, sender's running count)
+        self.messages: deque[tuple] = deque(maxlen=history)
+        self.next_id = 1
+        self.sent = [0, 0]  # messages sent by user, driver
+        self.seen = [0, 0]  # other side's messages seen by user, driver
+        self.subscribers: set[Subscription] = set()
+
+    def unread(self, side: Side) -> int:
+        reader = _side(side)
+        return self.sent[1 - reader] - self.seen[reader]
+
+    def render(self, message: tuple) -> dict:
+        """A ``Message`` dict; ``read`` says whether the other party has seen it."""
+        message_id, sender, text, timestamp, count = message
+        return {
+            "id": str(message_id),
+            "sender": SIDES[sender],
+            "text": text,
+            "timestamp": timestamp,
+            "read": count <= self.seen[1 - sender],
+        }
+
+
+class ChatBroker:
+    """asyncio fan-out of rider <-> driver messages with explicit backpressure."""
+
+    def __init__(
+        self,
+        *,
+        history: int = DEFAULT_HISTORY,
+        subscriber_buffer: int = DEFAULT_SUBSCRIBER_BUFFER,
+        send_timeout: float = 0.5,
+        clock=time.time,
+    ) -> None:
+        if history <= 0 or subscriber_buffer <= 0:
+            raise ValueError("history and subscriber_buffer must be positive")
+        self.history = history
+        self.subscriber_buffer = subscriber_buffer
+        self.send_timeout = send_timeout
+        self.clock = clock
+        self.stats = BrokerStats()
+        self._conversations: dict[str, Conversation] = {}
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def open(self, conversation_id: str, user_id: str = "", driver_id: str = "") -> Conversation:
+        """Create a conversation, or return the existing one."""
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            conversation = Conversation(conversation_id, user_id, driver_id, self.history)
+            self._conversations[conversation_id] = conversation
+        return conversation
+
+    def get(self, conversation_id: str) -> Conversation:
+        return self._conversations[conversation_id]
+
+    def close(self, conversation_id: str) -> None:
+        conversation = self._conversations.pop(conversation_id)
+        for subscription in list(conversation.subscribers):
+            subscription.close()
+
+    def subscribe(self, conversation_id: str, side: Side) -> Subscription:
+        _side(side)
+        conversation = self._conversations[conversation_id]
+        subscription = Subscription(conversation, side, self.subscriber_buffer)
+        conversation.subscribers.add(subscription)
+        return subscription
+
+    @timed(_POST_SECONDS)
+    async def post(self, conversation_id: str, side: Side, text: str) -> dict:
+        """Append a message and deliver it to every live subscriber."""
+        sender = _side(side)
+        conversation = self._conversations[conversation_id]
+        conversation.sent[sender] += 1
+        message = (conversation.next_id, sender, text, self.clock(), conversation.sent[sender])
+        conversation.next_id += 1
+        conversation.messages.append(message)
+        # The sender has seen everything the other side sent before replying.
+        conversation.seen[sender] = conversation.sent[1 - sender]
+        self.stats.posted += 1
+
+        waiting: dict[asyncio.Future, Subscription] = {}
+        for subscription in list(conversation.subscribers):
+            admitted = subscription._offer(message)
+            if admitted is None:
+                self.stats.delivered += 1
+            else:
+                waiting[admitted] = subscription
+        if waiting:
+            self.stats.waited += len(waiting)
+            await asyncio.wait(waiting, timeout=self.send_timeout)
+            for admitted, subscription in waiting.items():
+                if admitted.done() and admitted.result():
+                    self.stats.delivered += 1
+                elif not subscription.closed:
+                    self.stats.lagging += 1
+                    subscription.close("lagging")
+        return conversation.render(message)
+
+    def mark_read(self, conversation_id: str, side: Side) -> None:
+        reader = _side(side)
+        conversation = self._conversations[conversation_id]
+        conversation.seen[reader] = conversation.sent[1 - reader]
+
+    def unread_count(self, conversation_id: str, side: Side) -> int:
+        return self._conversations[conversation_id].unread(side)
+
+    def messages(self, conversation_id: str, *, since: Optional[str] = None) -> list[dict]:
+        """Buffered history, oldest first, optionally only after message ``since``."""
+        conversation = self._conversations[conversation_id]
+        after = 0 if since is None else int(since)
+        return [conversation.render(m) for m in conversation.messages if m[0] > after]
+
+    def summary(self, conversation_id: str, side: Side) -> dict:
+        """The ``Conversation`` fields the chat list shows, from ``side``'s point of view."""
+        conversation = self._conversations[conversation_id]
+        last = conversation.messages[-1] if conversation.messages else None
+        return {
+            "id": conversation.id,
+            "driverId": conversation.driver_id,
+            "lastMessage": last[2] if last else "",
+            "timestamp": last[3] if last else None,
+            "unreadCount": conversation.unread(side),
+        }
+
+
+class ChatServer:
+    """Newline-delimited JSON over TCP in front of a :class:`ChatBroker`."""
+
+    def __init__(self, broker: ChatBroker, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.broker = broker
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._handlers: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self) -> "ChatServer":
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        """Stop listening, hang up every client and wait for their handlers."""
+        if self._server is not None:
+            self._server.close()
+            for writer in self._handlers.values():
+                writer.close()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._handlers[asyncio.current_task()] = writer
+        pumps: dict[tuple[str, str], tuple[Subscription, asyncio.Task]] = {}
+        lock = asyncio.Lock()
+
+        async def send(payload: dict) -> None:
+            async with lock:
+                writer.write(json.dumps(payload).encode() + b"\n")
+                await writer.drain()  # a slow socket stalls the pump, filling the outbox
+
+        async def pump(subscription: Subscription) -> None:
+            event = {"conversation": subscription.conversation.id}
+            try:
+                try:
+                    while True:
+                        message = await subscription.get()
+                        await send({"event": "message", **event, "message": message})
+                except SubscriptionClosed as closed:
+                    await send({"event": "closed", **event, "reason": closed.reason})
+            except ConnectionError:
+                subscription.close()
+
+        try:
+            while line := await reader.readline():
+                try:
+                    await self._handle(json.loads(line), pumps, send, pump)
+                except (ValueError, KeyError, TypeError) as exc:
+                    await send({"event": "error", "error": str(exc)})
+        except ConnectionError:
+            pass
+        finally:
+            for subscription, task in pumps.values():
+                subscription.close()
+                task.cancel()
+            await asyncio.gather(*(task for _, task in pumps.values()), return_exceptions=True)
+            writer.close()
+            self._handlers.pop(asyncio.current_task(), None)
+
+    async def _handle(self, request: dict, pumps: dict, send, pump) -> None:
+        op = request["op"]
+        conversation = request["conversation"]
+        broker = self.broker
+        if op == "subscribe":
+            side = request["side"]
+            broker.open(conversation)
+            current = pumps.get((conversation, side))
+            # A subscription closed as lagging ended its pump; resubscribing replaces it.
+            if current is None or current[0].closed:
+                subscription = broker.subscribe(conversation, side)
+                pumps[conversation, side] = (subscription, asyncio.create_task(pump(subscription)))
+        elif op == "send":
+            broker.open(conversation)
+            await broker.post(conversation, request["side"], request["text"])
+        elif op == "read":
+            broker.mark_read(conversation, request["side"])
+        elif op == "history":
+            messages = broker.messages(conversation, since=request.get("since"))
+            unread = broker.unread_count(conversation, request["side"])
+            await send(
+                {
+                    "event": "history",
+                    "conversation": conversation,
+                    "messages": messages,
+                    "unreadCount": unread,
+                }
+            )
+        else:
+            raise ValueError(f"unknown op {op!r}")
+
+
+def _side(side: str) -> int:
+    try:
+        return SIDES.index(side)
+    except ValueError:
+        raise ValueError(f"side must be 'user' or 'driver', not {side!r}") from None
+
+
+def _wake(future: Optional[asyncio.Future], result: object = None) -> None:
+    if future is not None and not future.done():
+        future.set_result(result)
@@ -0,0 +1,202 @@
+"""
+Zoom-level marker clustering
+============================
+
+``components/Map.tsx`` renders one ``Marker`` per driver whatever the zoom, so
+a city-wide view ships and draws thousands of markers.
+
+:class:`ClusterIndex` keeps a hierarchy of nested geocell grids, one level per
+map zoom.  At zoom ``z`` a cell spans roughly ``cluster_px`` screen pixels,
+and every cell splits into exactly four cells at ``z + 1``, so a cluster can
+be expanded by walking down to its occupied children.  Each cell stores only
+a count and coordinate sums (for the centroid); driver ids live at the finest
+level.  Moving a driver adjusts one cell per level, which keeps the index
+current as ``ridehub.ingest`` applies position batches.
+
+Cell sizes are in plain degrees rather than Web Mercator pixels; at city
+latitudes that changes the on-screen cluster radius, not correctness.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Hashable, Iterator
+
+from ridehub.ingest import PositionBatch, Snapshot
+
+DriverId = Hashable
+Cell = tuple[int, int]
+Viewport = tuple[float, float, float, float]  # south, west, north, east
+
+TILE_PX = 256
+
+
+class ClusterIndex:
+    """Incrementally maintained per-zoom grid clusters of driver positions."""
+
+    def __init__(
+        self, *, min_zoom: int = 3, max_zoom: int = 17, cluster_px: int = 60, min_cluster: int = 2
+    ) -> None:
+        if not 0 <= min_zoom <= max_zoom:
+            raise ValueError("need 0 <= min_zoom <= max_zoom")
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.min_cluster = min_cluster
+        # Cell edge at min_zoom; every following level halves it.
+        self._base_deg = cluster_px * 360.0 / (TILE_PX * 2**min_zoom)
+        levels = max_zoom - min_zoom + 1
+        self._scales = [2**level / self._base_deg for level in range(levels)]
+        self._levels: list[dict[Cell, list[float]]] = [{} for _ in range(levels)]
+        self._leaves: dict[Cell, set[DriverId]] = {}
+        self._positions: dict[DriverId, tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def cell_size_deg(self, zoom: int) -> float:
+        return 1.0 / self._scales[self._level(zoom)]
+
+    def insert(self, driver_id: DriverId, lat: float, lng: float) -> None:
+        """Add a driver or move it to a new position."""
+        previous = self._positions.get(driver_id)
+        if previous is not None:
+            self._update(driver_id, previous, -1)
+        self._positions[driver_id] = (lat, lng)
+        self._update(driver_id, (lat, lng), 1)
+
+    def remove(self, driver_id: DriverId) -> None:
+        self._update(driver_id, self._positions.pop(driver_id), -1)
+
+    def on_positions(self, snapshot: Snapshot, applied: PositionBatch) -> None:
+        """``DriverTable.subscribe`` listener: fold an applied batch in."""
+        for driver_id, lat, lng in zip(
+            applied.driver_ids.tolist(), applied.latitudes.tolist(), applied.longitudes.tolist()
+        ):
+            self.insert(driver_id, lat, lng)
+
+    def _update(self, driver_id: DriverId, position: tuple[float, float], sign: int) -> None:
+        lat, lng = position
+        for cells, scale in zip(self._levels, self._scales):
+            cell = (math.floor(lat * scale), math.floor(lng * scale))
+            entry = cells.get(cell)
+            if entry is None:
+                cells[cell] = [1, lat, lng]
+                continue
+            entry[0] += sign
+            if entry[0] == 0:
+                del cells[cell]
+            else:
+                entry[1] += sign * lat
+                entry[2] += sign * lng
+        leaf = self._leaf_cell(lat, lng)
+        if sign > 0:
+            self._leaves.setdefault(leaf, set()).add(driver_id)
+        else:
+            members = self._leaves[leaf]
+            members.discard(driver_id)
+            if not members:
+                del self._leaves[leaf]
+
+    def _leaf_cell(self, lat: float, lng: float) -> Cell:
+        scale = self._scales[-1]
+        return math.floor(lat * scale), math.floor(lng * scale)
+
+    def _level(self, zoom: int) -> int:
+        return min(max(zoom, self.min_zoom), self.max_zoom) - self.min_zoom
+
+    def query(self, viewport: Viewport, zoom: int) -> tuple[list[dict], list[dict]]:
+        """Clusters and individually visible drivers inside ``viewport`` at ``zoom``.
+
+        Returns ``(clusters, drivers)`` where clusters are
+        ``{"latitude", "longitude", "count"}`` centroids and drivers are
+        ``{"id", "latitude", "longitude"}``.  Above ``max_zoom`` every driver
+        is individual.
+        """
+        south, west, north, east = viewport
+        if zoom > self.max_zoom:
+            return [], [
+                self._driver(driver_id)
+                for _, members in self._cells_in(len(self._levels) - 1, viewport, self._leaves)
+                for driver_id in members
+                if _inside(self._positions[driver_id], viewport)
+            ]
+
+        level = self._level(zoom)
+        clusters: list[dict] = []
+        drivers: list[dict] = []
+        for cell, (count, lat_sum, lng_sum) in self._cells_in(level, viewport, self._levels[level]):
+            if count >= self.min_cluster:
+                lat, lng = lat_sum / count, lng_sum / count
+                if south <= lat <= north and west <= lng <= east:
+                    clusters.append({"latitude": lat, "longitude": lng, "count": int(count)})
+            else:
+                drivers.extend(
+                    self._driver(driver_id)
+                    for driver_id in self._members(level, cell)
+                    if _inside(self._positions[driver_id], viewport)
+                )
+        return clusters, drivers
+
+    def _cells_in(self, level: int, viewport: Viewport, cells: dict) -> Iterator[tuple[Cell, object]]:
+        south, west, north, east = viewport
+        scale = self._scales[level]
+        row_lo, row_hi = math.floor(south * scale), math.floor(north * scale)
+        col_lo, col_hi = math.floor(west * scale), math.floor(east * scale)
+        if (row_hi - row_lo + 1) * (col_hi - col_lo + 1) <= len(cells):
+            for row in range(row_lo, row_hi + 1):
+                for col in range(col_lo, col_hi + 1):
+                    entry = cells.get((row, col))
+                    if entry is not None:
+                        yield (row, col), entry
+        else:
+            for (row, col), entry in cells.items():
+                if row_lo <= row <= row_hi and col_lo <= col <= col_hi:
+                    yield (row, col), entry
+
+    def _members(self, level: int, cell: Cell) -> Iterator[DriverId]:
+        """Driver ids under ``cell``, found by descending to occupied children."""
+        leaf_level = len(self._levels) - 1
+        frontier = [cell]
+        for depth in range(level + 1, leaf_level + 1):
+            cells = self._levels[depth]
+            frontier = [
+                child
+                for row, col in frontier
+                for child in (
+                    (2 * row, 2 * col),
+                    (2 * row, 2 * col + 1),
+                    (2 * row + 1, 2 * col),
+                    (2 * row + 1, 2 * col + 1),
+                )
+                if child in cells
+            ]
+        for leaf in frontier:
+            yield from self._leaves.get(leaf, ())
+
+    def _driver(self, driver_id: DriverId) -> dict:
+        lat, lng = self._positions[driver_id]
+        return {"id": driver_id, "latitude": lat, "longitude": lng}
+
+
+def _inside(position: tuple[float, float], viewport: Viewport) -> bool:
+    south, west, north, east = viewport
+    return south <= position[0] <= north and west <= position[1] <= east
+
+
+def region_to_viewport(
+    latitude: float, longitude: float, latitude_delta: float, longitude_delta: float
+) -> Viewport:
+    """Convert a ``calculateRegion``-style region to ``(south, west, north, east)``."""
+    return (
+        latitude - latitude_delta / 2,
+        longitude - longitude_delta / 2,
+        latitude + latitude_delta / 2,
+        longitude + longitude_delta / 2,
+    )
+
+
+def zoom_for_region(longitude_delta: float, width_px: int = 400) -> int:
+    """Approximate map zoom at which ``longitude_delta`` fills ``width_px``."""
+    if longitude_delta <= 0:
+        return 21
+    return max(0, min(21, int(math.log2(360.0 * width_px / (TILE_PX * longitude_delta)))))
@@ -0,0 +1,270 @@
+"""
+Directions API access
+=====================
+
+Request building and response parsing shared by every caller of the Google
+Directions endpoint, mirroring the URL ``lib/map.ts`` builds.
+
+:class:`AsyncDirectionsClient` replaces the client's fire-and-forget fetch
+loop: requests share a pool of keep-alive connections capped by a semaphore,
+identical requests that are in flight at the same moment are coalesced into
+one future, and transient failures are retried with jittered backoff.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import ssl
+import urllib.request
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+from ridehub.metrics import counter, histogram, timed
+
+DIRECTIONS_URL = "https://maps.googleapis.com/maps/api/directions/json"
+API_KEY_ENV = "EXPO_PUBLIC_DIRECTIONS_API_KEY"
+_FETCH_SECONDS = histogram(
+    "ridehub_directions_fetch_seconds", "AsyncDirectionsClient.fetch, retries included"
+)
+_RETRIES = counter("ridehub_directions_retries_total", "Directions requests retried after failing")
+
+
+class DirectionsError(RuntimeError):
+    """The Directions service answered without a usable route."""
+
+
+def directions_query(
+    origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float, key: Optional[str] = None
+) -> str:
+    params = {"origin": f"{origin_lat},{origin_lng}", "destination": f"{dest_lat},{dest_lng}"}
+    key = key if key is not None else os.environ.get(API_KEY_ENV)
+    if key:
+        params["key"] = key
+    return urlencode(params, safe=",")
+
+
+def parse_duration(payload: dict) -> float:
+    """Seconds of the first leg of the first route, as ``lib/map.ts`` reads it."""
+    try:
+        return float(payload["routes"][0]["legs"][0]["duration"]["value"])
+    except (KeyError, IndexError, TypeError) as exc:
+        raise DirectionsError(f"no route in response (status={payload.get('status')!r})") from exc
+
+
+def fetch_duration(
+    origin_lat: float,
+    origin_lng: float,
+    dest_lat: float,
+    dest_lng: float,
+    *,
+    base_url: str = DIRECTIONS_URL,
+    timeout: float = 10.0,
+) -> float:
+    """Blocking single-leg lookup; one HTTP request per call."""
+    url = f"{base_url}?{directions_query(origin_lat, origin_lng, dest_lat, dest_lng)}"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return parse_duration(json.load(response))
+
+
+class _RetryableError(Exception):
+    pass
+
+
+@dataclass
+class ClientStats:
+    calls: int = 0
+    coalesced: int = 0
+    http_requests: int = 0
+    retries: int = 0
+    sockets_opened: int = 0
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most ``max_size`` in use.
+
+    The size cap doubles as the concurrency semaphore: a request holds its
+    connection for the whole exchange, so no more than ``max_size`` requests
+    are ever on the wire.
+    """
+
+    def __init__(self, host: str, port: int, *, max_size: int = 32, tls: bool = False) -> None:
+        self.host = host
+        self.port = port
+        self._ssl = ssl.create_default_context() if tls else None
+        self._slots = asyncio.Semaphore(max_size)
+        self._idle: deque[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = deque()
+        self.opened = 0
+
+    async def acquire(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        await self._slots.acquire()
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        try:
+            connection = await asyncio.open_connection(self.host, self.port, ssl=self._ssl)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.opened += 1
+        return connection
+
+    def release(self, connection, *, reusable: bool) -> None:
+        if reusable:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+        self._slots.release()
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class AsyncDirectionsClient:
+    """Pooled, coalescing asyncio client for the Directions endpoint."""
+
+    def __init__(
+        self,
+        base_url: str = DIRECTIONS_URL,
+        *,
+        max_connections: int = 32,
+        retries: int = 3,
+        backoff: float = 0.05,
+        timeout: float = 10.0,
+        key: Optional[str] = None,
+    ) -> None:
+        parts = urlsplit(base_url)
+        tls = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._path = parts.path or "/"
+        self._pool = ConnectionPool(
+            self._host, parts.port or (443 if tls else 80), max_size=max_connections, tls=tls
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.key = key
+        self._stats = ClientStats()
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    @property
+    def stats(self) -> ClientStats:
+        self._stats.sockets_opened = self._pool.opened
+        return self._stats
+
+    async def __aenter__(self) -> "AsyncDirectionsClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    async def duration(
+        self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float
+    ) -> float:
+        """Seconds for one leg; concurrent identical legs share one request."""
+        return parse_duration(await self.fetch(origin_lat, origin_lng, dest_lat, dest_lng))
+
+    @timed(_FETCH_SECONDS)
+    async def fetch(
+        self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float
+    ) -> dict:
+        self._stats.calls += 1
+        query = directions_query(origin_lat, origin_lng, dest_lat, dest_lng, self.key)
+        future = self._in_flight.get(query)
+        if future is not None:
+            self._stats.coalesced += 1
+        else:
+            future = asyncio.ensure_future(self._fetch_with_retry(query))
+            self._in_flight[query] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(query, None))
+        # Shield so one caller giving up does not cancel the shared request.
+        return await asyncio.shield(future)
+
+    async def _fetch_with_retry(self, query: str) -> dict:
+        attempt = 0
+        while True:
+            try:
+                return await asyncio.wait_for(self._request(query), self.timeout)
+            except (
+                _RetryableError,
+                ConnectionError,
+                asyncio.IncompleteReadError,
+                asyncio.TimeoutError,
+            ) as exc:
+                if attempt >= self.retries:
+                    raise DirectionsError(
+                        f"Directions request failed after {attempt + 1} attempts"
+                    ) from exc
+                # Full jitter keeps a burst of failures from retrying in lockstep.
+                await asyncio.sleep(random.uniform(0, self.backoff * 2**attempt))
+                attempt += 1
+                self._stats.retries += 1
+                _RETRIES.inc()
+
+    async def _request(self, query: str) -> dict:
+        pool = self._pool
+        reader, writer = await pool.acquire()
+        reusable = False
+        try:
+            writer.write(
+                f"GET {self._path}?{query} HTTP/1.1\r\nHost: {self._host}\r\n"
+                "Accept: application/json\r\nConnection: keep-alive\r\n\r\n".encode()
+            )
+            await writer.drain()
+            self._stats.http_requests += 1
+            status, headers, body = await _read_response(reader)
+            reusable = headers.get("connection", "").lower() != "close"
+        finally:
+            pool.release((reader, writer), reusable=reusable)
+        if status == 429 or status >= 500:
+            raise _RetryableError(status)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if status != 200:
+            # Error pages are often HTML or empty rather than the API's JSON.
+            detail = payload.get("status") if isinstance(payload, dict) else body[:80]
+            raise DirectionsError(f"HTTP {status}: {detail!r}")
+        if not isinstance(payload, dict):
+            raise DirectionsError(f"HTTP {status}: response is not a JSON object")
+        return payload
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, dict[str, str], bytes]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    status = int(status_line.split(" ", 2)[1])
+    headers = {
+        name.strip().lower(): value.strip()
+        for name, _, value in (line.partition(":") for line in header_lines if line)
+    }
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await reader.readuntil(b"\r\n")
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        return status, headers, b"".join(chunks)
+    if "content-length" in headers:
+        return status, headers, await reader.readexactly(int(headers["content-length"]))
+    # Neither length nor chunks: the body runs to the end of the connection.
+    return status, {**headers, "connection": "close"}, await reader.read()
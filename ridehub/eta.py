@@ -0,0 +1,167 @@
+"""
+Batch ETA / fare engine
+=======================
+
+Server-side replacement for ``calculateDriverTimes`` in ``lib/map.ts``.
+
+The client version issues two Directions requests per marker: driver -> rider
+and rider -> destination.  The second leg is identical for every driver, so
+here it is resolved once per rider, while all driver -> pickup legs for a
+batch of N drivers and M riders are evaluated as a single (M, N) NumPy matrix.
+
+Pricing matches the client exactly: ``price = total_minutes * 0.5`` rendered
+the way ``toFixed(2)`` renders it (:func:`format_prices`, which rounds exact
+binary halves away from zero where Python rounds them to even), and ``time``
+is the total trip time in minutes.  :attr:`EtaBatch.prices` holds the same
+values as numbers.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from ridehub.geo import distance_matrix_km, haversine_km
+from ridehub.metrics import histogram, timed
+
+DEFAULT_SPEED_KMH = 30.0
+DETOUR_FACTOR = 1.3
+PRICE_PER_MINUTE = 0.5
+
+# (origin_lat, origin_lng, dest_lat, dest_lng) -> duration in seconds.
+LegDuration = Callable[[float, float, float, float], float]
+_BATCH_SECONDS = histogram("ridehub_eta_batch_seconds", "EtaEngine.batch, drivers x riders")
+
+
+@dataclass(frozen=True)
+class EtaBatch:
+    """Result of one N-driver x M-rider evaluation."""
+
+    pickup_seconds: np.ndarray  # (M, N) driver -> rider
+    trip_seconds: np.ndarray  # (M,) rider -> destination, shared by all drivers
+    price_per_minute: float = PRICE_PER_MINUTE
+
+    @property
+    def total_minutes(self) -> np.ndarray:
+        return (self.pickup_seconds + self.trip_seconds[:, None]) / 60.0
+
+    @property
+    def prices(self) -> np.ndarray:
+        return round_cents(self.total_minutes * self.price_per_minute)
+
+
+class EtaEngine:
+    """Estimates pickup and trip durations for many drivers and riders at once.
+
+    ``leg_duration`` resolves the shared rider -> destination leg, for example
+    through the Directions API.  When it is omitted both legs use the
+    straight-line estimate: haversine distance, stretched by ``detour_factor``
+    to approximate the road network, at ``speed_kmh``.
+    """
+
+    def __init__(
+        self,
+        *,
+        speed_kmh: float = DEFAULT_SPEED_KMH,
+        detour_factor: float = DETOUR_FACTOR,
+        price_per_minute: float = PRICE_PER_MINUTE,
+        leg_duration: Optional[LegDuration] = None,
+    ) -> None:
+        if speed_kmh <= 0:
+            raise ValueError("speed_kmh must be positive")
+        self.speed_kmh = speed_kmh
+        self.detour_factor = detour_factor
+        self.price_per_minute = price_per_minute
+        self.leg_duration = leg_duration
+        self._seconds_per_km = 3600.0 * detour_factor / speed_kmh
+
+    def pickup_matrix(self, drivers, pickups) -> np.ndarray:
+        """Driver -> pickup durations in seconds, shape (M pickups, N drivers)."""
+        return distance_matrix_km(pickups, drivers) * self._seconds_per_km
+
+    def trip_seconds(self, pickups, destinations) -> np.ndarray:
+        """Rider -> destination duration in seconds, one value per rider."""
+        pickups = np.asarray(pickups, dtype=np.float64).reshape(-1, 2)
+        destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+        if self.leg_duration is None:
+            km = haversine_km(pickups[:, 0], pickups[:, 1], destinations[:, 0], destinations[:, 1])
+            return km * self._seconds_per_km
+        return np.fromiter(
+            (
+                self.leg_duration(p[0], p[1], d[0], d[1])
+                for p, d in zip(pickups.tolist(), destinations.tolist())
+            ),
+            dtype=np.float64,
+            count=len(pickups),
+        )
+
+    @timed(_BATCH_SECONDS)
+    def batch(self, drivers, pickups, destinations) -> EtaBatch:
+        """Evaluate every driver against every rider in one pass."""
+        return EtaBatch(
+            pickup_seconds=self.pickup_matrix(drivers, pickups),
+            trip_seconds=self.trip_seconds(pickups, destinations),
+            price_per_minute=self.price_per_minute,
+        )
+
+    def driver_times(
+        self,
+        markers: Sequence[Mapping],
+        user_latitude: Optional[float],
+        user_longitude: Optional[float],
+        destination_latitude: Optional[float],
+        destination_longitude: Optional[float],
+    ) -> Optional[list[dict]]:
+        """Drop-in equivalent of ``calculateDriverTimes`` for a single rider.
+
+        Returns ``[{...marker, "time": minutes, "price": "x.xx"}]`` or ``None``
+        when the rider or destination is not known yet, like the client does.
+        """
+        if None in (user_latitude, user_longitude, destination_latitude, destination_longitude):
+            return None
+        if not markers:
+            return []
+
+        drivers = _marker_coordinates(markers)
+        result = self.batch(
+            drivers,
+            [(user_latitude, user_longitude)],
+            [(destination_latitude, destination_longitude)],
+        )
+        minutes = result.total_minutes[0]
+        prices = format_prices(minutes * self.price_per_minute)
+        return [
+            {**marker, "time": total, "price": price}
+            for marker, total, price in zip(markers, minutes.tolist(), prices)
+        ]
+
+
+def format_prices(fares: Sequence[float] | np.ndarray) -> list[str]:
+    """Render fares exactly as the app's ``toFixed(2)`` does."""
+    fares = np.asarray(fares, dtype=np.float64).ravel()
+    # toFixed rounds exact binary halves (x.125, x.375, ...) away from zero,
+    # Python's formatting rounds them to even; nudge those few off the tie.
+    eighths = fares * 8.0
+    ties = (eighths == np.floor(eighths)) & (np.abs(eighths) % 2.0 == 1.0)
+    if ties.any():
+        fares = np.where(ties, fares + np.copysign(1e-3, fares), fares)
+    return [f"{fare:.2f}" for fare in fares.tolist()]
+
+
+def round_cents(fares: Sequence[float] | np.ndarray) -> np.ndarray:
+    """``fares`` rounded to cents as numbers, agreeing with :func:`format_prices`."""
+    fares = np.asarray(fares, dtype=np.float64)
+    cents = np.abs(fares) * 100.0
+    rounded = np.copysign(np.floor(cents + 0.5), fares) / 100.0
+    # ``cents`` is itself rounded, so anything within reach of a half cent is
+    # settled by the exact decimal formatting instead.
+    near = np.abs(cents - np.floor(cents) - 0.5) < 1e-6
+    if near.any():
+        rounded[near] = [float(price) for price in format_prices(fares[near])]
+    return rounded
+
+
+def _marker_coordinates(markers: Iterable[Mapping]) -> np.ndarray:
+    return np.array([(m["latitude"], m["longitude"]) for m in markers], dtype=np.float64)
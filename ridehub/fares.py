@@ -0,0 +1,191 @@
+"""
+Vectorized fare quotes with a geocell surge grid
+================================================
+
+``calculateDriverTimes`` prices one marker at a time on the client as
+``(totalTime * 0.5).toFixed(2)``.  :class:`FareEngine` prices whole arrays of
+trips in one NumPy expression::
+
+    fare = max(minimum, base + per_minute * minutes + per_km * km) * surge
+
+where ``surge`` is looked up from a :class:`SurgeGrid`, a dense array of
+multipliers over the service area's geocells.  The grid keeps demand and
+supply counts per cell; updates only mark the touched cells dirty and
+:meth:`SurgeGrid.refresh` recomputes just those multipliers.
+
+With the default :data:`LEGACY_SCHEDULE` and no surge, quotes are exactly
+today's ``total_minutes * 0.5``; :func:`format_prices` renders them the way
+``toFixed(2)`` does in the app.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ridehub.eta import PRICE_PER_MINUTE, EtaBatch, format_prices  # noqa: F401  (re-exported)
+from ridehub.geo import DEFAULT_CELL_DEG, geocells
+from ridehub.ingest import PositionBatch, Snapshot
+from ridehub.metrics import histogram, timed
+
+_QUOTE_SECONDS = histogram("ridehub_fare_quote_seconds", "FareEngine.quote of one array of trips")
+_SURGE_REFRESH_SECONDS = histogram(
+    "ridehub_surge_refresh_seconds", "SurgeGrid.refresh of the dirty cells"
+)
+
+
+@dataclass(frozen=True)
+class FareSchedule:
+    base: float = 0.0
+    per_minute: float = PRICE_PER_MINUTE
+    per_km: float = 0.0
+    minimum: float = 0.0
+
+
+# What the app charges today: 0.5 per minute of total (pickup + trip) time.
+LEGACY_SCHEDULE = FareSchedule()
+
+
+class SurgeGrid:
+    """Dense per-geocell surge multipliers, refreshed from demand/supply counts.
+
+    A cell's multiplier is ``1 + sensitivity * (demand / max(supply, 1) -
+    threshold)``, clamped to ``[1, max_multiplier]`` and floored to ``step``.
+    Points outside the grid's bounds always get 1.0.
+    """
+
+    def __init__(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        *,
+        cell_deg: float = DEFAULT_CELL_DEG,
+        threshold: float = 1.0,
+        sensitivity: float = 0.5,
+        max_multiplier: float = 3.0,
+        step: float = 0.1,
+    ) -> None:
+        if north <= south or east <= west:
+            raise ValueError("bounds must satisfy south < north and west < east")
+        if max_multiplier < 1.0:
+            raise ValueError("max_multiplier must be at least 1")
+        self.cell_deg = cell_deg
+        self.threshold = threshold
+        self.sensitivity = sensitivity
+        self.max_multiplier = max_multiplier
+        self.step = step
+        rows, cols = geocells([south, north], [west, east], cell_deg)
+        self._row0, self._col0 = int(rows[0]), int(cols[0])
+        self.shape = (int(rows[1]) - self._row0 + 1, int(cols[1]) - self._col0 + 1)
+        self.demand = np.zeros(self.shape)
+        self.supply = np.zeros(self.shape)
+        self.multipliers = np.ones(self.shape)
+        self._dirty = np.zeros(self.shape, dtype=bool)
+        self._driver_cells = np.empty(0, dtype=np.int64)  # flat cell per snapshot slot, -1 outside
+
+    def cells(self, latitudes, longitudes) -> np.ndarray:
+        """Flat grid index for each point, or -1 when it falls outside the grid."""
+        rows, cols = geocells(latitudes, longitudes, self.cell_deg)
+        rows = rows - self._row0
+        cols = cols - self._col0
+        inside = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        return np.where(inside, rows * self.shape[1] + cols, -1)
+
+    def add_demand(self, latitudes, longitudes, weight: float = 1.0) -> None:
+        """Count ride requests (negative ``weight`` retires them)."""
+        self._add(self.demand, self.cells(latitudes, longitudes), weight)
+
+    def add_supply(self, latitudes, longitudes, weight: float = 1.0) -> None:
+        """Count available drivers (negative ``weight`` retires them)."""
+        self._add(self.supply, self.cells(latitudes, longitudes), weight)
+
+    def decay(self, factor: float) -> None:
+        """Scale all demand by ``factor`` (e.g. once a minute, for a rolling window)."""
+        self.demand *= factor
+        self._dirty[:] = True
+
+    def on_positions(self, snapshot: Snapshot, applied: PositionBatch) -> None:
+        """``DriverTable.subscribe`` listener: move supply between cells."""
+        current = self.cells(snapshot.latitudes, snapshot.longitudes)
+        previous = self._driver_cells
+        known = len(previous)
+        moved = np.flatnonzero(current[:known] != previous)
+        self._add(self.supply, previous[moved], -1.0)
+        self._add(self.supply, current[moved], 1.0)
+        self._add(self.supply, current[known:], 1.0)
+        self._driver_cells = current
+
+    @timed(_SURGE_REFRESH_SECONDS)
+    def refresh(self) -> int:
+        """Recompute multipliers of cells whose counts changed; return how many."""
+        dirty = np.flatnonzero(self._dirty)
+        if len(dirty) == 0:
+            return 0
+        demand = self.demand.ravel()[dirty]
+        supply = np.maximum(self.supply.ravel()[dirty], 1.0)
+        raw = 1.0 + self.sensitivity * (demand / supply - self.threshold)
+        raw = np.clip(raw, 1.0, self.max_multiplier)
+        # Small epsilon so 1.2 / 0.1 does not floor to 11.
+        self.multipliers.ravel()[dirty] = np.floor(raw / self.step + 1e-9) * self.step
+        self._dirty.ravel()[dirty] = False
+        return len(dirty)
+
+    def lookup(self, latitudes, longitudes) -> np.ndarray:
+        """Current multiplier at each point."""
+        cells = self.cells(latitudes, longitudes)
+        out = np.ones(cells.shape)
+        inside = cells >= 0
+        out[inside] = self.multipliers.ravel()[cells[inside]]
+        return out
+
+    def _add(self, counts: np.ndarray, cells: np.ndarray, weight: float) -> None:
+        cells = cells[cells >= 0]
+        if len(cells) == 0:
+            return
+        np.add.at(counts.ravel(), cells, weight)
+        self._dirty.ravel()[cells] = True
+
+
+class FareEngine:
+    """Prices arrays of trips against a :class:`FareSchedule` and optional surge."""
+
+    def __init__(
+        self, schedule: FareSchedule = LEGACY_SCHEDULE, surge: Optional[SurgeGrid] = None
+    ) -> None:
+        self.schedule = schedule
+        self.surge = surge
+
+    @timed(_QUOTE_SECONDS)
+    def quote(self, minutes, km=0.0, pickups=None) -> np.ndarray:
+        """Fares for broadcastable ``minutes`` and ``km`` arrays.
+
+        ``pickups`` is an (M, 2) lat/lng array of trip origins; the surge at
+        each origin scales the matching row of the result, so an (M, N)
+        rider x driver minutes matrix gets one multiplier per rider.
+        """
+        s = self.schedule
+        fares = np.asarray(minutes, dtype=np.float64) * s.per_minute
+        if s.per_km:
+            fares = fares + np.asarray(km, dtype=np.float64) * s.per_km
+        if s.base:
+            fares = fares + s.base
+        if s.minimum:
+            fares = np.maximum(fares, s.minimum)
+        if self.surge is not None and pickups is not None:
+            pickups = np.asarray(pickups, dtype=np.float64).reshape(-1, 2)
+            multiplier = self.surge.lookup(pickups[:, 0], pickups[:, 1])
+            fares = fares * (multiplier[:, None] if fares.ndim == 2 else multiplier)
+        return fares
+
+    def quote_batch(self, batch: EtaBatch, trip_km=0.0, pickups=None) -> np.ndarray:
+        """(M, N) fares for an :class:`~ridehub.eta.EtaBatch`.
+
+        ``trip_km`` is the (M,) rider -> destination distance: the per-km
+        component is charged for the rider's trip, not the driver's approach.
+        """
+        km = np.asarray(trip_km, dtype=np.float64)
+        return self.quote(batch.total_minutes, km[:, None] if km.ndim else km, pickups)
@@ -0,0 +1,385 @@
+"""
+Font stage
+==========
+
+``assets/fonts`` ships all fourteen PlusJakartaSans faces, italics included.
+Each one is a full ~95 KB font covering Vietnamese, Latin Extended and
+symbols the app never draws.  :class:`FontStage` writes to ``out_dir`` only
+the faces the app uses, each subset to what it can actually show.
+
+What counts as used is read from the sources, not the config.  Every
+``font-<key>`` class in ``app/`` and ``components/`` is resolved through the
+``fontFamily`` map in ``tailwind.config.js``.  Literal ``fontFamily: "..."``
+styles count as well.  The families found must all be loaded by the
+``useFonts`` call in ``app/_layout.tsx``, or the text silently falls back to
+the system font.  That is an error here.  Families the loader loads that
+nothing references are reported, as are ``font-*`` classes that resolve to
+no family.
+
+Faces are subset by :mod:`ridehub.ttf` to the code points of the configured
+:data:`LOCALES`.  Non-ASCII characters written literally in the scanned
+sources (``•``, ``→``, ``©``...) are kept as well, where the font has them.
+A subset is cached under ``cache_dir`` by the SHA-256 of the font, the code
+point set and :data:`STAGE_VERSION`.  A warm run hashes the inputs and
+hard-links (or copies) only the outputs that are not already in place.
+
+    python -m ridehub.fonts build/ [--root .] [--cache .asset-cache] [--locale en]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Optional
+
+from ridehub import ttf
+
+# Bump when subsetting changes so cached subsets are redone.
+STAGE_VERSION = 1
+FONT_DIR = "assets/fonts"
+LOADER = "app/_layout.tsx"
+TAILWIND = "tailwind.config.js"
+SOURCES = ("app", "components")
+DEFAULT_CACHE = ".asset-cache"
+
+_LATIN = ((0x20, 0x7E), (0xA0, 0xFF))
+_PUNCTUATION = (
+    (0x2013, 0x2014),  # en and em dash
+    (0x2018, 0x201A),  # single quotes
+    (0x201C, 0x201E),  # double quotes
+    (0x2022, 0x2022),  # bullet
+    (0x2026, 0x2026),  # ellipsis
+    (0x20AC, 0x20AC),  # euro sign
+    (0x2122, 0x2122),  # trade mark
+)
+LOCALES: dict[str, tuple[tuple[int, int], ...]] = {
+    "en": _LATIN + _PUNCTUATION,
+    "es": _LATIN + _PUNCTUATION,
+    "pt": _LATIN + _PUNCTUATION,
+    "fr": _LATIN + _PUNCTUATION + ((0x152, 0x153), (0x178, 0x178)),
+    "de": _LATIN + _PUNCTUATION + ((0x1E9E, 0x1E9E),),
+    "pl": _LATIN + _PUNCTUATION + ((0x100, 0x17F),),
+    "tr": _LATIN + _PUNCTUATION + ((0x100, 0x17F),),
+}
+DEFAULT_LOCALES = ("en",)
+
+# Tailwind's own font-* utilities (weights, the stock stacks): not families of ours.
+_BUILTIN = {
+    "thin",
+    "extralight",
+    "light",
+    "normal",
+    "medium",
+    "semibold",
+    "bold",
+    "extrabold",
+    "black",
+    "sans",
+    "serif",
+    "mono",
+}
+_CLASS = re.compile(r"(?<![\w-])font-([A-Za-z][\w-]*)")
+_STYLE = re.compile(r"""fontFamily:\s*["']([^"']+)["']""")
+_FAMILY_MAP = re.compile(r"fontFamily:\s*\{(?P<body>.*?)\}", re.S)
+_FAMILY = re.compile(r"""["']?(?P<key>[\w-]+)["']?:\s*\[\s*["'](?P<family>[^"']+)["']""")
+_LOAD = re.compile(
+    r"""(?:["'](?P<quoted>[^"']+)["']|(?P<bare>\w+)):\s*"""
+    r"""require\(["'](?P<path>[^"']+\.[ot]tf)["']\)"""
+)
+
+
+class FontError(ValueError):
+    """The sources reference a font the app does not load, or a font cannot be read."""
+
+
+def locale_codepoints(locales: Iterable[str]) -> set[int]:
+    codepoints: set[int] = set()
+    for locale in locales:
+        if locale not in LOCALES:
+            raise FontError(f"unknown locale {locale!r}; known: {', '.join(sorted(LOCALES))}")
+        for first, last in LOCALES[locale]:
+            codepoints.update(range(first, last + 1))
+    return codepoints
+
+
+def tailwind_families(root: str = ".") -> dict[str, str]:
+    """``font-<key>`` class key -> font family, from ``theme.extend.fontFamily``."""
+    with open(os.path.join(root, TAILWIND), encoding="utf-8") as handle:
+        match = _FAMILY_MAP.search(handle.read())
+    if match is None:
+        raise FontError(f"{TAILWIND} has no fontFamily map")
+    return {m["key"]: m["family"] for m in _FAMILY.finditer(match["body"])}
+
+
+def loaded_faces(root: str = ".") -> dict[str, str]:
+    """Family -> font file (relative to ``root``) for every face ``useFonts`` loads."""
+    with open(os.path.join(root, LOADER), encoding="utf-8") as handle:
+        source = handle.read()
+    base = posixpath.dirname(LOADER)
+    return {
+        m["quoted"] or m["bare"]: posixpath.normpath(posixpath.join(base, m["path"]))
+        for m in _LOAD.finditer(source)
+    }
+
+
+@dataclass
+class Usage:
+    families: dict[str, int] = field(default_factory=dict)  # family -> references
+    unresolved: dict[str, int] = field(default_factory=dict)  # font-* class -> uses
+    codepoints: set[int] = field(default_factory=set)  # non-ASCII characters in the sources
+
+
+def scan(root: str = ".", classes: Optional[dict[str, str]] = None) -> Usage:
+    """Which font families ``app/`` and ``components/`` reference, and how often."""
+    if classes is None:
+        classes = tailwind_families(root)
+    usage = Usage()
+    for top in SOURCES:
+        for directory, _, files in os.walk(os.path.join(root, top)):
+            for name in sorted(files):
+                if not name.endswith((".ts", ".tsx", ".js", ".jsx")):
+                    continue
+                with open(os.path.join(directory, name), encoding="utf-8") as handle:
+                    source = handle.read()
+                for key in _CLASS.findall(source):
+                    if key in classes:
+                        family = classes[key]
+                        usage.families[family] = usage.families.get(family, 0) + 1
+                    elif key.lower() not in _BUILTIN:
+                        usage.unresolved[key] = usage.unresolved.get(key, 0) + 1
+                for family in _STYLE.findall(source):
+                    usage.families[family] = usage.families.get(family, 0) + 1
+                usage.codepoints.update(ord(c) for c in source if ord(c) > 0x7E)
+    return usage
+
+
+@dataclass
+class FaceResult:
+    family: str
+    source: str
+    source_bytes: int
+    digest: str
+    bytes: int
+    outlines: int
+    codepoints: int
+    references: int
+    cached: bool
+
+
+@dataclass
+class StageReport:
+    faces: list[FaceResult] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)  # shipped font files not written
+    unused: list[str] = field(default_factory=list)  # families loaded but never referenced
+    unresolved: dict[str, int] = field(default_factory=dict)
+    bundled_bytes: int = 0  # every font file in FONT_DIR
+    subset: int = 0
+    reused: int = 0
+    linked: int = 0
+    seconds: float = 0.0
+
+    @property
+    def output_bytes(self) -> int:
+        return sum(f.bytes for f in self.faces)
+
+    def to_dict(self) -> dict:
+        return {
+            "faces": [asdict(f) for f in self.faces],
+            "dropped": self.dropped,
+            "unused": self.unused,
+            "unresolved": self.unresolved,
+            "bundled_bytes": self.bundled_bytes,
+            "output_bytes": self.output_bytes,
+            "subset": self.subset,
+            "reused": self.reused,
+            "linked": self.linked,
+            "seconds": self.seconds,
+        }
+
+
+class FontStage:
+    """Referenced faces of ``assets/fonts``, subset to ``locales``, -> ``out_dir``."""
+
+    def __init__(
+        self,
+        out_dir: str,
+        *,
+        root: str = ".",
+        cache_dir: str = DEFAULT_CACHE,
+        locales: Iterable[str] = DEFAULT_LOCALES,
+    ) -> None:
+        self.out_dir = out_dir
+        self.root = root
+        self.cache_dir = cache_dir
+        self.locales = tuple(sorted(set(locales)))
+        self.base_codepoints = locale_codepoints(self.locales)
+
+    def run(self) -> StageReport:
+        start = time.perf_counter()
+        report = StageReport()
+        classes = tailwind_families(self.root)
+        usage = scan(self.root, classes)
+        loaded = loaded_faces(self.root)
+        missing = sorted(set(usage.families) - set(loaded))
+        if missing:
+            raise FontError(
+                f"{', '.join(missing)} referenced in {' and '.join(SOURCES)} "
+                f"but not loaded by useFonts in {LOADER}"
+            )
+        report.unused = sorted(set(loaded) - set(usage.families))
+        report.unresolved = dict(sorted(usage.unresolved.items()))
+
+        shipped = sorted(
+            posixpath.join(FONT_DIR, name)
+            for name in os.listdir(os.path.join(self.root, FONT_DIR))
+            if name.lower().endswith((".ttf", ".otf"))
+        )
+        sizes = {path: os.path.getsize(os.path.join(self.root, path)) for path in shipped}
+        report.bundled_bytes = sum(sizes.values())
+
+        codepoints = self.base_codepoints | usage.codepoints
+        wanted = hashlib.sha256(",".join(map(str, sorted(codepoints))).encode()).hexdigest()
+        for family in sorted(usage.families):
+            source = loaded[family]
+            with open(os.path.join(self.root, source), "rb") as handle:
+                data = handle.read()
+            key = self._key(hashlib.sha256(data).hexdigest(), wanted)
+            record = self._load_record(key)
+            cached = record is not None
+            if record is None:
+                try:
+                    record = self._store(key, data, codepoints)
+                except ttf.TtfError as exc:
+                    raise FontError(f"{source}: {exc}") from None
+                report.subset += 1
+            report.reused += cached
+            report.linked += self._place(record["digest"], source)
+            report.faces.append(
+                FaceResult(
+                    family=family,
+                    source=source,
+                    source_bytes=len(data),
+                    references=usage.families[family],
+                    cached=cached,
+                    **record,
+                )
+            )
+        written = {face.source for face in report.faces}
+        report.dropped = [path for path in shipped if path not in written]
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _key(self, source_digest: str, codepoints_digest: str) -> str:
+        recipe = f"v{STAGE_VERSION}|{codepoints_digest}|{source_digest}"
+        return hashlib.sha256(recipe.encode()).hexdigest()
+
+    def _record_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "fonts", "records", key[:2], key + ".json")
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "fonts", "objects", digest[:2], digest + ".ttf")
+
+    def _load_record(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._record_path(key), encoding="utf-8") as handle:
+                record = json.load(handle)
+        except FileNotFoundError:
+            return None
+        if not os.path.exists(self._object_path(record["digest"])):
+            return None
+        return record
+
+    def _store(self, key: str, data: bytes, codepoints: set[int]) -> dict:
+        subset = ttf.subset(data, codepoints)
+        font = ttf.Font(subset)
+        offsets = font.offsets()
+        digest = hashlib.sha256(subset).hexdigest()
+        if not os.path.exists(self._object_path(digest)):
+            _write_atomic(self._object_path(digest), subset)
+        record = {
+            "digest": digest,
+            "bytes": len(subset),
+            "outlines": sum(b > a for a, b in zip(offsets, offsets[1:])),
+            "codepoints": len(font.cmap()),
+        }
+        _write_atomic(self._record_path(key), json.dumps(record).encode())
+        return record
+
+    def _place(self, digest: str, path: str) -> int:
+        """Put the object at ``out_dir/path`` unless it is already there; 1 if it was placed."""
+        source = self._object_path(digest)
+        target = os.path.join(self.out_dir, path)
+        try:
+            if os.path.samefile(source, target):
+                return 0
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temporary = target + ".fonts-tmp"
+        try:
+            os.link(source, temporary)
+        except OSError:  # another filesystem, or no hard links
+            shutil.copyfile(source, temporary)
+        os.replace(temporary, target)
+        return 1
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("out_dir")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--cache", default=DEFAULT_CACHE)
+    parser.add_argument(
+        "--locale", action="append", choices=sorted(LOCALES), help="repeat for more locales"
+    )
+    parser.add_argument("--report", help="write the JSON report here")
+    args = parser.parse_args(argv)
+    stage = FontStage(
+        args.out_dir,
+        root=args.root,
+        cache_dir=args.cache,
+        locales=args.locale or DEFAULT_LOCALES,
+    )
+    try:
+        report = stage.run()
+    except FontError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"{len(report.faces)} faces ({report.subset} subset, {report.reused} cached), "
+        f"{len(report.dropped)} dropped, {report.seconds:.2f} s; "
+        f"fonts {report.bundled_bytes:,} -> {report.output_bytes:,} bytes"
+    )
+    for face in report.faces:
+        print(
+            f"  {face.family:<18} {face.source_bytes:>8,} -> {face.bytes:>7,} bytes, "
+            f"{face.codepoints} code points, {face.references} references"
+        )
+    for family in report.unused:
+        print(f"warning: {family} is loaded in {LOADER} but never referenced", file=sys.stderr)
+    for key, count in report.unresolved.items():
+        print(f"warning: font-{key} ({count} uses) is not in {TAILWIND}", file=sys.stderr)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump(report.to_dict(), handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
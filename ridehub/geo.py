@@ -0,0 +1,50 @@
+"""
+Geodesic helpers shared by the dispatch services.
+
+All functions accept scalars or NumPy arrays and broadcast like NumPy ufuncs,
+so a single call can evaluate a whole rider x driver matrix.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distance in kilometres between two (broadcastable) points."""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlng = np.radians(lng2) - np.radians(lng1)
+    a = np.sin(dlat * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng * 0.5) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distance_matrix_km(origins, destinations) -> np.ndarray:
+    """Pairwise distances: ``origins`` is (M, 2), ``destinations`` is (N, 2) -> (M, N)."""
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+    destinations = np.asarray(destinations, dtype=np.float64).reshape(-1, 2)
+    return haversine_km(
+        origins[:, 0:1], origins[:, 1:2], destinations[:, 0][None, :], destinations[:, 1][None, :]
+    )
+
+
+KM_PER_DEGREE_LAT = np.pi * EARTH_RADIUS_KM / 180.0
+
+# Uniform lat/lng grid used by every geocell-keyed structure in ``ridehub``.
+DEFAULT_CELL_DEG = 0.01  # ~1.1 km of latitude
+
+
+def geocell(lat: float, lng: float, cell_deg: float = DEFAULT_CELL_DEG) -> tuple[int, int]:
+    """Integer (row, col) of the grid cell containing ``(lat, lng)``."""
+    return int(lat // cell_deg), int(lng // cell_deg)
+
+
+def geocells(lat, lng, cell_deg: float = DEFAULT_CELL_DEG) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized :func:`geocell`: row and column arrays for many points."""
+    return (
+        np.floor_divide(np.asarray(lat, dtype=np.float64), cell_deg).astype(np.int64),
+        np.floor_divide(np.asarray(lng, dtype=np.float64), cell_deg).astype(np.int64),
+    )
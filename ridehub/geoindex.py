@@ -0,0 +1,185 @@
+"""
+Geocell driver index
+====================
+
+Replaces the full scan that ``generateMarkersFromData`` in ``lib/map.ts``
+performs over ``useDriverStore.drivers`` on every map open.
+
+Drivers are bucketed into a uniform lat/lng grid (see ``ridehub.geo.geocell``).
+Insert, move and remove touch a single bucket, so drivers going on and off
+duty cost O(1).  Radius queries only read the cells overlapping the search
+circle; k-nearest queries grow a square of cells ring by ring and stop as soon
+as the k-th best distance is closer than anything outside the square.  Once
+the square holds more cells than are occupied, the occupied cells outside it
+are read directly instead, so a far-off driver costs O(occupied cells), not
+O(distance²) empty ones.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Hashable, Iterator, Optional
+
+import numpy as np
+
+from ridehub.geo import DEFAULT_CELL_DEG, KM_PER_DEGREE_LAT, geocell, haversine_km
+
+DriverId = Hashable
+Cell = tuple[int, int]
+
+
+class GeoIndex:
+    """Grid index of driver positions with k-nearest and radius queries."""
+
+    def __init__(self, cell_deg: float = DEFAULT_CELL_DEG) -> None:
+        if cell_deg <= 0:
+            raise ValueError("cell_deg must be positive")
+        self.cell_deg = cell_deg
+        self._cells: dict[Cell, dict[DriverId, tuple[float, float]]] = {}
+        self._where: dict[DriverId, Cell] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, driver_id: DriverId) -> bool:
+        return driver_id in self._where
+
+    def __iter__(self) -> Iterator[DriverId]:
+        return iter(self._where)
+
+    def position(self, driver_id: DriverId) -> tuple[float, float]:
+        return self._cells[self._where[driver_id]][driver_id]
+
+    def cell_of(self, lat: float, lng: float) -> Cell:
+        return geocell(lat, lng, self.cell_deg)
+
+    def insert(self, driver_id: DriverId, lat: float, lng: float) -> None:
+        """Add a driver, or move it if it is already indexed."""
+        cell = geocell(lat, lng, self.cell_deg)
+        previous = self._where.get(driver_id)
+        if previous is not None and previous != cell:
+            self._drop(driver_id, previous)
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            bucket = self._cells[cell] = {}
+        bucket[driver_id] = (lat, lng)
+        self._where[driver_id] = cell
+
+    def remove(self, driver_id: DriverId) -> None:
+        """Remove a driver; raises ``KeyError`` if it is not indexed."""
+        self._drop(driver_id, self._where.pop(driver_id))
+
+    def discard(self, driver_id: DriverId) -> None:
+        cell = self._where.pop(driver_id, None)
+        if cell is not None:
+            self._drop(driver_id, cell)
+
+    def _drop(self, driver_id: DriverId, cell: Cell) -> None:
+        bucket = self._cells[cell]
+        del bucket[driver_id]
+        if not bucket:
+            del self._cells[cell]
+
+    def within(self, lat: float, lng: float, radius_km: float) -> list[tuple[DriverId, float]]:
+        """All drivers within ``radius_km``, as ``(driver_id, km)`` sorted by distance."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlng = radius_km / (KM_PER_DEGREE_LAT * _cos_floor(abs(lat) + dlat))
+        row_lo, col_lo = geocell(lat - dlat, lng - dlng, self.cell_deg)
+        row_hi, col_hi = geocell(lat + dlat, lng + dlng, self.cell_deg)
+
+        ids: list[DriverId] = []
+        coords: list[tuple[float, float]] = []
+        cells = self._cells
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                bucket = cells.get((row, col))
+                if bucket:
+                    ids.extend(bucket)
+                    coords.extend(bucket.values())
+        if not ids:
+            return []
+
+        km = _distances(lat, lng, coords)
+        hits = np.flatnonzero(km <= radius_km)
+        hits = hits[np.argsort(km[hits], kind="stable")]
+        return [(ids[i], float(km[i])) for i in hits.tolist()]
+
+    def nearest(
+        self, lat: float, lng: float, k: int, max_radius_km: Optional[float] = None
+    ) -> list[tuple[DriverId, float]]:
+        """The ``k`` closest drivers as ``(driver_id, km)``, nearest first."""
+        if k <= 0 or not self._where:
+            return []
+        qrow, qcol = geocell(lat, lng, self.cell_deg)
+        ids: list[DriverId] = []
+        km = np.empty(0)
+        cells = self._cells
+        ring = 0
+        while True:
+            coords: list[tuple[float, float]] = []
+            for cell in _ring(qrow, qcol, ring):
+                bucket = cells.get(cell)
+                if bucket:
+                    ids.extend(bucket)
+                    coords.extend(bucket.values())
+            if coords:
+                km = np.concatenate((km, _distances(lat, lng, coords)))
+            covered = self._covered_km(lat, lng, qrow, qcol, ring)
+            if len(ids) >= k and np.partition(km, k - 1)[k - 1] <= covered:
+                break
+            if max_radius_km is not None and covered >= max_radius_km:
+                break
+            if (2 * ring + 1) ** 2 >= len(cells):
+                # Another ring would cost more than reading every occupied cell left.
+                coords = []
+                for (row, col), bucket in cells.items():
+                    if max(abs(row - qrow), abs(col - qcol)) > ring:
+                        ids.extend(bucket)
+                        coords.extend(bucket.values())
+                if coords:
+                    km = np.concatenate((km, _distances(lat, lng, coords)))
+                break
+            ring += 1
+
+        if not ids:
+            return []
+        if max_radius_km is not None:
+            order = np.flatnonzero(km <= max_radius_km)
+        else:
+            order = np.arange(len(ids))
+        if len(order) > k:
+            order = order[np.argpartition(km[order], k - 1)[:k]]
+        order = order[np.argsort(km[order], kind="stable")]
+        return [(ids[i], float(km[i])) for i in order.tolist()]
+
+    def _covered_km(self, lat: float, lng: float, qrow: int, qcol: int, ring: int) -> float:
+        """Distance from the query to the nearest edge of the searched square."""
+        size = self.cell_deg
+        south, north = (qrow - ring) * size, (qrow + ring + 1) * size
+        west, east = (qcol - ring) * size, (qcol + ring + 1) * size
+        lat_gap = min(lat - south, north - lat)
+        lng_gap = min(lng - west, east - lng)
+        cos_edge = _cos_floor(max(abs(south), abs(north)))
+        return min(lat_gap, lng_gap * cos_edge) * KM_PER_DEGREE_LAT
+
+
+def _ring(row: int, col: int, ring: int) -> Iterator[Cell]:
+    if ring == 0:
+        yield row, col
+        return
+    for c in range(col - ring, col + ring + 1):
+        yield row - ring, c
+        yield row + ring, c
+    for r in range(row - ring + 1, row + ring):
+        yield r, col - ring
+        yield r, col + ring
+
+
+def _distances(lat: float, lng: float, coords: list[tuple[float, float]]) -> np.ndarray:
+    points = np.asarray(coords, dtype=np.float64)
+    return haversine_km(lat, lng, points[:, 0], points[:, 1])
+
+
+def _cos_floor(lat_deg: float) -> float:
+    # Longitude degrees shrink towards the poles; never divide by ~0.
+    return max(math.cos(math.radians(min(lat_deg, 89.0))), 1e-3)
@@ -0,0 +1,744 @@
+"""
+Import graph
+============
+
+Nothing checked that what the app ships is used.  ``constants/index.ts``
+imports every icon and image.  ``components/index.ts`` re-exports every
+component.  The file lists in ``IMPLEMENTATION_COMPLETE.py`` were never
+compared with the tree.  :class:`ImportGraph` parses the modules under
+``app/``, ``components/``, ``lib/`` and ``constants/``, and any local module
+they import.  It then walks the graph from the entry points.
+
+Parsing is textual.  Comments are dropped and strings masked, then regular
+expressions read the import and export statements, ``require()`` calls and
+the identifiers in each ``export const`` initialiser.  An exported object
+literal (``icons = { star, ... }``) keeps one set of references per key.  So
+``icons.star`` in a screen reaches ``star.png``, but not the other 24 icons.
+
+The walk starts at every file in ``app/``, since expo-router makes each one a
+route, and at the assets ``app.json`` names.  It follows these rules:
+
+* Reaching a module follows what its code uses outside its ``export const``
+  initialisers.
+* Importing a name follows that export.  A member access ``x.key`` narrows
+  it to one key, and any other use of ``x`` takes all of it.
+* Type-only imports and ``.d.ts`` files are not followed.
+
+Each asset and module gets one status, and density variants (``@2x``,
+``@3x``) share their asset's:
+
+* ``used``: reached.
+* ``unused``: bundled, that is imported through value imports from a route,
+  but not reached.  Metro ships it anyway, so these are the bytes that
+  pruning an import saves.
+* ``orphan``: not bundled.  It only sits in the repository.
+
+Bindings imported from packages are not tracked.
+
+:func:`check_manifest` compares the manifest's file lists, component
+entries, services and screens with the tree and the graph.
+
+Each file's parse is cached under ``cache_dir`` by the SHA-256 of its
+content and :data:`GRAPH_VERSION`, so a re-run parses only the files that
+changed.  A file parses in about a millisecond and starting a worker costs
+tens, so misses are parsed inline unless there are at least
+:data:`POOL_THRESHOLD` of them (a cold run of this app is about 45 files) or
+``workers`` is given.
+
+    python -m ridehub.imports [--root .] [--cache .asset-cache] [--workers N] [--report graph.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from ridehub.assets import split_scale
+from ridehub.manifest import MANIFEST, Manifest
+
+# Bump when parsing changes so cached parses are redone.
+GRAPH_VERSION = 1
+SOURCE_DIRS = ("app", "components", "lib", "constants")
+ROUTES = "app"
+APP_CONFIG = "app.json"
+ASSET_DIR = "assets"
+DEFAULT_CACHE = ".asset-cache"
+POOL_THRESHOLD = 200  # misses below this parse inline unless ``workers`` says otherwise
+EXTENSIONS = (".tsx", ".ts", ".jsx", ".js")
+ASSET_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ttf", ".otf")
+
+_LEXEME = re.compile(
+    r"""//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`""", re.S
+)
+_TEMPLATE_EXPR = re.compile(r"\$\{[^}]*\}")
+_IMPORT = re.compile(
+    r"""import\s+(?:(?P<type>type)\s+)?(?P<clause>[\w$*{}\s,]+?)\s*\bfrom\s*"""
+    r"""["'](?P<spec>[^"'\n]+)["']"""
+)
+_BARE_IMPORT = re.compile(r"""import\s*["'](?P<spec>[^"'\n]+)["']""")
+_EXPORT_FROM = re.compile(
+    r"""export\s+(?:(?P<type>type)\s+)?(?P<clause>\*(?:\s+as\s+[\w$]+)?|\{[^}]*\})\s*from\s*"""
+    r"""["'](?P<spec>[^"'\n]+)["']"""
+)
+_CALL = re.compile(r"""(?:require|import)\s*\(\s*["'](?P<spec>[^"'\n]+)["']\s*\)""")
+_EXPORT_DECL = re.compile(
+    r"export\s+(?:default\s+)?(?:declare\s+)?(?:async\s+)?(?:abstract\s+)?"
+    r"(?:function\*?|class|const|let|var|enum)\s+(?P<name>[\w$]+)"
+)
+_EXPORT_DEFAULT = re.compile(r"export\s+default\b")
+_EXPORT_LIST = re.compile(r"export\s+\{(?P<names>[^}]*)\}(?!\s*from)")
+_EXPORT_CONST = re.compile(r"export\s+const\s+(?P<name>[\w$]+)\s*(?::[^=]+)?=(?!>)")
+# Member access or indexing after a reference; see _references().
+_ACCESS = r"(?:\s*\??\.\s*(?P<prop>[A-Za-z_$][\w$]*)|\s*(?P<index>\[))?"
+_CONTINUES = ".?:+-*/|&,=)]}>"
+_LOCAL = (".", "@/")  # specifier prefixes that resolve inside the root
+_WORD = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$.")
+
+
+class GraphError(ValueError):
+    """The root is not an app tree the graph can be built from."""
+
+
+def _find(pattern: re.Pattern, text: str, start: int = 0, end: Optional[int] = None):
+    """``pattern``'s matches that start a word.
+
+    The patterns begin with a keyword rather than ``\\b``, so :mod:`re` can scan for
+    the literal; the boundary is checked here instead.
+    """
+    for match in pattern.finditer(text, start, len(text) if end is None else end):
+        if not match.start() or text[match.start() - 1] not in _WORD:
+            yield match
+
+
+def _references(names: set[str]) -> Optional[re.Pattern]:
+    """A pattern for uses of ``names`` only, so the scan skips every other identifier."""
+    if not names:
+        return None
+    alternatives = "|".join(sorted(map(re.escape, names), key=len, reverse=True))
+    return re.compile(rf"(?<![\w$.])(?P<name>{alternatives})(?![\w$]){_ACCESS}")
+
+
+def _blank(text: str) -> str:
+    return re.sub(r"[^\n]", " ", text) if "\n" in text else " " * len(text)
+
+
+def _mask(source: str) -> tuple[str, str]:
+    """``source`` without comments, and the same with string contents blanked too.
+
+    Both keep every offset, so a match in one can be sliced from the other.
+    Template literals keep their ``${...}`` expressions.
+    """
+    code, masked = [], []
+    last = 0
+    for match in _LEXEME.finditer(source):
+        text = match.group()
+        code.append(source[last : match.start()])
+        masked.append(source[last : match.start()])
+        if text[0] == "/":
+            code.append(_blank(text))
+            masked.append(_blank(text))
+        elif text[0] == "`":
+            code.append(text)
+            pieces, at = [], 0
+            for expr in _TEMPLATE_EXPR.finditer(text):
+                pieces.append(_blank(text[at : expr.start()]) + expr.group())
+                at = expr.end()
+            masked.append("".join(pieces) + _blank(text[at:]))
+        else:
+            code.append(text)
+            masked.append(text[0] + _blank(text[1:-1]) + text[-1])
+        last = match.end()
+    code.append(source[last:])
+    masked.append(source[last:])
+    return "".join(code), "".join(masked)
+
+
+def _statement_end(masked: str, start: int) -> int:
+    """Where the expression starting at ``start`` ends: ``;``, or a line that starts anew."""
+    depth = 0
+    for at in range(start, len(masked)):
+        char = masked[at]
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+            if depth < 0:
+                return at
+        elif depth == 0 and char == ";":
+            return at + 1
+        elif depth == 0 and char == "\n":
+            before, after = masked[start:at].rstrip(), masked[at:].lstrip()
+            if before and before[-1] not in _CONTINUES + "([{" and after[:1] not in _CONTINUES:
+                return at
+    return len(masked)
+
+
+def _split(masked: str, start: int, end: int) -> list[tuple[int, int]]:
+    """Spans of the top-level comma-separated items of ``masked[start:end]``."""
+    spans, depth, first = [], 0, start
+    for at in range(start, end):
+        char = masked[at]
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == "," and depth == 0:
+            spans.append((first, at))
+            first = at + 1
+    spans.append((first, end))
+    return [(s, e) for s, e in spans if masked[s:e].strip()]
+
+
+def _refs(code: str, masked: str, start: int, end: int, known: Optional[re.Pattern]) -> dict:
+    """``{local: [props]}`` of the known names used in a span; ``None`` means all of it."""
+    found: dict[str, Optional[set[str]]] = {}
+
+    def add(name: str, prop: Optional[str]) -> None:
+        if name in found and found[name] is None:
+            return
+        found[name] = None if prop is None else found.get(name, set()) | {prop}
+
+    for match in known.finditer(masked, start, end) if known else ():
+        add(match["name"], match["prop"])
+    for match in _find(_CALL, code, start, end):
+        add("require:" + match["spec"], None)
+    return {k: None if v is None else sorted(v) for k, v in sorted(found.items())}
+
+
+def _clause(clause: str) -> dict[str, str]:
+    """``{local: imported}`` of an import clause; ``*`` is a namespace import."""
+    bindings = {}
+    default, _, named = clause.partition("{")
+    for part in default.split(","):
+        part = part.strip()
+        if part.startswith("*"):
+            bindings[part.split()[-1]] = "*"
+        elif part:
+            bindings[part] = "default"
+    for part in named.rstrip("} \n").split(","):
+        words = part.split()
+        if not words or words[0] == "type":
+            continue
+        bindings[words[-1]] = words[0]
+    return bindings
+
+
+def parse_module(source: str) -> dict:
+    """What one module imports, exports and uses, as a JSON-able record."""
+    code, masked = _mask(source)
+    imports, reexports, exports = [], [], set()
+    statements = []  # spans left out of the module-level uses
+    for match in _find(_IMPORT, code):
+        imports.append([match["spec"], _clause(match["clause"]), bool(match["type"])])
+        statements.append(match.span())
+    for match in _find(_BARE_IMPORT, code):
+        imports.append([match["spec"], {}, False])
+        statements.append(match.span())
+    for match in _find(_EXPORT_FROM, code):
+        clause = match["clause"]
+        if clause.startswith("*"):
+            names = {clause.split()[-1]: "*"} if " as " in clause else {"*": "*"}
+        else:
+            names = {
+                words[-1]: words[0]
+                for words in (part.split() for part in clause.strip("{}").split(","))
+                if words and words[0] != "type"
+            }
+        if not match["type"]:
+            reexports.append([match["spec"], names])
+            exports.update(name for name in names if name != "*")
+        statements.append(match.span())
+    for match in _find(_CALL, code):
+        imports.append([match["spec"], {"require:" + match["spec"]: "*"}, False])
+    exports.update(match["name"] for match in _find(_EXPORT_DECL, masked))
+    if any(_find(_EXPORT_DEFAULT, masked)):
+        exports.add("default")
+    for match in _find(_EXPORT_LIST, masked):
+        exports.update(p.split()[-1] for p in match["names"].split(",") if p.strip())
+
+    # Bindings from packages (View, Text, router...) lead nowhere in the graph; skip them.
+    locals_ = {
+        local
+        for spec, bindings, type_only in imports
+        if spec.startswith(_LOCAL) and not type_only
+        for local in bindings
+    }
+    constants = {match["name"]: match for match in _find(_EXPORT_CONST, masked)}
+    known = _references(locals_ | set(constants))
+    declarations = {}
+    for name, match in constants.items():
+        start = match.end()
+        end = _statement_end(masked, start)
+        statements.append((match.start(), end))
+        body = masked[start:end].lstrip()
+        keys: Optional[dict] = None
+        if body.startswith("{"):
+            open_at = masked.index("{", start)
+            keys = {}
+            for s, e in _split(masked, open_at + 1, _statement_end(masked, open_at + 1)):
+                item = masked[s:e].strip()
+                colon = _top_level(masked, s, e, ":")
+                if item.startswith(("...", "[")):
+                    keys = None
+                    break
+                if colon is not None:
+                    key = code[s:colon].strip().strip("\"'")
+                    keys[key] = _refs(code, masked, colon + 1, e, known)
+                else:
+                    shorthand = re.match(r"(?:async\s+|get\s+|set\s+)?([\w$]+)", item)
+                    if shorthand is None:
+                        keys = None
+                        break
+                    keys[shorthand[1]] = _refs(code, masked, s, e, known)
+        declarations[name] = {"refs": _refs(code, masked, start, end, known), "keys": keys}
+
+    outside_code, outside = code, masked
+    for s, e in statements:
+        outside_code = outside_code[:s] + _blank(outside_code[s:e]) + outside_code[e:]
+        outside = outside[:s] + _blank(outside[s:e]) + outside[e:]
+    return {
+        "imports": imports,
+        "reexports": reexports,
+        "exports": sorted(exports),
+        "declarations": declarations,
+        "uses": _refs(outside_code, outside, 0, len(outside), known),
+    }
+
+
+def _top_level(masked: str, start: int, end: int, char: str) -> Optional[int]:
+    depth = 0
+    for at in range(start, end):
+        if masked[at] in "([{":
+            depth += 1
+        elif masked[at] in ")]}":
+            depth -= 1
+        elif masked[at] == char and depth == 0:
+            return at
+    return None
+
+
+@dataclass
+class Usage:
+    path: str  # an asset as imported (its density variants are in ``files``) or a module
+    kind: str  # asset, component or module
+    status: str  # used, unused or orphan
+    bytes: int
+    files: list[str]
+    imported_by: list[str] = field(default_factory=list)  # bundled importers
+
+
+@dataclass
+class ManifestIssue:
+    section: str
+    entry: str
+    problem: str
+
+
+@dataclass
+class GraphReport:
+    modules: int = 0
+    parsed: int = 0
+    cached: int = 0
+    bundled: int = 0  # modules imported, directly or not, by a route
+    used: int = 0  # modules the walk reached
+    edges: int = 0
+    external: list[str] = field(default_factory=list)  # packages imported
+    unresolved: list[str] = field(default_factory=list)  # "importer: specifier"
+    files: list[Usage] = field(default_factory=list)  # every asset and module
+    manifest: list[ManifestIssue] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def select(self, status: str, kinds: tuple[str, ...] = ()) -> list[Usage]:
+        return [u for u in self.files if u.status == status and (not kinds or u.kind in kinds)]
+
+    def bytes(self, status: str, kinds: tuple[str, ...] = ()) -> int:
+        return sum(u.bytes for u in self.select(status, kinds))
+
+    def to_dict(self) -> dict:
+        return {
+            "modules": self.modules,
+            "parsed": self.parsed,
+            "cached": self.cached,
+            "bundled": self.bundled,
+            "used": self.used,
+            "edges": self.edges,
+            "external": self.external,
+            "unresolved": self.unresolved,
+            "unused_bytes": self.bytes("unused"),
+            "orphan_bytes": self.bytes("orphan"),
+            "files": [asdict(u) for u in self.files],
+            "manifest": [asdict(i) for i in self.manifest],
+            "seconds": self.seconds,
+        }
+
+
+class ImportGraph:
+    """The module graph of ``root``, walked from the routes in ``app/``."""
+
+    def __init__(
+        self,
+        root: str = ".",
+        *,
+        cache_dir: str = DEFAULT_CACHE,
+        workers: Optional[int] = None,
+        manifest: Optional[str] = MANIFEST,
+    ) -> None:
+        self.root = root
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.manifest = manifest
+        self.records: dict[str, dict] = {}
+        self._resolved: dict[tuple[str, str], tuple[str, str]] = {}
+
+    def analyze(self) -> GraphReport:
+        start = time.perf_counter()
+        report = GraphReport()
+        if not os.path.isdir(os.path.join(self.root, ROUTES)):
+            raise GraphError(f"{self.root}: no {ROUTES}/ directory")
+        self.records, self._resolved = {}, {}
+        pending = self._sources()
+        while pending:
+            self._parse(pending, report)
+            found = set()
+            for path in pending:
+                for spec, _, _ in self._imports(path):
+                    kind, target = self.resolve(path, spec)
+                    if kind == "module" and target not in self.records:
+                        found.add(target)
+            pending = sorted(found)
+        report.modules = len(self.records)
+
+        routes = [path for path in sorted(self.records) if path.startswith(ROUTES + "/")]
+        walk = _Walk(self)
+        for path in routes:
+            walk.reach(path)
+        walk.assets.update(self._configured_assets())
+        bundled, stack = set(routes), list(routes)
+        imported_by: dict[str, set[str]] = {}
+        external, unresolved = set(), set()
+        while stack:
+            path = stack.pop()
+            for spec, _, type_only in self._imports(path):
+                kind, target = self.resolve(path, spec)
+                if kind == "external":
+                    external.add(target)
+                elif kind == "unresolved":
+                    unresolved.add(f"{path}: {spec}")
+                if kind not in ("module", "asset") or type_only:
+                    continue
+                report.edges += 1
+                imported_by.setdefault(target, set()).add(path)
+                if kind == "module" and target not in bundled:
+                    bundled.add(target)
+                    stack.append(target)
+        report.bundled, report.used = len(bundled), len(walk.reached)
+        report.external, report.unresolved = sorted(external), sorted(unresolved)
+
+        def status(used: bool, path: str) -> str:
+            return "used" if used else "unused" if path in imported_by else "orphan"
+
+        for asset, files in sorted(self._asset_files().items()):
+            size = sum(os.path.getsize(os.path.join(self.root, f)) for f in files)
+            usage = Usage(asset, "asset", status(asset in walk.assets, asset), size, files)
+            report.files.append(usage)
+        for path in sorted(self.records):
+            if path.endswith(".d.ts"):
+                continue
+            kind = "component" if path.startswith("components/") else "module"
+            size = os.path.getsize(os.path.join(self.root, path))
+            used = path in walk.reached
+            report.files.append(Usage(path, kind, status(used, path), size, [path]))
+        for usage in report.files:
+            usage.imported_by = sorted(imported_by.get(usage.path, ()))
+        if self.manifest:
+            path = os.path.join(self.root, self.manifest)
+            if os.path.exists(path):
+                statuses = {usage.path: usage.status for usage in report.files}
+                report.manifest = check_manifest(Manifest(path), self.root, statuses)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def resolve(self, importer: str, spec: str) -> tuple[str, str]:
+        """``(kind, target)``: a local ``module``, ``types``, ``asset``, ``external`` or
+        ``unresolved``."""
+        key = (importer, spec)
+        if key not in self._resolved:
+            self._resolved[key] = self._resolve(importer, spec)
+        return self._resolved[key]
+
+    def _resolve(self, importer: str, spec: str) -> tuple[str, str]:
+        if spec.startswith("@/"):
+            base = posixpath.normpath(spec[2:])
+        elif spec.startswith("."):
+            base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+        else:
+            parts = spec.split("/")
+            return "external", "/".join(parts[:2] if spec.startswith("@") else parts[:1])
+        if base.lower().endswith(ASSET_EXTENSIONS):
+            stem, ext = posixpath.splitext(base)
+            variants = (base, *(f"{stem}@{scale}x{ext}" for scale in (2, 3)))
+            if any(os.path.isfile(os.path.join(self.root, v)) for v in variants):
+                return "asset", base
+            return "unresolved", spec
+        for ext in ("", *EXTENSIONS, ".d.ts"):
+            for candidate in (base + ext, posixpath.join(base, "index") + ext if ext else None):
+                if candidate and os.path.isfile(os.path.join(self.root, candidate)):
+                    if candidate.endswith(".d.ts"):
+                        return "types", candidate
+                    if candidate.endswith(EXTENSIONS):
+                        return "module", candidate
+        return "unresolved", spec
+
+    def _imports(self, path: str) -> list:
+        record = self.records[path]
+        return record["imports"] + [[spec, {}, False] for spec, _ in record["reexports"]]
+
+    def _sources(self) -> list[str]:
+        found = []
+        for directory in SOURCE_DIRS:
+            for parent, dirs, files in os.walk(os.path.join(self.root, directory)):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(EXTENSIONS) and not name.endswith(".d.ts"):
+                        path = os.path.relpath(os.path.join(parent, name), self.root)
+                        found.append(path.replace(os.sep, "/"))
+        return found
+
+    def _asset_files(self) -> dict[str, list[str]]:
+        """Every asset under ``assets/``, by its unsuffixed name."""
+        assets: dict[str, list[str]] = {}
+        for parent, dirs, files in os.walk(os.path.join(self.root, ASSET_DIR)):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(ASSET_EXTENSIONS):
+                    path = os.path.relpath(os.path.join(parent, name), self.root)
+                    path = path.replace(os.sep, "/")
+                    assets.setdefault(split_scale(path)[0], []).append(path)
+        return assets
+
+    def _configured_assets(self) -> set[str]:
+        """Assets ``app.json`` names: the icon, splash screen, adaptive icon and favicon."""
+        try:
+            with open(os.path.join(self.root, APP_CONFIG), encoding="utf-8") as handle:
+                text = handle.read()
+        except FileNotFoundError:
+            return set()
+        return {
+            split_scale(posixpath.normpath(path))[0]
+            for path in re.findall(r'"\./([^"]+)"', text)
+            if path.lower().endswith(ASSET_EXTENSIONS)
+        }
+
+    def _parse(self, paths: list[str], report: GraphReport) -> None:
+        """Fill ``self.records`` for ``paths``, from the cache or by parsing the misses."""
+        misses: list[tuple[str, str, str]] = []
+        for path in paths:
+            with open(os.path.join(self.root, path), "rb") as handle:
+                data = handle.read()
+            key = hashlib.sha256(f"v{GRAPH_VERSION}|".encode() + data).hexdigest()
+            try:
+                with open(self._record_path(key), encoding="utf-8") as handle:
+                    self.records[path] = json.load(handle)
+                report.cached += 1
+            except FileNotFoundError:
+                misses.append((path, key, data.decode("utf-8", "replace")))
+        if not misses:
+            return
+        sources = [source for _, _, source in misses]
+        workers = self.workers
+        if workers is None:
+            workers = (os.cpu_count() or 1) if len(misses) >= POOL_THRESHOLD else 1
+        if workers > 1 and len(misses) > 1:
+            with ProcessPoolExecutor(min(workers, len(misses))) as pool:
+                parsed = list(pool.map(parse_module, sources, chunksize=8))
+        else:
+            parsed = [parse_module(source) for source in sources]
+        for (path, key, _), record in zip(misses, parsed):
+            self.records[path] = record
+            _write_atomic(self._record_path(key), json.dumps(record).encode())
+        report.parsed += len(misses)
+
+    def _record_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "imports", "records", key[:2], key + ".json")
+
+
+class _Walk:
+    """Reachability over exports and their keys, from a set of entry modules."""
+
+    def __init__(self, graph: ImportGraph) -> None:
+        self.graph = graph
+        self.reached: set[str] = set()
+        self.assets: set[str] = set()
+        self._demanded: set[tuple[str, Optional[str], Optional[str]]] = set()
+
+    def reach(self, path: str) -> None:
+        if path in self.reached:
+            return
+        self.reached.add(path)
+        record = self.graph.records[path]
+        for spec, bindings, type_only in record["imports"]:
+            if not bindings and not type_only:  # import "./side-effect"
+                self._follow(path, spec, None, None)
+        for local, props in record["uses"].items():
+            self.use(path, local, props)
+
+    def use(self, path: str, local: str, props: Optional[list[str]]) -> None:
+        """``path``'s code uses ``local`` (or only ``local.props``)."""
+        record = self.graph.records[path]
+        if local in record["declarations"]:
+            for prop in props or [None]:
+                self.demand(path, local, prop)
+            return
+        for spec, bindings, type_only in record["imports"]:
+            if local in bindings and not type_only:
+                imported = bindings[local]
+                if imported == "*":
+                    for prop in props or [None]:
+                        self._follow(path, spec, prop, None)
+                else:
+                    for prop in props or [None]:
+                        self._follow(path, spec, imported, prop)
+
+    def _follow(self, path: str, spec: str, name: Optional[str], key: Optional[str]) -> None:
+        kind, target = self.graph.resolve(path, spec)
+        if kind == "asset":
+            self.assets.add(target)
+        elif kind == "module":
+            self.demand(target, name, key)
+
+    def demand(self, path: str, name: Optional[str], key: Optional[str]) -> None:
+        """Export ``name`` of ``path`` (all exports if ``None``), or its ``key`` alone."""
+        if (path, name, key) in self._demanded:
+            return
+        self._demanded.add((path, name, key))
+        self.reach(path)
+        record = self.graph.records[path]
+        declarations = record["declarations"]
+        if name is None:
+            for declared in declarations:
+                self.demand(path, declared, None)
+            for spec, names in record["reexports"]:
+                for exported, imported in names.items():
+                    self._follow(path, spec, None if imported == "*" else imported, None)
+        elif name in declarations:
+            keys = declarations[name]["keys"]
+            refs = declarations[name]["refs"] if key is None or keys is None else keys.get(key, {})
+            for local, props in refs.items():
+                self.use(path, local, props)
+        else:
+            for spec, names in record["reexports"]:
+                if name in names:
+                    imported = names[name]
+                    self._follow(path, spec, None if imported == "*" else imported, key)
+                elif "*" in names and name != "default":
+                    self._follow(path, spec, name, key)
+
+
+def check_manifest(manifest: Manifest, root: str, statuses: dict[str, str]) -> list[ManifestIssue]:
+    """Claims of the manifest that the tree or the graph contradicts.
+
+    ``statuses`` maps a path to its status in the graph: used, unused or orphan.
+    """
+    issues = []
+    sections = set(manifest.sections())
+
+    def entries(section: str):
+        return manifest[section] if section in sections else ()
+
+    def check(section: str, entry: str, path: str) -> None:
+        status = statuses.get(path)
+        if not os.path.exists(os.path.join(root, path)):
+            issues.append(ManifestIssue(section, entry, f"{path} does not exist"))
+        elif status == "unused":
+            issues.append(ManifestIssue(section, entry, f"{path} is bundled but never used"))
+        elif status == "orphan":
+            issues.append(ManifestIssue(section, entry, f"{path} is imported by no route"))
+
+    for entry in entries("files_created"):
+        check("files_created", entry, entry)
+    for entry in entries("files_modified"):
+        check("files_modified", entry, entry.split(" - ")[0].strip())
+    for entry in entries("documentation_created"):
+        check("documentation_created", entry, entry)
+    for section in ("new_components_created", "enhanced_components"):
+        for name, entry in dict(entries(section)).items():
+            check(section, name, entry.get("file") or f"components/{name}.tsx")
+    for name, entry in dict(entries("backend_services")).items():
+        for key in ("file", "benchmark"):
+            if key in entry:
+                check("backend_services", name, entry[key])
+    routes = {
+        posixpath.splitext(posixpath.basename(path))[0]
+        for path in statuses
+        if path.startswith(ROUTES + "/")
+    }
+    for entry in entries("screens_enhanced"):
+        listed = re.search(r"\(([^)]*)\)", entry)
+        names = listed[1].split(",") if listed else [re.sub(r"\s+Screens?$", "", entry)]
+        for name in names:
+            slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+            if slug not in routes:
+                issues.append(ManifestIssue("screens_enhanced", entry, f"no route {slug}"))
+    return issues
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--cache", default=DEFAULT_CACHE)
+    parser.add_argument(
+        "--workers", type=int, help=f"parse pool size (default: inline below {POOL_THRESHOLD})"
+    )
+    parser.add_argument("--report", help="write the JSON report here")
+    parser.add_argument(
+        "--strict", action="store_true", help="exit 1 on unused files or manifest issues"
+    )
+    args = parser.parse_args(argv)
+    graph = ImportGraph(args.root, cache_dir=args.cache, workers=args.workers)
+    try:
+        report = graph.analyze()
+    except GraphError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"{report.modules} modules ({report.parsed} parsed, {report.cached} cached), "
+        f"{report.bundled} bundled, {report.used} used, {report.edges} local imports, "
+        f"{len(report.external)} packages, {report.seconds:.2f} s"
+    )
+    for status, note in (("unused", "bundled, never used"), ("orphan", "imported by no route")):
+        usages = report.select(status)
+        print(f"{status} ({note}): {len(usages)} files, {report.bytes(status):,} bytes")
+        for usage in usages:
+            via = f"  <- {', '.join(usage.imported_by)}" if usage.imported_by else ""
+            print(f"  {usage.path:<50} {usage.bytes:>9,}  {usage.kind}{via}")
+    for spec in report.unresolved:
+        print(f"warning: cannot resolve {spec}", file=sys.stderr)
+    for issue in report.manifest:
+        print(f"warning: {MANIFEST} {issue.section}: {issue.problem}", file=sys.stderr)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump(report.to_dict(), handle, indent=2)
+    if args.strict and (report.select("unused") or report.manifest):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Driver GPS ingestion
+====================
+
+``store/index.ts`` only ever sets driver positions once through ``setDrivers``.
+This module handles the continuous stream a live fleet sends.
+
+Updates arrive as columnar :class:`PositionBatch` objects.  Every tick the
+:class:`PositionIngestor` drains whatever batches are queued, keeps only the
+newest fix per driver, and applies the result to the :class:`DriverTable` in a
+single vectorized pass.
+
+The table is copy-on-write: each apply builds new arrays and publishes them as
+an immutable :class:`Snapshot` with one attribute assignment.  Readers such as
+the marker endpoint or ``ridehub.eta`` grab ``table.snapshot`` and keep a
+consistent view for as long as they need it, without ever taking a lock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from ridehub.metrics import counter, histogram, timed
+
+_APPLY_SECONDS = histogram(
+    "ridehub_driver_table_apply_seconds", "DriverTable.apply of one coalesced batch"
+)
+_FIXES_APPLIED = counter("ridehub_position_fixes_applied_total", "GPS fixes written to the table")
+
+
+@dataclass(frozen=True)
+class PositionBatch:
+    """Columnar position updates: parallel arrays of equal length."""
+
+    driver_ids: np.ndarray  # int64
+    latitudes: np.ndarray  # float64
+    longitudes: np.ndarray  # float64
+    fixed_at: np.ndarray  # float64, seconds since epoch of the GPS fix
+
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[int, float, float, float]]) -> "PositionBatch":
+        rows = np.array(list(records), dtype=np.float64).reshape(-1, 4)
+        return cls(rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2], rows[:, 3])
+
+    def __len__(self) -> int:
+        return len(self.driver_ids)
+
+    @property
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        return self.driver_ids, self.latitudes, self.longitudes, self.fixed_at
+
+    @classmethod
+    def concat(cls, batches: list["PositionBatch"]) -> "PositionBatch":
+        if len(batches) == 1:
+            return batches[0]
+        return cls(*(np.concatenate(column) for column in zip(*(b.columns for b in batches))))
+
+    def latest_per_driver(self) -> "PositionBatch":
+        """Coalesce to one update per driver, keeping the newest fix."""
+        if len(self.driver_ids) < 2:
+            return self
+        order = np.lexsort((self.fixed_at, self.driver_ids))
+        ids = self.driver_ids[order]
+        last = np.empty(len(ids), dtype=bool)
+        last[:-1] = ids[1:] != ids[:-1]
+        last[-1] = True
+        keep = order[last]
+        return self.take(keep)
+
+    def take(self, index: np.ndarray) -> "PositionBatch":
+        """Rows selected by an integer or boolean index."""
+        return PositionBatch(*(column[index] for column in self.columns))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Immutable, internally consistent view of the driver table."""
+
+    version: int
+    driver_ids: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    fixed_at: np.ndarray
+    # Shared, append-only id -> slot map; slots >= len(self) are not visible yet.
+    _slots: dict = field(repr=False)
+
+    def __len__(self) -> int:
+        return len(self.driver_ids)
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """(N, 2) lat/lng array, ready for ``EtaEngine.batch``."""
+        return np.column_stack((self.latitudes, self.longitudes))
+
+    def position(self, driver_id: int) -> Optional[tuple[float, float]]:
+        slot = self._slots.get(driver_id)
+        if slot is None or slot >= len(self.driver_ids):
+            return None
+        return float(self.latitudes[slot]), float(self.longitudes[slot])
+
+
+ApplyListener = Callable[[Snapshot, PositionBatch], None]
+
+
+class DriverTable:
+    """Array-backed driver positions published as copy-on-write snapshots."""
+
+    def __init__(self) -> None:
+        self._slots: dict[int, int] = {}
+        empty = np.empty(0)
+        self.snapshot = _freeze(0, np.empty(0, dtype=np.int64), empty, empty, empty, self._slots)
+        self._listeners: list[ApplyListener] = []
+
+    def subscribe(self, listener: ApplyListener) -> None:
+        """Call ``listener(snapshot, applied)`` after every apply."""
+        self._listeners.append(listener)
+
+    @timed(_APPLY_SECONDS)
+    def apply(self, batch: PositionBatch) -> Snapshot:
+        """Apply a batch in one pass and publish a new snapshot.
+
+        Fixes older than the one already stored for a driver are ignored, so
+        late or reordered GPS packets never move a driver backwards in time.
+        A driver listed more than once keeps only its newest fix.
+        """
+        current = self.snapshot
+        if not len(batch):
+            return current
+
+        slots = self._slots
+        size = len(current)
+        ids = batch.driver_ids.tolist()
+        if len(set(ids)) != len(ids):
+            batch = batch.latest_per_driver()
+            ids = batch.driver_ids.tolist()
+        new_ids = [driver_id for driver_id in ids if driver_id not in slots]
+        for offset, driver_id in enumerate(new_ids):
+            slots[driver_id] = size + offset
+        target = np.fromiter((slots[driver_id] for driver_id in ids), dtype=np.int64, count=len(ids))
+
+        grown = size + len(new_ids)
+        driver_ids = _grow(current.driver_ids, grown, 0)
+        latitudes = _grow(current.latitudes, grown, np.nan)
+        longitudes = _grow(current.longitudes, grown, np.nan)
+        fixed_at = _grow(current.fixed_at, grown, -np.inf)
+
+        fresh = batch.fixed_at >= fixed_at[target]
+        if not fresh.all():
+            target = target[fresh]
+            batch = batch.take(fresh)
+        driver_ids[target] = batch.driver_ids
+        latitudes[target] = batch.latitudes
+        longitudes[target] = batch.longitudes
+        fixed_at[target] = batch.fixed_at
+        _FIXES_APPLIED.inc(len(batch))
+
+        snapshot = _freeze(current.version + 1, driver_ids, latitudes, longitudes, fixed_at, slots)
+        self.snapshot = snapshot
+        for listener in self._listeners:
+            listener(snapshot, batch)
+        return snapshot
+
+
+class PositionIngestor:
+    """asyncio stage that coalesces queued batches and applies them per tick.
+
+    ``max_pending`` bounds the number of queued batches; ``submit`` waits when
+    the queue is full, pushing backpressure to the producers.
+    """
+
+    def __init__(
+        self, table: DriverTable, *, tick_interval: float = 0.05, max_pending: int = 1024
+    ) -> None:
+        self.table = table
+        self.tick_interval = tick_interval
+        self._queue: asyncio.Queue[PositionBatch] = asyncio.Queue(maxsize=max_pending)
+        self._stopping = False
+        self.updates_received = 0
+        self.updates_applied = 0
+        self.ticks = 0
+
+    async def submit(self, batch: PositionBatch) -> None:
+        await self._queue.put(batch)
+        self.updates_received += len(batch)
+
+    def submit_nowait(self, batch: PositionBatch) -> None:
+        """Queue a batch or raise ``asyncio.QueueFull``."""
+        self._queue.put_nowait(batch)
+        self.updates_received += len(batch)
+
+    def flush(self) -> Snapshot:
+        """Drain everything queued right now and apply it as one tick."""
+        batches = []
+        queue = self._queue
+        while not queue.empty():
+            batches.append(queue.get_nowait())
+        if not batches:
+            return self.table.snapshot
+        merged = PositionBatch.concat(batches).latest_per_driver()
+        self.ticks += 1
+        self.updates_applied += len(merged)
+        return self.table.apply(merged)
+
+    async def run(self) -> None:
+        """Tick until :meth:`stop` is called, then apply whatever is left."""
+        while not self._stopping:
+            await asyncio.sleep(self.tick_interval)
+            self.flush()
+        self.flush()
+
+    def stop(self) -> None:
+        self._stopping = True
+
+
+def _grow(array: np.ndarray, size: int, fill) -> np.ndarray:
+    grown = np.empty(size, dtype=array.dtype)
+    grown[: len(array)] = array
+    grown[len(array) :] = fill
+    return grown
+
+
+def _freeze(version, driver_ids, latitudes, longitudes, fixed_at, slots) -> Snapshot:
+    for array in (driver_ids, latitudes, longitudes, fixed_at):
+        array.flags.writeable = False
+    return Snapshot(version, driver_ids, latitudes, longitudes, fixed_at, slots)
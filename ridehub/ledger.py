@@ -0,0 +1,388 @@
+"""
+Append-only wallet ledger
+=========================
+
+``wallet.tsx`` keeps the balance in ``useState(45.5)`` next to a literal
+``transactions`` array, so nothing is durable and a real balance would mean
+summing the whole history.
+
+:class:`WalletLedger` appends fixed-size 128-byte records to a log file and
+reads them back through ``mmap``.  Each record stores the account's balance
+after it, plus back-pointers to the account's previous record overall, of the
+same ``type`` and of the same ``status``.  History pages walk the shortest
+matching chain backwards from an in-memory head, and balances are kept per
+account in memory, so both are independent of history length.
+
+Amounts are stored as integer cents.  Only ``completed`` transactions move
+the balance.  Every ``checkpoint_every`` appends, the per-account state is
+written atomically to ``<log>.ckpt``.  Reopening loads that checkpoint and
+replays only the records appended after it.  A torn or corrupt record at the
+tail (checked by CRC-32) is cut off on open.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterator, Literal, Optional
+
+from ridehub.metrics import counter, histogram, timed
+
+TYPES = ("ride", "refund", "topup", "subscription")
+STATUSES = ("completed", "pending", "failed")
+TransactionType = Literal["ride", "refund", "topup", "subscription"]
+TransactionStatus = Literal["completed", "pending", "failed"]
+
+# account, at (us), amount, balance_after, prev, prev_same_type, prev_same_status,
+# type, status, title length, crc32, title
+_RECORD = struct.Struct("<QqqqqqqBBHI64s")
+RECORD_SIZE = _RECORD.size
+TITLE_BYTES = 64
+_CRC_OFFSET = 60  # the crc field covers everything except itself
+_NONE = -1
+
+_CHECKPOINT_MAGIC = b"RHLC"
+_CHECKPOINT_HEADER = struct.Struct("<4sIQQ")  # magic, version, records covered, accounts
+_ACCOUNT = struct.Struct(f"<Qqq{len(TYPES)}q{len(STATUSES)}q{len(TYPES)}q{len(STATUSES)}q")
+_APPEND_SECONDS = histogram(
+    "ridehub_ledger_append_seconds", "WalletLedger.append_many of one batch"
+)
+_RECORDS_APPENDED = counter("ridehub_ledger_records_total", "Transactions appended to the log")
+
+
+class LedgerError(ValueError):
+    """A transaction was rejected by the ledger."""
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    transactions: list[dict]
+    next_cursor: Optional[str]
+
+
+class _Account:
+    __slots__ = ("balance", "head", "type_heads", "status_heads", "type_counts", "status_counts")
+
+    def __init__(self) -> None:
+        self.balance = 0
+        self.head = _NONE
+        self.type_heads = [_NONE] * len(TYPES)
+        self.status_heads = [_NONE] * len(STATUSES)
+        self.type_counts = [0] * len(TYPES)
+        self.status_counts = [0] * len(STATUSES)
+
+    def pack(self, account: int) -> bytes:
+        return _ACCOUNT.pack(
+            account,
+            self.balance,
+            self.head,
+            *self.type_heads,
+            *self.status_heads,
+            *self.type_counts,
+            *self.status_counts,
+        )
+
+    @classmethod
+    def unpack(cls, raw) -> tuple[int, "_Account"]:
+        values = _ACCOUNT.unpack(raw)
+        state = cls()
+        state.balance, state.head = values[1], values[2]
+        t, s = len(TYPES), len(STATUSES)
+        state.type_heads = list(values[3 : 3 + t])
+        state.status_heads = list(values[3 + t : 3 + t + s])
+        state.type_counts = list(values[3 + t + s : 3 + 2 * t + s])
+        state.status_counts = list(values[3 + 2 * t + s :])
+        return values[0], state
+
+
+class WalletLedger:
+    """Durable per-account transaction log with O(1) balances."""
+
+    def __init__(
+        self, path: str | os.PathLike, *, checkpoint_every: int = 100_000, fsync: bool = False
+    ) -> None:
+        self.path = os.fspath(path)
+        self.checkpoint_path = self.path + ".ckpt"
+        self.checkpoint_every = checkpoint_every
+        self.fsync = fsync
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._map: Optional[mmap.mmap] = None
+        self._mapped = 0
+        self._accounts: dict[int, _Account] = {}
+        self._records = 0
+        self._since_checkpoint = 0
+        self._recover()
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def __enter__(self) -> "WalletLedger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        self.checkpoint()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        os.close(self._fd)
+        self._fd = -1
+
+    def __len__(self) -> int:
+        return self._records
+
+    # -- writes ------------------------------------------------------------
+
+    def append(
+        self,
+        account: int,
+        type: TransactionType,
+        amount: float,
+        *,
+        status: TransactionStatus = "completed",
+        title: str = "",
+        at: Optional[float] = None,
+    ) -> int:
+        """Record one transaction and return its id."""
+        return self.append_many([(account, type, amount, status, title, at)])[0]
+
+    @timed(_APPEND_SECONDS)
+    def append_many(self, transactions) -> range:
+        """Record ``(account, type, amount, status, title, at)`` tuples in one write.
+
+        The batch is validated as a whole before anything is written.
+        """
+        now = time.time()
+        start = self._records
+        staged: dict[int, _Account] = {}
+        chunks = []
+        for offset, (account, type_, amount, status, title, at) in enumerate(transactions):
+            try:
+                t, s = TYPES.index(type_), STATUSES.index(status)
+            except ValueError:
+                raise LedgerError(f"unknown transaction type/status {type_!r}/{status!r}") from None
+            state = staged.get(account)
+            if state is None:
+                state = staged[account] = _copy(self._accounts.get(account))
+            record = start + offset
+            cents = round(amount * 100)
+            if s == 0:
+                state.balance += cents
+            encoded = _truncate_utf8(title.encode("utf-8"), TITLE_BYTES)
+            body = _RECORD.pack(
+                account,
+                round((now if at is None else at) * 1_000_000),
+                cents,
+                state.balance,
+                state.head,
+                state.type_heads[t],
+                state.status_heads[s],
+                t,
+                s,
+                len(encoded),
+                0,
+                encoded,
+            )
+            chunks.append(_with_crc(body))
+            state.head = state.type_heads[t] = state.status_heads[s] = record
+            state.type_counts[t] += 1
+            state.status_counts[s] += 1
+        if not chunks:
+            return range(start, start)
+        data = b"".join(chunks)
+        written = os.write(self._fd, data)
+        if written != len(data):
+            raise OSError(f"short write to {self.path}: {written} of {len(data)} bytes")
+        if self.fsync:
+            os.fsync(self._fd)
+        self._accounts.update(staged)
+        self._records += len(chunks)
+        self._since_checkpoint += len(chunks)
+        _RECORDS_APPENDED.inc(len(chunks))
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+        return range(start, self._records)
+
+    def checkpoint(self) -> None:
+        """Persist per-account state so reopening skips replaying the log."""
+        if self.fsync:
+            os.fsync(self._fd)
+        temporary = self.checkpoint_path + ".tmp"
+        with open(temporary, "wb") as out:
+            out.write(_CHECKPOINT_HEADER.pack(_CHECKPOINT_MAGIC, 1, self._records, len(self._accounts)))
+            out.write(b"".join(state.pack(account) for account, state in self._accounts.items()))
+            out.flush()
+            if self.fsync:
+                os.fsync(out.fileno())
+        os.replace(temporary, self.checkpoint_path)
+        self._since_checkpoint = 0
+
+    # -- reads -------------------------------------------------------------
+
+    def balance(self, account: int) -> float:
+        state = self._accounts.get(account)
+        return 0.0 if state is None else state.balance / 100
+
+    def transaction(self, record: int) -> dict:
+        if not 0 <= record < self._records:
+            raise IndexError(record)
+        return self._decode(record, self._read(record))
+
+    def history(
+        self,
+        account: int,
+        *,
+        type: Optional[TransactionType] = None,
+        status: Optional[TransactionStatus] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> HistoryPage:
+        """Newest-first page of an account's transactions, optionally filtered."""
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        state = self._accounts.get(account)
+        if state is None:
+            return HistoryPage([], None)
+        t = None if type is None else TYPES.index(type)
+        s = None if status is None else STATUSES.index(status)
+
+        # Follow whichever matching chain is shorter; check the other filter per record.
+        if t is not None and (s is None or state.type_counts[t] <= state.status_counts[s]):
+            head, link = state.type_heads[t], 5
+        elif s is not None:
+            head, link = state.status_heads[s], 6
+        else:
+            head, link = state.head, 4
+        if cursor is not None:
+            head = _parse_cursor(cursor)
+            if head >= self._records:
+                raise ValueError(f"cursor {cursor!r} is past the end of the ledger")
+
+        page = []
+        for record, fields in self._walk(head, link):
+            if fields[0] != account:
+                raise LedgerError(f"cursor {cursor!r} does not belong to account {account}")
+            if (t is None or fields[7] == t) and (s is None or fields[8] == s):
+                if len(page) == limit:
+                    return HistoryPage(page, str(record))
+                page.append(self._decode(record, fields))
+        return HistoryPage(page, None)
+
+    # -- internals ---------------------------------------------------------
+
+    def _walk(self, record: int, link: int) -> Iterator[tuple[int, tuple]]:
+        while record != _NONE:
+            fields = self._read(record)
+            yield record, fields
+            record = fields[link]
+
+    def _read(self, record: int) -> tuple:
+        if record >= self._mapped:
+            self._remap()
+        return _RECORD.unpack_from(self._map, record * RECORD_SIZE)
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._fd, self._records * RECORD_SIZE, access=mmap.ACCESS_READ)
+        self._mapped = self._records
+
+    @staticmethod
+    def _decode(record: int, fields: tuple) -> dict:
+        return {
+            "id": str(record),
+            "type": TYPES[fields[7]],
+            "title": fields[11][: fields[9]].decode("utf-8"),
+            "amount": fields[2] / 100,
+            "balance": fields[3] / 100,
+            "date": datetime.fromtimestamp(fields[1] / 1_000_000, timezone.utc).isoformat(),
+            "status": STATUSES[fields[8]],
+        }
+
+    def _recover(self) -> None:
+        size = os.fstat(self._fd).st_size
+        records = size // RECORD_SIZE
+        start = self._load_checkpoint(records)
+        if start < records:
+            view = mmap.mmap(self._fd, records * RECORD_SIZE, access=mmap.ACCESS_READ)
+            try:
+                records = self._replay(view, start, records)
+            finally:
+                view.close()
+        if records * RECORD_SIZE != size:
+            os.ftruncate(self._fd, records * RECORD_SIZE)
+        self._records = records
+
+    def _load_checkpoint(self, records: int) -> int:
+        try:
+            with open(self.checkpoint_path, "rb") as handle:
+                raw = handle.read()
+            magic, version, covered, count = _CHECKPOINT_HEADER.unpack_from(raw)
+        except (OSError, struct.error):
+            return 0
+        if magic != _CHECKPOINT_MAGIC or version != 1 or covered > records:
+            return 0
+        if len(raw) != _CHECKPOINT_HEADER.size + count * _ACCOUNT.size:
+            return 0
+        for offset in range(_CHECKPOINT_HEADER.size, len(raw), _ACCOUNT.size):
+            account, state = _Account.unpack(raw[offset : offset + _ACCOUNT.size])
+            self._accounts[account] = state
+        return covered
+
+    def _replay(self, view: mmap.mmap, start: int, end: int) -> int:
+        for record in range(start, end):
+            offset = record * RECORD_SIZE
+            raw = view[offset : offset + RECORD_SIZE]
+            fields = _RECORD.unpack(raw)
+            if fields[10] != zlib.crc32(raw[:_CRC_OFFSET] + raw[_CRC_OFFSET + 4 :]):
+                return record  # torn or corrupt tail: keep everything before it
+            state = self._accounts.get(fields[0])
+            if state is None:
+                state = self._accounts[fields[0]] = _Account()
+            t, s = fields[7], fields[8]
+            state.balance = fields[3]
+            state.head = state.type_heads[t] = state.status_heads[s] = record
+            state.type_counts[t] += 1
+            state.status_counts[s] += 1
+            self._since_checkpoint += 1
+        return end
+
+
+def _copy(state: Optional[_Account]) -> _Account:
+    copy = _Account()
+    if state is not None:
+        copy.balance, copy.head = state.balance, state.head
+        copy.type_heads = state.type_heads[:]
+        copy.status_heads = state.status_heads[:]
+        copy.type_counts = state.type_counts[:]
+        copy.status_counts = state.status_counts[:]
+    return copy
+
+
+def _with_crc(body: bytes) -> bytes:
+    crc = zlib.crc32(body[:_CRC_OFFSET] + body[_CRC_OFFSET + 4 :])
+    return body[:_CRC_OFFSET] + crc.to_bytes(4, "little") + body[_CRC_OFFSET + 4 :]
+
+
+def _truncate_utf8(raw: bytes, limit: int) -> bytes:
+    if len(raw) <= limit:
+        return raw
+    return raw[:limit].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def _parse_cursor(cursor: str) -> int:
+    try:
+        record = int(cursor)
+    except ValueError:
+        raise ValueError(f"malformed cursor {cursor!r}") from None
+    if record < 0:
+        raise ValueError(f"malformed cursor {cursor!r}")
+    return record
@@ -0,0 +1,647 @@
+"""
+End-to-end booking load test
+============================
+
+Each service in ``ridehub`` has its own micro-benchmark, but nothing drives
+them together the way a rider does in ``app/(root)``:
+
+* **find-ride**: type the destination into the Places autocomplete (through
+  :class:`~ridehub.places.AutocompleteCache`), pick a prediction, and resolve
+  the pickup -> destination leg through the Directions client and
+  :class:`~ridehub.route_cache.RouteCache`;
+* **confirm-ride**: list the nearest free drivers from the
+  :class:`~ridehub.geoindex.GeoIndex` with pickup times and surge-priced fares,
+  as ``calculateDriverTimes`` would;
+* **book-ride**: take the cheapest of them and redeem the rider's promo code,
+  if they have one;
+* **payment**: debit the fare in the :class:`~ridehub.ledger.WalletLedger` and
+  store the paid ``Ride`` in the :class:`~ridehub.ride_store.RideStore`.
+
+While riders book, the whole fleet streams GPS fixes through a
+:class:`~ridehub.ingest.PositionIngestor`, which moves drivers in the index
+and feeds supply into the :class:`~ridehub.fares.SurgeGrid`.  Places and
+Directions are local stand-ins served from the same event loop.
+
+All synthetic data comes from seeded generators that build NumPy columns
+(``make_fleet``, ``make_places``, ``make_riders``) or stream in blocks
+(``generate_rides``), so fleets, rider populations and ride histories can be
+scaled to millions of records.  :func:`run_load` returns a
+:class:`LoadReport` with per-stage throughput and p50/p95/p99 latencies.  The
+report serializes to JSON, and :func:`compare_reports` lists the stages that
+regressed against a saved baseline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import platform
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import numpy as np
+
+from ridehub.directions import AsyncDirectionsClient, DirectionsError
+from ridehub.eta import EtaBatch, EtaEngine
+from ridehub.fares import FareEngine, SurgeGrid, format_prices
+from ridehub.geoindex import GeoIndex
+from ridehub.ingest import DriverTable, PositionBatch, PositionIngestor, Snapshot
+from ridehub.ledger import WalletLedger
+from ridehub.models import validate_ride
+from ridehub.places import AutocompleteCache, PlacesClient, PlacesError
+from ridehub.promos import PromoEngine, PromoRule
+from ridehub.ride_store import RideStore
+from ridehub.route_cache import RouteCache
+from ridehub.standins import DirectionsStandIn, PlacesStandIn
+
+REPORT_SCHEMA = 1
+STAGES = ("find-ride", "confirm-ride", "book-ride", "payment", "booking", "driver-positions")
+
+BOUNDS = (40.49, -74.26, 40.92, -73.69)  # New York City
+CENTER = (40.754, -73.984)
+FIRST_NAMES = ("James", "Sarah", "Mike", "Emily", "David", "Ana", "Kenji", "Priya")
+LAST_NAMES = ("Wilson", "Johnson", "Brown", "Davis", "Garcia", "Lee", "Patel", "Kim")
+STREETS = (
+    "Broadway Madison Lexington Amsterdam Columbus Flatbush Atlantic Bedford Myrtle Fulton Court "
+    "Smith Bergen Pacific Grand Union Jamaica Northern Queens Ocean Prospect Church Clinton Park"
+).split()
+SUFFIXES = ("St", "Ave", "Pl", "Blvd")
+BOROUGHS = ("New York", "Brooklyn", "Queens", "Bronx", "Staten Island")
+PAYMENT_STATUSES = ("paid", "paid", "paid", "pending", "failed", "refunded")
+PROMO_RULES = (
+    PromoRule("percentage", 20, max_discount=10.0),
+    PromoRule("fixed", 5, min_ride_amount=15.0),
+)
+
+_BLOCK = 10_000
+
+
+# -- synthetic data -------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Fleet:
+    """Drivers as columns; ids are ``1..len(fleet)`` like ``MOCK_DRIVERS``."""
+
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    car_seats: np.ndarray
+    ratings: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @property
+    def driver_ids(self) -> np.ndarray:
+        return np.arange(1, len(self) + 1, dtype=np.int64)
+
+    def marker(self, driver_id: int, lat: float, lng: float) -> dict:
+        """The ``MarkerData`` record the app renders for one driver."""
+        row = driver_id - 1
+        first = FIRST_NAMES[driver_id % len(FIRST_NAMES)]
+        last = LAST_NAMES[driver_id // len(FIRST_NAMES) % len(LAST_NAMES)]
+        return {
+            "latitude": lat,
+            "longitude": lng,
+            "id": driver_id,
+            "title": f"{first} {last}",
+            "profile_image_url": f"https://i.pravatar.cc/150?img={driver_id % 70}",
+            "car_image_url": "https://via.placeholder.com/150?text=Car",
+            "car_seats": int(self.car_seats[row]),
+            "rating": float(self.ratings[row]),
+            "first_name": first,
+            "last_name": last,
+        }
+
+
+def city_points(rng: np.random.Generator, count: int) -> np.ndarray:
+    """(count, 2) lat/lng points over the city, denser towards Midtown."""
+    south, west, north, east = BOUNDS
+    central = rng.random(count) < 0.6
+    lat = np.where(central, rng.normal(CENTER[0], 0.04, count), rng.uniform(south, north, count))
+    lng = np.where(central, rng.normal(CENTER[1], 0.04, count), rng.uniform(west, east, count))
+    return np.column_stack((np.clip(lat, south, north), np.clip(lng, west, east)))
+
+
+def make_fleet(count: int, seed: int = 0) -> Fleet:
+    rng = np.random.default_rng(seed)
+    points = city_points(rng, count)
+    return Fleet(
+        latitudes=points[:, 0],
+        longitudes=points[:, 1],
+        car_seats=rng.choice(np.array([4, 4, 4, 6], dtype=np.int8), count),
+        ratings=np.round(rng.uniform(4.0, 5.0, count), 1),
+    )
+
+
+def make_places(count: int, seed: int = 0) -> tuple[list[str], np.ndarray]:
+    """``count`` distinct street addresses and their coordinates."""
+    rng = np.random.default_rng(seed)
+    seen: set[str] = set()
+    names: list[str] = []
+    while len(names) < count:
+        n = count - len(names)
+        numbers = rng.integers(1, 2_000, n).tolist()
+        streets = rng.integers(len(STREETS), size=n).tolist()
+        suffixes = rng.integers(len(SUFFIXES), size=n).tolist()
+        boroughs = rng.integers(len(BOROUGHS), size=n).tolist()
+        for number, street, suffix, borough in zip(numbers, streets, suffixes, boroughs):
+            name = f"{number} {STREETS[street]} {SUFFIXES[suffix]}, {BOROUGHS[borough]}, NY"
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names, city_points(rng, count)
+
+
+@dataclass(frozen=True)
+class Riders:
+    """One booking attempt per row."""
+
+    user_ids: np.ndarray  # int64, also the wallet account
+    pickups: np.ndarray  # (N, 2) lat/lng
+    destinations: np.ndarray  # index into the places list
+    typed: np.ndarray  # characters typed before the first autocomplete request
+    promo_codes: list[str]  # "" when the rider has none
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+
+def make_riders(
+    count: int, places: int, *, users: int = 0, promo_share: float = 0.3, seed: int = 0
+) -> Riders:
+    """``count`` booking attempts by ``users`` distinct riders (default: one each).
+
+    Destinations are Zipf-skewed over ``places`` so popular addresses repeat,
+    as they do in practice.
+    """
+    rng = np.random.default_rng(seed)
+    users = users or count
+    destinations = np.minimum(rng.zipf(1.2, count) - 1, places - 1)
+    shuffle = rng.permutation(places)  # popular places are not just the first rows
+    promo = rng.random(count) < promo_share
+    pool = promo_codes(promo_pool(count, promo_share), seed)
+    codes = iter(pool[rng.integers(len(pool), size=int(promo.sum()))].tolist())
+    return Riders(
+        user_ids=rng.integers(1, users + 1, count),
+        pickups=city_points(rng, count),
+        destinations=shuffle[destinations],
+        typed=rng.integers(3, 9, count),
+        promo_codes=[next(codes).decode() if has else "" for has in promo.tolist()],
+    )
+
+
+def promo_pool(riders: int, promo_share: float) -> int:
+    """How many distinct codes :func:`make_riders` hands out; some riders share one."""
+    return max(1, round(riders * promo_share))
+
+
+def promo_codes(count: int, seed: int = 0) -> np.ndarray:
+    """``count`` distinct normalized codes (``S16``) derived from ``seed``."""
+    ids = np.arange(count, dtype=np.uint64) * np.uint64(2_654_435_761) + np.uint64(seed)
+    digits = np.array([(ids >> np.uint64(5 * i)) & np.uint64(31) for i in range(7)]).T
+    alphabet = np.frombuffer(b"ABCDEFGHJKLMNPQRSTUVWXYZ23456789", dtype=np.uint8)
+    raw = np.full((count, 8), ord("R"), dtype=np.uint8)
+    raw[:, 1:] = alphabet[digits.astype(np.int64)]
+    return raw.view("S8").ravel().astype("S16")
+
+
+def generate_rides(count: int, *, drivers: int, users: int, seed: int = 0) -> Iterator[dict]:
+    """Yield ``count`` ``Ride`` records, oldest first, one block of columns at a time."""
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    elapsed = 0
+    for base in range(0, count, _BLOCK):
+        n = min(_BLOCK, count - base)
+        steps = np.cumsum(rng.integers(1, 30_000_000, n)).tolist()
+        origins = city_points(rng, n).round(6).tolist()
+        targets = city_points(rng, n).round(6).tolist()
+        minutes = rng.integers(5, 60, n).tolist()
+        driver_ids = rng.integers(1, drivers + 1, n).tolist()
+        user_ids = rng.integers(1, users + 1, n).tolist()
+        statuses = rng.integers(len(PAYMENT_STATUSES), size=n).tolist()
+        for j in range(n):
+            i = base + j
+            driver = driver_ids[j]
+            yield {
+                "id": str(i),
+                "origin_address": f"{i % 900 + 1} {STREETS[i % len(STREETS)]} St, New York, NY",
+                "destination_address": f"{i % 700 + 1} {STREETS[i * 7 % len(STREETS)]} Ave, "
+                "New York, NY",
+                "origin_latitude": origins[j][0],
+                "origin_longitude": origins[j][1],
+                "destination_latitude": targets[j][0],
+                "destination_longitude": targets[j][1],
+                "ride_time": minutes[j],
+                "fare_price": minutes[j] * 0.5,
+                "payment_status": PAYMENT_STATUSES[statuses[j]],
+                "driver_id": driver,
+                "user_id": f"user_{user_ids[j]}",
+                "created_at": (start + timedelta(microseconds=elapsed + steps[j])).isoformat(),
+                "driver": {
+                    "first_name": FIRST_NAMES[driver % len(FIRST_NAMES)],
+                    "last_name": LAST_NAMES[driver // len(FIRST_NAMES) % len(LAST_NAMES)],
+                    "car_seats": 4,
+                },
+            }
+        elapsed += steps[-1]
+
+
+# -- measurement ----------------------------------------------------------
+
+
+class StageStats:
+    """Latency samples and item counts of one stage."""
+
+    __slots__ = ("name", "samples", "items", "errors")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.samples: list[float] = []
+        self.items = 0
+        self.errors = 0
+
+    def record(self, seconds: float, items: int = 1) -> None:
+        self.samples.append(seconds)
+        self.items += items
+
+    def summary(self, wall: float) -> dict:
+        """Throughput over ``wall`` seconds and nearest-rank latency percentiles in ms."""
+        result = {"count": self.items, "errors": self.errors}
+        result["throughput_per_s"] = round(self.items / wall, 3) if wall > 0 else 0.0
+        if self.samples:
+            ms = np.asarray(self.samples) * 1e3
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99], method="inverted_cdf").tolist()
+            result.update(
+                p50_ms=round(p50, 4),
+                p95_ms=round(p95, 4),
+                p99_ms=round(p99, 4),
+                max_ms=round(float(ms.max()), 4),
+            )
+        return result
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    riders: int = 5_000
+    users: int = 0  # distinct riders; 0 means one booking each
+    drivers: int = 20_000
+    places: int = 30_000
+    history: int = 100_000  # rides already in the store before the run
+    concurrency: int = 64  # riders in the flow at any moment
+    promo_share: float = 0.3
+    fix_interval: float = 4.0  # seconds between GPS fixes of one driver
+    tick_interval: float = 0.1
+    candidates: int = 10  # drivers listed on confirm-ride
+    busy_bookings: int = 500  # a booked driver is free again this many bookings later
+    standin_latency: float = 0.0
+    seed: int = 18
+
+
+@dataclass
+class LoadReport:
+    profile: LoadProfile
+    started_at: str
+    wall_seconds: float
+    stages: dict[str, dict]
+    counters: dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "schema": REPORT_SCHEMA,
+            "started_at": self.started_at,
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "profile": asdict(self.profile),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "stages": self.stages,
+            "counters": self.counters,
+        }
+
+    def write(self, path: str | os.PathLike) -> None:
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump(self.to_dict(), out, indent=2)
+            out.write("\n")
+
+
+def compare_reports(
+    baseline: dict, current: dict, *, tolerance: float = 0.1
+) -> list[tuple[str, str, float, float]]:
+    """``(stage, metric, before, after)`` for every stage more than ``tolerance`` worse.
+
+    A stage regresses when a latency percentile grows, or its throughput
+    drops, by more than ``tolerance`` (a fraction) relative to ``baseline``.
+    """
+    regressions = []
+    for stage, before in baseline.get("stages", {}).items():
+        after = current.get("stages", {}).get(stage)
+        if after is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if metric in before and metric in after:
+                if after[metric] > before[metric] * (1 + tolerance):
+                    regressions.append((stage, metric, before[metric], after[metric]))
+        metric = "throughput_per_s"
+        if after.get(metric, 0.0) < before.get(metric, 0.0) * (1 - tolerance):
+            regressions.append((stage, metric, before[metric], after[metric]))
+    return regressions
+
+
+# -- the flow -------------------------------------------------------------
+
+
+class _NoDriver(Exception):
+    """No free driver near the pickup."""
+
+
+class BookingLoad:
+    """The services one booking touches, wired together, plus the load drivers."""
+
+    def __init__(self, profile: LoadProfile, ledger_path: str | os.PathLike) -> None:
+        self.profile = profile
+        seed = profile.seed
+        self.fleet = make_fleet(profile.drivers, seed)
+        self.places, self.place_points = make_places(profile.places, seed + 1)
+        self.riders = make_riders(
+            profile.riders,
+            profile.places,
+            users=profile.users,
+            promo_share=profile.promo_share,
+            seed=seed + 2,
+        )
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.counters = {"booked": 0, "promo_redeemed": 0, "promo_rejected": 0, "rebooked": 0}
+
+        self.index = GeoIndex()
+        self.surge = SurgeGrid(*BOUNDS)
+        self.table = DriverTable()
+        self.table.subscribe(self._on_positions)
+        self.table.subscribe(self.surge.on_positions)
+        self.ingestor = PositionIngestor(self.table, tick_interval=profile.tick_interval)
+        self.eta = EtaEngine()
+        self.fares = FareEngine(surge=self.surge)
+        self.routes = RouteCache()
+        self.promos = PromoEngine(PROMO_RULES, capacity=max(1, len(self.riders)))
+        codes = promo_codes(promo_pool(len(self.riders), profile.promo_share), seed + 2)
+        rule = np.arange(len(codes)) % len(PROMO_RULES)
+        self.promos.issue_many(codes, rule, uses=3, normalized=True)
+        self.store = RideStore()
+        users = profile.users or profile.riders
+        self.store.extend(
+            generate_rides(profile.history, drivers=profile.drivers, users=users, seed=seed + 3)
+        )
+        self.ledger = WalletLedger(ledger_path)
+        self._busy: set[int] = set()
+        self._released: deque[int] = deque()
+        self._rng = np.random.default_rng(seed + 4)
+
+    def close(self) -> None:
+        self.ledger.close()
+
+    # -- drivers -----------------------------------------------------------
+
+    def _on_positions(self, snapshot: Snapshot, applied: PositionBatch) -> None:
+        busy, insert = self._busy, self.index.insert
+        for driver_id, lat, lng in zip(
+            applied.driver_ids.tolist(), applied.latitudes.tolist(), applied.longitudes.tolist()
+        ):
+            if driver_id not in busy:
+                insert(driver_id, lat, lng)
+
+    async def stream_positions(self, done: asyncio.Event) -> None:
+        """Every tick, a ``tick / fix_interval`` share of the fleet reports a new fix."""
+        profile, fleet, rng = self.profile, self.fleet, self._rng
+        lat, lng = fleet.latitudes.copy(), fleet.longitudes.copy()
+        per_tick = max(1, round(len(fleet) * profile.tick_interval / profile.fix_interval))
+        stats = self.stats["driver-positions"]
+        while not done.is_set():
+            await asyncio.sleep(profile.tick_interval)
+            moving = rng.integers(len(fleet), size=per_tick)
+            lat[moving] += rng.normal(0, 0.0003, per_tick)
+            lng[moving] += rng.normal(0, 0.0003, per_tick)
+            fixed_at = np.full(per_tick, time.time())
+            batch = PositionBatch(moving + 1, lat[moving], lng[moving], fixed_at)
+            start = time.perf_counter()
+            self.ingestor.submit_nowait(batch)
+            self.ingestor.flush()
+            self.surge.decay(0.999)
+            self.surge.refresh()
+            stats.record(time.perf_counter() - start, per_tick)
+
+    def _reserve(self, driver_id: int) -> None:
+        self._busy.add(driver_id)
+        self.index.discard(driver_id)
+        self._released.append(driver_id)
+        if len(self._released) > self.profile.busy_bookings:
+            free = self._released.popleft()
+            self._busy.discard(free)
+            position = self.table.snapshot.position(free)
+            if position is not None:
+                self.index.insert(free, *position)
+
+    # -- rider stages --------------------------------------------------------
+
+    async def find_ride(
+        self, places: AutocompleteCache, directions: AsyncDirectionsClient, rider: int
+    ) -> tuple[int, float]:
+        """Destination place and trip seconds, as ``find-ride.tsx`` collects them."""
+        riders = self.riders
+        target = self.places[riders.destinations[rider]]
+        lat, lng = riders.pickups[rider].tolist()
+        self.surge.add_demand(lat, lng)
+        text = target[: riders.typed[rider]]
+        while True:
+            predictions = await places.autocomplete(text, language="en")
+            chosen = next((p for p in predictions if p["description"] == target), None)
+            if chosen is not None or text == target:
+                break
+            text = target  # the rider keeps typing until the address shows up
+        if chosen is None:
+            if not predictions:
+                raise PlacesError(f"no predictions for {target!r}")
+            chosen = predictions[0]
+        place = int(chosen["place_id"].rpartition("-")[2])
+        d_lat, d_lng = self.place_points[place].tolist()
+        seconds = self.routes.get(lat, lng, d_lat, d_lng)
+        if seconds is None:
+            seconds = await directions.duration(lat, lng, d_lat, d_lng)
+            self.routes.put(lat, lng, d_lat, d_lng, seconds)
+        return place, seconds
+
+    def confirm_ride(self, rider: int, trip_seconds: float) -> list[dict]:
+        """Nearest free drivers with ``time`` and ``price``, cheapest first."""
+        pickup = self.riders.pickups[rider]
+        nearby = self.index.nearest(pickup[0], pickup[1], self.profile.candidates)
+        if not nearby:
+            raise _NoDriver
+        ids = [driver_id for driver_id, _ in nearby]
+        coordinates = np.array([self.index.position(driver_id) for driver_id in ids])
+        batch = EtaBatch(
+            pickup_seconds=self.eta.pickup_matrix(coordinates, pickup),
+            trip_seconds=np.array([trip_seconds]),
+        )
+        fares = self.fares.quote_batch(batch, pickups=pickup)[0]
+        minutes = batch.total_minutes[0].tolist()
+        prices = format_prices(fares)
+        markers = [
+            {**self.fleet.marker(driver_id, lat, lng), "time": total, "price": price}
+            for driver_id, (lat, lng), total, price in zip(
+                ids, coordinates.tolist(), minutes, prices
+            )
+        ]
+        markers.sort(key=lambda marker: float(marker["price"]))
+        return markers
+
+    def book_ride(self, rider: int, markers: list[dict]) -> tuple[dict, float]:
+        """Reserve the cheapest driver still free and apply the rider's promo code."""
+        for attempt, marker in enumerate(markers):
+            if marker["id"] not in self._busy:
+                break
+        else:
+            raise _NoDriver
+        self.counters["rebooked"] += int(attempt > 0)
+        self._reserve(marker["id"])
+        fare = float(marker["price"])
+        code = self.riders.promo_codes[rider]
+        if code:
+            result = self.promos.redeem(code, fare)
+            if result.valid:
+                self.counters["promo_redeemed"] += 1
+                fare = round(result.final_fare, 2)
+            else:
+                self.counters["promo_rejected"] += 1
+        return marker, fare
+
+    def payment(self, rider: int, place: int, marker: dict, fare: float) -> int:
+        """Debit the wallet and store the paid ride, like ``Payment.tsx`` on success."""
+        riders = self.riders
+        user = int(riders.user_ids[rider])
+        destination = self.places[place]
+        self.ledger.append(user, "ride", -fare, title=f"Ride to {destination}")
+        pickup_lat, pickup_lng = riders.pickups[rider].tolist()
+        dest_lat, dest_lng = self.place_points[place].tolist()
+        ride = {
+            "origin_address": f"{pickup_lat:.5f}, {pickup_lng:.5f}",
+            "destination_address": destination,
+            "origin_latitude": pickup_lat,
+            "origin_longitude": pickup_lng,
+            "destination_latitude": dest_lat,
+            "destination_longitude": dest_lng,
+            "ride_time": marker["time"],
+            "fare_price": fare,
+            "payment_status": "paid",
+            "driver_id": marker["id"],
+            "user_id": f"user_{user}",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "driver": {
+                "first_name": marker["first_name"],
+                "last_name": marker["last_name"],
+                "car_seats": marker["car_seats"],
+            },
+        }
+        return self.store.insert(validate_ride(ride))
+
+    async def book(
+        self, places: AutocompleteCache, directions: AsyncDirectionsClient, rider: int
+    ) -> None:
+        """Walk one rider through every stage, timing each."""
+        stats = self.stats
+        stage = "find-ride"
+        started = clock = time.perf_counter()
+        try:
+            place, trip_seconds = await self.find_ride(places, directions, rider)
+            now = time.perf_counter()
+            stats[stage].record(now - clock)
+            stage, clock = "confirm-ride", now
+            markers = self.confirm_ride(rider, trip_seconds)
+            now = time.perf_counter()
+            stats[stage].record(now - clock)
+            stage, clock = "book-ride", now
+            marker, fare = self.book_ride(rider, markers)
+            now = time.perf_counter()
+            stats[stage].record(now - clock)
+            stage, clock = "payment", now
+            self.payment(rider, place, marker, fare)
+            now = time.perf_counter()
+            stats[stage].record(now - clock)
+        except (_NoDriver, PlacesError, DirectionsError):
+            stats[stage].errors += 1
+            stats["booking"].errors += 1
+            return
+        stats["booking"].record(now - started)
+        self.counters["booked"] += 1
+
+    # -- driver --------------------------------------------------------------
+
+    async def run(self) -> LoadReport:
+        profile = self.profile
+        places_server = await PlacesStandIn(self.places, latency=profile.standin_latency).start()
+        directions_server = await DirectionsStandIn(latency=profile.standin_latency).start()
+        places_client = PlacesClient(places_server.url, max_connections=profile.concurrency, key="")
+        directions = AsyncDirectionsClient(
+            directions_server.url, max_connections=profile.concurrency, key=""
+        )
+        places = AutocompleteCache(places_client)
+
+        fleet = self.fleet
+        self.ingestor.submit_nowait(
+            PositionBatch(fleet.driver_ids, fleet.latitudes, fleet.longitudes, np.zeros(len(fleet)))
+        )
+        self.ingestor.flush()
+        self.surge.refresh()
+
+        pending = iter(range(len(self.riders)))
+
+        async def session() -> None:
+            for rider in pending:
+                await self.book(places, directions, rider)
+
+        done = asyncio.Event()
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        start = time.perf_counter()
+        streamer = asyncio.ensure_future(self.stream_positions(done))
+        try:
+            await asyncio.gather(*(session() for _ in range(profile.concurrency)))
+        finally:
+            wall = time.perf_counter() - start
+            done.set()
+            await streamer
+            await places_client.close()
+            await directions.close()
+            await places_server.close()
+            await directions_server.close()
+
+        counters = dict(self.counters)
+        counters.update(
+            places_requests=places.stats.lookups,
+            places_upstream=places.stats.upstream,
+            directions_requests=directions_server.requests,
+            route_cache_hit_rate=round(self.routes.stats.hit_rate, 4),
+            position_updates=self.ingestor.updates_applied,
+            rides_stored=len(self.store),
+            ledger_records=len(self.ledger),
+        )
+        return LoadReport(
+            profile=profile,
+            started_at=started_at,
+            wall_seconds=wall,
+            stages={name: stats.summary(wall) for name, stats in self.stats.items()},
+            counters=counters,
+        )
+
+
+def run_load(profile: LoadProfile, ledger_path: str | os.PathLike) -> LoadReport:
+    """Build the synthetic world for ``profile`` and run it to completion."""
+    load = BookingLoad(profile, ledger_path)
+    try:
+        return asyncio.run(load.run())
+    finally:
+        load.close()
@@ -0,0 +1,298 @@
+"""
+Project manifest
+================
+
+``IMPLEMENTATION_COMPLETE.py`` holds the design tokens, the service
+catalogue and the metrics inventory as one dict literal.  Importing it runs
+the whole file.  When the file has changed since its ``.pyc`` was written,
+that means compiling ~1,200 lines to read a single field.
+
+:class:`Manifest` never imports it.  The literal is evaluated once with
+:func:`ast.literal_eval` and written as a snapshot next to the bytecode
+(``__pycache__/IMPLEMENTATION_COMPLETE.<cache tag>.manifest``).  The
+snapshot is a small index followed by one :mod:`marshal` blob per top-level
+section.  A read checks the source's mtime and size against the index, then
+unmarshals only the sections asked for.  If the stat differs, the source's
+CRC-32 is compared.  :mod:`zlib` is used because importing :mod:`hashlib`
+alone costs more than a whole warm read.  The same bytes (a ``touch``, a
+checkout) only refresh the index, and different bytes rebuild the snapshot.
+Only that path parses, through the builtin ``_ast`` rather than :mod:`ast`,
+which would cost more to import than the parse itself.
+
+The CLI parses its own arguments, since importing :mod:`argparse` costs more
+than answering the query.  Strings and numbers are printed as they are, and
+everything else as JSON.
+
+    python -m ridehub.manifest [--manifest PATH] get color_palette.status
+    python -m ridehub.manifest [--manifest PATH] keys [backend_services]
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+
+# No typing import: it would double the cost of importing this module.
+
+MANIFEST = "IMPLEMENTATION_COMPLETE.py"
+NAME = "IMPLEMENTATION_COMPLETE"
+# Bump when the snapshot layout changes; older snapshots are then rebuilt.
+SNAPSHOT_VERSION = 1
+
+_USAGE = """\
+usage: python -m ridehub.manifest [--manifest PATH] get KEY[.KEY...]
+       python -m ridehub.manifest [--manifest PATH] keys [KEY[.KEY...]]"""
+# JSON escapes for control characters, for dumps().
+_ESCAPES = {"\b": "\\b", "\f": "\\f", "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_ESCAPES.update({chr(i): f"\\u{i:04x}" for i in range(0x20) if chr(i) not in _ESCAPES})
+
+
+class ManifestError(ValueError):
+    """The manifest is not a file with a literal ``IMPLEMENTATION_COMPLETE`` dict."""
+
+
+def parse(source: str, path: str = MANIFEST) -> dict[str, object]:
+    """The ``IMPLEMENTATION_COMPLETE`` dict, evaluated as a literal without running the file."""
+    # The builtin _ast, not ast: importing ast (enum, contextlib, ...) costs
+    # twice as much as parsing the manifest.
+    import _ast
+
+    for node in compile(source, path, "exec", _ast.PyCF_ONLY_AST).body:
+        if (
+            isinstance(node, _ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], _ast.Name)
+            and node.targets[0].id == NAME
+        ):
+            try:
+                value = _literal(node.value, _ast)
+            except ValueError as exc:
+                raise ManifestError(f"{path}: {NAME} is not a literal: {exc}") from None
+            if not isinstance(value, dict):
+                raise ManifestError(f"{path}: {NAME} is not a dict")
+            return value
+    raise ManifestError(f"{path}: no {NAME} assignment")
+
+
+def _literal(node, _ast) -> object:
+    """:func:`ast.literal_eval` for the containers and constants a manifest holds."""
+    if isinstance(node, _ast.Constant):
+        return node.value
+    if isinstance(node, _ast.Dict) and None not in node.keys:
+        return {_literal(k, _ast): _literal(v, _ast) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, _ast.List):
+        return [_literal(item, _ast) for item in node.elts]
+    if isinstance(node, _ast.Tuple):
+        return tuple(_literal(item, _ast) for item in node.elts)
+    if isinstance(node, _ast.Set):
+        return {_literal(item, _ast) for item in node.elts}
+    if (
+        isinstance(node, _ast.UnaryOp)
+        and isinstance(node.op, (_ast.USub, _ast.UAdd))
+        and isinstance(node.operand, _ast.Constant)
+        and type(node.operand.value) in (int, float, complex)
+    ):
+        value = node.operand.value
+        return -value if isinstance(node.op, _ast.USub) else +value
+    raise ValueError(f"line {node.lineno}: {type(node).__name__} is not a literal")
+
+
+def snapshot_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    tag = sys.implementation.cache_tag
+    return os.path.join(directory, "__pycache__", f"{stem}.{tag}.manifest")
+
+
+class Manifest:
+    """Lazily loaded sections of ``IMPLEMENTATION_COMPLETE.py``, backed by a snapshot."""
+
+    def __init__(self, path: str = MANIFEST, *, snapshot: str | None = None) -> None:
+        self.path = path
+        self.snapshot = snapshot or snapshot_path(path)
+        # How the last load was served: "snapshot", "refreshed" (same bytes, new stat)
+        # or "parsed".
+        self.loaded_from = ""
+        self._stat: tuple[int, int] | None = None
+        self._data = b""
+        self._base = 0  # where the section blobs start in _data
+        self._index: dict[str, tuple[int, int]] = {}
+        self._sections: dict[str, object] = {}
+
+    def sections(self) -> list[str]:
+        self._load()
+        return list(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        self._load()
+        return name in self._index
+
+    def __getitem__(self, name: str) -> object:
+        self._load()
+        if name not in self._sections:
+            if name not in self._index:
+                raise KeyError(name)
+            offset, length = self._index[name]
+            start = self._base + offset
+            self._sections[name] = marshal.loads(self._data[start : start + length])
+        return self._sections[name]
+
+    def get(self, key: str) -> object:
+        """The value at a dotted path such as ``color_palette.status.error``.
+
+        A part that indexes a list is a decimal position.
+        """
+        section, *rest = key.split(".")
+        value = self[section]
+        for depth, part in enumerate(rest, 1):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+                value = value[int(part)]
+            else:
+                raise KeyError(".".join([section, *rest[:depth]]))
+        return value
+
+    def keys(self, key: str = "") -> list[str]:
+        if not key:
+            return self.sections()
+        value = self.get(key)
+        if isinstance(value, dict):
+            return [str(k) for k in value]
+        if isinstance(value, list):
+            return [str(i) for i in range(len(value))]
+        raise ManifestError(f"{key} is a {type(value).__name__}, not a section")
+
+    def to_dict(self) -> dict[str, object]:
+        return {name: self[name] for name in self.sections()}
+
+    def _load(self) -> None:
+        stat = os.stat(self.path)
+        current = (stat.st_mtime_ns, stat.st_size)
+        if current == self._stat:
+            return
+        self._sections = {}
+        header = self._read_snapshot()
+        if header is not None and header[0] == current:
+            self.loaded_from = "snapshot"
+        else:
+            import zlib
+
+            with open(self.path, "rb") as handle:
+                raw = handle.read()
+            digest = zlib.crc32(raw)
+            if header is not None and header[1] == digest:
+                base = self._base
+                blobs = {
+                    name: self._data[base + offset : base + offset + length]
+                    for name, (offset, length) in self._index.items()
+                }
+                self.loaded_from = "refreshed"
+            else:
+                try:
+                    manifest = parse(raw.decode("utf-8"), self.path)
+                except SyntaxError as exc:
+                    raise ManifestError(f"{self.path}: {exc}") from None
+                blobs = {name: marshal.dumps(value) for name, value in manifest.items()}
+                self._sections = manifest
+                self.loaded_from = "parsed"
+            self._write_snapshot(current, digest, blobs)
+        self._stat = current
+
+    def _read_snapshot(self) -> tuple[tuple[int, int], int] | None:
+        """``(stat, crc)`` of the snapshot's source, or ``None`` if it is unusable."""
+        try:
+            with open(self.snapshot, "rb") as handle:
+                data = handle.read()
+            length = int.from_bytes(data[:4], "big")
+            version, stat, digest, index = marshal.loads(data[4 : 4 + length])
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        if version != SNAPSHOT_VERSION:
+            return None
+        self._data, self._base, self._index = data, 4 + length, index
+        return stat, digest
+
+    def _write_snapshot(self, stat: tuple[int, int], digest: int, blobs: dict[str, bytes]) -> None:
+        index, offset = {}, 0
+        for name, blob in blobs.items():
+            index[name] = (offset, len(blob))
+            offset += len(blob)
+        header = marshal.dumps((SNAPSHOT_VERSION, stat, digest, index))
+        self._data = len(header).to_bytes(4, "big") + header + b"".join(blobs.values())
+        self._base, self._index = 4 + len(header), index
+        try:
+            os.makedirs(os.path.dirname(self.snapshot), exist_ok=True)
+            temporary = f"{self.snapshot}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as handle:
+                handle.write(self._data)
+            os.replace(temporary, self.snapshot)
+        except OSError:
+            pass  # a read-only checkout still answers, it just parses every time
+
+
+def dumps(value: object, indent: str = "") -> str:
+    """``json.dumps(value, indent=2, ensure_ascii=False)`` for manifest values.
+
+    :mod:`json` pulls in :mod:`re` and its decoder, which cost more than a lookup.
+    """
+    inner = indent + "  "
+    if isinstance(value, dict) and value:
+        items = (f"{inner}{_quote(str(k))}: {dumps(v, inner)}" for k, v in value.items())
+        return "{\n" + ",\n".join(items) + f"\n{indent}}}"
+    if isinstance(value, (list, tuple)) and value:
+        items = (inner + dumps(v, inner) for v in value)
+        return "[\n" + ",\n".join(items) + f"\n{indent}]"
+    if isinstance(value, str):
+        return _quote(value)
+    if value is None or isinstance(value, bool):
+        return {None: "null", True: "true", False: "false"}[value]
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "{}" if isinstance(value, dict) else "[]"
+
+
+def _quote(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"')
+    if any(c < " " for c in escaped):
+        escaped = "".join(_ESCAPES.get(c, c) if c < " " else c for c in escaped)
+    return f'"{escaped}"'
+
+
+def _print(value: object) -> None:
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        print(value)
+    else:
+        print(dumps(value))
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else list(argv)
+    path = MANIFEST
+    if len(args) >= 2 and args[0] == "--manifest":
+        path, args = args[1], args[2:]
+    if args[:1] in (["-h"], ["--help"]):
+        print(__doc__.splitlines()[1] + "\n\n" + _USAGE)
+        return 0
+    command = args[0] if args else ""
+    if not (command == "get" and len(args) == 2 or command == "keys" and len(args) <= 2):
+        print(_USAGE, file=sys.stderr)
+        return 2
+    manifest = Manifest(path)
+    try:
+        if command == "get":
+            _print(manifest.get(args[1]))
+        else:
+            print("\n".join(manifest.keys(args[1] if len(args) == 2 else "")))
+    except KeyError as exc:
+        print(f"error: no {exc.args[0]} in {path}", file=sys.stderr)
+        return 1
+    except (OSError, ManifestError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,515 @@
+"""
+Hot-path instrumentation
+========================
+
+The client's only telemetry is ``console.log`` in ``lib/fetch.ts``,
+``lib/map.ts`` and ``lib/auth.ts``.  This module gives the services counters,
+callback gauges and latency histograms cheap enough to leave on in
+production, plus a Prometheus endpoint and an on-demand sampling profiler.
+
+:class:`Histogram` is HDR-style: durations are kept as integer nanoseconds in
+log-linear buckets, 32 per power of two, so any value is resolved to within
+about 3% at every scale from nanoseconds to half an hour.  The hot path
+appends the raw duration to a list and nothing else; every 1,024
+observations, and before any read, the batch is bucketed in one NumPy pass.
+Percentiles are read from the counts, so nothing is ever sorted.  The
+:func:`timed` decorator (sync or ``async`` functions) and the
+:meth:`Histogram.time` context manager wrap exactly that append, so a timed
+call costs well under a microsecond.  Counters are plain attribute
+increments without a lock.  Under free-running threads a counter increment
+can very rarely be lost, which is fine for monitoring but not for billing.
+
+Metrics live in a :class:`Registry` (by default the module-level
+:data:`REGISTRY`).  :meth:`Registry.render` produces the Prometheus text
+exposition format, with histogram counts folded into a fixed ``le`` ladder.
+:class:`MetricsServer` serves it on ``/metrics``, and
+``/debug/profile?seconds=N`` returns a :class:`SamplingProfiler` dump in
+folded-stack form, ready for ``flamegraph.pl`` or speedscope.  Every metric
+the services register is listed under ``metrics`` in
+``IMPLEMENTATION_COMPLETE.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import math
+import re
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Exposition bucket bounds in seconds: 1-2.5-5 steps from 1 us to 10 s.
+DEFAULT_BOUNDS = tuple(
+    round(m * 10.0**e, 9) for e in range(-6, 1) for m in (1.0, 2.5, 5.0)
+) + (10.0,)
+MAX_PROFILE_SECONDS = 60.0
+
+_SUB_BITS = 5  # 2**5 sub-buckets per power of two: ~3% relative error
+_MAX_NS = (1 << 41) - 1  # ~36 minutes; longer observations land in the top bucket
+_DRAIN_AT = 1024
+_BUCKETS = ((_MAX_NS.bit_length() - _SUB_BITS) << _SUB_BITS) + (1 << _SUB_BITS)
+_NAME = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*$")
+_now_ns = time.perf_counter_ns
+
+
+class MetricsError(ValueError):
+    """A metric name is invalid or already registered as a different type."""
+
+
+def bucket_index(ns):
+    """HDR bucket of durations in nanoseconds (an int or an integer array)."""
+    ns = np.clip(np.asarray(ns, dtype=np.int64), 0, _MAX_NS)
+    # frexp's exponent is the bit length, exact for integers below 2**53.
+    shift = np.frexp(ns.astype(np.float64))[1] - _SUB_BITS - 1
+    index = np.where(shift > 0, (shift << _SUB_BITS) + (ns >> np.maximum(shift, 0)), ns)
+    return index if index.ndim else int(index)
+
+
+def bucket_bounds(index):
+    """Lowest and highest nanosecond value that lands in bucket ``index``."""
+    index = np.asarray(index, dtype=np.int64)
+    shift = np.maximum((index >> _SUB_BITS) - 1, 0)
+    mantissa = index - (shift << _SUB_BITS)
+    low, high = mantissa << shift, ((mantissa + 1) << shift) - 1
+    if index.ndim:
+        return low, high
+    return int(low), int(high)
+
+
+class Counter:
+    """Monotonic count; Prometheus names end in ``_total``."""
+
+    __slots__ = ("name", "help", "value")
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "") -> None:
+        if not name.endswith("_total"):
+            raise MetricsError(f"counter name {name!r} must end in '_total'")
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def reset(self) -> None:
+        self.value = 0
+
+    def exposition(self) -> list[str]:
+        return [f"{self.name} {_number(self.value)}"]
+
+
+class Gauge:
+    """Value read from ``fn`` at scrape time, e.g. a cache's size."""
+
+    __slots__ = ("name", "help", "fn")
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float]) -> None:
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+    def reset(self) -> None:
+        pass
+
+    def exposition(self) -> list[str]:
+        return [f"{self.name} {_number(self.fn())}"]
+
+
+class _Timer:
+    """``with histogram.time(): ...`` records the block's duration.
+
+    ``histogram.time`` is a subclass of this made once per histogram, holding
+    the histogram as a class attribute, so creating a timer runs no Python
+    code: a block costs only ``__enter__`` and ``__exit__``.  The clock starts
+    at ``__enter__``.
+    """
+
+    __slots__ = ("_start",)
+    _histogram: "Histogram"
+    _pending: list[int]
+
+    def __enter__(self) -> "_Timer":
+        self._start = _now_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pending = self._pending
+        pending.append(_now_ns() - self._start)
+        if len(pending) >= _DRAIN_AT:
+            self._histogram.drain()
+
+
+class Histogram:
+    """Log-linear latency histogram recorded in integer nanoseconds."""
+
+    __slots__ = (
+        "name", "help", "bounds", "pending", "time", "_counts", "_sum_ns", "_edges", "_lock"
+    )
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", *, bounds=DEFAULT_BOUNDS) -> None:
+        self.name = name
+        self.help = help
+        self.bounds = tuple(sorted(bounds))
+        # Appended to by timed() wrappers that hold on to this very list.
+        self.pending: list[int] = []
+        # ``with histogram.time():`` instantiates this class; see _Timer.
+        self.time: type[_Timer] = type(
+            "_Timer", (_Timer,), {"__slots__": (), "_histogram": self, "_pending": self.pending}
+        )
+        self._counts = np.zeros(_BUCKETS, dtype=np.int64)
+        self._sum_ns = 0
+        # A bucket counts towards ``le`` only when all of it is <= le.
+        highest = bucket_bounds(np.arange(_BUCKETS))[1]
+        self._edges = np.searchsorted(highest, np.array(self.bounds) * 1e9, side="right")
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        self.observe_ns(round(seconds * 1e9))
+
+    def observe_ns(self, ns: int) -> None:
+        self.pending.append(ns)
+        if len(self.pending) >= _DRAIN_AT:
+            self.drain()
+
+    def drain(self) -> None:
+        """Fold pending observations into the bucket counts."""
+        with self._lock:
+            pending = self.pending
+            n = len(pending)
+            if not n:
+                return
+            # Other threads only ever append, so the first n are exactly these.
+            batch = np.clip(np.array(pending[:n], dtype=np.int64), 0, _MAX_NS)
+            del pending[:n]
+            self._sum_ns += int(batch.sum())
+            self._counts += np.bincount(bucket_index(batch), minlength=_BUCKETS)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Observations per HDR bucket (see :func:`bucket_bounds`)."""
+        self.drain()
+        return self._counts.copy()
+
+    @property
+    def count(self) -> int:
+        self.drain()
+        return int(self._counts.sum())
+
+    @property
+    def sum(self) -> float:
+        self.drain()
+        return self._sum_ns / 1e9
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile in seconds (upper edge of its bucket); NaN if empty."""
+        cumulative = np.cumsum(self.counts)
+        total = int(cumulative[-1])
+        if not total:
+            return math.nan
+        rank = max(1, math.ceil(pct / 100.0 * total))
+        index = int(np.searchsorted(cumulative, rank))
+        return int(bucket_bounds(index)[1]) / 1e9
+
+    def reset(self) -> None:
+        with self._lock:
+            self.pending.clear()
+            self._counts[:] = 0
+            self._sum_ns = 0
+
+    def exposition(self) -> list[str]:
+        cumulative = np.cumsum(self.counts)
+        below = np.where(self._edges > 0, cumulative[np.maximum(self._edges - 1, 0)], 0)
+        lines = [
+            f'{self.name}_bucket{{le="{_number(bound)}"}} {count}'
+            for bound, count in zip(self.bounds, below.tolist())
+        ]
+        total = int(cumulative[-1])
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {total}')
+        lines.append(f"{self.name}_sum {_number(self._sum_ns / 1e9)}")
+        lines.append(f"{self.name}_count {total}")
+        return lines
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class Registry:
+    """Named metrics, rendered together in registration order."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[Metric]:
+        return iter(list(self._metrics.values()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def get(self, name: str) -> Metric:
+        return self._metrics[name]
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._register(Counter, name, help)
+
+    def histogram(self, name: str, help: str = "", **kwargs) -> Histogram:
+        return self._register(Histogram, name, help, **kwargs)
+
+    def gauge(self, name: str, help: str, fn: Callable[[], float]) -> Gauge:
+        metric = self._register(Gauge, name, help, fn)
+        metric.fn = fn  # re-registering points the gauge at the newest source
+        return metric
+
+    def reset(self) -> None:
+        for metric in self:
+            metric.reset()
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric."""
+        lines = []
+        for metric in self:
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, cls, name: str, help: str, *args, **kwargs):
+        # Importing a module twice (or two services sharing a metric) must
+        # hand back the same object, so registration is get-or-create.
+        if not _NAME.match(name):
+            raise MetricsError(f"invalid metric name {name!r}")
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise MetricsError(f"{name!r} is already registered as a {metric.kind}")
+            return metric
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str = "") -> Counter:
+    return REGISTRY.counter(name, help)
+
+
+def histogram(name: str, help: str = "", **kwargs) -> Histogram:
+    return REGISTRY.histogram(name, help, **kwargs)
+
+
+def gauge(name: str, help: str, fn: Callable[[], float]) -> Gauge:
+    return REGISTRY.gauge(name, help, fn)
+
+
+def timed(metric: Histogram) -> Callable:
+    """Decorator recording every call's wall time, exceptions included, into ``metric``.
+
+    Works on plain functions, methods and ``async def`` functions; for a
+    coroutine the time runs until it completes, suspensions included.
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        pending = metric.pending
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def timed_coroutine(*args, **kwargs):
+                start = _now_ns()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    pending.append(_now_ns() - start)
+                    if len(pending) >= _DRAIN_AT:
+                        metric.drain()
+
+            return timed_coroutine
+
+        @functools.wraps(fn)
+        def timed_call(*args, **kwargs):
+            start = _now_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                pending.append(_now_ns() - start)
+                if len(pending) >= _DRAIN_AT:
+                    metric.drain()
+
+        return timed_call
+
+    return decorate
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler over every thread but its own.
+
+    A background thread snapshots ``sys._current_frames()`` every
+    ``interval`` seconds; nothing is hooked into the profiled code, so it
+    costs nothing until a dump is requested.
+    """
+
+    def __init__(self, interval: float = 0.005, *, max_depth: int = 64) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.max_depth = max_depth
+
+    def sample(self, seconds: float) -> _Tally:
+        """Sample for ``seconds`` (blocking the caller) and count identical stacks."""
+        stacks: _Tally = _Tally()
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    stacks[self._stack(names.get(ident) or str(ident), frame)] += 1
+            time.sleep(self.interval)
+        return stacks
+
+    def dump(self, seconds: float) -> str:
+        """Folded stacks (``thread;outer;...;inner count``), hottest first."""
+        stacks = self.sample(seconds)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def _stack(self, thread: str, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "?")
+            names.append(f"{module}:{code.co_qualname}")
+            frame = frame.f_back
+        names.append(thread.replace(";", ":").replace(" ", "_"))
+        return ";".join(reversed(names))
+
+
+class MetricsServer:
+    """Minimal HTTP endpoint: ``/metrics`` and ``/debug/profile?seconds=N``."""
+
+    def __init__(
+        self,
+        registry: Registry = REGISTRY,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 9464,
+        profiler: Optional[SamplingProfiler] = None,
+    ) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.profiler = profiler or SamplingProfiler()
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "MetricsServer":
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @contextmanager
+    def running(self) -> Iterator["MetricsServer"]:
+        """Serve from a daemon thread for the duration of the ``with`` block."""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def serve() -> None:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+
+        thread = threading.Thread(target=serve, name=type(self).__name__, daemon=True)
+        thread.start()
+        ready.wait()
+        try:
+            yield self
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+    async def respond(self, target: str) -> tuple[int, str]:
+        parts = urlsplit(target)
+        if parts.path == "/metrics":
+            return 200, self.registry.render()
+        if parts.path == "/debug/profile":
+            query = parse_qs(parts.query)
+            try:
+                seconds = float(query.get("seconds", ["1"])[0])
+            except ValueError:
+                return 400, "seconds must be a number\n"
+            seconds = min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+            loop = asyncio.get_running_loop()
+            return 200, await loop.run_in_executor(None, self.profiler.dump, seconds)
+        return 404, "not found\n"
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines if line)
+                }
+                method, target = request_line.split(" ")[:2]
+                if method != "GET":
+                    status, text = 405, "only GET is supported\n"
+                else:
+                    status, text = await self.respond(target)
+                body = text.encode()
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                        f"Content-Type: {CONTENT_TYPE}\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode()
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
@@ -0,0 +1,114 @@
+"""
+Record schemas mirrored from ``types/type.d.ts``.
+
+The backend services exchange plain dicts shaped exactly like the client's
+TypeScript interfaces; these tuples are the single Python description of
+those shapes, used for binary encoding and validation.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    type: type  # float, int or str
+    optional: bool = False
+
+
+# interface MarkerData, plus the optional Driver fields ``generateMarkersFromData``
+# (lib/map.ts) copies into every marker with ``...driver``.
+MARKER_FIELDS = (
+    Field("latitude", float),
+    Field("longitude", float),
+    Field("id", int),
+    Field("title", str),
+    Field("profile_image_url", str),
+    Field("car_image_url", str),
+    Field("car_seats", int),
+    Field("rating", float),
+    Field("first_name", str),
+    Field("last_name", str),
+    Field("time", float, optional=True),
+    Field("price", str, optional=True),
+    Field("email", str, optional=True),
+    Field("car_model", str, optional=True),
+    Field("car_year", int, optional=True),
+    Field("car_color", str, optional=True),
+)
+
+# interface Ride; the optional nested ``driver`` object is listed separately.
+RIDE_FIELDS = (
+    Field("id", str, optional=True),
+    Field("origin_address", str),
+    Field("destination_address", str),
+    Field("origin_latitude", float),
+    Field("origin_longitude", float),
+    Field("destination_latitude", float),
+    Field("destination_longitude", float),
+    Field("ride_time", float),
+    Field("fare_price", float),
+    Field("payment_status", str),
+    Field("driver_id", int),
+    Field("user_id", str),
+    Field("created_at", str),
+)
+
+RIDE_DRIVER_FIELDS = (
+    Field("first_name", str),
+    Field("last_name", str),
+    Field("car_seats", int),
+)
+
+
+class SchemaError(ValueError):
+    """A record does not match its TypeScript interface."""
+
+
+def _check(record: object, fields: tuple[Field, ...], where: str) -> None:
+    if not isinstance(record, dict):
+        raise SchemaError(f"{where or 'record'} must be an object, got {type(record).__name__}")
+    for f in fields:
+        value = record.get(f.name)
+        if value is None:
+            if not f.optional:
+                raise SchemaError(f"missing required field {where}{f.name!r}")
+            continue
+        if f.type is float:
+            ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        elif f.type is int:
+            ok = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            ok = isinstance(value, str)
+        if not ok:
+            raise SchemaError(
+                f"field {where}{f.name!r} must be {f.type.__name__}, got {type(value).__name__}"
+            )
+
+
+_RIDE_NAMES = frozenset(f.name for f in RIDE_FIELDS) | {"driver"}
+_DRIVER_NAMES = frozenset(f.name for f in RIDE_DRIVER_FIELDS)
+
+
+def validate_ride(record: object) -> dict:
+    """Return ``record`` unchanged if it is a well-formed ``Ride``, else raise SchemaError."""
+    _check(record, RIDE_FIELDS, "")
+    try:
+        datetime.fromisoformat(record["created_at"])
+    except ValueError:
+        raise SchemaError(
+            f"field 'created_at' is not an ISO-8601 timestamp: {record['created_at']!r}"
+        ) from None
+    unknown = record.keys() - _RIDE_NAMES
+    if unknown:
+        raise SchemaError(f"unknown field(s) {sorted(unknown)}")
+    driver = record.get("driver")
+    if driver is not None:
+        _check(driver, RIDE_DRIVER_FIELDS, "driver.")
+        unknown = driver.keys() - _DRIVER_NAMES
+        if unknown:
+            raise SchemaError(f"unknown field(s) {sorted('driver.' + k for k in unknown)}")
+    return record
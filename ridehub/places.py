@@ -0,0 +1,303 @@
+"""
+Places autocomplete cache
+=========================
+
+``GoogleTextInput`` sends every debounced keystroke straight to the Places
+Autocomplete endpoint, so a thousand riders typing "jfk" pay for "j", "jf" and
+"jfk" a thousand times.  :class:`AutocompleteCache` sits between the app and
+the endpoint:
+
+* results are stored on the nodes of a prefix trie (one trie per set of
+  non-input parameters such as ``language``), each with its own expiry, and
+  the number of cached nodes is bounded with least-recently-used eviction;
+* concurrent requests for the same prefix share one upstream call;
+* a longer prefix is answered by filtering a shorter prefix's result, but
+  only when that result was *complete* (fewer predictions than the upstream
+  page size).  Every match of the longer input also matches the shorter one,
+  so a complete list for the shorter input contains all of them.  A
+  truncated top-5 list is never filtered, because the longer input may match
+  places that were ranked out of it.
+
+Matching follows the term rule the stand-in implements: every word of the
+input must be a prefix of some word of the description, case-insensitively.
+Filtered answers keep the upstream ranking, and their ``matched_substrings``
+are recomputed for the longer input.
+
+:class:`PlacesClient` is the pooled upstream ``fetch``; the cache returns
+predictions in Google's shape, ready to be served back on the same path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlencode, urlsplit
+
+from ridehub.directions import ConnectionPool, _read_response
+from ridehub.metrics import counter, histogram, timed
+
+AUTOCOMPLETE_URL = "https://maps.googleapis.com/maps/api/place/autocomplete/json"
+API_KEY_ENV = "EXPO_PUBLIC_GOOGLE_PLACES_API_KEY"
+PAGE_SIZE = 5  # predictions Google returns per request
+
+# Parameters that do not change the predictions and must not split the cache.
+_UNKEYED = frozenset({"input", "key", "sessiontoken"})
+_WORD = re.compile(r"\w+")
+
+Fetch = Callable[[dict[str, str]], Awaitable[dict]]
+# (predictions, description words per prediction, complete, expires_at)
+_Entry = tuple[tuple[dict, ...], tuple[tuple[str, ...], ...], bool, float]
+_AUTOCOMPLETE_SECONDS = histogram(
+    "ridehub_places_autocomplete_seconds", "AutocompleteCache.autocomplete, upstream waits included"
+)
+_PLACES_UPSTREAM = counter("ridehub_places_upstream_total", "Autocomplete requests sent upstream")
+
+
+class PlacesError(RuntimeError):
+    """The Places service answered with an error status."""
+
+
+def input_terms(text: str) -> tuple[str, ...]:
+    """Lower-cased words of an input or description; punctuation separates words."""
+    return tuple(_WORD.findall(text.lower()))
+
+
+def matches(terms: tuple[str, ...], words: tuple[str, ...]) -> bool:
+    """Whether every input term is a prefix of some description word."""
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+
+def matched_substrings(terms: tuple[str, ...], description: str) -> list[dict]:
+    """Offsets of the first description word each term matches, Google's shape."""
+    spans = [(m.start(), m.group()) for m in _WORD.finditer(description.lower())]
+    found = []
+    for term in terms:
+        for offset, word in spans:
+            if word.startswith(term):
+                found.append({"length": len(term), "offset": offset})
+                break
+    return sorted(found, key=lambda span: span["offset"])
+
+
+@dataclass
+class PlacesStats:
+    lookups: int = 0
+    hits: int = 0  # answered from the exact prefix
+    filtered: int = 0  # answered by filtering a shorter, complete prefix
+    coalesced: int = 0  # joined an identical request already in flight
+    upstream: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered without their own upstream call."""
+        return 1 - self.upstream / self.lookups if self.lookups else 0.0
+
+
+class _Node:
+    __slots__ = ("parent", "char", "children", "entry")
+
+    def __init__(self, parent: Optional["_Node"], char: str) -> None:
+        self.parent = parent
+        self.char = char
+        self.children: dict[str, _Node] = {}
+        self.entry: Optional[_Entry] = None
+
+
+class AutocompleteCache:
+    """Prefix-trie cache of autocomplete predictions in front of ``fetch``.
+
+    ``fetch`` receives the request parameters (``input`` included) and returns
+    the decoded Places response.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetch,
+        *,
+        ttl: float = 600.0,
+        max_entries: int = 100_000,
+        page_size: int = PAGE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.page_size = page_size
+        self.clock = clock
+        self.stats = PlacesStats()
+        self._roots: dict[tuple, _Node] = {}
+        self._lru: OrderedDict[_Node, None] = OrderedDict()
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    @timed(_AUTOCOMPLETE_SECONDS)
+    async def autocomplete(self, text: str, **params: str) -> list[dict]:
+        """Predictions for ``text``; ``params`` are the other query parameters."""
+        self.stats.lookups += 1
+        terms = input_terms(text)
+        if not terms:
+            return []
+        key = " ".join(terms)
+        context = tuple(sorted((k, v) for k, v in params.items() if k not in _UNKEYED))
+
+        node, ancestor = self._find(context, key)
+        if node is not None:
+            self.stats.hits += 1
+            self._lru.move_to_end(node)
+            return list(node.entry[0])
+        if ancestor is not None:
+            self.stats.filtered += 1
+            predictions, words, _, expires_at = ancestor.entry
+            self._lru.move_to_end(ancestor)
+            keep = [i for i, w in enumerate(words) if matches(terms, w)]
+            result = tuple(
+                {**p, "matched_substrings": matched_substrings(terms, p["description"])}
+                for p in (predictions[i] for i in keep)
+            )
+            # A subset of a complete list is complete; it expires with its source.
+            self._store(context, key, result, tuple(words[i] for i in keep), True, expires_at)
+            return list(result)
+
+        future = self._in_flight.get((context, key))
+        if future is not None:
+            self.stats.coalesced += 1
+        else:
+            future = asyncio.ensure_future(self._load(context, key, {**params, "input": text}))
+            self._in_flight[context, key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop((context, key), None))
+        # Shield so one caller giving up does not cancel the shared request.
+        return list(await asyncio.shield(future))
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now; returns how many were removed."""
+        now = self.clock()
+        stale = [node for node in self._lru if node.entry[3] <= now]
+        for node in stale:
+            self._drop(node)
+        self.stats.expirations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._roots.clear()
+        self._lru.clear()
+
+    async def _load(self, context: tuple, key: str, params: dict[str, str]) -> tuple[dict, ...]:
+        self.stats.upstream += 1
+        _PLACES_UPSTREAM.inc()
+        payload = await self.fetch(params)
+        status = payload.get("status")
+        if status not in ("OK", "ZERO_RESULTS"):
+            raise PlacesError(f"Places autocomplete failed (status={status!r})")
+        predictions = tuple(payload.get("predictions", ()))
+        words = tuple(input_terms(p["description"]) for p in predictions)
+        complete = len(predictions) < self.page_size
+        self._store(context, key, predictions, words, complete, self.clock() + self.ttl)
+        return predictions
+
+    def _find(self, context: tuple, key: str) -> tuple[Optional[_Node], Optional[_Node]]:
+        """The fresh node for ``key`` and the deepest fresh complete ancestor."""
+        node = self._roots.get(context)
+        ancestor = None
+        if node is None:
+            return None, None
+        now = self.clock()
+        last = len(key) - 1
+        for i, char in enumerate(key):
+            node = node.children.get(char)
+            if node is None:
+                return None, ancestor
+            entry = node.entry
+            if entry is None:
+                continue
+            if entry[3] <= now:
+                self.stats.expirations += 1
+                parent = node.parent
+                self._drop(node)
+                if not parent.children.get(char):
+                    return None, ancestor
+                continue
+            if i == last:
+                return node, ancestor
+            if entry[2]:
+                ancestor = node
+        return None, ancestor
+
+    def _store(self, context, key, predictions, words, complete: bool, expires_at: float) -> None:
+        node = self._roots.get(context)
+        if node is None:
+            node = self._roots[context] = _Node(None, "")
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node(node, char)
+            node = child
+        node.entry = (predictions, words, complete, expires_at)
+        lru = self._lru
+        lru[node] = None
+        lru.move_to_end(node)
+        while len(lru) > self.max_entries:
+            self._drop(next(iter(lru)))
+            self.stats.evictions += 1
+
+    def _drop(self, node: _Node) -> None:
+        """Forget ``node``'s entry and prune the branch it no longer needs."""
+        node.entry = None
+        self._lru.pop(node, None)
+        while node.parent is not None and node.entry is None and not node.children:
+            del node.parent.children[node.char]
+            node = node.parent
+
+
+class PlacesClient:
+    """Pooled keep-alive client for the autocomplete endpoint; usable as ``fetch``."""
+
+    def __init__(
+        self,
+        base_url: str = AUTOCOMPLETE_URL,
+        *,
+        max_connections: int = 32,
+        key: Optional[str] = None,
+    ) -> None:
+        parts = urlsplit(base_url)
+        tls = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._path = parts.path or "/"
+        self._pool = ConnectionPool(
+            self._host, parts.port or (443 if tls else 80), max_size=max_connections, tls=tls
+        )
+        self.key = key if key is not None else os.environ.get(API_KEY_ENV)
+
+    async def __call__(self, params: dict[str, str]) -> dict:
+        if self.key:
+            params = {**params, "key": self.key}
+        reader, writer = await self._pool.acquire()
+        reusable = False
+        try:
+            writer.write(
+                f"GET {self._path}?{urlencode(params)} HTTP/1.1\r\nHost: {self._host}\r\n"
+                "Accept: application/json\r\nConnection: keep-alive\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status, headers, body = await _read_response(reader)
+            reusable = headers.get("connection", "").lower() != "close"
+        finally:
+            self._pool.release((reader, writer), reusable=reusable)
+        if status != 200:
+            raise PlacesError(f"HTTP {status}")
+        return json.loads(body)
+
+    async def close(self) -> None:
+        await self._pool.close()
+
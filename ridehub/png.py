@@ -0,0 +1,316 @@
+"""
+PNG codec
+=========
+
+Just enough PNG for the asset pipeline, implemented with :mod:`zlib` and
+NumPy.  :func:`decode` reads 8-bit and palette (1/2/4/8-bit) images in every
+colour type, without interlacing, into an ``(height, width, 4)`` RGBA
+``uint8`` array.  :func:`encode` writes the smallest of the encodings it
+tries:
+
+* an indexed image with ``PLTE``/``tRNS`` at the narrowest bit depth, when
+  there are no more than 256 distinct colours;
+* grey, grey+alpha, RGB or RGBA truecolour, dropping channels the pixels
+  do not use.  Each row gets the filter with the smallest sum of absolute
+  differences, libpng's heuristic, all computed at once in NumPy.
+
+Ancillary chunks (``eXIf``, ``tEXt``, ``pHYs``, ``gAMA``...) are not written.
+The colour values are taken as sRGB, as React Native displays them anyway.
+
+:func:`resize` is area-averaging resampling (each output pixel is the
+coverage-weighted mean of the input pixels under it) on premultiplied
+alpha, the right filter for the integer and 2/3 downscales of @1x/@2x/@3x
+renditions.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Union
+
+import numpy as np
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+_CRITICAL = (b"IHDR", b"PLTE", b"tRNS", b"IDAT", b"IEND")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class PngError(ValueError):
+    """The data is not a PNG this codec can read."""
+
+
+def header(data: Buffer) -> tuple[int, int, int, int]:
+    """``(width, height, bit_depth, colour_type)`` from the ``IHDR`` chunk."""
+    if bytes(data[:8]) != SIGNATURE or bytes(data[12:16]) != b"IHDR":
+        raise PngError("not a PNG file")
+    width, height, depth, colour = struct.unpack(">IIBB", data[16:26])
+    return width, height, depth, colour
+
+
+def strip(data: Buffer) -> bytes:
+    """The same image with only the chunks needed to display it (IHDR, PLTE, tRNS, IDAT, IEND)."""
+    header(data)
+    view = memoryview(data)
+    kept = [SIGNATURE]
+    pos = 8
+    while pos + 8 <= len(view):
+        length, kind = struct.unpack(">I4s", view[pos : pos + 8])
+        if kind in _CRITICAL:
+            kept.append(bytes(view[pos : pos + 12 + length]))
+        if kind == b"IEND":
+            break
+        pos += 12 + length
+    return b"".join(kept)
+
+
+def decode(data: Buffer) -> np.ndarray:
+    """RGBA ``uint8`` pixels of a PNG image."""
+    width, height, depth, colour = header(data)
+    if colour not in _CHANNELS:
+        raise PngError(f"unknown colour type {colour}")
+    if depth != 8 and not (colour in (0, 3) and depth in (1, 2, 4)):
+        raise PngError(f"unsupported bit depth {depth} for colour type {colour}")
+    if data[28]:
+        raise PngError("interlaced PNGs are not supported")
+    palette = transparency = None
+    idat = []
+    view = memoryview(data)
+    pos = 8
+    while pos + 8 <= len(view):
+        length, kind = struct.unpack(">I4s", view[pos : pos + 8])
+        body = view[pos + 8 : pos + 8 + length]
+        if kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"PLTE":
+            palette = np.frombuffer(body, np.uint8).reshape(-1, 3)
+        elif kind == b"tRNS":
+            transparency = bytes(body)
+        elif kind == b"IEND":
+            break
+        pos += 12 + length
+    try:
+        raw = zlib.decompress(b"".join(idat))
+    except zlib.error as exc:
+        raise PngError(f"corrupt image data: {exc}") from None
+
+    channels = _CHANNELS[colour]
+    row_bytes = (width * channels * depth + 7) // 8
+    if len(raw) < height * (row_bytes + 1):
+        raise PngError("image data is truncated")
+    rows = _unfilter(raw, height, row_bytes, max(1, channels * depth // 8))
+    if depth < 8:
+        bits = np.unpackbits(rows, axis=1).reshape(height, -1, depth)
+        weights = (1 << np.arange(depth - 1, -1, -1)).astype(np.uint8)
+        samples = (bits * weights).sum(axis=2, dtype=np.uint8)[:, :width, None]
+    else:
+        samples = rows.reshape(height, width, channels)
+
+    if colour == 3:
+        if palette is None:
+            raise PngError("indexed image without a PLTE chunk")
+        alpha = np.full(len(palette), 255, np.uint8)
+        if transparency:
+            alpha[: len(transparency)] = np.frombuffer(transparency, np.uint8)[: len(palette)]
+        lut = np.column_stack((palette, alpha))
+        index = samples[..., 0]
+        if index.max(initial=0) >= len(lut):
+            raise PngError("palette index out of range")
+        return lut[index]
+    if colour in (0, 4):
+        grey = samples[..., 0]
+        alpha = samples[..., 1] if colour == 4 else _opaque(grey, transparency, depth)
+        if depth < 8:
+            grey = grey * np.uint8(255 // ((1 << depth) - 1))
+        return np.stack((grey, grey, grey, alpha), axis=2)
+    if colour == 2:
+        alpha = _opaque(samples, transparency, depth)
+        return np.concatenate((samples, alpha[..., None]), axis=2)
+    return np.ascontiguousarray(samples)
+
+
+def encode(rgba: np.ndarray, *, level: int = 9) -> bytes:
+    """The smallest PNG encoding of ``(height, width, 4)`` RGBA pixels."""
+    rgba = np.ascontiguousarray(rgba, dtype=np.uint8)
+    if rgba.ndim != 3 or rgba.shape[2] != 4 or 0 in rgba.shape:
+        raise PngError(f"expected a non-empty (height, width, 4) array, got {rgba.shape}")
+    height, width = rgba.shape[:2]
+    candidates = [_truecolour(rgba, level)]
+    indexed = _indexed(rgba, level)
+    if indexed is not None:
+        candidates.append(indexed)
+    depth, colour, extra, data = min(candidates, key=lambda c: len(c[3]) + len(c[2]))
+    ihdr = struct.pack(">IIBBBBB", width, height, depth, colour, 0, 0, 0)
+    return SIGNATURE + _chunk(b"IHDR", ihdr) + extra + _chunk(b"IDAT", data) + _chunk(b"IEND", b"")
+
+
+def resize(rgba: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Area-averaged resampling of RGBA pixels to ``width`` x ``height``."""
+    if width <= 0 or height <= 0:
+        raise ValueError("width and height must be positive")
+    source_h, source_w = rgba.shape[:2]
+    if (source_w, source_h) == (width, height):
+        return rgba.copy()
+    pixels = rgba.astype(np.float32)
+    alpha = pixels[..., 3:] / 255.0
+    premultiplied = np.concatenate((pixels[..., :3] * alpha, pixels[..., 3:]), axis=2)
+    out = _resample(_resample(premultiplied, width, axis=1), height, axis=0)
+    out_alpha = out[..., 3:]
+    colour = np.divide(
+        out[..., :3] * 255.0, out_alpha, out=np.zeros_like(out[..., :3]), where=out_alpha > 0
+    )
+    result = np.concatenate((colour, out_alpha), axis=2)
+    return np.clip(np.rint(result), 0, 255).astype(np.uint8)
+
+
+# -- decoding ------------------------------------------------------------------
+
+
+def _opaque(samples: np.ndarray, transparency, depth: int) -> np.ndarray:
+    """Alpha for grey/RGB images: 0 where a pixel matches the ``tRNS`` colour."""
+    shape = samples.shape[:2]
+    if not transparency:
+        return np.full(shape, 255, np.uint8)
+    key = np.frombuffer(transparency, ">u2").astype(np.uint8 if depth == 8 else np.uint16)
+    if samples.ndim == 2:
+        return np.where(samples == key[0], 0, 255).astype(np.uint8)
+    return np.where((samples == key[:3]).all(axis=2), 0, 255).astype(np.uint8)
+
+
+def _unfilter(raw: bytes, height: int, row_bytes: int, bpp: int) -> np.ndarray:
+    data = np.frombuffer(raw, np.uint8, count=height * (row_bytes + 1)).reshape(height, -1)
+    kinds = data[:, 0]
+    if kinds.max(initial=0) > 4:
+        raise PngError(f"unknown row filter {kinds.max()}")
+    out = data[:, 1:].copy()
+    if not kinds.any():
+        return out
+    prior = np.zeros(row_bytes, np.uint8)
+    for y, kind in enumerate(kinds.tolist()):
+        row = out[y]
+        if kind == 1:
+            if row_bytes % bpp == 0:
+                grouped = row.reshape(-1, bpp)
+                np.cumsum(grouped, axis=0, dtype=np.uint8, out=grouped)
+            else:
+                _unfilter_sequential(row, prior, bpp, kind)
+        elif kind == 2:
+            row += prior
+        elif kind in (3, 4):
+            _unfilter_sequential(row, prior, bpp, kind)
+        prior = row
+    return out
+
+
+def _unfilter_sequential(row: np.ndarray, prior: np.ndarray, bpp: int, kind: int) -> None:
+    """Sub, Average and Paeth depend on the byte just reconstructed, so go byte by byte."""
+    line = row.tolist()
+    up = prior.tolist()
+    for i in range(len(line)):
+        a = line[i - bpp] if i >= bpp else 0
+        b = up[i]
+        if kind == 1:
+            predicted = a
+        elif kind == 3:
+            predicted = (a + b) >> 1
+        else:
+            c = up[i - bpp] if i >= bpp else 0
+            pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - 2 * c)
+            predicted = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+        line[i] = (line[i] + predicted) & 0xFF
+    row[:] = line
+
+
+# -- encoding ------------------------------------------------------------------
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def _truecolour(rgba: np.ndarray, level: int) -> tuple[int, int, bytes, bytes]:
+    opaque = bool((rgba[..., 3] == 255).all())
+    grey = bool((rgba[..., 0] == rgba[..., 1]).all() and (rgba[..., 1] == rgba[..., 2]).all())
+    if grey:
+        colour, pixels = (0, rgba[..., :1]) if opaque else (4, rgba[..., [0, 3]])
+    else:
+        colour, pixels = (2, rgba[..., :3]) if opaque else (6, rgba)
+    height, width, channels = pixels.shape
+    rows = np.ascontiguousarray(pixels).reshape(height, width * channels)
+    return 8, colour, b"", zlib.compress(_filter_rows(rows, channels), level)
+
+
+def _indexed(rgba: np.ndarray, level: int):
+    height, width = rgba.shape[:2]
+    packed = rgba.reshape(-1, 4).view(np.uint32).ravel()
+    colours, index = np.unique(packed, return_inverse=True)
+    if len(colours) > 256:
+        return None
+    # Transparent entries first, so tRNS can stop at the last of them.
+    table = colours.view(np.uint8).reshape(-1, 4)
+    order = np.argsort(table[:, 3] == 255, kind="stable")
+    table = table[order]
+    index = np.argsort(order)[index].astype(np.uint8).reshape(height, width)
+    depth = next(d for d in (1, 2, 4, 8) if len(table) <= 1 << d)
+    if depth < 8:
+        per_byte = 8 // depth
+        padded = np.zeros((height, -(-width // per_byte) * per_byte), np.uint8)
+        padded[:, :width] = index
+        bits = np.unpackbits(padded[..., None], axis=2)[..., 8 - depth :]
+        rows = np.packbits(bits.reshape(height, -1), axis=1)
+    else:
+        rows = index
+    # Filters rarely help indexed rows; libpng uses None for them too.
+    raw = np.column_stack((np.zeros(height, np.uint8), rows)).tobytes()
+    extra = _chunk(b"PLTE", table[:, :3].tobytes())
+    translucent = int((table[:, 3] < 255).sum())
+    if translucent:
+        extra += _chunk(b"tRNS", table[:translucent, 3].tobytes())
+    return depth, 3, extra, zlib.compress(raw, level)
+
+
+def _filter_rows(rows: np.ndarray, bpp: int) -> bytes:
+    """Rows prefixed with whichever of the five filters minimizes the sum of |residuals|."""
+    x = rows.astype(np.int16)
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    upleft = np.zeros_like(x)
+    upleft[1:, bpp:] = x[:-1, :-bpp]
+    pa, pb, pc = np.abs(up - upleft), np.abs(left - upleft), np.abs(left + up - 2 * upleft)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+    filtered = np.stack(
+        (x, x - left, x - up, x - ((left + up) >> 1), x - paeth)
+    ).astype(np.uint8)
+    signed = filtered.view(np.int8).astype(np.int16)
+    best = np.abs(signed).sum(axis=2).argmin(axis=0)
+    chosen = filtered[best, np.arange(len(rows))]
+    return np.column_stack((best.astype(np.uint8), chosen)).tobytes()
+
+
+def _resample(pixels: np.ndarray, target: int, axis: int) -> np.ndarray:
+    """Area-average ``pixels`` to ``target`` samples along ``axis``.
+
+    Each output sample overlaps at most ``ceil(source / target) + 1`` inputs,
+    so the weights are a narrow band: gather those few neighbours and sum.
+    """
+    source = pixels.shape[axis]
+    if source == target:
+        return pixels
+    ratio = source / target
+    start = np.arange(target) * ratio
+    first = np.floor(start).astype(np.intp)
+    taps = int(np.ceil(ratio)) + 1
+    index = first[:, None] + np.arange(taps)
+    overlap = np.minimum(start[:, None] + ratio, index + 1) - np.maximum(start[:, None], index)
+    weights = (np.clip(overlap, 0, None) / ratio).astype(np.float32)
+    index = np.minimum(index, source - 1)  # taps past the edge carry zero weight
+    moved = np.moveaxis(pixels, axis, 0)
+    out = np.zeros((target,) + moved.shape[1:], np.float32)
+    for tap in range(taps):
+        out += weights[:, tap].reshape(-1, *([1] * (moved.ndim - 1))) * moved[index[:, tap]]
+    return np.moveaxis(out, 0, axis)
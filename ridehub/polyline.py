@@ -0,0 +1,266 @@
+"""
+Route geometry: simplification and encoded polylines
+====================================================
+
+The pickup -> destination route is drawn from full-resolution directions
+geometry: a long trip ships and renders thousands of points, most of them
+closer together than a pixel at the zoom the map is showing.
+
+:class:`RouteGeometry` ranks every vertex of a route once with Douglas-Peucker
+and stores how far it sits off the simplified line at the moment it is kept.
+The ranking is vectorized: each round measures every interior point of every
+open segment in one NumPy pass and splits all segments at once, so the
+number of Python-level steps is the depth of the split tree, not the number
+of points.  Weights are capped by the parent's, which makes the kept set
+shrink monotonically with tolerance.  Simplifying to any tolerance is then a
+threshold on the weights, and the result is exactly what running
+Douglas-Peucker at that tolerance would keep.  Tolerance follows zoom: a
+``px_tolerance`` of one pixel is ``156543 * cos(lat) / 2**zoom`` metres.
+
+Output uses Google's encoded-polyline format (1e5 precision, zigzag, 5-bit
+varint chunks offset by 63), so ``overview_polyline`` consumers decode it
+unchanged.  :func:`encode` and :func:`decode` are vectorized too.
+
+:class:`RouteGeometryCache` keeps the ranked routes and the encoded string for
+each ``(route, zoom)`` with least-recently-used eviction.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from ridehub.geo import EARTH_RADIUS_KM
+from ridehub.route_cache import CacheStats
+
+PRECISION = 5
+MIN_ZOOM, MAX_ZOOM = 0, 21
+METRES_PER_PIXEL_Z0 = 156_543.033_92  # Web Mercator, 256-px tiles, at the equator
+
+_CHUNKS = 7  # 35 bits: enough for any delta of coordinates scaled by 1e5
+
+
+class PolylineError(ValueError):
+    """The string is not a valid encoded polyline."""
+
+
+def encode(points, precision: int = PRECISION) -> str:
+    """Google encoded polyline of (lat, lng) rows."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if not len(points):
+        return ""
+    scaled = _round_half_away(points * 10.0**precision)
+    deltas = np.diff(scaled, axis=0, prepend=0).ravel()
+    zigzag = (deltas << 1) ^ (deltas >> 63)
+    shifts = 5 * np.arange(_CHUNKS, dtype=np.int64)
+    chunks = (zigzag[:, None] >> shifts) & 0x1F
+    # Chunks after the highest non-zero one are dropped; the first always stays.
+    nonzero = chunks != 0
+    length = _CHUNKS - np.argmax(nonzero[:, ::-1], axis=1)
+    length[~nonzero.any(axis=1)] = 1
+    used = np.arange(_CHUNKS) < length[:, None]
+    more = np.arange(_CHUNKS) < (length - 1)[:, None]
+    encoded = (chunks | np.where(more, 0x20, 0)) + 63
+    return encoded[used].astype(np.uint8).tobytes().decode("ascii")
+
+
+def decode(text: str, precision: int = PRECISION) -> np.ndarray:
+    """(N, 2) lat/lng array of an encoded polyline."""
+    if not text:
+        return np.empty((0, 2))
+    raw = np.frombuffer(text.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    if raw.min() < 0 or raw.max() > 0x3F:
+        raise PolylineError("character outside the polyline alphabet")
+    last = (raw & 0x20) == 0
+    if not last[-1]:
+        raise PolylineError("polyline ends in the middle of a value")
+    ends = np.flatnonzero(last)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)
+    if position.max() >= _CHUNKS:
+        raise PolylineError("value longer than 35 bits")
+    values = np.add.reduceat((raw & 0x1F) << (5 * position), starts)
+    if len(values) % 2:
+        raise PolylineError("odd number of values")
+    deltas = (values >> 1) ^ -(values & 1)
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 10.0**precision
+
+
+def tolerance_m(zoom: float, latitude: float, px_tolerance: float = 1.0) -> float:
+    """Metres covered by ``px_tolerance`` screen pixels at ``zoom`` and ``latitude``."""
+    return px_tolerance * METRES_PER_PIXEL_Z0 * math.cos(math.radians(latitude)) / 2.0**zoom
+
+
+def directions_points(payload: dict, route: int = 0) -> np.ndarray:
+    """Full-resolution geometry of a Directions response: every step's polyline, joined."""
+    parts = []
+    for leg in payload["routes"][route]["legs"]:
+        for step in leg["steps"]:
+            part = decode(step["polyline"]["points"])
+            parts.append(part[1:] if parts and len(part) else part)
+    return np.concatenate(parts) if parts else np.empty((0, 2))
+
+
+class RouteGeometry:
+    """A route with per-vertex Douglas-Peucker weights in metres."""
+
+    def __init__(self, points, *, min_tolerance_m: Optional[float] = None) -> None:
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(self.points):
+            self.latitude = float(self.points[:, 0].mean())
+        else:
+            self.latitude = 0.0
+        if min_tolerance_m is None:
+            min_tolerance_m = tolerance_m(MAX_ZOOM, self.latitude, 0.5)
+        self.weights = _rank(_project(self.points, self.latitude), min_tolerance_m)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def keep(self, tolerance: float) -> np.ndarray:
+        """Boolean mask of the vertices Douglas-Peucker keeps at ``tolerance`` metres."""
+        return self.weights > tolerance
+
+    def simplified(self, zoom: float, px_tolerance: float = 1.0) -> np.ndarray:
+        return self.points[self.keep(tolerance_m(zoom, self.latitude, px_tolerance))]
+
+    def encoded(self, zoom: float, px_tolerance: float = 1.0) -> str:
+        return encode(self.simplified(zoom, px_tolerance))
+
+
+class RouteGeometryCache:
+    """Ranked routes and their encoded polylines per zoom, LRU-bounded."""
+
+    def __init__(
+        self, *, max_routes: int = 10_000, max_entries: int = 100_000, px_tolerance: float = 1.0
+    ) -> None:
+        if max_routes <= 0 or max_entries <= 0:
+            raise ValueError("max_routes and max_entries must be positive")
+        self.max_routes = max_routes
+        self.max_entries = max_entries
+        self.px_tolerance = px_tolerance
+        self.stats = CacheStats()
+        self._routes: OrderedDict[str, RouteGeometry] = OrderedDict()
+        self._encoded: OrderedDict[tuple[str, int], str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    def add(self, route_id: str, points) -> RouteGeometry:
+        """Rank a route's full geometry; replaces any earlier geometry for ``route_id``."""
+        geometry = RouteGeometry(points)
+        self.discard(route_id)
+        self._routes[route_id] = geometry
+        while len(self._routes) > self.max_routes:
+            self.discard(next(iter(self._routes)))
+            self.stats.evictions += 1
+        return geometry
+
+    def discard(self, route_id: str) -> None:
+        if self._routes.pop(route_id, None) is not None:
+            for zoom in range(MIN_ZOOM, MAX_ZOOM + 1):
+                self._encoded.pop((route_id, zoom), None)
+
+    def encoded(self, route_id: str, zoom: int, points=None) -> str:
+        """Encoded polyline of ``route_id`` at ``zoom``.
+
+        ``points`` is only needed the first time a route is seen (or after it
+        was evicted); otherwise ``KeyError`` is raised for unknown routes.
+        """
+        zoom = min(max(int(zoom), MIN_ZOOM), MAX_ZOOM)
+        key = (route_id, zoom)
+        text = self._encoded.get(key)
+        if text is not None:
+            self._encoded.move_to_end(key)
+            self.stats.hits += 1
+            return text
+        self.stats.misses += 1
+        geometry = self._routes.get(route_id)
+        if geometry is None:
+            if points is None:
+                raise KeyError(route_id)
+            geometry = self.add(route_id, points)
+        else:
+            self._routes.move_to_end(route_id)
+        text = geometry.encoded(zoom, self.px_tolerance)
+        self._encoded[key] = text
+        while len(self._encoded) > self.max_entries:
+            self._encoded.popitem(last=False)
+            self.stats.evictions += 1
+        return text
+
+    def clear(self) -> None:
+        self._routes.clear()
+        self._encoded.clear()
+
+
+def _round_half_away(values: np.ndarray) -> np.ndarray:
+    # Google's reference rounds half away from zero; np.round rounds half to even.
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+def _project(points: np.ndarray, latitude: float) -> np.ndarray:
+    """Local equirectangular metres around ``latitude``; fine at route scale."""
+    metres_per_degree = EARTH_RADIUS_KM * 1000.0 * math.pi / 180.0
+    return np.column_stack(
+        (
+            points[:, 1] * metres_per_degree * math.cos(math.radians(latitude)),
+            points[:, 0] * metres_per_degree,
+        )
+    )
+
+
+def _rank(xy: np.ndarray, floor: float) -> np.ndarray:
+    """Douglas-Peucker weight per vertex; endpoints are infinite.
+
+    Points whose weight would fall below ``floor`` stop splitting and are left
+    at 0, which bounds the work to the resolution anyone can see.
+    """
+    n = len(xy)
+    weights = np.zeros(n)
+    if n == 0:
+        return weights
+    weights[[0, -1]] = np.inf
+    starts = np.array([0])
+    ends = np.array([n - 1])
+    caps = np.array([np.inf])
+    while len(starts):
+        inner = ends - starts - 1
+        open_ = inner > 0
+        starts, ends, caps, inner = starts[open_], ends[open_], caps[open_], inner[open_]
+        if not len(starts):
+            break
+        # Every interior point of every open segment, segment by segment.
+        offsets = np.cumsum(inner) - inner
+        owner = np.repeat(np.arange(len(starts)), inner)
+        index = np.arange(inner.sum()) - np.repeat(offsets, inner) + np.repeat(starts + 1, inner)
+        distance = _segment_distance(xy[index], xy[starts[owner]], xy[ends[owner]])
+        best = np.maximum.reduceat(distance, offsets)
+        # Split at the first point reaching the maximum, like the recursive algorithm.
+        at_best = np.flatnonzero(distance == best[owner])
+        segment = owner[at_best]
+        split = index[at_best[np.r_[True, segment[1:] != segment[:-1]]]]
+        weight = np.minimum(best, caps)
+        keep = weight >= floor
+        weights[split[keep]] = weight[keep]
+        starts, ends, split, weight = starts[keep], ends[keep], split[keep], weight[keep]
+        starts, ends, caps = (
+            np.concatenate((starts, split)),
+            np.concatenate((split, ends)),
+            np.concatenate((weight, weight)),
+        )
+    return weights
+
+
+def _segment_distance(p: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distance from each point to the segment (not the infinite line) a-b."""
+    ab = b - a
+    ap = p - a
+    length2 = np.einsum("ij,ij->i", ab, ab)
+    t = np.clip(np.einsum("ij,ij->i", ap, ab) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+    closest = a + ab * t[:, None]
+    return np.hypot(*(p - closest).T)
+
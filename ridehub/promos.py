@@ -0,0 +1,455 @@
+"""
+Indexed promo-code engine
+=========================
+
+``promo-codes.tsx`` validates a code by walking a literal array, and its
+comparison (``code.toLowerCase() === input.toUpperCase()``) can never match.
+:class:`PromoEngine` holds millions of issued codes in flat NumPy columns:
+
+* codes are normalized (trimmed, upper-cased, spaces and dashes removed) and
+  stored as fixed-width bytes;
+* a :class:`BloomFilter` in front rejects most unknown codes without touching
+  the index;
+* an open-addressing hash table (linear probing, load <= 0.5) maps a code to
+  its row; bulk issue and batch lookup probe all codes at once, one
+  vectorized round per probe distance;
+* campaign rules (percentage or fixed, minimum ride amount, optional cap) are
+  compiled into arrays so :meth:`PromoEngine.apply` discounts a whole batch
+  of fares in one call;
+* :meth:`PromoEngine.redeem` checks and decrements ``usesLeft`` under a
+  striped lock, so concurrent redemptions never oversell a code.  Issuing
+  may run alongside: a grown index is built off to the side and published
+  in one assignment, and the columns redemption writes are carried over
+  with every stripe held.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Literal, Optional, Sequence
+
+import numpy as np
+
+from ridehub.metrics import counter, histogram, timed
+
+CODE_BYTES = 16
+UNLIMITED = -1
+NEVER = 0
+
+# Rejection reasons, in the order they are checked.
+OK = "ok"
+UNKNOWN = "unknown"
+INACTIVE = "inactive"
+EXPIRED = "expired"
+BELOW_MINIMUM = "below_minimum"
+EXHAUSTED = "exhausted"
+REASONS = (OK, UNKNOWN, INACTIVE, EXPIRED, BELOW_MINIMUM, EXHAUSTED)
+
+_MASK64 = (1 << 64) - 1
+_SEED = 0x9E3779B97F4A7C15
+_LOCK_STRIPES = 64
+_COLUMNS = ("_codes", "_rule", "_uses_left", "_active", "_expires_at", "_hashes")
+_STRIP = re.compile(r"[\s-]+")
+_REDEEM_SECONDS = histogram("ridehub_promo_redeem_seconds", "PromoEngine.redeem of one code")
+_REDEEM_REJECTED = counter("ridehub_promo_rejected_total", "Redemptions refused for any reason")
+
+
+def normalize_code(code: str) -> str:
+    """Canonical form used for storage and lookup: ``" save-20 "`` -> ``"SAVE20"``."""
+    return _STRIP.sub("", code).upper()
+
+
+def _encode(code: str) -> Optional[bytes]:
+    raw = normalize_code(code).encode("utf-8")
+    return raw if 0 < len(raw) <= CODE_BYTES else None
+
+
+def _mix(x):
+    """splitmix64 finalizer; works on Python ints and uint64 arrays alike."""
+    if isinstance(x, int):
+        x ^= x >> 30
+        x = (x * 0xBF58476D1CE4E5B9) & _MASK64
+        x ^= x >> 27
+        x = (x * 0x94D049BB133111EB) & _MASK64
+        return x ^ (x >> 31)
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _hash_one(raw: bytes) -> int:
+    padded = raw.ljust(CODE_BYTES, b"\0")
+    low = int.from_bytes(padded[:8], "little")
+    high = int.from_bytes(padded[8:], "little")
+    return _mix(low ^ _mix(high ^ _SEED))
+
+
+def hash_codes(codes: np.ndarray) -> np.ndarray:
+    """64-bit hashes of normalized codes given as an ``S16`` array."""
+    words = np.ascontiguousarray(codes, dtype=f"S{CODE_BYTES}").view("<u8").reshape(-1, 2)
+    return _mix(words[:, 0] ^ _mix(words[:, 1] ^ np.uint64(_SEED)))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit hashes (double hashing, ``k`` probes)."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01) -> None:
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.size = max(64, bits)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._view = memoryview(self._bits)
+
+    def _probes(self, h: np.ndarray):
+        step = _mix(h ^ np.uint64(_SEED)) | np.uint64(1)
+        size = np.uint64(self.size)
+        for i in range(self.hashes):
+            yield (h + np.uint64(i) * step) % size
+
+    def add_many(self, hashes: np.ndarray) -> None:
+        for index in self._probes(hashes):
+            bit = np.left_shift(1, (index & np.uint64(7)).astype(np.uint8), dtype=np.uint8)
+            np.bitwise_or.at(self._bits, index >> np.uint64(3), bit)
+
+    def contains_many(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.ones(len(hashes), dtype=bool)
+        for index in self._probes(hashes):
+            bit = np.left_shift(1, (index & np.uint64(7)).astype(np.uint8), dtype=np.uint8)
+            found &= (self._bits[index >> np.uint64(3)] & bit) != 0
+        return found
+
+    def __contains__(self, h: int) -> bool:
+        step = _mix(h ^ _SEED) | 1
+        bits = self._view
+        for i in range(self.hashes):
+            index = ((h + i * step) & _MASK64) % self.size
+            if not bits[index >> 3] >> (index & 7) & 1:
+                return False
+        return True
+
+
+@dataclass(frozen=True)
+class PromoRule:
+    """One campaign's discount, mirroring ``PromoCode.type`` / ``discount``."""
+
+    kind: Literal["percentage", "fixed"]
+    value: float
+    min_ride_amount: float = 0.0
+    max_discount: float = math.inf
+
+    def __post_init__(self) -> None:
+        if self.kind not in ("percentage", "fixed"):
+            raise ValueError(f"unknown promo kind {self.kind!r}")
+        if self.value < 0 or (self.kind == "percentage" and self.value > 100):
+            raise ValueError(f"invalid {self.kind} value {self.value}")
+
+
+@dataclass(frozen=True)
+class PromoResult:
+    code: str
+    reason: str
+    fare: float
+    discount: float
+
+    @property
+    def valid(self) -> bool:
+        return self.reason == OK
+
+    @property
+    def final_fare(self) -> float:
+        return self.fare - self.discount
+
+
+class PromoEngine:
+    """Issued promo codes with a Bloom-filtered hash index and compiled rules."""
+
+    def __init__(self, rules: Sequence[PromoRule], *, capacity: int = 1024) -> None:
+        if not rules:
+            raise ValueError("at least one rule is required")
+        self.rules = tuple(rules)
+        self._is_percentage = np.array([r.kind == "percentage" for r in rules])
+        self._value = np.array([r.value for r in rules], dtype=np.float64)
+        self._minimum = np.array([r.min_ride_amount for r in rules], dtype=np.float64)
+        self._cap = np.array([r.max_discount for r in rules], dtype=np.float64)
+
+        self._rows = 0
+        self._codes = np.zeros(0, dtype=f"S{CODE_BYTES}")
+        self._rule = np.zeros(0, dtype=np.int32)
+        self._uses_left = np.zeros(0, dtype=np.int64)
+        self._active = np.zeros(0, dtype=bool)
+        self._expires_at = np.zeros(0, dtype=np.int64)
+        self._hashes = np.zeros(0, dtype=np.uint64)
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._issuing = threading.Lock()
+        # (bloom, table, mask, codes) that lookups read, replaced as a unit
+        self._probe: tuple[BloomFilter, np.ndarray, int, np.ndarray]
+        self._reserve(max(capacity, 1))
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def bloom(self) -> BloomFilter:
+        return self._probe[0]
+
+    # -- issuing -----------------------------------------------------------
+
+    def issue_many(
+        self,
+        codes: Sequence[str] | np.ndarray,
+        rule: int | np.ndarray,
+        *,
+        uses: int | np.ndarray = UNLIMITED,
+        expires_at: int | np.ndarray = NEVER,
+        active: bool | np.ndarray = True,
+        normalized: bool = False,
+    ) -> None:
+        """Add codes in bulk.
+
+        ``codes`` may be an ``S16`` array of already-normalized codes (pass
+        ``normalized=True``) to skip per-code string work.  Raises ValueError
+        if a code is empty, too long or already issued; nothing is added then.
+        """
+        if normalized:
+            raw = np.asarray(codes, dtype=f"S{CODE_BYTES}")
+        else:
+            encoded = [_encode(c) for c in codes]
+            if None in encoded:
+                bad = next(c for c, e in zip(codes, encoded) if e is None)
+                raise ValueError(f"promo code {bad!r} is empty or longer than {CODE_BYTES} bytes")
+            raw = np.array(encoded, dtype=f"S{CODE_BYTES}")
+        count = len(raw)
+        rule = np.broadcast_to(np.asarray(rule, dtype=np.int32), (count,))
+        if count and (rule.min() < 0 or rule.max() >= len(self.rules)):
+            raise ValueError("rule index out of range")
+
+        with self._issuing:
+            start = self._rows
+            self._reserve(start + count)
+            end = start + count
+            self._codes[start:end] = raw
+            self._hashes[start:end] = hash_codes(raw)
+            bloom, table, mask, codes = self._probe
+            try:
+                _place(table, codes, self._hashes, np.arange(start, end, dtype=np.int64))
+            except ValueError:
+                # Drop the rows placed before the duplicate turned up.
+                self._probe = (bloom, *self._table(codes, self._hashes, start))
+                raise
+            # A row is placed before its columns are set; until then it reads
+            # as inactive with no uses left, so it cannot be redeemed early.
+            self._rule[start:end] = rule
+            self._uses_left[start:end] = uses
+            self._expires_at[start:end] = expires_at
+            self._active[start:end] = active
+            self._rows = end
+            bloom.add_many(self._hashes[start:end])
+
+    def issue(self, code: str, rule: int, **kwargs) -> None:
+        self.issue_many([code], rule, **kwargs)
+
+    def get(self, code: str) -> Optional[dict]:
+        """Stored state of ``code`` (``usesLeft`` of -1 means unlimited), or None."""
+        row = self.lookup(code)
+        if row is None:
+            return None
+        return {
+            "code": self._codes[row].decode(),
+            "rule": self.rules[self._rule[row]],
+            "usesLeft": int(self._uses_left[row]),
+            "isActive": bool(self._active[row]),
+            "expiresAt": int(self._expires_at[row]),
+        }
+
+    def deactivate(self, code: str) -> bool:
+        row = self.lookup(code)
+        if row is None:
+            return False
+        with self._locks[row % _LOCK_STRIPES]:
+            self._active[row] = False
+        return True
+
+    # -- lookup ------------------------------------------------------------
+
+    def lookup(self, code: str) -> Optional[int]:
+        """Row of ``code``, or None if it was never issued."""
+        raw = _encode(code)
+        if raw is None:
+            return None
+        h = _hash_one(raw)
+        bloom, table, mask, codes = self._probe
+        if h not in bloom:
+            return None
+        slot = h & mask
+        while True:
+            row = int(table[slot])
+            if row < 0:
+                return None
+            if codes[row] == raw:
+                return row
+            slot = (slot + 1) & mask
+
+    def lookup_many(self, codes: Sequence[str] | np.ndarray, *, normalized: bool = False) -> np.ndarray:
+        """Rows for a batch of codes, -1 where unknown."""
+        if normalized:
+            raw = np.asarray(codes, dtype=f"S{CODE_BYTES}")
+        else:
+            raw = np.array([_encode(c) or b"" for c in codes], dtype=f"S{CODE_BYTES}")
+        hashes = hash_codes(raw)
+        bloom, table, mask, stored = self._probe
+        rows = np.full(len(raw), -1, dtype=np.int64)
+        pending = np.flatnonzero((raw != b"") & bloom.contains_many(hashes))
+        slots = (hashes[pending] & np.uint64(mask)).astype(np.int64)
+        while len(pending):
+            found = table[slots]
+            empty = found < 0
+            hit = ~empty
+            hit[hit] = stored[found[hit]] == raw[pending[hit]]
+            rows[pending[hit]] = found[hit]
+            more = ~(empty | hit)
+            pending = pending[more]
+            slots = (slots[more] + 1) & mask
+        return rows
+
+    # -- pricing -----------------------------------------------------------
+
+    def reasons(self, rows: np.ndarray, fares: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """Index into :data:`REASONS` for each (row, fare) pair; rows broadcast against fares."""
+        now = time.time() if now is None else now
+        rows, fares = np.broadcast_arrays(np.asarray(rows), np.asarray(fares, dtype=np.float64))
+        known = rows >= 0
+        safe = np.where(known, rows, 0)
+        expires = self._expires_at[safe]
+        reason = np.zeros(rows.shape, dtype=np.int8)
+        checks = (
+            (EXHAUSTED, self._uses_left[safe] == 0),
+            (BELOW_MINIMUM, fares < self._minimum[self._rule[safe]]),
+            (EXPIRED, (expires != NEVER) & (expires <= now)),
+            (INACTIVE, ~self._active[safe]),
+            (UNKNOWN, ~known),
+        )
+        # Later checks win, so the earliest failing check in REASONS order is reported.
+        for name, failed in checks:
+            reason[failed] = REASONS.index(name)
+        return reason
+
+    def discounts(self, rows, fares, now: Optional[float] = None) -> np.ndarray:
+        """Discount for each fare, 0 where the code does not apply."""
+        fares = np.asarray(fares, dtype=np.float64)
+        rows = np.broadcast_to(np.asarray(rows), fares.shape)
+        rule = self._rule[np.where(rows >= 0, rows, 0)]
+        amount = np.where(self._is_percentage[rule], fares * (self._value[rule] / 100.0), self._value[rule])
+        amount = np.minimum(np.minimum(amount, self._cap[rule]), fares)
+        return np.where(self.reasons(rows, fares, now) == 0, amount, 0.0)
+
+    def apply(self, fares, codes: str | Sequence[str], now: Optional[float] = None) -> np.ndarray:
+        """Discounted fares in one call.
+
+        ``codes`` is one code for every fare (e.g. a rider's code against all
+        candidate drivers) or one code per row of ``fares``.
+        """
+        fares = np.asarray(fares, dtype=np.float64)
+        if isinstance(codes, str):
+            rows = np.int64(-1 if (row := self.lookup(codes)) is None else row)
+        else:
+            rows = self.lookup_many(codes).reshape((-1,) + (1,) * (fares.ndim - 1))
+        return fares - self.discounts(rows, fares, now)
+
+    def check(self, code: str, fare: float, now: Optional[float] = None) -> PromoResult:
+        row = self.lookup(code)
+        return self._result(code, -1 if row is None else row, fare, now)
+
+    @timed(_REDEEM_SECONDS)
+    def redeem(self, code: str, fare: float, now: Optional[float] = None) -> PromoResult:
+        """Validate and consume one use of ``code``; safe under concurrent callers."""
+        row = self.lookup(code)
+        if row is None:
+            _REDEEM_REJECTED.inc()
+            return PromoResult(code, UNKNOWN, fare, 0.0)
+        with self._locks[row % _LOCK_STRIPES]:
+            result = self._result(code, row, fare, now)
+            if result.valid and self._uses_left[row] > 0:
+                self._uses_left[row] -= 1
+        if not result.valid:
+            _REDEEM_REJECTED.inc()
+        return result
+
+    def _result(self, code: str, row: int, fare: float, now: Optional[float]) -> PromoResult:
+        reason = REASONS[int(self.reasons(np.int64(row), fare, now))]
+        discount = float(self.discounts(np.int64(row), fare, now)) if reason == OK else 0.0
+        return PromoResult(code, reason, fare, discount)
+
+    # -- storage -----------------------------------------------------------
+
+    def _reserve(self, rows: int) -> None:
+        """Grow every column to hold ``rows``; the caller holds ``_issuing``."""
+        capacity = len(self._codes)
+        if rows <= capacity:
+            return
+        capacity = max(rows, 2 * capacity, 16)
+        used = self._rows
+        grown = {}
+        for name in _COLUMNS:
+            old = getattr(self, name)
+            grown[name] = np.zeros(capacity, dtype=old.dtype)
+            grown[name][:used] = old[:used]
+        bloom = BloomFilter(capacity)
+        bloom.add_many(grown["_hashes"][:used])
+        table, mask = self._table(grown["_codes"], grown["_hashes"], used)
+        # redeem and deactivate write these in place: copy them again, and swap
+        # everything in, where neither can run.
+        with self._all_stripes():
+            for name in ("_uses_left", "_active"):
+                grown[name][:used] = getattr(self, name)[:used]
+            for name, column in grown.items():
+                setattr(self, name, column)
+            self._probe = (bloom, table, mask, grown["_codes"])
+
+    def _table(self, codes: np.ndarray, hashes: np.ndarray, rows: int) -> tuple[np.ndarray, int]:
+        """A new probe table sized for ``codes``, holding its first ``rows`` rows."""
+        slots = 1 << max(5, (2 * len(codes) - 1).bit_length())
+        table = np.full(slots, -1, dtype=np.int64)
+        if rows:
+            _place(table, codes, hashes, np.arange(rows, dtype=np.int64))
+        return table, slots - 1
+
+    @contextmanager
+    def _all_stripes(self):
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+
+def _place(table: np.ndarray, codes: np.ndarray, hashes: np.ndarray, rows: np.ndarray) -> None:
+    """Place ``rows`` into the probe ``table``, one linear-probing step per round."""
+    mask = len(table) - 1
+    slots = (hashes[rows] & np.uint64(mask)).astype(np.int64)
+    while len(rows):
+        occupant = table[slots]
+        taken = occupant >= 0
+        duplicate = codes[occupant[taken]] == codes[rows[taken]]
+        if duplicate.any():
+            code = codes[rows[taken][duplicate][0]].decode()
+            raise ValueError(f"promo code {code!r} is already issued")
+        # Several rows may target the same empty slot: the first one wins and
+        # the others retry it next round, where it then counts as taken.
+        candidates = np.flatnonzero(~taken)
+        _, first = np.unique(slots[candidates], return_index=True)
+        winners = candidates[first]
+        table[slots[winners]] = rows[winners]
+        keep = np.ones(len(rows), dtype=bool)
+        keep[winners] = False
+        slots = np.where(taken, (slots + 1) & mask, slots)[keep]
+        rows = rows[keep]
@@ -0,0 +1,153 @@
+"""
+Streaming NDJSON import/export for ride history
+===============================================
+
+Rides move in and out as newline-delimited JSON, one ``Ride`` object per
+line, optionally gzip-compressed (chosen by a ``.gz`` suffix).  Everything is
+a generator over fixed-size chunks, so memory depends on ``chunk_size`` and
+never on the size of the file:
+
+* :func:`read_rides` yields lists of validated rides;
+* :func:`write_rides` consumes any iterable of rides;
+* :func:`import_rides` / :func:`export_rides` connect those to a
+  :class:`~ridehub.ride_store.RideStore`.
+
+Every record is checked against the ``Ride`` interface; schema errors carry
+the file name and line number.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Iterable, Iterator, Literal, Mapping, Optional, Union
+
+from ridehub.models import SchemaError, validate_ride
+from ridehub.ride_store import RideStore
+
+DEFAULT_CHUNK = 10_000
+PathLike = Union[str, os.PathLike]
+
+
+class RideImportError(ValueError):
+    """A line of an NDJSON file could not be turned into a ``Ride``."""
+
+    def __init__(self, path: str, line: int, reason: str) -> None:
+        super().__init__(f"{path}:{line}: {reason}")
+        self.path = path
+        self.line = line
+        self.reason = reason
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    skipped: int = 0
+
+
+def _open(path: PathLike, mode: Literal["r", "w"], compresslevel: int = 6) -> IO[str]:
+    if os.fspath(path).endswith(".gz"):
+        raw = gzip.open(path, mode + "b", compresslevel=compresslevel)
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="\n")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def read_rides(
+    path: PathLike,
+    *,
+    chunk_size: int = DEFAULT_CHUNK,
+    errors: Literal["raise", "skip"] = "raise",
+    stats: Optional[ImportStats] = None,
+) -> Iterator[list[dict]]:
+    """Yield validated rides from an NDJSON file, ``chunk_size`` at a time.
+
+    Blank lines are ignored.  With ``errors="skip"`` malformed lines are
+    counted in ``stats.skipped`` instead of raising :class:`RideImportError`.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if errors not in ("raise", "skip"):
+        raise ValueError(f"errors must be 'raise' or 'skip', not {errors!r}")
+    stats = stats if stats is not None else ImportStats()
+    name = os.fspath(path)
+    loads = json.loads
+    with _open(path, "r") as handle:
+        number = 0
+        while True:
+            lines = list(islice(handle, chunk_size))
+            if not lines:
+                return
+            chunk = []
+            for line in lines:
+                number += 1
+                if not line.strip():
+                    continue
+                try:
+                    chunk.append(validate_ride(loads(line)))
+                except (json.JSONDecodeError, SchemaError) as exc:
+                    if errors == "raise":
+                        raise RideImportError(name, number, str(exc)) from exc
+                    stats.skipped += 1
+            stats.rows += len(chunk)
+            if chunk:
+                yield chunk
+
+
+def write_rides(
+    path: PathLike,
+    rides: Iterable[Mapping],
+    *,
+    chunk_size: int = DEFAULT_CHUNK,
+    compresslevel: int = 6,
+    validate: bool = True,
+) -> int:
+    """Write ``rides`` as NDJSON and return how many were written."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    rides = iter(rides)
+    count = 0
+    with _open(path, "w", compresslevel) as handle:
+        while True:
+            chunk = list(islice(rides, chunk_size))
+            if not chunk:
+                return count
+            if validate:
+                for offset, ride in enumerate(chunk):
+                    try:
+                        validate_ride(ride)
+                    except SchemaError as exc:
+                        raise RideImportError(os.fspath(path), count + offset + 1, str(exc)) from exc
+            handle.write("\n".join(map(dumps, chunk)))
+            handle.write("\n")
+            count += len(chunk)
+
+
+def import_rides(
+    store: RideStore,
+    path: PathLike,
+    *,
+    chunk_size: int = DEFAULT_CHUNK,
+    errors: Literal["raise", "skip"] = "raise",
+) -> ImportStats:
+    """Stream an NDJSON file into ``store``."""
+    stats = ImportStats()
+    for chunk in read_rides(path, chunk_size=chunk_size, errors=errors, stats=stats):
+        store.extend(chunk)
+    return stats
+
+
+def export_rides(
+    store: RideStore,
+    path: PathLike,
+    *,
+    chunk_size: int = DEFAULT_CHUNK,
+    compresslevel: int = 6,
+) -> int:
+    """Write every ride in ``store`` to ``path``, oldest first."""
+    # Rows came out of the store, so they already passed validation on the way in.
+    return write_rides(path, store, chunk_size=chunk_size, compresslevel=compresslevel, validate=False)
@@ -0,0 +1,244 @@
+"""
+Indexed ride-history store
+==========================
+
+``sortRides`` in ``lib/utils.ts`` builds two ``Date`` objects inside every
+comparator call, sorts the whole array and reverses it, and ``rides.tsx``
+filters ``payment_status`` again on every render.
+
+:class:`RideStore` keeps ``Ride`` records in array-backed columns and parses
+``created_at`` exactly once, at insert, into an integer microsecond sort key.
+Secondary indexes on ``user_id``, ``driver_id`` and ``payment_status`` keep
+row ids ordered by that key, so a history page is a bisect plus a slice, and
+pages are addressed by an opaque cursor rather than an offset.
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Collection, Iterable, Iterator, Mapping, Optional, Union
+
+from ridehub.metrics import histogram, timed
+from ridehub.models import RIDE_FIELDS
+
+INDEXED_FIELDS = ("user_id", "driver_id", "payment_status")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_QUERY_SECONDS = histogram("ridehub_ride_store_query_seconds", "RideStore.query of one page")
+
+
+def timestamp_key(created_at: str) -> int:
+    """Microseconds since the epoch for an ISO-8601 ``created_at`` (UTC if naive)."""
+    moment = datetime.fromisoformat(created_at)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    delta = moment - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class _Posting:
+    """Row ids ordered by ``(sort key, row)``."""
+
+    __slots__ = ("keys", "rows")
+
+    def __init__(self) -> None:
+        self.keys = array("q")
+        self.rows = array("q")
+
+    def add(self, key: int, row: int) -> None:
+        keys, rows = self.keys, self.rows
+        if not keys or (key, row) >= (keys[-1], rows[-1]):
+            keys.append(key)
+            rows.append(row)
+            return
+        at = bisect_left(keys, key)
+        while at < len(keys) and keys[at] == key and rows[at] < row:
+            at += 1
+        keys.insert(at, key)
+        rows.insert(at, row)
+
+    def before(self, cursor: Optional[tuple[int, int]]) -> Iterator[tuple[int, int]]:
+        """``(key, row)`` pairs strictly older than ``cursor``, newest first."""
+        keys, rows = self.keys, self.rows
+        end = len(keys)
+        if cursor is not None:
+            key, row = cursor
+            end = bisect_left(keys, key)
+            while end < len(keys) and keys[end] == key and rows[end] < row:
+                end += 1
+        for i in range(end - 1, -1, -1):
+            yield keys[i], rows[i]
+
+
+@dataclass(frozen=True)
+class Page:
+    rides: list[dict]
+    next_cursor: Optional[str]
+
+
+class RideStore:
+    """Columnar, append-mostly store of ``Ride`` records."""
+
+    def __init__(self) -> None:
+        self._columns: dict[str, Union[array, list]] = {}
+        for f in RIDE_FIELDS:
+            if f.type is float and not f.optional:
+                self._columns[f.name] = array("d")
+            elif f.type is int and not f.optional:
+                self._columns[f.name] = array("q")
+            else:
+                self._columns[f.name] = []
+        self._drivers: list[Optional[dict]] = []
+        self._keys = array("q")
+        self._all = _Posting()
+        self._indexes: dict[str, dict[object, _Posting]] = {name: {} for name in INDEXED_FIELDS}
+        self._strings: dict[str, str] = {}
+        self._layout = [(f.name, self._columns[f.name], f.type is str, f.optional) for f in RIDE_FIELDS]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def insert(self, ride: Mapping) -> int:
+        """Store one ride and return its row id."""
+        row = len(self._keys)
+        key = timestamp_key(ride["created_at"])
+        strings = self._strings
+        values = []
+        for name, _, is_str, optional in self._layout:
+            value = ride.get(name)
+            if value is None:
+                if not optional:
+                    raise ValueError(f"ride is missing required field {name!r}")
+            elif is_str:
+                value = strings.setdefault(value, value)
+            values.append(value)
+        # A typed column rejects a wrong-typed value; undo the appends before it so
+        # every column keeps one entry per row.
+        done = 0
+        try:
+            for (_, column, _, _), value in zip(self._layout, values):
+                column.append(value)
+                done += 1
+        except (TypeError, OverflowError):
+            for _, column, _, _ in self._layout[:done]:
+                column.pop()
+            name = self._layout[done][0]
+            raise ValueError(f"ride field {name!r} has the wrong type: {values[done]!r}") from None
+        self._drivers.append(ride.get("driver"))
+        self._keys.append(key)
+        self._all.add(key, row)
+        for name in INDEXED_FIELDS:
+            index = self._indexes[name]
+            value = ride[name]
+            posting = index.get(value)
+            if posting is None:
+                posting = index[value] = _Posting()
+            posting.add(key, row)
+        return row
+
+    def extend(self, rides: Iterable[Mapping]) -> int:
+        count = 0
+        for ride in rides:
+            self.insert(ride)
+            count += 1
+        return count
+
+    def get(self, row: int) -> dict:
+        """The ride at ``row`` as a ``Ride``-shaped dict."""
+        ride = {}
+        for f in RIDE_FIELDS:
+            value = self._columns[f.name][row]
+            if value is not None:
+                ride[f.name] = value
+        driver = self._drivers[row]
+        if driver is not None:
+            ride["driver"] = driver
+        return ride
+
+    def __iter__(self) -> Iterator[dict]:
+        """Every ride, oldest first."""
+        for row in self._all.rows:
+            yield self.get(row)
+
+    def values(self, field: str) -> list:
+        """Distinct values seen for an indexed field (e.g. payment statuses)."""
+        return list(self._indexes[field])
+
+    @timed(_QUERY_SECONDS)
+    def query(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        driver_id: Optional[int] = None,
+        payment_status: Union[None, str, Collection[str]] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Page:
+        """Newest-first page of rides matching every given filter.
+
+        ``payment_status`` may be one status or a collection of statuses
+        (``rides.tsx``'s "cancelled" tab is every status except ``"paid"``).
+        Pass ``page.next_cursor`` back as ``cursor`` for the following page.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        position = _parse_cursor(cursor)
+
+        candidates: list[tuple[str, object]] = []
+        if user_id is not None:
+            candidates.append(("user_id", user_id))
+        if driver_id is not None:
+            candidates.append(("driver_id", driver_id))
+        statuses: Optional[set] = None
+        if payment_status is not None:
+            statuses = {payment_status} if isinstance(payment_status, str) else set(payment_status)
+
+        # Walk the shortest posting list and check the other filters per row.
+        streams = []
+        for name, value in candidates:
+            posting = self._indexes[name].get(value)
+            if posting is None:
+                return Page([], None)
+            streams.append((len(posting.keys), name, posting.before(position)))
+        if statuses is not None:
+            postings = [self._indexes["payment_status"].get(s) for s in statuses]
+            postings = [p for p in postings if p is not None]
+            if not postings:
+                return Page([], None)
+            merged = heapq.merge(*(p.before(position) for p in postings), reverse=True)
+            streams.append((sum(len(p.keys) for p in postings), "payment_status", merged))
+        if not streams:
+            streams.append((len(self._all.keys), "", self._all.before(position)))
+        streams.sort(key=lambda item: item[0])
+        _, driving, stream = streams[0]
+
+        checks = [(name, value) for name, value in candidates if name != driving]
+        status_column = self._columns["payment_status"]
+        check_status = statuses is not None and driving != "payment_status"
+
+        def matches(row: int) -> bool:
+            for name, value in checks:
+                if self._columns[name][row] != value:
+                    return False
+            return not check_status or status_column[row] in statuses
+
+        hits = list(islice(((k, r) for k, r in stream if matches(r)), limit + 1))
+        more = len(hits) > limit
+        hits = hits[:limit]
+        next_cursor = f"{hits[-1][0]}.{hits[-1][1]}" if more else None
+        return Page([self.get(row) for _, row in hits], next_cursor)
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[tuple[int, int]]:
+    if cursor is None:
+        return None
+    try:
+        key, row = cursor.split(".")
+        return int(key), int(row)
+    except ValueError:
+        raise ValueError(f"malformed cursor {cursor!r}") from None
@@ -0,0 +1,136 @@
+"""
+Route / ETA cache
+=================
+
+``calculateDriverTimes`` asks the Directions API for every leg using the exact
+float coordinates, so riders standing a few metres apart never share a
+result.  :class:`RouteCache` snaps origin and destination to a configurable
+grid before looking a leg up, keeps durations for ``ttl`` seconds, and bounds
+memory with least-recently-used eviction.
+
+``cache.wrap(fetch)`` returns a ``LegDuration`` that can be handed straight to
+``ridehub.eta.EtaEngine(leg_duration=...)``.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from ridehub.eta import LegDuration
+
+RouteKey = tuple[int, int, int, int]
+
+DEFAULT_GRID_DEG = 0.0005  # ~55 m of latitude
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class RouteCache:
+    """Quantized-key duration cache with TTL expiry and LRU eviction."""
+
+    def __init__(
+        self,
+        *,
+        grid_deg: float = DEFAULT_GRID_DEG,
+        ttl: float = 300.0,
+        max_entries: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if grid_deg <= 0:
+            raise ValueError("grid_deg must be positive")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.grid_deg = grid_deg
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[RouteKey, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float) -> RouteKey:
+        grid = self.grid_deg
+        return (
+            round(origin_lat / grid),
+            round(origin_lng / grid),
+            round(dest_lat / grid),
+            round(dest_lng / grid),
+        )
+
+    def get(
+        self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float
+    ) -> Optional[float]:
+        """Cached duration in seconds, or ``None`` (counted as a miss)."""
+        key = self.key(origin_lat, origin_lng, dest_lat, dest_lng)
+        entry = self._entries.get(key)
+        if entry is not None:
+            seconds, expires_at = entry
+            if expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return seconds
+            del self._entries[key]
+            self.stats.expirations += 1
+        self.stats.misses += 1
+        return None
+
+    def put(
+        self, origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float, seconds: float
+    ) -> None:
+        key = self.key(origin_lat, origin_lng, dest_lat, dest_lng)
+        entries = self._entries
+        entries[key] = (seconds, self.clock() + self.ttl)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def get_or_fetch(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        dest_lat: float,
+        dest_lng: float,
+        fetch: LegDuration,
+    ) -> float:
+        seconds = self.get(origin_lat, origin_lng, dest_lat, dest_lng)
+        if seconds is None:
+            seconds = fetch(origin_lat, origin_lng, dest_lat, dest_lng)
+            self.put(origin_lat, origin_lng, dest_lat, dest_lng, seconds)
+        return seconds
+
+    def wrap(self, fetch: LegDuration) -> LegDuration:
+        """A ``LegDuration`` that consults the cache before calling ``fetch``."""
+
+        def cached(origin_lat: float, origin_lng: float, dest_lat: float, dest_lng: float) -> float:
+            return self.get_or_fetch(origin_lat, origin_lng, dest_lat, dest_lng, fetch)
+
+        return cached
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now; returns how many were removed."""
+        now = self.clock()
+        stale = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in stale:
+            del self._entries[key]
+        self.stats.expirations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,490 @@
+"""
+Geocell-sharded dispatch workers
+================================
+
+``store/index.ts`` holds every driver and ``calculateDriverTimes`` evaluates
+every candidate in the one JS thread.  :class:`DispatchRuntime` partitions
+the city into rectangular shards of geocells (:class:`ShardGrid`) and gives
+each worker process a contiguous run of shards to match.
+
+Driver positions live in a :class:`SharedDriverTable`, a single
+``multiprocessing.shared_memory`` block laid out shard by shard: every shard
+owns a fixed range of slots, so the drivers of one shard are contiguous and
+workers read them as NumPy views of the block without anything being pickled
+through a pipe.  Only the coordinator writes.  Each shard has a sequence
+counter that is odd while it is being written, and a worker re-runs a shard
+whose counter moved while it was matching.  A counter left odd for longer than
+:data:`WRITE_TIMEOUT` means the writer died mid-write, and reading that shard
+raises :class:`TimeoutError` rather than waiting forever.
+
+Requests near a shard border can be served by drivers across it: a worker
+also reads the shards within ``max_pickup_seconds`` of its requests.  Those
+drivers may be claimed by a neighbouring worker in the same tick.  The
+coordinator resolves such conflicts by keeping the cheaper pickup, and the
+other rider goes back into the next tick.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Hashable, Optional, Sequence
+
+import numpy as np
+
+from ridehub.assignment import UNASSIGNED, solve
+from ridehub.eta import EtaEngine
+from ridehub.geo import DEFAULT_CELL_DEG, KM_PER_DEGREE_LAT, geocell, geocells
+from ridehub.metrics import histogram, timed
+
+_PRICED_OUT = 1e9
+WRITE_TIMEOUT = 1.0  # seconds a shard may stay mid-write before readers give up
+
+_TICK_SECONDS = histogram("ridehub_dispatch_tick_seconds", "DispatchRuntime.tick across shards")
+
+
+class ShardGrid:
+    """The city bounding box cut into square blocks of ``shard_cells`` geocells."""
+
+    def __init__(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        *,
+        shard_cells: int = 8,
+        cell_deg: float = DEFAULT_CELL_DEG,
+    ) -> None:
+        if shard_cells <= 0 or cell_deg <= 0:
+            raise ValueError("shard_cells and cell_deg must be positive")
+        self.bounds = (south, west, north, east)
+        self.shard_cells = shard_cells
+        self.cell_deg = cell_deg
+        self.row0, self.col0 = geocell(south, west, cell_deg)
+        row_hi, col_hi = geocell(north, east, cell_deg)
+        self.rows = (row_hi - self.row0) // shard_cells + 1
+        self.cols = (col_hi - self.col0) // shard_cells + 1
+
+    def __len__(self) -> int:
+        return self.rows * self.cols
+
+    def shard_of(self, lat, lng) -> np.ndarray:
+        """Shard index per point; points outside the box go to the nearest edge shard."""
+        rows, cols = geocells(lat, lng, self.cell_deg)
+        row = np.clip((rows - self.row0) // self.shard_cells, 0, self.rows - 1)
+        col = np.clip((cols - self.col0) // self.shard_cells, 0, self.cols - 1)
+        return row * self.cols + col
+
+    def reach(self, lat, lng, radius_km: float) -> tuple[float, float, float, float]:
+        """Bounding box (south, west, north, east) of circles of ``radius_km`` around the points."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlng = dlat / max(np.cos(np.radians(min(np.abs(lat).max() + dlat, 89.0))), 1e-3)
+        return lat.min() - dlat, lng.min() - dlng, lat.max() + dlat, lng.max() + dlng
+
+    def shards_within(self, lat, lng, radius_km: float) -> list[int]:
+        """Shards overlapping :meth:`reach` of the points."""
+        south, west, north, east = self.reach(lat, lng, radius_km)
+        corners = self.shard_of(np.array([south, north]), np.array([west, east]))
+        (row_lo, row_hi), (col_lo, col_hi) = divmod(corners, self.cols)
+        return [
+            row * self.cols + col
+            for row in range(row_lo, row_hi + 1)
+            for col in range(col_lo, col_hi + 1)
+        ]
+
+
+@dataclass(frozen=True)
+class ShardView:
+    """Zero-copy view of one shard's drivers, valid while ``version`` is current."""
+
+    shard: int
+    version: int
+    start: int  # global slot of the first driver
+    driver_ids: np.ndarray
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    available: np.ndarray
+
+
+class SharedDriverTable:
+    """Driver positions in shared memory, in fixed per-shard slot ranges.
+
+    Created (``name=None``) by the coordinator, which is the only writer, and
+    attached by name in worker processes.
+    """
+
+    def __init__(self, shards: int, capacity: int, *, name: Optional[str] = None) -> None:
+        if shards <= 0 or capacity <= 0:
+            raise ValueError("shards and capacity must be positive")
+        self.shards = shards
+        self.capacity = capacity
+        slots = shards * capacity
+        size = 16 * shards + 25 * slots
+        self.owner = name is None
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        buf = self._shm.buf
+        self._counts = np.ndarray(shards, np.int64, buf, 0)
+        self._versions = np.ndarray(shards, np.int64, buf, 8 * shards)
+        offset = 16 * shards
+        self._ids = np.ndarray(slots, np.int64, buf, offset)
+        self._lat = np.ndarray(slots, np.float64, buf, offset + 8 * slots)
+        self._lng = np.ndarray(slots, np.float64, buf, offset + 16 * slots)
+        self._available = np.ndarray(slots, np.bool_, buf, offset + 24 * slots)
+        # Writer-side index: driver id -> global slot.
+        self._where: dict[int, int] = {}
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __len__(self) -> int:
+        return int(self._counts.sum())
+
+    def counts(self) -> np.ndarray:
+        return self._counts.copy()
+
+    def view(self, shard: int, *, timeout: float = WRITE_TIMEOUT) -> ShardView:
+        """The shard's drivers once no write is in progress.
+
+        Raises :class:`TimeoutError` if a write has not finished after ``timeout``
+        seconds, which means the writer died part-way through.
+        """
+        version = int(self._versions[shard])
+        if version % 2:
+            deadline = time.monotonic() + timeout
+            while version % 2:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"shard {shard} has been mid-write for over {timeout:g} s; "
+                        "did the writer crash?"
+                    )
+                version = int(self._versions[shard])
+        start = shard * self.capacity
+        end = start + int(self._counts[shard])
+        return ShardView(
+            shard,
+            version,
+            start,
+            self._ids[start:end],
+            self._lat[start:end],
+            self._lng[start:end],
+            self._available[start:end],
+        )
+
+    def stable(self, view: ShardView) -> bool:
+        """Whether nothing was written to ``view``'s shard since it was taken."""
+        return int(self._versions[view.shard]) == view.version
+
+    def apply(self, driver_ids, latitudes, longitudes, shards) -> None:
+        """Insert or move drivers; a driver changing shard moves to the new range."""
+        ids = np.asarray(driver_ids, dtype=np.int64).tolist()
+        shards = np.asarray(shards, dtype=np.int64)
+        where = self._where
+        slots = np.fromiter((where.get(i, -1) for i in ids), dtype=np.int64, count=len(ids))
+        stays = (slots >= 0) & (slots // self.capacity == shards)
+        touched = np.union1d(shards, slots[slots >= 0] // self.capacity)
+        self._versions[touched] += 1
+        try:
+            self._lat[slots[stays]] = np.asarray(latitudes, dtype=np.float64)[stays]
+            self._lng[slots[stays]] = np.asarray(longitudes, dtype=np.float64)[stays]
+            for i in np.flatnonzero(~stays).tolist():
+                # Swap-removes move other drivers, so look the slot up again.
+                slot = where.get(ids[i], -1)
+                available = True
+                if slot >= 0:
+                    available = bool(self._available[slot])
+                    self._remove(slot)
+                self._append(ids[i], latitudes[i], longitudes[i], int(shards[i]), available)
+        finally:
+            self._versions[touched] += 1
+
+    def set_available(self, driver_ids, available: bool) -> None:
+        slots = [self._where[i] for i in np.asarray(driver_ids, dtype=np.int64).tolist()]
+        touched = np.unique(np.asarray(slots, dtype=np.int64) // self.capacity)
+        self._versions[touched] += 1
+        self._available[slots] = available
+        self._versions[touched] += 1
+
+    def close(self) -> None:
+        for name in ("_counts", "_versions", "_ids", "_lat", "_lng", "_available"):
+            setattr(self, name, None)
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def _append(self, driver_id: int, lat: float, lng: float, shard: int, available: bool) -> None:
+        count = int(self._counts[shard])
+        if count == self.capacity:
+            raise ValueError(f"shard {shard} is full ({self.capacity} drivers)")
+        slot = shard * self.capacity + count
+        self._ids[slot] = driver_id
+        self._lat[slot] = lat
+        self._lng[slot] = lng
+        self._available[slot] = available
+        self._counts[shard] = count + 1
+        self._where[driver_id] = slot
+
+    def _remove(self, slot: int) -> None:
+        """Swap-remove so the shard's range stays dense."""
+        shard = slot // self.capacity
+        last = shard * self.capacity + int(self._counts[shard]) - 1
+        del self._where[int(self._ids[slot])]
+        if slot != last:
+            moved = int(self._ids[last])
+            self._ids[slot] = moved
+            self._lat[slot] = self._lat[last]
+            self._lng[slot] = self._lng[last]
+            self._available[slot] = self._available[last]
+            self._where[moved] = slot
+        self._counts[shard] -= 1
+
+
+class ShardMatcher:
+    """Matches the requests of some shards against their own and nearby drivers."""
+
+    def __init__(
+        self,
+        table: SharedDriverTable,
+        grid: ShardGrid,
+        *,
+        engine: Optional[EtaEngine] = None,
+        max_pickup_seconds: float = 600.0,
+        method: str = "auto",
+        time_budget: Optional[float] = 0.05,
+        attempts: int = 3,
+    ) -> None:
+        self.table = table
+        self.grid = grid
+        self.engine = engine or EtaEngine()
+        self.max_pickup_seconds = max_pickup_seconds
+        self.radius_km = (
+            max_pickup_seconds * self.engine.speed_kmh / (3600.0 * self.engine.detour_factor)
+        )
+        self.method = method
+        self.time_budget = time_budget
+        self.attempts = attempts
+        # Slots given to a rider earlier in the same match call.
+        self._claimed = np.zeros(table.shards * table.capacity, dtype=bool)
+
+    def match(
+        self, rows: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        """Returns matched request rows, driver ids, pickup seconds and shard re-runs."""
+        home = self.grid.shard_of(latitudes, longitudes)
+        claimed = self._claimed
+        claimed_slots = []
+        out_rows, out_drivers, out_seconds = [], [], []
+        reruns = 0
+        for shard in np.unique(home).tolist():
+            mine = np.flatnonzero(home == shard)
+            pickups = np.column_stack((latitudes[mine], longitudes[mine]))
+            south, west, north, east = self.grid.reach(pickups[:, 0], pickups[:, 1], self.radius_km)
+            reach = self.grid.shards_within(pickups[:, 0], pickups[:, 1], self.radius_km)
+            for attempt in range(self.attempts):
+                views = [self.table.view(s) for s in reach]
+                slots = np.concatenate(
+                    [
+                        v.start
+                        + np.flatnonzero(
+                            v.available
+                            & ~claimed[v.start : v.start + len(v.driver_ids)]
+                            & (v.latitudes >= south)
+                            & (v.latitudes <= north)
+                            & (v.longitudes >= west)
+                            & (v.longitudes <= east)
+                        )
+                        for v in views
+                    ]
+                )
+                if not len(slots):
+                    break
+                coords = np.column_stack((self.table._lat[slots], self.table._lng[slots]))
+                cost = self.engine.pickup_matrix(coords, pickups)
+                # Only drivers within reach of some rider go to the solver.
+                usable = (cost <= self.max_pickup_seconds).any(axis=0)
+                slots, cost = slots[usable], cost[:, usable]
+                ids = self.table._ids[slots]
+                cost = np.where(cost > self.max_pickup_seconds, _PRICED_OUT, cost)
+                driver_for = solve(cost, self.method, self.time_budget).driver_for
+                if all(self.table.stable(v) for v in views) or attempt == self.attempts - 1:
+                    break
+                reruns += 1
+            if not len(slots):
+                continue
+            placed = np.flatnonzero(driver_for != UNASSIGNED)
+            placed = placed[cost[placed, driver_for[placed]] < _PRICED_OUT]
+            chosen = slots[driver_for[placed]]
+            claimed[chosen] = True
+            claimed_slots.append(chosen)
+            out_rows.append(rows[mine[placed]])
+            out_drivers.append(ids[driver_for[placed]])
+            out_seconds.append(cost[placed, driver_for[placed]])
+        for chosen in claimed_slots:
+            claimed[chosen] = False
+        if not out_rows:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0), reruns
+        return (
+            np.concatenate(out_rows),
+            np.concatenate(out_drivers),
+            np.concatenate(out_seconds),
+            reruns,
+        )
+
+
+@dataclass
+class TickResult:
+    matches: dict[Hashable, int]  # rider id -> driver id
+    unmatched: list[Hashable]
+    conflicts: int  # riders who lost a border driver to another worker
+    reruns: int  # shards matched again because the table changed underneath
+    seconds: float
+    pickup_seconds: dict[Hashable, float] = field(default_factory=dict)
+
+
+class DispatchRuntime:
+    """Coordinator of ``workers`` matcher processes over a shared driver table.
+
+    ``workers=0`` runs the same matcher in the calling process, which gives
+    identical results and is the baseline for the scaling benchmark.
+    """
+
+    def __init__(
+        self,
+        grid: ShardGrid,
+        *,
+        workers: int = 1,
+        capacity: int = 4_096,
+        engine: Optional[EtaEngine] = None,
+        max_pickup_seconds: float = 600.0,
+        method: str = "auto",
+        time_budget: Optional[float] = 0.05,
+    ) -> None:
+        if workers < 0:
+            raise ValueError("workers must be >= 0")
+        self.grid = grid
+        self.table = SharedDriverTable(len(grid), capacity)
+        options = {
+            "engine": engine,
+            "max_pickup_seconds": max_pickup_seconds,
+            "method": method,
+            "time_budget": time_budget,
+        }
+        self.workers = workers
+        # Contiguous runs of shards keep most borders inside one worker.
+        self._owner = np.arange(len(grid)) * max(workers, 1) // len(grid)
+        self._local = ShardMatcher(self.table, grid, **options) if workers == 0 else None
+        self._pipes = []
+        self._processes = []
+        context = multiprocessing.get_context()
+        for _ in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child, self.table.name, len(grid), capacity, grid, options),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self) -> "DispatchRuntime":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def update(self, driver_ids, latitudes, longitudes) -> None:
+        """Publish driver positions; new drivers start out available."""
+        shards = self.grid.shard_of(latitudes, longitudes)
+        self.table.apply(driver_ids, latitudes, longitudes, shards)
+
+    def release(self, driver_ids) -> None:
+        """Make drivers available again, e.g. when their ride ends."""
+        self.table.set_available(driver_ids, True)
+
+    @timed(_TICK_SECONDS)
+    def tick(self, rider_ids: Sequence[Hashable], pickups) -> TickResult:
+        """Match one batch of requests; matched drivers become unavailable."""
+        start = time.perf_counter()
+        pickups = np.asarray(pickups, dtype=np.float64).reshape(-1, 2)
+        lat, lng = pickups[:, 0], pickups[:, 1]
+        rows = np.arange(len(pickups))
+        if self._local is not None:
+            results = [self._local.match(rows, lat, lng)]
+        else:
+            owner = self._owner[self.grid.shard_of(lat, lng)]
+            sent = []
+            for worker, pipe in enumerate(self._pipes):
+                mine = np.flatnonzero(owner == worker)
+                if len(mine):
+                    pipe.send((rows[mine], lat[mine], lng[mine]))
+                    sent.append(pipe)
+            results = [pipe.recv() for pipe in sent]
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+
+        matched_rows = np.concatenate([r[0] for r in results])
+        drivers = np.concatenate([r[1] for r in results])
+        seconds = np.concatenate([r[2] for r in results])
+        # A border driver claimed by two workers goes to the closer rider.
+        order = np.argsort(seconds, kind="stable")
+        _, first = np.unique(drivers[order], return_index=True)
+        keep = order[first]
+        conflicts = len(drivers) - len(keep)
+        if len(keep):
+            self.table.set_available(drivers[keep], False)
+
+        matches = {}
+        pickup_seconds = {}
+        for row, driver, secs in zip(
+            matched_rows[keep].tolist(), drivers[keep].tolist(), seconds[keep].tolist()
+        ):
+            matches[rider_ids[row]] = driver
+            pickup_seconds[rider_ids[row]] = secs
+        served = np.zeros(len(pickups), dtype=bool)
+        served[matched_rows[keep]] = True
+        unmatched = [rider_ids[row] for row in np.flatnonzero(~served).tolist()]
+        return TickResult(
+            matches,
+            unmatched,
+            conflicts,
+            sum(r[3] for r in results),
+            time.perf_counter() - start,
+            pickup_seconds,
+        )
+
+    def close(self) -> None:
+        for pipe in self._pipes:
+            pipe.send(None)
+        for process in self._processes:
+            process.join()
+        self._pipes.clear()
+        self._processes.clear()
+        self.table.close()
+
+
+def _worker_main(
+    pipe, table_name: str, shards: int, capacity: int, grid: ShardGrid, options: dict
+) -> None:
+    table = SharedDriverTable(shards, capacity, name=table_name)
+    matcher = ShardMatcher(table, grid, **options)
+    try:
+        while (message := pipe.recv()) is not None:
+            try:
+                result = matcher.match(*message)
+            except Exception as exc:  # re-raised by tick() in the coordinator
+                result = exc
+            pipe.send(result)
+    finally:
+        table.close()
@@ -0,0 +1,209 @@
+"""
+Local stand-ins for external HTTP services
+==========================================
+
+Minimal asyncio HTTP/1.1 servers that answer like the Google endpoints the app
+calls, so caches and clients can be measured offline.  They honour keep-alive,
+inject a configurable latency and failure rate, and count connections and
+requests.
+
+Use them inside an event loop (``await server.start()``) or, for synchronous
+callers, in a background thread::
+
+    with DirectionsStandIn(latency=0.02).running() as server:
+        urllib.request.urlopen(server.url + "?origin=...&destination=...")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import json
+import random
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+from urllib.parse import parse_qs, urlsplit
+
+from ridehub.eta import DEFAULT_SPEED_KMH, DETOUR_FACTOR
+from ridehub.geo import haversine_km
+from ridehub.places import PAGE_SIZE, input_terms, matched_substrings, matches
+
+
+class HttpStandIn:
+    """Base class: subclasses implement :meth:`respond` for one request."""
+
+    path = "/"
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}{self.path}"
+
+    def respond(self, query: dict[str, str]) -> tuple[int, dict]:
+        raise NotImplementedError
+
+    async def start(self) -> "HttpStandIn":
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @contextmanager
+    def running(self) -> Iterator["HttpStandIn"]:
+        """Serve from a daemon thread for the duration of the ``with`` block."""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def serve() -> None:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+
+        thread = threading.Thread(target=serve, name=type(self).__name__, daemon=True)
+        thread.start()
+        ready.wait()
+        try:
+            yield self
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines if line)
+                }
+                length = int(headers.get("content-length", 0))
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                target = request_line.split(" ")[1]
+                query = {k: v[0] for k, v in parse_qs(urlsplit(target).query).items()}
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.failure_rate and self._random.random() < self.failure_rate:
+                    status, payload = 503, {"status": "UNKNOWN_ERROR"}
+                else:
+                    status, payload = self.respond(query)
+
+                body = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode()
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class DirectionsStandIn(HttpStandIn):
+    """Answers ``/maps/api/directions/json`` with a single-leg route.
+
+    Durations follow the same straight-line model as ``ridehub.eta`` so
+    results can be cross-checked against the engine.
+    """
+
+    path = "/maps/api/directions/json"
+
+    def respond(self, query: dict[str, str]) -> tuple[int, dict]:
+        try:
+            o_lat, o_lng = (float(v) for v in query["origin"].split(","))
+            d_lat, d_lng = (float(v) for v in query["destination"].split(","))
+        except (KeyError, ValueError):
+            return 400, {"status": "INVALID_REQUEST", "routes": []}
+        km = float(haversine_km(o_lat, o_lng, d_lat, d_lng)) * DETOUR_FACTOR
+        seconds = round(km / DEFAULT_SPEED_KMH * 3600)
+        leg = {
+            "distance": {"text": f"{km:.1f} km", "value": round(km * 1000)},
+            "duration": {"text": f"{max(1, seconds // 60)} mins", "value": seconds},
+        }
+        return 200, {"status": "OK", "routes": [{"legs": [leg]}]}
+
+
+class PlacesStandIn(HttpStandIn):
+    """Answers ``/maps/api/place/autocomplete/json`` from a fixed list of places.
+
+    ``places`` are descriptions ordered by prominence.  A place matches when
+    every input word is a prefix of one of its words; the first ``page_size``
+    matches are returned in that order.
+    """
+
+    path = "/maps/api/place/autocomplete/json"
+
+    def __init__(self, places: Sequence[str], *, page_size: int = PAGE_SIZE, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.places = list(places)
+        self.page_size = page_size
+        self._words = [input_terms(place) for place in self.places]
+        self._index = sorted(
+            (word, rank) for rank, words in enumerate(self._words) for word in set(words)
+        )
+
+    def respond(self, query: dict[str, str]) -> tuple[int, dict]:
+        terms = input_terms(query.get("input", ""))
+        if not terms:
+            return 400, {"status": "INVALID_REQUEST", "predictions": []}
+        # Candidates come from the index range of the most selective (longest) term.
+        term = max(terms, key=len)
+        index = self._index
+        candidates = set()
+        i = bisect.bisect_left(index, (term,))
+        while i < len(index) and index[i][0].startswith(term):
+            candidates.add(index[i][1])
+            i += 1
+        ranks = sorted(rank for rank in candidates if matches(terms, self._words[rank]))
+        predictions = []
+        for rank in ranks[: self.page_size]:
+            description = self.places[rank]
+            main, _, secondary = description.partition(", ")
+            predictions.append(
+                {
+                    "description": description,
+                    "place_id": f"standin-{rank}",
+                    "matched_substrings": matched_substrings(terms, description),
+                    "structured_formatting": {"main_text": main, "secondary_text": secondary},
+                }
+            )
+        return 200, {"status": "OK" if predictions else "ZERO_RESULTS", "predictions": predictions}
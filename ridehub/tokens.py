@@ -0,0 +1,476 @@
+"""
+Design-token compiler
+=====================
+
+The palette, spacing scale, radii and shadows used to be maintained by hand in
+four places, and those copies had drifted apart.  ``lib/theme.ts`` had
+``Colors.primary[500] = #0EA5E9`` while ``tailwind.config.js`` had
+``primary.500 = #0286FF``.  They now live only in ``IMPLEMENTATION_COMPLETE.py``
+(``color_palette``, ``spacing_system``, ``radius_system`` and
+``shadow_system``).  :class:`TokenCompiler` writes them into the blocks of
+``lib/theme.ts``, ``constants/index.ts`` and ``tailwind.config.js`` that are
+delimited by ``// @generated tokens:<name>`` / ``// @end tokens:<name>``
+comments.  Everything outside those blocks stays hand-written.
+
+The manifest is read by :func:`ridehub.manifest.parse` rather than
+imported, so no code in it runs.  Each block's marker carries a digest
+of the manifest sections it is rendered from.  A build only renders blocks
+whose digest is stale, and only rewrites a file whose bytes actually change.
+Metro and Tailwind therefore never see a new mtime from a no-op build.
+Between builds the compiler remembers the ``stat`` of every file and a hash
+of the manifest's bytes.  When nothing has changed, a build costs a handful
+of ``stat`` calls.  A manifest that was saved but not changed costs one
+read and hash.
+:meth:`TokenCompiler.watch` is that build in a polling loop.
+
+Digests cover the manifest, not the generated text.  A hand edit inside a
+block survives until its sections change.  ``--check`` renders every block
+and reports any difference, for CI.
+
+    python -m ridehub.tokens [--root .] [--check | --watch]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from ridehub.manifest import MANIFEST, ManifestError, parse
+
+# Bump when rendering changes so every block is regenerated once.
+GENERATOR_VERSION = 1
+
+_BLOCK = re.compile(
+    r"^(?P<indent>[ \t]*)// @generated tokens:(?P<name>[\w-]+) (?P<digest>\S+)[^\n]*\n"
+    r"(?P<body>.*?)"
+    r"^[ \t]*// @end tokens:(?P=name)[ \t]*\n",
+    re.M | re.S,
+)
+_IDENTIFIER = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*$")
+_PIXELS = re.compile(r"(\d+(?:\.\d+)?)px$")
+_HEX = re.compile(r"#([0-9A-Fa-f]{3}|[0-9A-Fa-f]{6})$")
+
+Tokens = dict[str, Any]
+
+
+class TokenError(ValueError):
+    """The manifest or a target file cannot be compiled."""
+
+
+def load_manifest(path: str) -> Tokens:
+    """The ``IMPLEMENTATION_COMPLETE`` dict, evaluated as a literal without running the file."""
+    with open(path, encoding="utf-8") as handle:
+        return _parse_manifest(handle.read(), path)
+
+
+def _parse_manifest(source: str, path: str) -> Tokens:
+    try:
+        return parse(source, path)
+    except ManifestError as exc:
+        raise TokenError(str(exc)) from None
+
+
+def section_digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# -- rendering -----------------------------------------------------------------
+
+
+def _pixels(value: str) -> int | float:
+    match = _PIXELS.match(str(value))
+    if not match:
+        raise TokenError(f"expected a pixel length like '8px', got {value!r}")
+    number = float(match.group(1))
+    return int(number) if number.is_integer() else number
+
+
+def _rgb(color: str) -> tuple[int, int, int]:
+    match = _HEX.match(color)
+    if not match:
+        raise TokenError(f"expected a hex colour, got {color!r}")
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = "".join(c * 2 for c in digits)
+    return tuple(int(digits[i : i + 2], 16) for i in (0, 2, 4))
+
+
+def _js_key(key: str) -> str:
+    key = str(key)
+    if key.isdigit() or _IDENTIFIER.match(key):
+        return key
+    return json.dumps(key)
+
+
+def _js(value: Any, indent: str) -> str:
+    """A JavaScript literal in Prettier's layout: two-space indents, trailing commas.
+
+    Objects of one or two plain values (``shadowOffset``) stay on one line.
+    """
+    if isinstance(value, dict):
+        if len(value) <= 2 and not any(isinstance(v, dict) for v in value.values()):
+            pairs = ", ".join(f"{_js_key(k)}: {_js(v, indent)}" for k, v in value.items())
+            return f"{{ {pairs} }}"
+        inner = indent + "  "
+        lines = [f"{inner}{_js_key(k)}: {_js(v, inner)}," for k, v in value.items()]
+        return "{\n" + "\n".join(lines) + f"\n{indent}}}"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    raise TokenError(f"cannot render {value!r} as a token")
+
+
+def _theme_colors(palette: Tokens) -> Tokens:
+    return {
+        "primary": palette["primary"],
+        "neutral": palette["neutral"],
+        **palette["status"],
+        **palette["semantic"],
+        "text": palette["text"],
+        "brand": palette["brand"],
+    }
+
+
+def _alias_colors(palette: Tokens) -> Tokens:
+    resolved = {}
+    for name, path in palette["aliases"].items():
+        value: Any = palette
+        for part in path.split("."):
+            if not isinstance(value, dict) or part not in value:
+                raise TokenError(f"color_palette.aliases.{name}: {path!r} is not a colour")
+            value = value[part]
+        resolved[name] = value
+    return resolved
+
+
+def _tailwind_colors(palette: Tokens) -> Tokens:
+    return {"primary": palette["primary"], **palette["scales"]}
+
+
+def _native_shadows(shadows: Tokens) -> Tokens:
+    return {
+        name: {
+            "shadowColor": shadows["color"],
+            "shadowOffset": {"width": 0, "height": _pixels(level["offset"])},
+            "shadowOpacity": level["opacity"],
+            "shadowRadius": _pixels(level["blur"]),
+            "elevation": level["elevation"],
+        }
+        for name, level in shadows["levels"].items()
+    }
+
+
+def _css_shadows(shadows: Tokens) -> Tokens:
+    r, g, b = _rgb(shadows["color"])
+
+    def length(value: str) -> str:
+        return "0" if _pixels(value) == 0 else value
+
+    return {
+        name: f"0 {length(level['offset'])} {length(level['blur'])} "
+        f"rgba({r},{g},{b},{level['opacity']:g})"
+        for name, level in shadows["levels"].items()
+    }
+
+
+def _lengths(values: Tokens) -> Tokens:
+    return {name: _pixels(value) for name, value in values.items()}
+
+
+@dataclass(frozen=True)
+class Block:
+    """One generated block: the file it lives in, what it reads and how it is declared.
+
+    ``declaration`` is either ``export const Name`` (rendered as
+    ``export const Name = {...};``) or an object key ending in ``:``
+    (rendered as ``key: {...},``).
+    """
+
+    target: str
+    name: str
+    declaration: str
+    sections: tuple[str, ...]
+    value: Callable[[Tokens], Any]
+
+    def render(self, manifest: Tokens, indent: str) -> str:
+        literal = _js(self.value(manifest), indent)
+        if self.declaration.endswith(":"):
+            return f"{indent}{self.declaration} {literal},\n"
+        return f"{indent}{self.declaration} = {literal};\n"
+
+
+def _palette(fn: Callable[[Tokens], Tokens]) -> Callable[[Tokens], Tokens]:
+    return lambda manifest: fn(manifest["color_palette"])
+
+
+def _spacing(manifest: Tokens) -> Tokens:
+    return _lengths(manifest["spacing_system"]["units"])
+
+
+def _radii(manifest: Tokens) -> Tokens:
+    return _lengths(manifest["radius_system"]["presets"])
+
+
+THEME, CONSTANTS, TAILWIND = "lib/theme.ts", "constants/index.ts", "tailwind.config.js"
+BLOCKS = (
+    Block(THEME, "colors", "export const Colors", ("color_palette",), _palette(_theme_colors)),
+    Block(THEME, "spacing", "export const Spacing", ("spacing_system",), _spacing),
+    Block(THEME, "radius", "export const BorderRadius", ("radius_system",), _radii),
+    Block(
+        THEME,
+        "shadows",
+        "export const Shadows",
+        ("shadow_system",),
+        lambda manifest: _native_shadows(manifest["shadow_system"]),
+    ),
+    Block(CONSTANTS, "colors", "export const colors", ("color_palette",), _palette(_alias_colors)),
+    Block(
+        CONSTANTS,
+        "shadows",
+        "export const shadows",
+        ("shadow_system",),
+        lambda manifest: _css_shadows(manifest["shadow_system"]),
+    ),
+    Block(CONSTANTS, "radius", "export const borderRadius", ("radius_system",), _radii),
+    Block(CONSTANTS, "spacing", "export const spacing", ("spacing_system",), _spacing),
+    Block(TAILWIND, "colors", "colors:", ("color_palette",), _palette(_tailwind_colors)),
+)
+
+
+# -- compiler ------------------------------------------------------------------
+
+
+@dataclass
+class BuildResult:
+    written: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    blocks_rendered: int = 0
+    manifest_read: bool = False
+    seconds: float = 0.0
+
+
+def _stat(path: str) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class TokenCompiler:
+    """Incremental manifest -> theme.ts / constants / Tailwind compiler rooted at ``root``."""
+
+    def __init__(self, root: str = ".", *, blocks: tuple[Block, ...] = BLOCKS) -> None:
+        self.root = root
+        self.blocks = blocks
+        self.manifest_path = os.path.join(root, MANIFEST)
+        self.targets = tuple(dict.fromkeys(block.target for block in blocks))
+        self._manifest: Optional[Tokens] = None
+        self._manifest_stat: Optional[tuple[int, int]] = None
+        self._manifest_digest = b""
+        self._wanted: dict[tuple[str, str], str] = {}
+        # target -> (stat after our last read or write, block digests it then held)
+        self._seen: dict[str, tuple[Optional[tuple[int, int]], dict[str, str]]] = {}
+
+    def digests(self) -> dict[tuple[str, str], str]:
+        """Digest every block should carry, keyed by ``(target, block name)``."""
+        self._refresh_manifest()
+        return dict(self._wanted)
+
+    def build(self, *, force: bool = False) -> BuildResult:
+        """Bring every target up to date; ``force`` re-renders every block."""
+        start = time.perf_counter()
+        result = BuildResult(manifest_read=self._refresh_manifest())
+        for target in self.targets:
+            path = os.path.join(self.root, target)
+            seen = self._seen.get(target)
+            if not force and seen and seen[0] == _stat(path) and self._is_current(target, seen[1]):
+                result.unchanged.append(target)
+                continue
+            text = _read_target(path)
+            updated, rendered = self._splice(target, text, force=force)
+            result.blocks_rendered += rendered
+            if updated != text:
+                _write_atomic(path, updated)
+                result.written.append(target)
+            else:
+                result.unchanged.append(target)
+            self._seen[target] = (_stat(path), self._held(target, updated))
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def check(self) -> list[str]:
+        """Targets whose generated blocks differ from a fresh render, hand edits included."""
+        self._refresh_manifest()
+        stale = []
+        for target in self.targets:
+            text = _read_target(os.path.join(self.root, target))
+            if self._splice(target, text, force=True)[0] != text:
+                stale.append(target)
+        return stale
+
+    def watch(
+        self,
+        *,
+        interval: float = 0.05,
+        stop: Optional[threading.Event] = None,
+        on_build: Optional[Callable[[BuildResult], None]] = None,
+    ) -> None:
+        """Rebuild whenever the manifest or a target changes, until ``stop`` is set."""
+        stop = stop or threading.Event()
+        broken: Optional[tuple] = None
+        paths = [self.manifest_path] + [os.path.join(self.root, t) for t in self.targets]
+        while not stop.is_set():
+            # A failure can come from a target as well as the manifest (a deleted
+            # marker, a missing file), so fixing either one earns a retry.
+            stat = tuple(map(_stat, paths))
+            if stat != broken:
+                try:
+                    result = self.build()
+                except (TokenError, OSError, SyntaxError) as exc:
+                    # A half-saved file is normal while editing: report it
+                    # once and wait for the next save.
+                    print(f"tokens: {exc}", file=sys.stderr)
+                    broken = stat
+                else:
+                    broken = None
+                    if on_build and (result.written or result.manifest_read):
+                        on_build(result)
+            stop.wait(interval)
+
+    def _refresh_manifest(self) -> bool:
+        stat = _stat(self.manifest_path)
+        if stat is None:
+            raise TokenError(f"{self.manifest_path} does not exist")
+        if self._manifest is not None and stat == self._manifest_stat:
+            return False
+        with open(self.manifest_path, "rb") as handle:
+            source = handle.read()
+        # Saving without changes, or a checkout, moves the mtime but not the bytes.
+        source_digest = hashlib.sha256(source).digest()
+        if self._manifest is not None and source_digest == self._manifest_digest:
+            self._manifest_stat = stat
+            return False
+        manifest = _parse_manifest(source.decode("utf-8"), self.manifest_path)
+        sections: dict[str, str] = {}
+        wanted = {}
+        for block in self.blocks:
+            parts = [f"v{GENERATOR_VERSION}", block.target, block.name]
+            for name in block.sections:
+                if name not in manifest:
+                    raise TokenError(f"{MANIFEST} has no {name!r} section")
+                if name not in sections:
+                    sections[name] = section_digest(manifest[name])
+                parts.append(sections[name])
+            digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+            wanted[block.target, block.name] = digest
+        self._manifest, self._manifest_stat, self._wanted = manifest, stat, wanted
+        self._manifest_digest = source_digest
+        return True
+
+    def _is_current(self, target: str, held: dict[str, str]) -> bool:
+        return all(
+            held.get(block.name) == self._wanted[target, block.name]
+            for block in self.blocks
+            if block.target == target
+        )
+
+    def _held(self, target: str, text: str) -> dict[str, str]:
+        return {match["name"]: match["digest"] for match in _BLOCK.finditer(text)}
+
+    def _splice(self, target: str, text: str, *, force: bool) -> tuple[str, int]:
+        blocks = {block.name: block for block in self.blocks if block.target == target}
+        found = set()
+        rendered = 0
+        pieces, last = [], 0
+        for match in _BLOCK.finditer(text):
+            block = blocks.get(match["name"])
+            if block is None:
+                raise TokenError(f"{target}: unknown generated block {match['name']!r}")
+            found.add(block.name)
+            digest = self._wanted[target, block.name]
+            if not force and match["digest"] == digest:
+                continue
+            indent = match["indent"]
+            body = block.render(self._manifest, indent)
+            rendered += 1
+            pieces.append(text[last : match.start()])
+            pieces.append(
+                f"{indent}// @generated tokens:{block.name} {digest} "
+                f"from {MANIFEST}; do not edit\n{body}{indent}// @end tokens:{block.name}\n"
+            )
+            last = match.end()
+        missing = sorted(set(blocks) - found)
+        if missing:
+            raise TokenError(f"{target}: no '// @generated tokens:{missing[0]}' block")
+        pieces.append(text[last:])
+        return "".join(pieces), rendered
+
+
+def _read_target(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return handle.read()
+    except FileNotFoundError:
+        raise TokenError(f"{path} does not exist") from None
+
+
+def _write_atomic(path: str, text: str) -> None:
+    temporary = f"{path}.tokens-tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    os.replace(temporary, path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--root", default=".")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="exit 1 if any target is stale")
+    mode.add_argument("--watch", action="store_true", help="rebuild on every manifest change")
+    parser.add_argument("--interval", type=float, default=0.05, help="watch poll interval (s)")
+    args = parser.parse_args(argv)
+    compiler = TokenCompiler(args.root)
+
+    if args.check:
+        try:
+            stale = compiler.check()
+        except TokenError as exc:
+            print(f"tokens: {exc}", file=sys.stderr)
+            return 2
+        for target in stale:
+            print(f"{target} is out of date; run python -m ridehub.tokens")
+        return 1 if stale else 0
+
+    def report(result: BuildResult) -> None:
+        written = ", ".join(result.written) or "nothing to write"
+        print(f"tokens: {written} ({result.seconds * 1e3:.1f} ms)")
+
+    try:
+        report(compiler.build())
+    except TokenError as exc:
+        print(f"tokens: {exc}", file=sys.stderr)
+        return 2
+    if args.watch:
+        print(f"watching {compiler.manifest_path}")
+        try:
+            compiler.watch(interval=args.interval, on_build=report)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
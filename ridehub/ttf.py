@@ -0,0 +1,378 @@
+"""
+TrueType subsetter
+==================
+
+Just enough TrueType for the font stage, implemented with :mod:`struct`.
+:func:`subset` keeps the outlines of the glyphs needed to draw a set of
+code points and empties every other ``glyf`` entry.  The needed glyphs are
+the ones ``cmap`` maps those code points to, plus everything reachable from
+them through composite glyphs and ``GSUB`` single, multiple, alternate,
+ligature and reverse-chaining substitutions.  Lookups are followed whatever
+feature or context they belong to, so the set can be larger than needed but
+never too small.
+
+Glyph ids are kept, as fontTools' ``--retain-gids`` does.  ``hmtx``,
+``GDEF``, ``GPOS`` and ``GSUB`` stay valid byte for byte, and only ``glyf``,
+``loca``, ``cmap``, ``post`` (reduced to format 3, without glyph names) and
+a few ``head``/``OS/2`` fields are rewritten.  Emptied glyphs cost four
+bytes of ``loca`` each.  ``DSIG`` is dropped because the signature no
+longer holds.  Table checksums and ``head.checkSumAdjustment`` are
+recomputed.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Iterable, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_SFNT_VERSIONS = (b"\x00\x01\x00\x00", b"true")
+_DROPPED = (b"DSIG",)
+_CHECKSUM_MAGIC = 0xB1B0AFBA
+
+# Composite glyph flags.
+_ARG_WORDS = 0x0001
+_HAVE_SCALE = 0x0008
+_MORE_COMPONENTS = 0x0020
+_HAVE_XY_SCALE = 0x0040
+_HAVE_2X2 = 0x0080
+
+
+class TtfError(ValueError):
+    """The data is not a TrueType font this module can read."""
+
+
+class Font:
+    """The tables of a TrueType font, by tag."""
+
+    def __init__(self, data: Buffer) -> None:
+        data = bytes(data)
+        if data[:4] not in _SFNT_VERSIONS:
+            raise TtfError("not a TrueType font (OpenType CFF and collections are not supported)")
+        (count,) = struct.unpack(">H", data[4:6])
+        self.tables: dict[bytes, bytes] = {}
+        for i in range(count):
+            tag, _, offset, length = struct.unpack(">4sIII", data[12 + 16 * i : 28 + 16 * i])
+            if offset + length > len(data):
+                raise TtfError(f"table {tag.decode('latin-1')} runs past the end of the file")
+            self.tables[tag] = data[offset : offset + length]
+        for tag in (b"head", b"maxp", b"cmap", b"loca", b"glyf"):
+            if tag not in self.tables:
+                raise TtfError(f"missing {tag.decode()} table")
+
+    @property
+    def num_glyphs(self) -> int:
+        return struct.unpack(">H", self.tables[b"maxp"][4:6])[0]
+
+    @property
+    def long_loca(self) -> bool:
+        return struct.unpack(">h", self.tables[b"head"][50:52])[0] == 1
+
+    def offsets(self) -> list[int]:
+        """``loca``: where each glyph starts in ``glyf``, plus the end of the last one."""
+        n = self.num_glyphs + 1
+        if self.long_loca:
+            return list(struct.unpack(f">{n}I", self.tables[b"loca"][: 4 * n]))
+        return [2 * o for o in struct.unpack(f">{n}H", self.tables[b"loca"][: 2 * n])]
+
+    def cmap(self) -> dict[int, int]:
+        """Code point -> glyph id from the best Unicode subtable (format 12, else format 4)."""
+        table = self.tables[b"cmap"]
+        (count,) = struct.unpack(">H", table[2:4])
+        subtables = {}
+        for i in range(count):
+            platform, encoding, offset = struct.unpack(">HHI", table[4 + 8 * i : 12 + 8 * i])
+            subtables[platform, encoding] = offset
+        for key in ((3, 10), (0, 4), (0, 6), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+            if key not in subtables:
+                continue
+            offset = subtables[key]
+            (kind,) = struct.unpack(">H", table[offset : offset + 2])
+            if kind == 12:
+                return _read_cmap12(table, offset)
+            if kind == 4:
+                return _read_cmap4(table, offset)
+        raise TtfError("no Unicode cmap subtable in format 4 or 12")
+
+    def components(self, glyph: bytes) -> list[int]:
+        """Glyph ids a composite glyph is built from; empty for a simple glyph."""
+        if len(glyph) < 10 or struct.unpack(">h", glyph[:2])[0] >= 0:
+            return []
+        found = []
+        pos = 10
+        while True:
+            flags, component = struct.unpack(">HH", glyph[pos : pos + 4])
+            found.append(component)
+            pos += 4 + (4 if flags & _ARG_WORDS else 2)
+            if flags & _HAVE_SCALE:
+                pos += 2
+            elif flags & _HAVE_XY_SCALE:
+                pos += 4
+            elif flags & _HAVE_2X2:
+                pos += 8
+            if not flags & _MORE_COMPONENTS:
+                return found
+
+
+def closure(font: Font, codepoints: Iterable[int]) -> tuple[dict[int, int], set[int]]:
+    """The kept ``cmap`` entries and every glyph id needed to draw them (``.notdef`` included)."""
+    mapping = font.cmap()
+    kept = {cp: mapping[cp] for cp in sorted(set(codepoints)) if cp in mapping}
+    glyphs = {0, *kept.values()}
+    rules = _gsub_rules(font.tables[b"GSUB"]) if b"GSUB" in font.tables else []
+    offsets = font.offsets()
+    glyf = font.tables[b"glyf"]
+    pending = list(glyphs)
+    while pending:
+        while pending:
+            gid = pending.pop()
+            if gid >= font.num_glyphs:
+                raise TtfError(f"glyph id {gid} out of range")
+            for component in font.components(glyf[offsets[gid] : offsets[gid + 1]]):
+                if component not in glyphs:
+                    glyphs.add(component)
+                    pending.append(component)
+        for inputs, outputs in rules:
+            if inputs <= glyphs and not outputs <= glyphs:
+                pending.extend(outputs - glyphs)
+                glyphs |= outputs
+    return kept, glyphs
+
+
+def subset(data: Buffer, codepoints: Iterable[int]) -> bytes:
+    """The font with outlines only for the glyphs ``codepoints`` need; glyph ids unchanged."""
+    font = Font(data)
+    kept, glyphs = closure(font, codepoints)
+    if not kept:
+        raise TtfError("none of the requested code points are in the font")
+    offsets = font.offsets()
+    glyf = font.tables[b"glyf"]
+    align = 4 if font.long_loca else 2
+    parts, loca, end = [], [], 0
+    for gid in range(font.num_glyphs):
+        loca.append(end)
+        if gid in glyphs:
+            glyph = glyf[offsets[gid] : offsets[gid + 1]]
+            glyph += b"\0" * (-len(glyph) % align)
+            parts.append(glyph)
+            end += len(glyph)
+    loca.append(end)
+
+    tables = {t: v for t, v in font.tables.items() if t not in _DROPPED}
+    tables[b"glyf"] = b"".join(parts)
+    if font.long_loca:
+        tables[b"loca"] = struct.pack(f">{len(loca)}I", *loca)
+    else:
+        tables[b"loca"] = struct.pack(f">{len(loca)}H", *(o // 2 for o in loca))
+    tables[b"cmap"] = _build_cmap(kept)
+    if b"post" in tables:
+        tables[b"post"] = b"\x00\x03\x00\x00" + tables[b"post"][4:32]
+    if b"OS/2" in tables:
+        bmp = [cp for cp in kept if cp <= 0xFFFF] or [0xFFFF]
+        os2 = bytearray(tables[b"OS/2"])
+        struct.pack_into(">HH", os2, 64, min(bmp), max(bmp))
+        tables[b"OS/2"] = bytes(os2)
+    head = bytearray(tables[b"head"])
+    struct.pack_into(">I", head, 8, 0)
+    tables[b"head"] = bytes(head)
+    return _assemble(bytes(data[:4]), tables)
+
+
+def checksum(data: Buffer) -> int:
+    """The sfnt checksum: the sum of big-endian uint32s, zero-padded, modulo 2**32."""
+    data = bytes(data) + b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+def verify(data: Buffer) -> None:
+    """Raise :class:`TtfError` unless every table and the whole-file checksum are right."""
+    data = bytes(data)
+    font = Font(data)
+    (count,) = struct.unpack(">H", data[4:6])
+    for i in range(count):
+        tag, expected, offset, length = struct.unpack(">4sIII", data[12 + 16 * i : 28 + 16 * i])
+        table = font.tables[tag]
+        if tag == b"head":
+            table = table[:8] + b"\0\0\0\0" + table[12:]
+        if checksum(table) != expected:
+            raise TtfError(f"bad checksum for {tag.decode('latin-1')}")
+    if checksum(data) != _CHECKSUM_MAGIC:
+        raise TtfError("bad head.checkSumAdjustment")
+
+
+def _read_cmap4(table: bytes, offset: int) -> dict[int, int]:
+    (seg_x2,) = struct.unpack(">H", table[offset + 6 : offset + 8])
+    segments = seg_x2 // 2
+    ends_at = offset + 14
+    starts_at = ends_at + seg_x2 + 2
+    deltas_at = starts_at + seg_x2
+    ranges_at = deltas_at + seg_x2
+    ends = struct.unpack(f">{segments}H", table[ends_at : ends_at + seg_x2])
+    starts = struct.unpack(f">{segments}H", table[starts_at : starts_at + seg_x2])
+    deltas = struct.unpack(f">{segments}H", table[deltas_at : deltas_at + seg_x2])
+    ranges = struct.unpack(f">{segments}H", table[ranges_at : ranges_at + seg_x2])
+    mapping = {}
+    for i, (start, end, delta, range_offset) in enumerate(zip(starts, ends, deltas, ranges)):
+        for cp in range(start, end + 1):
+            if cp == 0xFFFF:
+                break
+            if range_offset:
+                at = ranges_at + 2 * i + range_offset + 2 * (cp - start)
+                (gid,) = struct.unpack(">H", table[at : at + 2])
+                gid = (gid + delta) & 0xFFFF if gid else 0
+            else:
+                gid = (cp + delta) & 0xFFFF
+            if gid:
+                mapping[cp] = gid
+    return mapping
+
+
+def _read_cmap12(table: bytes, offset: int) -> dict[int, int]:
+    (groups,) = struct.unpack(">I", table[offset + 12 : offset + 16])
+    mapping = {}
+    for i in range(groups):
+        at = offset + 16 + 12 * i
+        start, end, gid = struct.unpack(">III", table[at : at + 12])
+        for cp in range(start, end + 1):
+            mapping[cp] = gid + cp - start
+    return mapping
+
+
+def _runs(mapping: dict[int, int]) -> list[tuple[int, int, int]]:
+    """``(first, last, first_gid)`` for runs of consecutive code points and glyph ids."""
+    runs: list[list[int]] = []
+    for cp, gid in sorted(mapping.items()):
+        if runs and cp == runs[-1][1] + 1 and gid == runs[-1][2] + cp - runs[-1][0]:
+            runs[-1][1] = cp
+        else:
+            runs.append([cp, cp, gid])
+    return [tuple(run) for run in runs]
+
+
+def _build_cmap(mapping: dict[int, int]) -> bytes:
+    """Format 4 for the BMP, plus format 12 when anything lies beyond it."""
+    bmp = {cp: gid for cp, gid in mapping.items() if cp < 0xFFFF}
+    segments = [(a, b, (g - a) & 0xFFFF) for a, b, g in _runs(bmp)] + [(0xFFFF, 0xFFFF, 1)]
+    n = len(segments)
+    power = 1 << (n.bit_length() - 1)
+    format4 = struct.pack(
+        f">HHHHHHH{n}HH{n}H{n}H{n}H",
+        4,
+        16 + 8 * n,
+        0,
+        2 * n,
+        2 * power,
+        power.bit_length() - 1,
+        2 * (n - power),
+        *(end for _, end, _ in segments),
+        0,
+        *(start for start, _, _ in segments),
+        *(delta for _, _, delta in segments),
+        *([0] * n),
+    )
+    subtables = [((0, 3), format4), ((3, 1), format4)]
+    if any(cp > 0xFFFF for cp in mapping):
+        groups = _runs(mapping)
+        format12 = struct.pack(">HHIII", 12, 0, 16 + 12 * len(groups), 0, len(groups))
+        format12 += b"".join(struct.pack(">III", *group) for group in groups)
+        subtables = [((0, 3), format4), ((0, 4), format12), ((3, 1), format4), ((3, 10), format12)]
+
+    records, bodies, placed = [], [], {}
+    offset = 4 + 8 * len(subtables)
+    for (platform, encoding), body in subtables:
+        if body not in placed:
+            placed[body] = offset
+            bodies.append(body)
+            offset += len(body)
+        records.append(struct.pack(">HHI", platform, encoding, placed[body]))
+    return struct.pack(">HH", 0, len(subtables)) + b"".join(records) + b"".join(bodies)
+
+
+def _assemble(version: bytes, tables: dict[bytes, bytes]) -> bytes:
+    tags = sorted(tables)
+    n = len(tags)
+    power = 1 << (n.bit_length() - 1)
+    search = struct.pack(">HHHH", n, 16 * power, power.bit_length() - 1, 16 * (n - power))
+    directory = [version, search]
+    body = []
+    offset = 12 + 16 * n
+    for tag in tags:
+        table = tables[tag]
+        directory.append(struct.pack(">4sIII", tag, checksum(table), offset, len(table)))
+        padded = table + b"\0" * (-len(table) % 4)
+        body.append(padded)
+        offset += len(padded)
+    font = bytearray(b"".join(directory + body))
+    head_at = 12 + 16 * n + sum(len(b) for b in body[: tags.index(b"head")])
+    struct.pack_into(">I", font, head_at + 8, (_CHECKSUM_MAGIC - checksum(font)) & 0xFFFFFFFF)
+    return bytes(font)
+
+
+def _coverage(table: bytes, offset: int) -> list[int]:
+    """Glyph ids of a coverage table, in coverage-index order."""
+    kind, count = struct.unpack(">HH", table[offset : offset + 4])
+    if kind == 1:
+        return list(struct.unpack(f">{count}H", table[offset + 4 : offset + 4 + 2 * count]))
+    if kind == 2:
+        glyphs = []
+        for i in range(count):
+            at = offset + 4 + 6 * i
+            start, end, _ = struct.unpack(">HHH", table[at : at + 6])
+            glyphs.extend(range(start, end + 1))
+        return glyphs
+    raise TtfError(f"unknown coverage format {kind}")
+
+
+def _u16s(table: bytes, offset: int) -> tuple[int, ...]:
+    """A uint16 count at ``offset`` followed by that many uint16s."""
+    (count,) = struct.unpack(">H", table[offset : offset + 2])
+    return struct.unpack(f">{count}H", table[offset + 2 : offset + 2 + 2 * count])
+
+
+def _gsub_rules(gsub: bytes) -> list[tuple[frozenset[int], frozenset[int]]]:
+    """``(input glyphs, output glyphs)`` for every substitution any lookup can make."""
+    (lookup_list,) = struct.unpack(">H", gsub[8:10])
+    rules = []
+    for lookup_offset in _u16s(gsub, lookup_list):
+        lookup = lookup_list + lookup_offset
+        kind, _ = struct.unpack(">HH", gsub[lookup : lookup + 4])
+        for sub_offset in _u16s(gsub, lookup + 4):
+            sub, sub_kind = lookup + sub_offset, kind
+            if kind == 7:  # extension: the real subtable is further on
+                sub_kind, extension = struct.unpack(">HI", gsub[sub + 2 : sub + 8])
+                sub += extension
+            rules.extend(_substitutions(gsub, sub, sub_kind))
+    return rules
+
+
+def _substitutions(gsub: bytes, sub: int, kind: int):
+    if kind not in (1, 2, 3, 4, 8):
+        return  # contextual lookups only call other lookups, which are all followed anyway
+    fmt, coverage_offset = struct.unpack(">HH", gsub[sub : sub + 4])
+    coverage = _coverage(gsub, sub + coverage_offset)
+    if kind == 1 and fmt == 1:
+        (delta,) = struct.unpack(">h", gsub[sub + 4 : sub + 6])
+        for gid in coverage:
+            yield frozenset((gid,)), frozenset(((gid + delta) & 0xFFFF,))
+    elif kind == 1:
+        for gid, out in zip(coverage, _u16s(gsub, sub + 4)):
+            yield frozenset((gid,)), frozenset((out,))
+    elif kind in (2, 3):  # a sequence, or a set of alternates, per covered glyph
+        for gid, offset in zip(coverage, _u16s(gsub, sub + 4)):
+            yield frozenset((gid,)), frozenset(_u16s(gsub, sub + offset))
+    elif kind == 4:
+        for gid, set_offset in zip(coverage, _u16s(gsub, sub + 4)):
+            ligature_set = sub + set_offset
+            for offset in _u16s(gsub, ligature_set):
+                at = ligature_set + offset
+                ligature, count = struct.unpack(">HH", gsub[at : at + 4])
+                components = struct.unpack(f">{count - 1}H", gsub[at + 4 : at + 2 + 2 * count])
+                yield frozenset((gid, *components)), frozenset((ligature,))
+    else:  # reverse chaining single substitution
+        pos = sub + 4
+        for _ in range(2):  # skip the backtrack, then the lookahead, coverage offsets
+            (count,) = struct.unpack(">H", gsub[pos : pos + 2])
+            pos += 2 + 2 * count
+        for gid, out in zip(coverage, _u16s(gsub, pos)):
+            yield frozenset((gid,)), frozenset((out,))
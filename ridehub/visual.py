@@ -0,0 +1,421 @@
+"""
+Visual regression diffs
+=======================
+
+``IMPLEMENTATION_COMPLETE.py`` catalogues the component library, but none
+of it has screenshot coverage.  :func:`variant_matrix` turns the catalogue
+into one :class:`Case` per combination of a component's axes:
+
+* ``variants`` × ``sizes`` of the new components;
+* the variant and size lists spelled out in a ``CustomButton`` improvement
+  ("Added 7 variants (primary, ...)");
+* the ``states`` of ``InputField``.
+
+A component with no axes is a single ``default`` case.  A case's screenshot
+is ``<Component>/<variant>-<size>.png`` in both the baseline and the
+current directory.
+
+:class:`VisualDiff` compares the two sets.  Every file is hashed first, and
+byte-identical pairs are ``identical`` without being decoded.  The other
+pairs go to a process pool, which decodes them with :mod:`ridehub.png`.
+Equal pixels end the comparison there.  Otherwise the diff follows
+pixelmatch, the measure most screenshot tools use.  Colours are blended
+onto white, and a pixel differs when its YIQ distance exceeds
+``threshold``² of the largest possible.
+
+A differing pixel is discounted as anti-aliasing when pixelmatch's test
+says so in either image.  That holds when the pixel:
+
+* has no more than two identical neighbours;
+* has both a darker and a brighter neighbour;
+* has its darkest or brightest neighbour in a flat area (three or more
+  identical neighbours) in both images.
+
+Everything is vectorised.  The anti-aliasing test runs only on the pixels
+that crossed the threshold, gathering their neighbours with fancy indexing.
+
+A case fails when more than ``max_diff_ratio`` of its pixels differ, when
+its size changed, or when its screenshot is missing.  A failing case gets
+a diff image like pixelmatch's: the baseline faded to grey, differing
+pixels red and anti-aliased pixels yellow.
+
+    python -m ridehub.visual baseline/ current/ [--out visual-diff] [--threshold 0.1] [--workers N]
+    python -m ridehub.visual --list
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from ridehub import png
+from ridehub.manifest import Manifest
+
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_OUT = "visual-diff"
+# The YIQ distance between black and white, pixelmatch's normaliser.
+MAX_YIQ_DELTA = 35215.0
+
+# Manifest axis -> the singular used in case names, in naming order.
+_AXES = {"variants": "variant", "sizes": "size", "states": "state"}
+_SPELLED = re.compile(r"Added \d+ (?P<axis>variants|sizes) \((?P<values>[^)]*)\)")
+# RGB -> Y, I and Q (columns), and pixelmatch's weights for their squared differences.
+_YIQ = np.array(
+    [
+        [0.29889531, 0.59597799, 0.21147017],
+        [0.58662247, -0.27417610, -0.52261711],
+        [0.11448223, -0.32180189, 0.31114694],
+    ]
+)
+_WEIGHTS = np.array([0.5053, 0.299, 0.1957])
+# Neighbour offsets in pixelmatch's scan order (x outer, y inner), which breaks ties.
+_DY = np.array([dy for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy])
+_DX = np.array([dx for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy])
+
+
+class VisualError(ValueError):
+    """A screenshot cannot be read or the catalogue has no components."""
+
+
+@dataclass(frozen=True)
+class Case:
+    component: str
+    axes: tuple[tuple[str, str], ...] = ()  # (("variant", "primary"), ("size", "md"))
+
+    @property
+    def name(self) -> str:
+        return f"{self.component}/{'-'.join(v for _, v in self.axes) or 'default'}"
+
+    @property
+    def path(self) -> str:
+        return self.name + ".png"
+
+
+def variant_matrix(manifest: Optional[Manifest] = None) -> list[Case]:
+    """Every component × variant × size (or state) combination the manifest catalogues."""
+    manifest = manifest or Manifest()
+    catalogue: dict[str, dict[str, list[str]]] = {}
+    for section in ("new_components_created", "enhanced_components"):
+        for component, entry in manifest[section].items() if section in manifest else ():
+            axes = {axis: list(entry[axis]) for axis in _AXES if axis in entry}
+            for line in entry.get("improvements", ()):
+                match = _SPELLED.search(line)
+                if match:
+                    axes[match["axis"]] = [v.strip() for v in match["values"].split(",")]
+            catalogue[component] = {axis: axes[axis] for axis in _AXES if axis in axes}
+    if not catalogue:
+        raise VisualError("the manifest catalogues no components")
+    cases = []
+    for component, axes in catalogue.items():
+        names = [_AXES[axis] for axis in axes]
+        for values in itertools.product(*axes.values()):
+            cases.append(Case(component, tuple(zip(names, values))))
+    return cases
+
+
+@dataclass
+class Comparison:
+    diff: np.ndarray  # bool (H, W): differs beyond the threshold, anti-aliasing excluded
+    antialiased: np.ndarray  # bool (H, W): over the threshold but anti-aliasing
+    max_delta: float  # largest YIQ distance, as a fraction of MAX_YIQ_DELTA
+
+    @property
+    def diff_pixels(self) -> int:
+        return int(np.count_nonzero(self.diff))
+
+
+def compare(
+    baseline: np.ndarray, current: np.ndarray, threshold: float = DEFAULT_THRESHOLD
+) -> Comparison:
+    """pixelmatch's per-pixel verdict for two RGBA ``uint8`` images of the same size."""
+    if baseline.shape != current.shape:
+        raise ValueError(f"shapes differ: {baseline.shape} and {current.shape}")
+    a, b = _blend(baseline), _blend(current)
+    yiq = (a - b) @ _YIQ
+    delta = (yiq * yiq) @ _WEIGHTS
+    over = delta > MAX_YIQ_DELTA * threshold * threshold
+    flat = np.flatnonzero(over)
+    antialiased = np.zeros(over.size, bool)
+    if len(flat):
+        width = over.shape[1]
+        # Neighbours are gathered from copies with a one-pixel border, which marks the edge.
+        at = flat + flat // width * 2 + width + 3
+        offsets = _DY * (width + 2) + _DX
+        ya, yb = _bordered(a @ _YIQ[:, 0], np.nan), _bordered(b @ _YIQ[:, 0], np.nan)
+        pa, pb = _bordered(_packed(baseline), -1), _bordered(_packed(current), -1)
+        aa = _antialiased(ya, pa, pb, at, offsets)
+        rest = np.flatnonzero(~aa)
+        aa[rest] = _antialiased(yb, pb, pa, at[rest], offsets)
+        antialiased[flat[aa]] = True
+    antialiased = antialiased.reshape(over.shape)
+    return Comparison(over & ~antialiased, antialiased, float(delta.max()) / MAX_YIQ_DELTA)
+
+
+def diff_image(baseline: np.ndarray, comparison: Comparison) -> np.ndarray:
+    """pixelmatch's output: the baseline as faint grey, anti-aliasing yellow, differences red."""
+    grey = 255 + (_blend(baseline) @ _YIQ[:, 0] - 255) * 0.1 * (baseline[..., 3] / 255)
+    out = np.empty(baseline.shape, np.uint8)
+    out[..., :3] = np.clip(np.rint(grey), 0, 255)[..., None].astype(np.uint8)
+    out[..., 3] = 255
+    out[comparison.antialiased] = (255, 255, 0, 255)
+    out[comparison.diff] = (255, 0, 0, 255)
+    return out
+
+
+def _blend(rgba: np.ndarray) -> np.ndarray:
+    """RGB as float64, composited onto white."""
+    rgb = rgba[..., :3].astype(np.float64)
+    if (rgba[..., 3] == 255).all():
+        return rgb
+    return 255 + (rgb - 255) * (rgba[..., 3:4] / 255.0)
+
+
+def _packed(rgba: np.ndarray) -> np.ndarray:
+    """One integer per pixel, for exact comparisons."""
+    return np.ascontiguousarray(rgba).view(np.uint32)[..., 0].astype(np.int64)
+
+
+def _bordered(values: np.ndarray, border) -> np.ndarray:
+    """``values`` with a one-pixel frame of ``border``, flattened."""
+    return np.pad(values, 1, constant_values=border).ravel()
+
+
+def _many_siblings(packed: np.ndarray, at: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Pixels with three or more identical neighbours (an image edge counts as one)."""
+    neighbours = packed[at[:, None] + offsets]
+    same = np.count_nonzero(neighbours == packed[at][:, None], axis=1)
+    return (neighbours == -1).any(axis=1) + same > 2
+
+
+def _antialiased(
+    y: np.ndarray, packed: np.ndarray, other: np.ndarray, at: np.ndarray, offsets: np.ndarray
+) -> np.ndarray:
+    """pixelmatch's ``antialiased`` test for each pixel ``at`` (bordered flat index)."""
+    delta = y[at][:, None] - y[at[:, None] + offsets]
+    outside = np.isnan(delta)
+    zeroes = outside.any(axis=1) + np.count_nonzero(delta == 0, axis=1)
+    keep = np.flatnonzero(zeroes <= 2)  # most pixels of a real change stop here
+    delta = np.where(outside[keep], 0.0, delta[keep])
+    k = np.arange(len(keep))
+    darkest, brightest = delta.argmin(axis=1), delta.argmax(axis=1)
+    both = (delta[k, darkest] < 0) & (delta[k, brightest] > 0)
+    keep, darkest, brightest = keep[both], darkest[both], brightest[both]
+    result = np.zeros(len(at), bool)
+    for pick in (darkest, brightest):
+        neighbour = at[keep] + offsets[pick]
+        flat = _many_siblings(packed, neighbour, offsets)
+        result[keep] |= flat & _many_siblings(other, neighbour, offsets)
+    return result
+
+
+@dataclass
+class CaseResult:
+    case: str
+    status: str  # identical, passed, failed, resized, new or missing
+    pixels: int = 0
+    diff_pixels: int = 0
+    antialiased_pixels: int = 0
+    max_delta: float = 0.0
+    diff_image: Optional[str] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.status in ("failed", "resized", "missing")
+
+
+@dataclass
+class DiffReport:
+    cases: list[CaseResult] = field(default_factory=list)
+    unlisted: list[str] = field(default_factory=list)  # screenshots of no catalogued case
+    hashed_identical: int = 0  # skipped on the file hash alone
+    compared: int = 0  # decoded and compared in the pool
+    pixels_compared: int = 0
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> list[CaseResult]:
+        return [c for c in self.cases if c.failed]
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for case in self.cases:
+            counts[case.status] = counts.get(case.status, 0) + 1
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            "cases": [asdict(c) for c in self.cases],
+            "counts": self.counts(),
+            "unlisted": self.unlisted,
+            "hashed_identical": self.hashed_identical,
+            "compared": self.compared,
+            "pixels_compared": self.pixels_compared,
+            "seconds": self.seconds,
+        }
+
+
+class VisualDiff:
+    """Screenshots in ``current_dir`` against ``baseline_dir``, for every case of the matrix."""
+
+    def __init__(
+        self,
+        baseline_dir: str,
+        current_dir: str,
+        *,
+        out_dir: str = DEFAULT_OUT,
+        cases: Optional[list[Case]] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_diff_ratio: float = 0.0,
+        workers: Optional[int] = None,
+    ) -> None:
+        if not 0 <= threshold <= 1:
+            raise ValueError("threshold must be between 0 and 1")
+        self.baseline_dir = baseline_dir
+        self.current_dir = current_dir
+        self.out_dir = out_dir
+        self.cases = cases if cases is not None else variant_matrix()
+        self.threshold = threshold
+        self.max_diff_ratio = max_diff_ratio
+        self.workers = workers
+
+    def run(self) -> DiffReport:
+        start = time.perf_counter()
+        report = DiffReport()
+        results: dict[str, CaseResult] = {}
+        jobs = []
+        for case in self.cases:
+            baseline = os.path.join(self.baseline_dir, case.path)
+            current = os.path.join(self.current_dir, case.path)
+            if not os.path.exists(current):
+                results[case.name] = CaseResult(case.name, "missing")
+            elif not os.path.exists(baseline):
+                results[case.name] = CaseResult(case.name, "new")
+            elif _digest(baseline) == _digest(current):
+                results[case.name] = CaseResult(case.name, "identical")
+                report.hashed_identical += 1
+            else:
+                diff = os.path.join(self.out_dir, case.path)
+                jobs.append(
+                    (case.name, baseline, current, diff, self.threshold, self.max_diff_ratio)
+                )
+        if jobs:
+            # Biggest files first, so one large screenshot does not finish last.
+            jobs.sort(key=lambda job: -os.path.getsize(job[2]))
+            with ProcessPoolExecutor(min(self.workers or os.cpu_count() or 1, len(jobs))) as pool:
+                for result in pool.map(_diff, jobs):
+                    results[result.case] = result
+                    report.pixels_compared += result.pixels
+            report.compared = len(jobs)
+        report.cases = [results[case.name] for case in self.cases]
+        listed = {case.path for case in self.cases}
+        report.unlisted = sorted(p for p in _pngs(self.current_dir) if p not in listed)
+        report.seconds = time.perf_counter() - start
+        return report
+
+
+def _digest(path: str) -> str:
+    with open(path, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def _pngs(directory: str) -> list[str]:
+    found = []
+    for parent, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(".png"):
+                path = os.path.relpath(os.path.join(parent, name), directory)
+                found.append(path.replace(os.sep, "/"))
+    return found
+
+
+def _read(path: str) -> np.ndarray:
+    with open(path, "rb") as handle:
+        data = handle.read()
+    try:
+        return png.decode(data)
+    except png.PngError as exc:
+        raise VisualError(f"{path}: {exc}") from None
+
+
+def _diff(job: tuple[str, str, str, str, float, float]) -> CaseResult:
+    """Worker: decode one pair, compare it and write the diff image if it fails."""
+    name, baseline_path, current_path, diff_path, threshold, max_diff_ratio = job
+    baseline, current = _read(baseline_path), _read(current_path)
+    pixels = baseline.shape[0] * baseline.shape[1]
+    if baseline.shape != current.shape:
+        return CaseResult(name, "resized", pixels)
+    if np.array_equal(baseline, current):
+        return CaseResult(name, "identical", pixels)
+    comparison = compare(baseline, current, threshold)
+    result = CaseResult(
+        name,
+        "passed",
+        pixels,
+        comparison.diff_pixels,
+        int(np.count_nonzero(comparison.antialiased)),
+        round(comparison.max_delta, 6),
+    )
+    if comparison.diff_pixels > max_diff_ratio * pixels:
+        result.status = "failed"
+        os.makedirs(os.path.dirname(diff_path), exist_ok=True)
+        with open(diff_path, "wb") as handle:
+            handle.write(png.encode(diff_image(baseline, comparison), level=1))
+        result.diff_image = diff_path
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline_dir", nargs="?")
+    parser.add_argument("current_dir", nargs="?")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="diff images and report.json")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--max-diff-ratio", type=float, default=0.0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--list", action="store_true", help="print the case matrix and exit")
+    args = parser.parse_args(argv)
+    if args.list:
+        for case in variant_matrix():
+            print(case.path)
+        return 0
+    if args.current_dir is None:
+        parser.error("baseline_dir and current_dir are required")
+    report = VisualDiff(
+        args.baseline_dir,
+        args.current_dir,
+        out_dir=args.out,
+        threshold=args.threshold,
+        max_diff_ratio=args.max_diff_ratio,
+        workers=args.workers,
+    ).run()
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "report.json"), "w", encoding="utf-8") as handle:
+        json.dump(report.to_dict(), handle, indent=2)
+    counts = ", ".join(f"{n} {status}" for status, n in sorted(report.counts().items()))
+    print(
+        f"{len(report.cases)} cases: {counts}; {report.hashed_identical} skipped by hash, "
+        f"{report.compared} compared ({report.pixels_compared:,} pixels) in {report.seconds:.2f} s"
+    )
+    for case in report.failed:
+        detail = ""
+        if case.diff_image:
+            detail = f", {case.diff_pixels:,} pixels differ -> {case.diff_image}"
+        print(f"  {case.status:<8} {case.case}{detail}")
+    for path in report.unlisted:
+        print(f"warning: {path} is not a case of the component matrix", file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+Binary wire format for marker and ride lists
+============================================
+
+``MarkerData`` objects are sent as JSON, so every marker repeats its field
+names, image URLs and names as text.  This format stores the same records
+column by column:
+
+* numeric fields are fixed-width little-endian arrays (``array``/``struct``);
+* every string is interned once in a side table and columns hold indexes;
+* missing optional values use a sentinel (NaN, ``INT32_MIN``, ``0xFFFFFFFF``).
+
+:func:`encode` raises :class:`~ridehub.models.SchemaError` for a record with a
+missing required field, a wrong-typed value or a field the schema does not
+know, rather than dropping it.
+
+Layout (all sections padded to 8 bytes)::
+
+    header   magic "RHWF", version, kind, reserved, rows, strings, blob bytes
+    offsets  uint32[strings + 1] into the UTF-8 blob
+    blob     concatenated UTF-8 strings
+    columns  one array per schema field, in schema order
+
+:class:`WireReader` wraps the buffer in a ``memoryview`` and casts each
+section in place, so opening a payload copies nothing; values are only
+materialized when a row or string is actually read.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Mapping, Optional, Union
+
+from ridehub.models import MARKER_FIELDS, RIDE_DRIVER_FIELDS, RIDE_FIELDS, Field, SchemaError
+
+MAGIC = b"RHWF"
+VERSION = 2  # 2: markers carry the optional Driver fields
+MEDIA_TYPE = "application/vnd.ridehub.wire"
+
+_HEADER = struct.Struct("<4sBBHIII")
+_MISSING_STR = 0xFFFFFFFF
+_MISSING_INT = -(2**31)
+_TYPECODES = {float: "d", int: "i", str: "I"}
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class WireFormatError(ValueError):
+    """The buffer is not a payload this reader understands."""
+
+
+@dataclass(frozen=True)
+class _Column:
+    name: str
+    path: tuple[str, ...]
+    type: type
+    optional: bool
+
+    @property
+    def typecode(self) -> str:
+        return _TYPECODES[self.type]
+
+
+def _columns(fields: Iterable[Field], prefix: tuple[str, ...] = (), optional: bool = False):
+    return [
+        _Column(".".join(prefix + (f.name,)), prefix + (f.name,), f.type, optional or f.optional)
+        for f in fields
+    ]
+
+
+# Kind ids are part of the wire contract; append new kinds, never renumber.
+SCHEMAS: dict[str, tuple[int, list[_Column]]] = {
+    "markers": (1, _columns(MARKER_FIELDS)),
+    "rides": (2, _columns(RIDE_FIELDS) + _columns(RIDE_DRIVER_FIELDS, ("driver",), optional=True)),
+}
+_KINDS = {kind_id: (name, columns) for name, (kind_id, columns) in SCHEMAS.items()}
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def _get(record: Mapping, path: tuple[str, ...]):
+    value = record
+    for key in path:
+        value = value.get(key) if isinstance(value, Mapping) else None
+        if value is None:
+            return None
+    return value
+
+
+def _check_names(records: list, columns: list[_Column], kind: str) -> None:
+    # Records of one payload share a handful of key layouts; check each layout once.
+    names = frozenset(c.path[0] for c in columns)
+    unknown = set().union(*map(set, {tuple(record) for record in records})) - names
+    for key in {c.path[0] for c in columns if len(c.path) == 2}:
+        fields = {c.path[1] for c in columns if c.path[0] == key}
+        children = {tuple(child) for r in records if isinstance(child := r.get(key), dict)}
+        unknown |= {f"{key}.{name}" for name in set().union(*map(set, children)) - fields}
+    for row, record in enumerate(records if unknown else ()):
+        found = sorted(name for name in unknown if _has(record, name))
+        if found:
+            raise SchemaError(f"{kind} record {row}: unknown field(s) {found}")
+
+
+def _has(record: Mapping, name: str) -> bool:
+    key, _, nested = name.partition(".")
+    if not nested:
+        return key in record
+    child = record.get(key)
+    return isinstance(child, dict) and nested in child
+
+
+def _type_error(values: list, column: _Column, kind: str) -> SchemaError:
+    expected = (int, float) if column.type is float else column.type
+    for row, value in enumerate(values):
+        if value is not None and (not isinstance(value, expected) or isinstance(value, bool)):
+            return SchemaError(
+                f"{kind} record {row}: field {column.name!r} must be {column.type.__name__}, "
+                f"got {type(value).__name__}"
+            )
+    return SchemaError(f"{kind}: field {column.name!r} does not fit its column")
+
+
+def encode(records: Iterable[Mapping], kind: str = "markers") -> bytes:
+    """Pack ``records`` (dicts shaped like the TypeScript interface) into bytes."""
+    kind_id, columns = SCHEMAS[kind]
+    records = records if isinstance(records, list) else list(records)
+    _check_names(records, columns, kind)
+    interned: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = interned.get(value)
+        if index is None:
+            if not isinstance(value, str):
+                raise TypeError(value)
+            index = interned[value] = len(interned)
+        return index
+
+    packed = []
+    for column in columns:
+        if len(column.path) == 1:
+            key = column.path[0]
+            values = [record.get(key) for record in records]
+        else:
+            values = [_get(record, column.path) for record in records]
+        if not column.optional and None in values:
+            row = values.index(None)
+            raise SchemaError(f"{kind} record {row}: missing required field {column.name!r}")
+        try:
+            if column.type is str:
+                data = array("I", [_MISSING_STR if v is None else intern(v) for v in values])
+            elif not column.optional:
+                data = array(column.typecode, values)
+            elif column.type is float:
+                data = array("d", [math.nan if v is None else v for v in values])
+            else:
+                data = array("i", [_MISSING_INT if v is None else v for v in values])
+        except (TypeError, OverflowError):
+            raise _type_error(values, column, kind) from None
+        if not _LITTLE_ENDIAN:
+            data.byteswap()
+        packed.append(data.tobytes())
+
+    encoded = [s.encode("utf-8") for s in interned]
+    offsets = array("I", [0])
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    if not _LITTLE_ENDIAN:
+        offsets.byteswap()
+    blob = b"".join(encoded)
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, kind_id, 0, len(records), len(encoded), len(blob)))
+    for part in (offsets.tobytes(), blob, *packed):
+        out += bytes(_pad(len(out)))
+        out += part
+    return bytes(out)
+
+
+class WireReader:
+    """Zero-copy view over an encoded payload."""
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview]) -> None:
+        view = memoryview(buffer).cast("B")
+        if len(view) < _HEADER.size:
+            raise WireFormatError("payload shorter than header")
+        magic, version, kind_id, _, rows, strings, blob_bytes = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise WireFormatError("bad magic")
+        if version != VERSION:
+            raise WireFormatError(f"unsupported wire version {version}")
+        if kind_id not in _KINDS:
+            raise WireFormatError(f"unknown payload kind {kind_id}")
+        self.kind, columns = _KINDS[kind_id]
+        self._rows = rows
+
+        cursor = _HEADER.size
+        cursor += _pad(cursor)
+        self._offsets = _cast(view[cursor : cursor + 4 * (strings + 1)], "I")
+        cursor += 4 * (strings + 1)
+        cursor += _pad(cursor)
+        self._blob = view[cursor : cursor + blob_bytes]
+        cursor += blob_bytes
+        self._strings: list[Optional[str]] = [None] * strings
+
+        self._columns: dict[str, tuple[_Column, memoryview]] = {}
+        for column in columns:
+            cursor += _pad(cursor)
+            size = rows * array(column.typecode).itemsize
+            if cursor + size > len(view):
+                raise WireFormatError("payload truncated")
+            data = _cast(view[cursor : cursor + size], column.typecode)
+            self._columns[column.name] = (column, data)
+            cursor += size
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def column(self, name: str) -> memoryview:
+        """Raw column: floats/ints directly, string columns as table indexes."""
+        return self._columns[name][1]
+
+    def string(self, index: int) -> str:
+        cached = self._strings[index]
+        if cached is None:
+            start, end = self._offsets[index], self._offsets[index + 1]
+            cached = self._strings[index] = str(self._blob[start:end], "utf-8")
+        return cached
+
+    def values(self, name: str) -> list:
+        """Decoded values of one column, ``None`` where missing."""
+        column, data = self._columns[name]
+        if column.type is str:
+            string = self.string
+            return [None if raw == _MISSING_STR else string(raw) for raw in data]
+        if not column.optional:
+            return data.tolist()
+        if column.type is float:
+            return [None if raw != raw else raw for raw in data]
+        return [None if raw == _MISSING_INT else raw for raw in data]
+
+    def _decode(self, column: _Column, raw):
+        if column.type is str:
+            return None if raw == _MISSING_STR else self.string(raw)
+        if column.type is float:
+            return None if raw != raw else raw
+        return None if raw == _MISSING_INT else raw
+
+    def row(self, index: int) -> dict:
+        if not 0 <= index < self._rows:
+            raise IndexError(index)
+        record: dict = {}
+        for column, data in self._columns.values():
+            value = self._decode(column, data[index])
+            if value is None:
+                continue
+            target = record
+            for key in column.path[:-1]:
+                target = target.setdefault(key, {})
+            target[column.path[-1]] = value
+        return record
+
+    def __iter__(self) -> Iterator[dict]:
+        # Decode column by column, then stitch rows; much cheaper than row().
+        flat = [c.name for c, _ in self._columns.values() if len(c.path) == 1]
+        nested = [c for c, _ in self._columns.values() if len(c.path) > 1]
+        flat_values = [self.values(name) for name in flat]
+        nested_values = [self.values(c.name) for c in nested]
+        for index, values in enumerate(zip(*flat_values)):
+            record = {name: value for name, value in zip(flat, values) if value is not None}
+            for column, column_values in zip(nested, nested_values):
+                value = column_values[index]
+                if value is not None:
+                    target = record
+                    for key in column.path[:-1]:
+                        target = target.setdefault(key, {})
+                    target[column.path[-1]] = value
+            yield record
+
+
+def decode(buffer: Union[bytes, bytearray, memoryview]) -> list[dict]:
+    """Materialize every record of a payload."""
+    return list(WireReader(buffer))
+
+
+def _cast(view: memoryview, typecode: str) -> memoryview:
+    if _LITTLE_ENDIAN:
+        return view.cast(typecode)
+    # Big-endian hosts cannot view little-endian data in place.
+    data = array(typecode, view.tobytes())
+    data.byteswap()
+    return memoryview(data)
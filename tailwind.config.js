@@ -6,23 +6,23 @@ module.exports = {
       fontFamily: {
         Jakarta: ["Jakarta", "sans-serif"],
         JakartaBold: ["Jakarta-Bold", "sans-serif"],
-        JakartaExtraBold: ["Jakarta-ExtraBold", "sans-serif"],
-        JakartaExtraLight: ["Jakarta-ExtraLight", "sans-serif"],
-        JakartaLight: ["Jakarta-Light", "sans-serif"],
         JakartaMedium: ["Jakarta-Medium", "sans-serif"],
+        JakartaRegular: ["Jakarta", "sans-serif"],
         JakartaSemiBold: ["Jakarta-SemiBold", "sans-serif"],
       },
+      // @generated tokens:colors 4ba34e0cc29d11c3 from IMPLEMENTATION_COMPLETE.py; do not edit
       colors: {
         primary: {
-          100: "#F5F8FF",
-          200: "#EBF4FF",
-          300: "#C3D9FF",
-          400: "#9BBFFF",
-          500: "#0286FF",
-          600: "#6A85E6",
-          700: "#475A99",
-          800: "#364573",
-          900: "#242B4D",
+          50: "#F0F9FF",
+          100: "#E0F2FE",
+          200: "#BAE6FD",
+          300: "#7DD3FC",
+          400: "#38BDF8",
+          500: "#0EA5E9",
+          600: "#0284C7",
+          700: "#0369A1",
+          800: "#075985",
+          900: "#082F49",
         },
         secondary: {
           100: "#F8F8F8",
@@ -79,6 +79,7 @@ module.exports = {
           800: "#ADADAD",
         },
       },
+      // @end tokens:colors
     },
   },
   plugins: [],
@@ -0,0 +1,17 @@
+import numpy as np
+
+from ridehub.assignment import greedy, solve
+
+
+def test_budget_below_greedy_cost_goes_straight_to_greedy():
+    cost = np.random.default_rng(3).uniform(0, 900, (300, 300))
+    result = solve(cost, "auction", time_budget=1e-4)
+    assert result.fell_back
+    assert result.driver_for.tolist() == greedy(cost).tolist()
+
+
+def test_generous_budget_solves_exactly():
+    cost = np.random.default_rng(4).uniform(0, 900, (40, 60))
+    budgeted = solve(cost, "hungarian", time_budget=5.0)
+    assert not budgeted.fell_back
+    assert budgeted.total_cost == solve(cost, "hungarian").total_cost
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import socket
+
+from ridehub.chat import ChatBroker, ChatServer, SubscriptionClosed
+
+
+async def drain(subscription, count):
+    received = []
+    for _ in range(count):
+        try:
+            received.append((await subscription.get())["text"])
+        except SubscriptionClosed as closed:
+            received.append(closed.reason)
+            break
+    return received
+
+
+def test_concurrent_posts_to_full_live_subscriber_arrive_in_order():
+    async def scenario():
+        broker = ChatBroker(subscriber_buffer=1, send_timeout=1.0)
+        broker.open("c1")
+        subscription = broker.subscribe("c1", "driver")
+        consumer = asyncio.create_task(drain(subscription, 5))
+        await asyncio.gather(*(broker.post("c1", "user", f"m{i}") for i in range(1, 6)))
+        return await consumer, broker.stats
+
+    received, stats = asyncio.run(scenario())
+    assert received == ["m1", "m2", "m3", "m4", "m5"]
+    assert stats.lagging == 0 and stats.delivered == 5
+
+
+def test_stalled_subscriber_does_not_hold_back_the_others():
+    async def scenario():
+        broker = ChatBroker(subscriber_buffer=1, send_timeout=0.3)
+        broker.open("c1")
+        stalled = broker.subscribe("c1", "user")
+        live = broker.subscribe("c1", "driver")
+        await broker.post("c1", "user", "first")
+        await live.get()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        post = asyncio.create_task(broker.post("c1", "user", "second"))
+        received = (await live.get())["text"]
+        waited = loop.time() - start
+        await post
+        return received, waited, stalled, broker.stats
+
+    received, waited, stalled, stats = asyncio.run(scenario())
+    assert received == "second" and waited < 0.1
+    assert stalled.reason == "lagging" and stats.lagging == 1
+
+
+def test_waiting_posts_are_dropped_when_subscriber_closes():
+    async def scenario():
+        broker = ChatBroker(subscriber_buffer=1, send_timeout=5.0)
+        broker.open("c1")
+        subscription = broker.subscribe("c1", "driver")
+        await broker.post("c1", "user", "m1")
+        post = asyncio.create_task(broker.post("c1", "user", "m2"))
+        await asyncio.sleep(0)
+        subscription.close()
+        await post
+        return await drain(subscription, 3), broker.stats
+
+    received, stats = asyncio.run(scenario())
+    assert received == ["m1", "closed"]
+    assert stats.delivered == 1 and stats.lagging == 0
+
+
+def test_lagging_tcp_client_resubscribes_and_receives():
+    async def scenario():
+        broker = ChatBroker(subscriber_buffer=1, send_timeout=0.05)
+        server = await ChatServer(broker).start()
+        # A tiny receive window lets an unread socket back up into the outbox.
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (server.host, server.port))
+        reader, writer = await asyncio.open_connection(sock=sock, limit=1 << 20)
+
+        async def request(**payload):
+            writer.write(json.dumps(payload).encode() + b"\n")
+            await writer.drain()
+
+        async def event(kind):
+            while True:
+                payload = json.loads(await reader.readline())
+                if payload["event"] == kind:
+                    return payload
+
+        await request(op="subscribe", conversation="c1", side="driver")
+        await asyncio.sleep(0.01)
+        while not broker.stats.lagging:
+            await broker.post("c1", "user", "x" * 65536)
+        closed = await event("closed")
+        await request(op="subscribe", conversation="c1", side="driver")
+        await asyncio.sleep(0.01)
+        subscribers = len(broker.get("c1").subscribers)
+        await broker.post("c1", "user", "after resync")
+        while (received := await event("message"))["message"]["text"] != "after resync":
+            pass
+        writer.close()
+        await server.close()
+        return closed, subscribers, received
+
+    closed, subscribers, received = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert closed["reason"] == "lagging"
+    assert subscribers == 1
+    assert received["conversation"] == "c1"
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+
+from ridehub.directions import AsyncDirectionsClient, DirectionsError
+
+ROUTE = {"status": "OK", "routes": [{"legs": [{"duration": {"value": 321}}]}]}
+
+
+def fetch(response: bytes):
+    """Answer one request with ``response`` (closing the socket after it) and fetch a leg."""
+
+    async def scenario():
+        async def answer(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(response)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(answer, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with AsyncDirectionsClient(f"http://127.0.0.1:{port}/", retries=0) as client:
+                return await client.fetch(40.7, -74.0, 40.8, -73.9)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        b"HTTP/1.1 403 Forbidden\r\nContent-Length: 15\r\n\r\n<html>no</html>",
+        b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n",
+        b"HTTP/1.1 200 OK\r\nContent-Length: 6\r\n\r\n<html>",
+        b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\n",
+    ],
+    ids=["html 4xx", "empty 4xx", "html 200", "no length, empty"],
+)
+def test_unusable_responses_raise_directions_error(response):
+    with pytest.raises(DirectionsError, match="HTTP"):
+        fetch(response)
+
+
+def test_body_without_length_runs_to_end_of_connection():
+    body = json.dumps(ROUTE).encode()
+    assert fetch(b"HTTP/1.1 200 OK\r\n\r\n" + body) == ROUTE
+
+
+def test_api_error_status_is_reported():
+    body = json.dumps({"status": "REQUEST_DENIED"}).encode()
+    response = b"HTTP/1.1 400 Bad Request\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+    with pytest.raises(DirectionsError, match="REQUEST_DENIED"):
+        fetch(response)
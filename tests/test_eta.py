@@ -0,0 +1,28 @@
+import numpy as np
+
+from ridehub.eta import EtaBatch, EtaEngine, format_prices, round_cents
+
+USER = (40.7128, -74.0060)
+DESTINATION = (40.7580, -73.9855)
+
+
+def test_driver_times_rounds_ties_like_to_fixed():
+    marker = {"id": 1, "latitude": USER[0], "longitude": USER[1]}
+    engine = EtaEngine(leg_duration=lambda *_: 75.0)
+    (priced,) = engine.driver_times([marker], *USER, *DESTINATION)
+    assert priced["time"] == 1.25
+    assert priced["price"] == "0.63"
+
+
+def test_batch_prices_match_formatted_prices():
+    # 0.625 is an exact tie, 0.115 and 0.335 sit just off one.
+    minutes = np.array([[1.25, 0.23, 0.67, 2.0, 4.25]])
+    batch = EtaBatch(pickup_seconds=minutes * 60.0, trip_seconds=np.zeros(1))
+    assert batch.prices.tolist() == [[0.63, 0.12, 0.34, 1.0, 2.13]]
+    assert [float(p) for p in format_prices(batch.total_minutes * 0.5)] == batch.prices[0].tolist()
+
+
+def test_round_cents_agrees_with_format_prices_near_half_cents():
+    halves = (np.arange(2_000) + 0.5) / 100
+    fares = np.concatenate([halves, np.nextafter(halves, 0), np.nextafter(halves, 1)])
+    assert round_cents(fares).tolist() == [float(p) for p in format_prices(fares)]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from ridehub.fares import FareEngine, format_prices
+
+
+# (fare, what (fare).toFixed(2) returns in the app)
+GOLDEN = [
+    (1.005, "1.00"),  # 1.00499999999999989...
+    (2.675, "2.67"),  # 2.67499999999999982...
+    (10.235, "10.23"),  # 10.2349999999999994...
+    (0.125, "0.13"),  # exact binary half: toFixed rounds up, Python rounds to even
+    (0.375, "0.38"),
+    (0.625, "0.63"),
+    (2.125, "2.13"),
+    (0.135, "0.14"),  # 0.13500000000000000888...
+    (0.0, "0.00"),
+    (19.999, "20.00"),
+    (-0.125, "-0.13"),
+]
+
+
+@pytest.mark.parametrize("fare, expected", GOLDEN)
+def test_format_prices_matches_to_fixed(fare, expected):
+    assert format_prices([fare]) == [expected]
+
+
+def test_format_prices_keeps_order_and_flattens():
+    fares = np.array([[0.125, 1.005], [2.675, 0.625]])
+    assert format_prices(fares) == ["0.13", "1.00", "2.67", "0.63"]
+
+
+def test_legacy_quote_renders_like_the_client():
+    # calculateDriverTimes: (totalTime * 0.5).toFixed(2)
+    minutes = np.array([0.25, 0.75, 1.25, 2.01, 5.35])
+    assert format_prices(FareEngine().quote(minutes)) == ["0.13", "0.38", "0.63", "1.00", "2.67"]
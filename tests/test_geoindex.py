@@ -0,0 +1,41 @@
+import numpy as np
+
+import ridehub.geoindex as geoindex
+from ridehub.geo import haversine_km
+from ridehub.geoindex import GeoIndex
+
+
+def brute_force(points, lat, lng, k):
+    km = haversine_km(lat, lng, points[:, 0], points[:, 1])
+    return sorted(range(len(points)), key=lambda i: (km[i], i))[:k]
+
+
+def test_nearest_matches_brute_force_with_a_far_outlier():
+    rng = np.random.default_rng(5)
+    points = np.vstack(
+        [np.array([40.70, -74.02]) + rng.uniform(0, 1, (300, 2)) * [0.08, 0.06], [[34.05, -118.24]]]
+    )
+    index = GeoIndex()
+    for i, (lat, lng) in enumerate(points):
+        index.insert(i, lat, lng)
+    for lat, lng in np.array([40.70, -74.02]) + rng.uniform(0, 1, (50, 2)) * [0.08, 0.06]:
+        for k in (1, 5, 301):
+            found = [driver for driver, _ in index.nearest(lat, lng, k)]
+            assert found == brute_force(points, lat, lng, k)
+
+
+def test_departed_outlier_does_not_widen_the_search(monkeypatch):
+    index = GeoIndex()
+    index.insert("near", 40.75, -73.99)
+    index.insert("gone", 34.05, -118.24)
+    index.remove("gone")
+    rings = []
+
+    def counted(row, col, ring):
+        rings.append(ring)
+        return ring_cells(row, col, ring)
+
+    ring_cells = geoindex._ring
+    monkeypatch.setattr(geoindex, "_ring", counted)
+    assert [driver for driver, _ in index.nearest(40.76, -73.98, 5)] == ["near"]
+    assert len(rings) <= 2
@@ -0,0 +1,31 @@
+import numpy as np
+
+from ridehub.ingest import DriverTable, PositionBatch
+
+
+def test_apply_coalesces_repeated_new_driver():
+    table = DriverTable()
+    batch = PositionBatch.from_records([(7, 40.0, -74.0, 1.0), (7, 40.5, -74.5, 2.0)])
+    snapshot = table.apply(batch)
+    assert snapshot.driver_ids.tolist() == [7]
+    assert not np.isnan(snapshot.latitudes).any()
+    assert snapshot.position(7) == (40.5, -74.5)
+
+
+def test_apply_keeps_newest_fix_of_repeated_known_driver():
+    table = DriverTable()
+    table.apply(PositionBatch.from_records([(7, 40.0, -74.0, 1.0), (8, 41.0, -73.0, 1.0)]))
+    batch = PositionBatch.from_records(
+        [(7, 40.9, -74.9, 5.0), (7, 40.2, -74.2, 3.0), (9, 42.0, -72.0, 1.0)]
+    )
+    snapshot = table.apply(batch)
+    assert snapshot.driver_ids.tolist() == [7, 8, 9]
+    assert snapshot.position(7) == (40.9, -74.9)
+    assert snapshot.fixed_at.tolist() == [5.0, 1.0, 1.0]
+
+
+def test_apply_ignores_stale_fix():
+    table = DriverTable()
+    table.apply(PositionBatch.from_records([(7, 40.0, -74.0, 5.0)]))
+    snapshot = table.apply(PositionBatch.from_records([(7, 41.0, -75.0, 4.0)]))
+    assert snapshot.position(7) == (40.0, -74.0)
@@ -0,0 +1,43 @@
+import threading
+
+import numpy as np
+
+from ridehub.promos import EXHAUSTED, OK, PromoEngine, PromoRule
+
+
+def test_issue_many_while_redeeming_never_oversells_or_loses_codes():
+    engine = PromoEngine([PromoRule("fixed", 5.0)], capacity=16)
+    codes = [f"RIDE{i}" for i in range(8)]
+    uses = 400
+    engine.issue_many(codes, 0, uses=uses)
+    outcomes = {OK: 0, EXHAUSTED: 0}
+    unexpected = []
+    tally = threading.Lock()
+
+    def redeem(code):
+        for _ in range(uses + 50):
+            reason = engine.redeem(code, 20.0).reason
+            if reason not in outcomes:
+                unexpected.append(reason)
+            with tally:
+                outcomes[reason] = outcomes.get(reason, 0) + 1
+
+    workers = [threading.Thread(target=redeem, args=(code,)) for code in codes * 2]
+    for worker in workers:
+        worker.start()
+    # Each batch doubles the capacity, so every column, the table and the
+    # Bloom filter are replaced repeatedly while the redeemers run.
+    issued = 0
+    for batch in range(12):
+        size = 16 << batch
+        fresh = np.char.add(f"B{batch}X".encode(), np.arange(size).astype("S")).astype("S16")
+        engine.issue_many(fresh, 0, uses=1, normalized=True)
+        issued += size
+    for worker in workers:
+        worker.join()
+
+    assert unexpected == []
+    assert outcomes[OK] == uses * len(codes)
+    assert all(engine.get(code)["usesLeft"] == 0 for code in codes)
+    assert len(engine) == len(codes) + issued
+    assert (engine.lookup_many(codes) >= 0).all()
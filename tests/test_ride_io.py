@@ -0,0 +1,42 @@
+import gzip
+import json
+
+import pytest
+
+from ridehub.ride_io import RideImportError, import_rides, read_rides
+from ridehub.ride_store import RideStore
+from tests.test_ride_store import ride
+
+
+def write_lines(path, rides):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rides), encoding="utf-8")
+
+
+def test_unparseable_created_at_is_a_schema_error_with_line(tmp_path):
+    path = tmp_path / "rides.ndjson"
+    write_lines(path, [ride(), ride(created_at="yesterday"), ride()])
+    store = RideStore()
+    with pytest.raises(RideImportError) as raised:
+        import_rides(store, path)
+    assert raised.value.line == 2 and "created_at" in raised.value.reason
+    assert len(store) == 0
+
+
+def test_unparseable_created_at_is_skipped(tmp_path):
+    path = tmp_path / "rides.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        for record in (ride(), ride(created_at="yesterday"), ride(fare_price=1.0)):
+            handle.write(json.dumps(record) + "\n")
+    store = RideStore()
+    stats = import_rides(store, path, errors="skip")
+    assert (stats.rows, stats.skipped) == (2, 1)
+    assert len(store) == 2
+
+
+def test_chunks_and_blank_lines(tmp_path):
+    path = tmp_path / "rides.ndjson"
+    path.write_text(
+        json.dumps(ride()) + "\n\n" + json.dumps(ride()) + "\n" + json.dumps(ride()) + "\n",
+        encoding="utf-8",
+    )
+    assert [len(chunk) for chunk in read_rides(path, chunk_size=2)] == [1, 2]
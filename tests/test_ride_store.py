@@ -0,0 +1,46 @@
+import pytest
+
+from ridehub.ride_store import RideStore
+
+
+def ride(**overrides):
+    record = {
+        "origin_address": "Kathmandu, Nepal",
+        "destination_address": "Pokhara, Nepal",
+        "origin_latitude": 27.717245,
+        "origin_longitude": 85.323961,
+        "destination_latitude": 28.209583,
+        "destination_longitude": 83.985567,
+        "ride_time": 391.0,
+        "fare_price": 19500.0,
+        "payment_status": "paid",
+        "driver_id": 2,
+        "user_id": "1",
+        "created_at": "2024-08-12 05:19:20.620007",
+    }
+    record.update(overrides)
+    return record
+
+
+def test_failed_insert_leaves_store_unchanged():
+    store = RideStore()
+    store.insert(ride())
+    with pytest.raises(ValueError, match="ride_time"):
+        store.insert(ride(ride_time="12", created_at="2024-08-13 05:19:20"))
+    assert len(store) == 1
+    assert {len(column) for column in store._columns.values()} == {1}
+
+    row = store.insert(ride(fare_price=4200.0, created_at="2024-08-14 05:19:20"))
+    assert row == 1
+    assert store.get(row)["fare_price"] == 4200.0
+    assert [r["fare_price"] for r in store.query(user_id="1").rides] == [4200.0, 19500.0]
+
+
+def test_missing_required_field_is_rejected_before_any_write():
+    store = RideStore()
+    record = ride()
+    del record["user_id"]
+    with pytest.raises(ValueError, match="user_id"):
+        store.insert(record)
+    assert len(store) == 0
+    assert {len(column) for column in store._columns.values()} == {0}
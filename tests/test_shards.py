@@ -0,0 +1,34 @@
+import time
+
+import numpy as np
+import pytest
+
+from ridehub.shards import DispatchRuntime, SharedDriverTable, ShardGrid
+
+BOUNDS = (40.70, -74.02, 40.78, -73.96)
+
+
+def test_view_raises_when_a_write_never_finishes():
+    table = SharedDriverTable(2, 4)
+    try:
+        table.apply([7], [40.71], [-74.01], [1])
+        table._versions[0] += 1  # a writer that died between its two increments
+        start = time.monotonic()
+        with pytest.raises(TimeoutError, match="shard 0"):
+            table.view(0, timeout=0.05)
+        assert time.monotonic() - start < 1.0
+        assert table.view(1).driver_ids.tolist() == [7]
+    finally:
+        table.close()
+
+
+def test_tick_surfaces_a_stalled_shard_from_a_worker():
+    grid = ShardGrid(*BOUNDS, shard_cells=4)
+    with DispatchRuntime(grid, workers=1, capacity=64) as runtime:
+        runtime.update([1, 2], [40.72, 40.75], [-74.00, -73.98])
+        assert runtime.tick(["a"], [(40.721, -74.001)]).matches == {"a": 1}
+        runtime.table._versions[:] += 1
+        with pytest.raises(TimeoutError, match="mid-write"):
+            runtime.tick(["b"], [(40.751, -73.981)])
+        runtime.table._versions[:] += 1
+        assert runtime.tick(["c"], [(40.751, -73.981)]).matches == {"c": 2}
@@ -0,0 +1,58 @@
+import os
+import re
+import shutil
+import threading
+
+import pytest
+
+from ridehub.tokens import MANIFEST, THEME, TokenCompiler, TokenError, main
+
+
+@pytest.fixture
+def root(tmp_path):
+    for name in (MANIFEST, *TokenCompiler().targets):
+        os.makedirs(tmp_path / os.path.dirname(name), exist_ok=True)
+        shutil.copyfile(name, tmp_path / name)
+    return str(tmp_path)
+
+
+def test_check_reports_missing_target_as_token_error(root, capsys):
+    os.remove(os.path.join(root, THEME))
+    with pytest.raises(TokenError, match="does not exist"):
+        TokenCompiler(root).check()
+    assert main(["--root", root, "--check"]) == 2
+    assert "does not exist" in capsys.readouterr().err
+
+
+def test_watch_retries_once_a_broken_target_is_fixed(root):
+    path = os.path.join(root, THEME)
+    with open(path, encoding="utf-8") as handle:
+        original = handle.read()
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(original.replace("// @generated tokens:colors", "// tokens:colors"))
+
+    compiler = TokenCompiler(root)
+    built = threading.Event()
+    stop = threading.Event()
+    results = []
+
+    def on_build(result):
+        results.append(result)
+        built.set()
+
+    watcher = threading.Thread(
+        target=compiler.watch, kwargs={"interval": 0.01, "stop": stop, "on_build": on_build}
+    )
+    watcher.start()
+    try:
+        assert not built.wait(0.2)
+        # Only the target changes (the marker comes back with a stale digest);
+        # the manifest is never touched.
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(re.sub(r"(// @generated tokens:colors) \S+", r"\1 -", original))
+        assert built.wait(5)
+    finally:
+        stop.set()
+        watcher.join()
+    assert results[0].written == [THEME]
+    assert compiler.check() == []
@@ -0,0 +1,80 @@
+import struct
+
+import pytest
+
+from ridehub.ttf import Font, TtfError, subset, verify
+
+REGULAR = "assets/fonts/PlusJakartaSans-Regular.ttf"
+TEXT = "Café ñ"
+
+
+@pytest.fixture(scope="module")
+def original():
+    with open(REGULAR, "rb") as handle:
+        return handle.read()
+
+
+@pytest.fixture(scope="module")
+def subsetted(original):
+    return subset(original, map(ord, TEXT))
+
+
+def sfnt_sum(data):
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) & 0xFFFFFFFF
+
+
+def glyph(font, gid):
+    offsets = font.offsets()
+    return font.tables[b"glyf"][offsets[gid] : offsets[gid + 1]]
+
+
+def test_subset_parses_with_valid_checksums(original, subsetted):
+    assert len(subsetted) < len(original) / 2
+    font = Font(subsetted)
+    (count,) = struct.unpack(">H", subsetted[4:6])
+    for i in range(count):
+        entry = subsetted[12 + 16 * i : 28 + 16 * i]
+        tag, expected, offset, length = struct.unpack(">4sIII", entry)
+        table = subsetted[offset : offset + length]
+        if tag == b"head":
+            table = table[:8] + b"\0\0\0\0" + table[12:]
+        assert sfnt_sum(table) == expected, tag
+        assert font.tables[tag] == subsetted[offset : offset + length]
+    assert sfnt_sum(subsetted) == 0xB1B0AFBA
+    assert b"DSIG" not in font.tables
+    verify(subsetted)
+
+
+def test_cmap_holds_exactly_the_requested_code_points(original, subsetted):
+    before, after = Font(original).cmap(), Font(subsetted).cmap()
+    assert after == {ord(c): before[ord(c)] for c in set(TEXT)}
+
+
+def test_composite_components_are_kept(original, subsetted):
+    source, font = Font(original), Font(subsetted)
+    accented = source.cmap()[ord("é")]
+    components = source.components(glyph(source, accented))
+    assert components
+    assert glyph(font, accented) == glyph(source, accented)
+    for component in components:
+        assert glyph(font, component) == glyph(source, component)
+    assert glyph(font, source.cmap()[ord("z")]) == b""
+    assert font.num_glyphs == source.num_glyphs
+
+
+def test_gsub_ligatures_follow_their_inputs(original):
+    source = Font(original)
+    plain = {source.cmap()[ord("f")], source.cmap()[ord("i")]}
+    font = Font(subset(original, map(ord, "fi")))
+    kept = {gid for gid in range(font.num_glyphs) if glyph(font, gid)}
+    assert plain < kept and len(kept - plain - {0}) > 1
+
+
+def test_verify_rejects_a_corrupted_font(subsetted):
+    damaged = bytearray(subsetted)
+    damaged[-8] ^= 0xFF
+    with pytest.raises(TtfError):
+        verify(damaged)
+    with pytest.raises(TtfError, match="none of the requested"):
+        subset(subsetted, [0x4E00])
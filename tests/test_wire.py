@@ -0,0 +1,104 @@
+import pytest
+
+from ridehub.models import SchemaError
+from ridehub.wire import WireReader, decode, encode
+
+# MOCK_DRIVERS from components/Map.tsx
+DRIVERS = [
+    {
+        "id": 1,
+        "first_name": "James",
+        "last_name": "Wilson",
+        "email": "james@example.com",
+        "profile_image_url": "https://i.pravatar.cc/150?img=1",
+        "car_seats": 4,
+        "car_model": "Toyota Camry",
+        "car_year": 2022,
+        "car_color": "Silver",
+        "car_image_url": "https://via.placeholder.com/150?text=Camry",
+        "rating": 4.8,
+        "latitude": 40.7128,
+        "longitude": -74.0060,
+    },
+    {
+        "id": 2,
+        "first_name": "Sarah",
+        "last_name": "Johnson",
+        "profile_image_url": "https://i.pravatar.cc/150?img=2",
+        "car_seats": 4,
+        "car_image_url": "https://via.placeholder.com/150?text=Accord",
+        "rating": 4.9,
+    },
+]
+
+
+def generate_markers(drivers, user_latitude=40.7, user_longitude=-74.0):
+    """``generateMarkersFromData`` from lib/map.ts, without the random offset."""
+    return [
+        {
+            "latitude": user_latitude,
+            "longitude": user_longitude,
+            "title": f"{driver['first_name']} {driver['last_name']}",
+            **driver,
+        }
+        for driver in drivers
+    ]
+
+
+def test_markers_round_trip_with_driver_fields():
+    markers = generate_markers(DRIVERS)
+    assert decode(encode(markers)) == markers
+    assert WireReader(encode(markers)).row(0)["car_model"] == "Toyota Camry"
+
+
+def test_markers_round_trip_with_driver_times():
+    markers = generate_markers(DRIVERS)
+    markers[0].update(time=12.5, price="6.25")
+    assert decode(encode(markers)) == markers
+
+
+def test_unknown_field_is_rejected():
+    markers = generate_markers(DRIVERS)
+    markers[1]["licence_plate"] = "ABC-123"
+    expected = r"markers record 1: unknown field\(s\) \['licence_plate'\]"
+    with pytest.raises(SchemaError, match=expected):
+        encode(markers)
+
+
+def test_missing_required_field_names_the_field():
+    markers = generate_markers(DRIVERS)
+    del markers[1]["rating"]
+    with pytest.raises(SchemaError, match="markers record 1: missing required field 'rating'"):
+        encode(markers)
+
+
+@pytest.mark.parametrize(
+    "field, value", [("car_seats", "4"), ("rating", "4.8"), ("car_year", 2022.5), ("email", 7)]
+)
+def test_wrong_type_names_the_field(field, value):
+    markers = generate_markers(DRIVERS)
+    markers[0][field] = value
+    with pytest.raises(SchemaError, match=f"markers record 0: field '{field}'"):
+        encode(markers)
+
+
+def test_unknown_nested_ride_driver_field_is_rejected():
+    ride = {
+        "origin_address": "Kathmandu, Nepal",
+        "destination_address": "Pokhara, Nepal",
+        "origin_latitude": 27.717245,
+        "origin_longitude": 85.323961,
+        "destination_latitude": 28.209583,
+        "destination_longitude": 83.985567,
+        "ride_time": 391.0,
+        "fare_price": 19500.0,
+        "payment_status": "paid",
+        "driver_id": 2,
+        "user_id": "1",
+        "created_at": "2024-08-12 05:19:20.620007",
+        "driver": {"first_name": "David", "last_name": "Brown", "car_seats": 5},
+    }
+    assert decode(encode([ride], "rides")) == [ride]
+    ride["driver"]["car_model"] = None
+    with pytest.raises(SchemaError, match=r"unknown field\(s\) \['driver.car_model'\]"):
+        encode([ride], "rides")